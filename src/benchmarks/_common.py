@@ -0,0 +1,36 @@
+# coding=utf-8
+""" Shared helpers for the benchmark scripts """
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Tuple, Any
+
+# Making the local parac module importable without installing it, same as
+# the pytest conftest does
+SRC_PATH: Path = Path(os.path.dirname(os.path.realpath(__file__))).parent
+sys.path.insert(0, str(SRC_PATH))
+
+TEST_FILES_PATH: Path = SRC_PATH / "pytest" / "test_files"
+
+__all__ = [
+    'SRC_PATH',
+    'TEST_FILES_PATH',
+    'best_of'
+]
+
+
+def best_of(
+        func: Callable[[], Any], repeat: int = 3
+) -> Tuple[float, Any]:
+    """
+    Runs the passed function repeat times and returns the fastest wall time
+    in seconds together with the return value of the last run
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
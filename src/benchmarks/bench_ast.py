@@ -0,0 +1,120 @@
+# coding=utf-8
+"""
+Benchmark for the AST, which compares the nodes and the retained memory of
+the Antlr4 parse tree (CST) with the AST built from it.
+
+The CST bytes are the memory allocated by parsing, which stays alive as long
+as the tree is referenced, since the tree keeps its tokens, the token stream
+and the input stream alive. The AST bytes are the memory left after freeing
+the tree, which is only the AST itself. Measured on the test files and on a
+generated file of expression statements (see bench_expression_tree.py).
+"""
+import gc
+import tracemalloc
+from typing import Iterator, Tuple
+
+import antlr4
+from antlr4.error.ErrorListener import ErrorListener
+from _common import best_of, TEST_FILES_PATH
+from bench_expression_tree import count_nodes, create_source
+
+from parac.compiler import ParacCompiler
+from parac.compiler.ast_nodes import count_nodes as count_ast_nodes
+from parac.compiler.parser.ast_builder import AstBuilder
+from parac.compiler.parser.fast_lexer import FastParaCLexer
+from parac.compiler.parser.flat_parser import FlatParaCParser
+from parac.compiler.parser.python.ParaCListener import ParaCListener
+from parac.util import (DispatchTableWalker, ParseModeStatistics,
+                        free_parse_tree, get_input_stream, parse_with_mode)
+
+FILE_EXTENSIONS = (".para", ".ph", ".c", ".h")
+
+
+class _AstListener(ParaCListener):
+    """ Listener only building the AST """
+
+    def __init__(self):
+        self.builder = AstBuilder()
+
+    def exitEveryRule(self, ctx: antlr4.ParserRuleContext):
+        self.builder.exit_rule(ctx)
+
+
+def parse(source: str) -> antlr4.ParserRuleContext:
+    """ Parses the source with the two-stage parse mode """
+    parser = FlatParaCParser(antlr4.CommonTokenStream(
+        FastParaCLexer(get_input_stream(source, "bench"))
+    ))
+    parser.removeErrorListeners()
+    return parse_with_mode(
+        parser, parser.compilationUnit, ErrorListener(), None,
+        ParseModeStatistics()
+    )
+
+
+def build(tree: antlr4.ParserRuleContext):
+    """ Walks the tree and returns the built AST """
+    listener = _AstListener()
+    DispatchTableWalker().walk(listener, tree)
+    return listener.builder.result
+
+
+def measure(source: str) -> Tuple[int, int, int, int]:
+    """
+    Returns the nodes and retained bytes of the CST and the AST of the source
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tree = parse(source)
+        cst_bytes, _ = tracemalloc.get_traced_memory()
+        cst_nodes = count_nodes(tree)
+
+        unit = build(tree)
+        free_parse_tree(tree)
+        del tree
+        gc.collect()
+        ast_bytes, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return cst_nodes, cst_bytes, count_ast_nodes(unit), ast_bytes
+
+
+def test_files() -> Iterator[str]:
+    """ Yields the sources of the test files without comments """
+    for path in sorted(TEST_FILES_PATH.rglob("*")):
+        if path.suffix in FILE_EXTENSIONS:
+            yield ParacCompiler.remove_comments_from_str(
+                path.read_text(encoding="utf-8")
+            )
+
+
+def main() -> None:
+    print(f"{'source':<12} | {'lines':>6} | {'CST nodes':>9} | "
+          f"{'AST nodes':>9} | {'CST B/line':>10} | {'AST B/line':>10} | "
+          f"{'build':>8}")
+
+    for name, sources in [
+        ("test files", list(test_files())),
+        ("expressions", [create_source()]),
+    ]:
+        # Warming up the shared DFA, so its growth is not measured
+        for source in sources:
+            parse(source)
+
+        lines = sum(source.count("\n") + 1 for source in sources)
+        totals = [0, 0, 0, 0]
+        for source in sources:
+            for i, value in enumerate(measure(source)):
+                totals[i] += value
+        cst_nodes, cst_bytes, ast_nodes, ast_bytes = totals
+
+        trees = [parse(source) for source in sources]
+        duration, _ = best_of(lambda: [build(tree) for tree in trees])
+        print(f"{name:<12} | {lines:>6,} | {cst_nodes:>9,} | "
+              f"{ast_nodes:>9,} | {cst_bytes / lines:>10,.0f} | "
+              f"{ast_bytes / lines:>10,.0f} | {duration:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
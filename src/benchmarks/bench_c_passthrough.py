@@ -0,0 +1,58 @@
+# coding=utf-8
+"""
+Benchmark for the verbatim C regions ('#pragma PARAC lang C'), which compares
+parsing a file whose C code is lexed and parsed by the Para-C parser with
+parsing it with the C code marked as a C region, which is copied verbatim.
+
+The file has a small Para-C part and a large C part built from the C test
+files, same as a Para-C wrapper around an existing C library.
+"""
+import asyncio
+import os
+
+from _common import best_of, TEST_FILES_PATH
+
+from parac.compiler.ctx import ProgramCompilationContext
+
+C_REPEATS = 20
+PARAC_CODE = "int main() {\n    return 0;\n}\n"
+
+
+def create_source() -> tuple:
+    """ Returns the source of the file and its C region """
+    c_code = ""
+    for path in sorted((TEST_FILES_PATH / "c_files").glob("*.c")):
+        with open(path, 'r', encoding='utf-8') as file:
+            c_code += file.read().replace("main(", f"main_{len(c_code)}(") \
+                + "\n"
+    c_code *= C_REPEATS
+    source = f"{PARAC_CODE}#pragma PARAC lang C\n{c_code}"
+    start = PARAC_CODE.count('\n') + 2
+    return source, [(start, source.count('\n') + 2)]
+
+
+def parse(source: str, c_regions: list) -> int:
+    """ Parses the source and returns the amount of syntax errors """
+    ctx = asyncio.run(
+        ProgramCompilationContext.read_and_parse_file(
+            os.path.abspath("entry.para"), 'utf-8', os.getcwd(), False,
+            source=source, c_regions=c_regions, release_parse_tree=True
+        )
+    )
+    return ctx.syntax_errors
+
+
+def main() -> None:
+    source, c_regions = create_source()
+    size = len(source.encode())
+    print(f"Source: {size / 1024:.0f} KB, {source.count(chr(10)):,} lines")
+    for name, regions in [("parsed", None), ("verbatim", c_regions)]:
+        duration, errors = best_of(lambda: parse(source, regions))
+        print(
+            f"{name:<10} {duration:8.3f}s  "
+            f"({size / duration / 1e6:.2f} MB/s, {errors} syntax errors)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# coding=utf-8
+"""
+Benchmark for the evaluation of the #if and #elif conditions, which compares
+the ConditionEvaluator with and without the cache of compiled conditions.
+
+Every simulated header defines its own include guard, which changes the
+generation of the macro table, and repeats the same conditions, like the
+'#if __cplusplus' guard of the generated headers.
+"""
+from _common import best_of
+
+from parac.preprocessor import ConditionEvaluator, MacroTable, parse_define
+
+HEADERS = 2_000
+CONDITIONS = [
+    "__cplusplus",
+    "defined(__cplusplus) && __cplusplus >= 201103L",
+    "PARAC_VERSION >= 2 && !defined(PARAC_NO_LIST)",
+    "defined(_WIN32) || defined(__linux__) || defined(__APPLE__)",
+]
+
+
+def evaluate_headers(cache_conditions: bool) -> ConditionEvaluator:
+    """ Evaluates the conditions of HEADERS headers """
+    table = MacroTable()
+    table.define(parse_define("#define PARAC_VERSION 2"))
+    table.define(parse_define("#define __linux__ 1"))
+    evaluator = ConditionEvaluator(table, cache_conditions)
+    for i in range(HEADERS):
+        table.define(parse_define(f"#define HEADER_{i}_H"))
+        for condition in CONDITIONS:
+            evaluator.evaluate(condition)
+    return evaluator
+
+
+def main() -> None:
+    count = HEADERS * len(CONDITIONS)
+    print(f"Headers: {HEADERS:,}, conditions: {count:,}")
+    for name, cache_conditions in [("uncached", False), ("cached", True)]:
+        duration, evaluator = best_of(
+            lambda: evaluate_headers(cache_conditions)
+        )
+        stats = evaluator.statistics
+        print(
+            f"{name:<10} {duration / count * 1e6:8.2f} us/condition  "
+            f"({duration:.3f}s, {stats.compilations:,} compilations, "
+            f"{stats.cache_hits:,} cache hits)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# coding=utf-8
+"""
+Benchmark for the shared Antlr4 DFA cache, which compares the parse time of
+the test files with cold prediction tables, warm in-process tables and
+tables loaded from the on-disk cache
+
+Usage: python bench_dfa_cache.py
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from _common import best_of, TEST_FILES_PATH
+
+from parac.compiler import ParacCompiler
+from parac.util import get_dfa_cache, get_input_stream, DFA_CACHE_FILE_NAME
+
+
+def load_sources() -> dict:
+    """ Loads the test files with the comments already removed """
+    return {
+        path.name: ParacCompiler.remove_comments_from_str(
+            path.read_text(encoding="utf-8")
+        )
+        for path in sorted(TEST_FILES_PATH.glob("*.para"))
+    }
+
+
+def parse_all(sources: dict) -> None:
+    """ Parses all passed sources """
+    for name, source in sources.items():
+        asyncio.run(
+            ParacCompiler.parse(get_input_stream(source, name), False)
+        )
+
+
+def main() -> None:
+    """ Runs the benchmark """
+    cache = get_dfa_cache()
+    sources = load_sources()
+
+    cache.clear()
+    start = time.perf_counter()
+    parse_all(sources)
+    cold = time.perf_counter() - start
+    warm, _ = best_of(lambda: parse_all(sources))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, DFA_CACHE_FILE_NAME)
+        save, _ = best_of(lambda: cache.save(path), 1)
+        size = os.path.getsize(path) / 1024 / 1024
+
+        cache.clear()
+        load, _ = best_of(lambda: cache.load(path), 1)
+        start = time.perf_counter()
+        parse_all(sources)
+        from_disk = time.perf_counter() - start
+
+    print(f"{len(sources)} files, {cache.state_count} DFA states, "
+          f"cache file {size:.2f} MB")
+    print(f"{'cold':>20} | {cold:>8.3f} s")
+    print(f"{'warm (in-process)':>20} | {warm:>8.3f} s")
+    print(f"{'warm (from disk)':>20} | {from_disk:>8.3f} s "
+          f"(+ {load:.3f} s load)")
+    print(f"{'save':>20} | {save:>8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
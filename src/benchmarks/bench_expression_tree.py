@@ -0,0 +1,98 @@
+# coding=utf-8
+"""
+Benchmark for the expression trees of the parsers, which compares the
+generated ParaCParser with the FlatParaCParser on a file made of expression
+statements. Measured are the parse time, the LL fallbacks, the nodes of the
+parse tree and the time of a listener walk.
+"""
+import random
+
+import antlr4
+from antlr4.error.ErrorListener import ErrorListener
+from _common import best_of
+
+from parac.compiler.parser.fast_lexer import FastParaCLexer
+from parac.compiler.parser.flat_parser import FlatParaCParser
+from parac.compiler.parser.python.ParaCListener import ParaCListener
+from parac.compiler.parser.python.ParaCParser import ParaCParser
+from parac.util import (DispatchTableWalker, ParseModeStatistics,
+                        get_input_stream, parse_with_mode)
+
+STATEMENTS = 400
+OPERATORS = [
+    '+', '-', '*', '/', '%', '<', '>', '<=', '>=', '==', '!=', '&&', '||',
+    '&', '|', '^', '<<', '>>'
+]
+OPERANDS = ["a", "b[i]", "f(x, y)", "1", "0x1F", "p->q", "s.t", "-a", "!b",
+            "x++"]
+
+
+def create_source(seed: int = 1) -> str:
+    """ Returns a function with random assignments of nested expressions """
+    rnd = random.Random(seed)
+
+    def operand(depth: int) -> str:
+        if depth < 3 and rnd.random() < 0.25:
+            return f"({expression(depth + 1, 1)})"
+        return rnd.choice(OPERANDS)
+
+    def expression(depth: int = 0, min_operators: int = 0) -> str:
+        result = operand(depth)
+        for _ in range(rnd.randint(min_operators, 3)):
+            result += f" {rnd.choice(OPERATORS)} {operand(depth)}"
+        return result
+
+    return "int main() {\n" + "".join(
+        f"    x = {expression()};\n" for _ in range(STATEMENTS)
+    ) + "    return 0;\n}\n"
+
+
+def parse(
+        parser_cls: type, source: str, statistics: ParseModeStatistics
+) -> antlr4.ParserRuleContext:
+    """ Parses the source with the two-stage parse mode """
+    parser = parser_cls(antlr4.CommonTokenStream(
+        FastParaCLexer(get_input_stream(source, "bench"))
+    ))
+    parser.removeErrorListeners()
+    return parse_with_mode(
+        parser, parser.compilationUnit, ErrorListener(), None, statistics
+    )
+
+
+def count_nodes(tree: antlr4.ParserRuleContext) -> int:
+    """ Counts the nodes of the tree """
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(getattr(node, 'children', None) or ())
+    return count
+
+
+def main() -> None:
+    source = create_source()
+    print(f"Source: {source.count(chr(10)):,} lines")
+    print(f"{'parser':<16} | {'parse':>8} | {'fallback':>8} | "
+          f"{'nodes':>8} | {'walk':>8}")
+
+    for parser_cls in (ParaCParser, FlatParaCParser):
+        # Warming up the shared DFA, so only the prediction of the parser
+        # itself is measured
+        parse(parser_cls, source, ParseModeStatistics())
+
+        statistics = ParseModeStatistics()
+        duration, tree = best_of(
+            lambda: parse(parser_cls, source, statistics)
+        )
+        walk_time, _ = best_of(
+            lambda: DispatchTableWalker().walk(ParaCListener(), tree)
+        )
+        print(f"{parser_cls.__name__:<16} | {duration:7.3f}s | "
+              f"{statistics.fallback_rate:>8.0%} | "
+              f"{count_nodes(tree):>8,} | {walk_time:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
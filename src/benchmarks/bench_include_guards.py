@@ -0,0 +1,83 @@
+# coding=utf-8
+"""
+Benchmark for the multiple-include optimisation of the Pre-Processor, which
+compares processing a program whose modules all include the same guarded
+headers with and without skipping the includes of already processed headers.
+
+Without the optimisation every include of a header processes its directives
+again, same as a C pre-processor without include guard detection.
+"""
+import asyncio
+import os
+import tempfile
+from unittest import mock
+
+from _common import best_of
+
+from parac.compiler import ProgramCompilationProcess
+from parac.preprocessor import MultipleIncludeOptimizer
+
+MODULES = 300
+HEADER_DEFINES = 200
+
+
+def create_program(path: str) -> str:
+    """ Creates the program in the passed folder and returns the entry """
+    defines = "".join(
+        f"#define COMMON_{i} ({i} + COMMON_{i - 1})\n"
+        for i in range(1, HEADER_DEFINES)
+    )
+    with open(os.path.join(path, "common.ph"), 'w') as file:
+        file.write(
+            f"#ifndef COMMON_H\n#define COMMON_H\n#define COMMON_0 0\n"
+            f"{defines}#endif\n"
+        )
+    with open(os.path.join(path, "once.ph"), 'w') as file:
+        file.write(f"#pragma once\n{defines}")
+
+    for i in range(MODULES):
+        with open(os.path.join(path, f"module_{i}.ph"), 'w') as file:
+            file.write(
+                f'#include "common.ph"\n#include "once.ph"\n'
+                f'int module_{i} = COMMON_{HEADER_DEFINES - 1};\n'
+            )
+    entry = os.path.join(path, "entry.para")
+    with open(entry, 'w') as file:
+        file.write("".join(
+            f'#include "module_{i}.ph"\n' for i in range(MODULES)
+        ))
+    return entry
+
+
+def process_program(path: str, entry: str) -> ProgramCompilationProcess:
+    """ Runs the Pre-Processor on the program """
+    p = ProgramCompilationProcess(
+        entry, 'utf-8', os.path.join(path, "build"),
+        os.path.join(path, "dist"), use_build_cache=False
+    )
+    asyncio.run(p.preprocessor_ctx.process_program(False))
+    return p
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as path:
+        entry = create_program(path)
+        print(f"Modules: {MODULES:,}, includes: {MODULES * 3:,}")
+        for name, skip in [("reprocess", False), ("skip", True)]:
+            with mock.patch.object(
+                    MultipleIncludeOptimizer, 'can_skip',
+                    MultipleIncludeOptimizer.can_skip if skip
+                    else lambda *_: False
+            ):
+                duration, p = best_of(lambda: process_program(path, entry))
+            ctx = p.preprocessor_ctx
+            print(
+                f"{name:<10} {duration:8.3f}s  "
+                f"({ctx.include_optimizer.statistics.skipped_includes:,} "
+                f"skipped includes, {ctx.macro_table.statistics.expansions:,}"
+                f" macro expansions)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# coding=utf-8
+"""
+Benchmark for the resolution of the included files, which compares checking
+every candidate path on the file system with the IncludeResolver, which
+lists every searched directory once and caches the resolved includes.
+
+The simulated program has MODULES folders, whose files include headers from
+the include paths, so most candidate paths do not exist, same as for the
+library headers of a C program.
+"""
+import os
+import tempfile
+
+from _common import best_of
+
+from parac.preprocessor import DirectoryIndex, IncludeResolver
+
+MODULES = 50
+FILES_PER_MODULE = 20
+INCLUDE_PATHS = 4
+HEADERS_PER_PATH = 25
+
+
+def create_tree(path: str) -> tuple:
+    """ Creates the modules and include paths and returns their paths """
+    modules = []
+    for i in range(MODULES):
+        modules.append(os.path.join(path, f"module_{i}"))
+        os.makedirs(modules[-1])
+    include_paths = []
+    for i in range(INCLUDE_PATHS):
+        include_paths.append(os.path.join(path, f"include_{i}"))
+        os.makedirs(include_paths[-1])
+        for j in range(HEADERS_PER_PATH):
+            name = os.path.join(include_paths[-1], f"header_{i}_{j}.ph")
+            open(name, 'w').close()
+    return modules, include_paths
+
+
+def get_includes(include_paths: list) -> list:
+    """ Returns the names included by every file """
+    return [
+        f"header_{i}_{j}.ph"
+        for i in range(len(include_paths)) for j in range(HEADERS_PER_PATH)
+    ]
+
+
+def resolve_stat(modules: list, include_paths: list) -> int:
+    """ Resolves the includes by checking every candidate path """
+    resolved = 0
+    for module in modules:
+        for _ in range(FILES_PER_MODULE):
+            for name in get_includes(include_paths):
+                for directory in (module, *include_paths):
+                    path = os.path.normpath(os.path.join(directory, name))
+                    if os.access(path, os.F_OK) and os.path.isfile(path):
+                        resolved += 1
+                        break
+    return resolved
+
+
+def resolve_indexed(modules: list, include_paths: list) -> int:
+    """ Resolves the includes using an IncludeResolver """
+    resolver = IncludeResolver(include_paths, index=DirectoryIndex())
+    resolved = 0
+    for module in modules:
+        for _ in range(FILES_PER_MODULE):
+            for name in get_includes(include_paths):
+                if resolver.resolve(name, module) is not None:
+                    resolved += 1
+    return resolved
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as path:
+        modules, include_paths = create_tree(path)
+        count = MODULES * FILES_PER_MODULE * INCLUDE_PATHS * HEADERS_PER_PATH
+        print(f"Includes: {count:,}")
+        for name, func in [("stat", resolve_stat),
+                           ("indexed", resolve_indexed)]:
+            duration, resolved = best_of(
+                lambda: func(modules, include_paths)
+            )
+            assert resolved == count
+            print(
+                f"{name:<10} {duration / count * 1e6:8.2f} us/include  "
+                f"({duration:.3f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# coding=utf-8
+"""
+Benchmark for the lexers of the Para-C grammar, which compares the tokens per
+second of the generated ParaCLexer (cold and with warm lexer DFA) and the
+regex based FastParaCLexer on the C test files.
+"""
+import antlr4
+
+from _common import best_of, TEST_FILES_PATH
+
+from parac.compiler import ParacCompiler
+from parac.compiler.parser.fast_lexer import FastParaCLexer
+from parac.compiler.parser.python.ParaCLexer import ParaCLexer
+from parac.util import get_input_stream
+
+REPEATS = 10
+
+
+def get_source() -> str:
+    """ Returns the merged C test files without comments """
+    source = ""
+    for path in sorted((TEST_FILES_PATH / "c_files").glob("*.c")):
+        with open(path, 'r', encoding='utf-8') as file:
+            source += file.read() + "\n"
+    return ParacCompiler.remove_comments_from_str(source) * REPEATS
+
+
+def lex(lexer_cls: type, source: str) -> int:
+    """ Lexes the source and returns the amount of tokens """
+    stream = antlr4.CommonTokenStream(
+        lexer_cls(get_input_stream(source, "bench"))
+    )
+    stream.fill()
+    return len(stream.tokens)
+
+
+def main() -> None:
+    source = get_source()
+    print(f"Source: {len(source.encode()) / 1024:.0f} KB")
+
+    # The first run of the Antlr4 lexer also builds its DFA
+    duration, tokens = best_of(lambda: lex(ParaCLexer, source), repeat=1)
+    print(f"{'antlr-cold':<12} {tokens / duration:12,.0f} tokens/s")
+    for name, lexer_cls in [("antlr-warm", ParaCLexer),
+                            ("fast", FastParaCLexer)]:
+        duration, tokens = best_of(lambda: lex(lexer_cls, source))
+        print(f"{name:<12} {tokens / duration:12,.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# coding=utf-8
+"""
+Benchmark for the macro expansion of the Pre-Processor, which compares the
+MacroTable with and without cached expansions.
+
+The macros are the defines of the any-type C implementation example header
+and the code is the example main file repeated to roughly 1 MB. The chained
+run uses the macros through aliases, which are expanded to other macros, as
+headers often do it.
+"""
+import re
+from typing import List, Tuple
+
+from _common import best_of, SRC_PATH
+
+from parac.compiler import ParacCompiler
+from parac.preprocessor import DefineDirective, Macro, MacroTable, tokenize
+from parac.preprocessor.line_scanner import scan_directive_lines
+
+TARGET_SIZE = 1_000_000
+CHAIN_DEPTH = 4
+EXAMPLE_PATH = SRC_PATH.parent / "examples" / "c-implementation" / "any-type"
+
+
+def read_source(name: str) -> str:
+    """ Reads an example file and removes its comments """
+    return ParacCompiler.remove_comments_from_str(
+        (EXAMPLE_PATH / name).read_text(encoding="utf-8")
+    )
+
+
+def load_macros() -> List[Macro]:
+    """ Returns the macros defined in the example header """
+    scanned = scan_directive_lines(read_source("__parac__.h"), "bench")
+    return [
+        item.macro for item in scanned.directive_items
+        if isinstance(item, DefineDirective)
+    ]
+
+
+def load_code() -> str:
+    """ Loads the example main file and repeats it up to TARGET_SIZE """
+    scanned = scan_directive_lines(read_source("main.c"), "bench")
+    code = "".join(item.get_as_str() for item in scanned.code_items)
+    return code * (TARGET_SIZE // len(code) + 1)
+
+
+def create_chain(macros: List[Macro], code: str) \
+        -> Tuple[List[Macro], str]:
+    """
+    Adds CHAIN_DEPTH aliases for every macro and replaces the macros in the
+    code with their last alias
+    """
+    chained = list(macros)
+    for macro in macros:
+        for i in range(1, CHAIN_DEPTH + 1):
+            target = macro.name if i == 1 else f"{macro.name}_{i - 1}"
+            chained.append(Macro(f"{macro.name}_{i}", target))
+
+    pattern = re.compile(
+        r'\b(' + '|'.join(macro.name for macro in macros) + r')\b'
+    )
+    return chained, pattern.sub(rf'\1_{CHAIN_DEPTH}', code)
+
+
+def expand(macros: List[Macro], code: str, cache_expansions: bool) \
+        -> MacroTable:
+    """ Expands the code using a new table with the passed macros """
+    table = MacroTable(cache_expansions)
+    for macro in macros:
+        table.define(macro)
+    table.expand(code)
+    return table
+
+
+def main() -> None:
+    macros = load_macros()
+    code = load_code()
+    size = len(code.encode()) / 1e6
+    print(f"Size: {size:.2f} MB, macros: {len(macros)}")
+
+    # Reference for the speed of only splitting the code into tokens
+    duration, _ = best_of(lambda: tokenize(code))
+    print(f"{'tokenize':<20} {size / duration:10.2f} MB/s")
+
+    chained_macros, chained_code = create_chain(macros, code)
+    for name, run_macros, run_code, cache_expansions in [
+        ("uncached", macros, code, False),
+        ("cached", macros, code, True),
+        ("chained, uncached", chained_macros, chained_code, False),
+        ("chained, cached", chained_macros, chained_code, True),
+    ]:
+        duration, table = best_of(
+            lambda: expand(run_macros, run_code, cache_expansions)
+        )
+        stats = table.statistics
+        print(
+            f"{name:<20} {size / duration:10.2f} MB/s  ({duration:.3f}s, "
+            f"{stats.expansions:,} expansions, "
+            f"{stats.cache_hits:,} cache hits)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# coding=utf-8
+"""
+Benchmark for the front-end of the Pre-Processor, which compares parsing an
+entire directive-sparse file using the Pre-Processor grammar with scanning it
+for directive lines and only parsing those.
+
+The text is the test entry file repeated to roughly 1 MB with an include
+directive in front of every repetition.
+"""
+import asyncio
+import re
+
+import antlr4
+
+from _common import best_of, TEST_FILES_PATH
+
+from parac.compiler import ParacCompiler
+from parac.preprocessor import PreProcessor
+from parac.preprocessor.ctx import ProgramPreProcessorContext
+from parac.preprocessor.line_scanner import scan_directive_lines
+from parac.preprocessor.listener import Listener
+
+TARGET_SIZE = 1_000_000
+
+
+def load_text() -> str:
+    """ Loads the entry test file and repeats it up to TARGET_SIZE """
+    text = ParacCompiler.remove_comments_from_str(
+        (TEST_FILES_PATH / "entry.para").read_text(encoding="utf-8")
+    )
+    # The test file has its own includes, which would not be sparse anymore
+    text = re.sub(r'^[ \t]*#.*\n', '', text, flags=re.MULTILINE)
+    text = f'#include "lib.para"\n{text.rstrip()}\n'
+    return text * (TARGET_SIZE // len(text) + 1)
+
+
+def parse_grammar(text: str) -> int:
+    """ Parses the entire text using the grammar and walks it """
+    stream = antlr4.InputStream(text)
+    tree = asyncio.run(PreProcessor.parse(stream, False))
+    listener = Listener(tree, stream, "bench")
+    asyncio.run(listener.walk_and_process_directives(False))
+    return len(listener.logic_stream)
+
+
+def parse_scanned(text: str) -> int:
+    """ Scans the text and only parses the directive lines """
+    ctx = asyncio.run(
+        ProgramPreProcessorContext.parse_single_file(
+            antlr4.InputStream(text), "bench", False,
+            release_parse_tree=True
+        )
+    )
+    return len(ctx.logic_stream)
+
+
+def main() -> None:
+    text = load_text()
+    size = len(text.encode()) / 1e6
+    directives = len(scan_directive_lines(text, "bench").line_map)
+    print(f"Size: {size:.2f} MB, directive lines: {directives:,}")
+
+    # Reference for the speed of only encoding and decoding the text
+    duration, _ = best_of(lambda: text.encode().decode())
+    print(f"{'encode/decode':<16} {size / duration:10.2f} MB/s")
+    for name, parse in [
+        ("grammar", parse_grammar),
+        ("line scanner", parse_scanned),
+    ]:
+        duration, _ = best_of(lambda: parse(text))
+        print(f"{name:<16} {size / duration:10.2f} MB/s  ({duration:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# coding=utf-8
+"""
+Benchmark for ParacCompiler.remove_comments_from_str, which reports the
+throughput in MB/s for inputs of increasing size
+
+Usage: python bench_remove_comments.py [size in MB ...] (default: 1 10 100)
+"""
+import sys
+
+from _common import best_of, TEST_FILES_PATH
+
+from parac.compiler import ParacCompiler
+
+DEFAULT_SIZES = (1, 10, 100)
+
+
+def make_source(size_mb: int) -> str:
+    """
+    Creates a source string of roughly size_mb MB by repeating the test
+    files, which contain a realistic mix of code, comments and literals
+    """
+    sample = "".join(
+        (TEST_FILES_PATH / name).read_text(encoding="utf-8")
+        for name in ("entry.para", "exceptions.para", "pre-processor.para")
+    )
+    sample += '\nchar *url = "http://localhost/*"; // x\nchar c = \'/\';\n'
+    target = size_mb * 1024 * 1024
+    return (sample * (target // len(sample) + 1))[:target]
+
+
+def main(sizes) -> None:
+    """ Runs the benchmark for every passed size """
+    print(f"{'size':>8} | {'time (s)':>10} | {'MB/s':>10}")
+    for size in sizes:
+        source = make_source(size)
+        repeat = 3 if size <= 10 else 1
+        seconds, _ = best_of(
+            lambda: ParacCompiler.remove_comments_from_str(source), repeat
+        )
+        print(f"{size:>5} MB | {seconds:>10.3f} | {size / seconds:>10.2f}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,68 @@
+# coding=utf-8
+"""
+Benchmark for the character streams of the lexer, which compares the memory
+used by antlr4.InputStream and parac's SourceStream for the same text and
+the time for lexing it.
+
+The text is the test entry file repeated to roughly 1 MB.
+"""
+import gc
+import tracemalloc
+from typing import Callable
+
+import antlr4
+
+from _common import best_of, TEST_FILES_PATH
+
+from parac.compiler import ParacCompiler
+from parac.compiler.parser.python.ParaCLexer import ParaCLexer
+from parac.util import SourceStream
+
+TARGET_SIZE = 1_000_000
+
+
+def load_text() -> str:
+    """ Loads the entry test file and repeats it up to TARGET_SIZE """
+    text = ParacCompiler.remove_comments_from_str(
+        (TEST_FILES_PATH / "entry.para").read_text(encoding="utf-8")
+    )
+    return text * (TARGET_SIZE // len(text) + 1)
+
+
+def stream_bytes(create: Callable[[str], object], text: str) -> int:
+    """ Returns the bytes allocated for the stream of the text """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stream = create(text)
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del stream
+    return allocated
+
+
+def lex(stream) -> int:
+    """ Lexes the whole stream and returns the amount of tokens """
+    token_stream = antlr4.CommonTokenStream(ParaCLexer(stream))
+    token_stream.fill()
+    return len(token_stream.tokens)
+
+
+def main() -> None:
+    text = load_text()
+    print(f"Characters: {len(text):,}")
+    for name, create in [
+        ("antlr4.InputStream", antlr4.InputStream),
+        ("SourceStream", SourceStream),
+    ]:
+        allocated = stream_bytes(create, text)
+        duration, tokens = best_of(lambda: lex(create(text)))
+        print(
+            f"{name:<20} {allocated / len(text):6.2f} bytes/char  "
+            f"lexed {tokens:,} tokens in {duration:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
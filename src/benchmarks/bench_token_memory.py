@@ -0,0 +1,113 @@
+# coding=utf-8
+"""
+Benchmark for the memory used by the logic tokens, which reports the bytes
+per token of a PreProcessorStream and a ParacLogicStream.
+
+The tokens are created with shared strings and without Antlr4 contexts, so
+only the memory of the token objects themselves is measured. The getters are
+called once per token, since cached properties only allocate on first access.
+
+The compiler does not define concrete logic tokens yet, so the
+ParacLogicStream is filled with a minimal ParacLogicToken subclass.
+"""
+import gc
+import tracemalloc
+from typing import Callable, List
+
+from _common import best_of
+
+from parac.abc import ParacLogicToken, NULL_CHILDREN
+from parac.compiler.logic_stream import ParacLogicStream
+from parac.preprocessor.logic_stream import PreProcessorStream
+from parac.preprocessor.logic_tokens import (NonPreProcessorItem,
+                                             FileIncludeDirective)
+
+TOKEN_COUNT = 100_000
+FILE_NAME = "entry.para"
+ITEM = "int main() { return 0; }"
+INCLUDE = '#include "lib.para"'
+
+
+class _BenchParacToken(ParacLogicToken):
+    """ Minimal Para-C logic token """
+    __slots__ = ()
+
+    def __init__(self, as_str: str, line: int, column: int):
+        super().__init__(
+            "BenchParacToken", as_str, line, column, FILE_NAME, None, None,
+            NULL_CHILDREN
+        )
+
+    @property
+    def relative_parent_file_name(self) -> str:
+        return self._relative_parent_file_name
+
+    def get_as_str(self) -> str:
+        return self._as_str
+
+    def get_name(self) -> str:
+        return self._name
+
+    def get_line(self) -> int:
+        return self._line
+
+    def get_column(self) -> int:
+        return self._column
+
+
+def create_preprocessor_stream() -> PreProcessorStream:
+    """ Creates a stream of items and includes and calls their getters """
+    stream = PreProcessorStream()
+    for i in range(TOKEN_COUNT):
+        if i % 10:
+            token = NonPreProcessorItem(ITEM, i, 0, FILE_NAME, None)
+        else:
+            token = FileIncludeDirective(
+                INCLUDE, i, 0, FILE_NAME, None, "lib.para", False
+            )
+        _ = (
+            token.get_name, token.get_line, token.get_column,
+            token.is_directive
+        )
+        stream.append(token)
+    return stream
+
+
+def create_parac_logic_stream() -> ParacLogicStream:
+    """ Creates a stream of Para-C tokens and calls their getters """
+    stream = ParacLogicStream()
+    for i in range(TOKEN_COUNT):
+        token = _BenchParacToken(ITEM, i, 0)
+        _ = token.get_name(), token.get_line(), token.get_column()
+        stream.append(token)
+    return stream
+
+
+def bytes_per_token(create: Callable[[], List]) -> float:
+    """ Returns the allocated bytes per token of the created stream """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        stream = create()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return allocated / len(stream)
+
+
+def main() -> None:
+    print(f"Tokens per stream: {TOKEN_COUNT:,}")
+    for name, create in [
+        ("PreProcessorStream", create_preprocessor_stream),
+        ("ParacLogicStream", create_parac_logic_stream),
+    ]:
+        per_token = bytes_per_token(create)
+        duration, _ = best_of(create)
+        print(
+            f"{name:<20} {per_token:8.1f} bytes/token  "
+            f"{TOKEN_COUNT / duration / 1e6:6.2f}M tokens/s created"
+        )
+
+
+if __name__ == "__main__":
+    main()
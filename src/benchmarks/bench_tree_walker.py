@@ -0,0 +1,80 @@
+# coding=utf-8
+"""
+Benchmark for walking the parse trees of the compiler, which compares the
+throughput (nodes/s) of the antlr4.ParseTreeWalker with the table-driven
+DispatchTableWalker on large files
+
+Usage: python bench_tree_walker.py
+"""
+import asyncio
+from typing import List, Tuple
+
+import antlr4
+from _common import best_of, TEST_FILES_PATH
+
+from parac.compiler import ParacCompiler
+from parac.compiler.parser.listener import Listener
+from parac.util import DispatchTableWalker, get_input_stream
+
+# Amount of times the test files are concatenated to create the large files
+FILE_SCALES: List[int] = [10, 100, 500]
+
+
+def load_source() -> str:
+    """ Loads the test files with the comments already removed """
+    return "\n".join(
+        ParacCompiler.remove_comments_from_str(
+            path.read_text(encoding="utf-8")
+        )
+        for path in sorted(TEST_FILES_PATH.glob("*.para"))
+        # Files that are not completely parsable by the compiler grammar
+        if path.name not in ("pre-processor.para", "exttask.para")
+    )
+
+
+def parse(source: str) -> Tuple[Listener, antlr4.ParserRuleContext]:
+    """ Parses the source and creates a listener for the tree """
+    stream = get_input_stream(source, "bench.para")
+    tree = asyncio.run(ParacCompiler.parse(stream, False))
+    return Listener(tree, stream, "bench"), tree
+
+
+def count_nodes(tree: antlr4.ParserRuleContext) -> int:
+    """ Counts the nodes of the tree """
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(getattr(node, 'children', None) or ())
+    return count
+
+
+def main() -> None:
+    """ Runs the benchmark """
+    source = load_source()
+    print(f"{'scale':>6} | {'nodes':>9} | {'ParseTreeWalker':>18} | "
+          f"{'DispatchTableWalker':>20} | speedup")
+
+    for scale in FILE_SCALES:
+        listener, tree = parse("\n".join([source] * scale))
+        nodes = count_nodes(tree)
+
+        try:
+            antlr_time, _ = best_of(
+                lambda: antlr4.ParseTreeWalker().walk(listener, tree)
+            )
+            antlr_rate = f"{nodes / antlr_time:>12,.0f} nodes/s"
+        except RecursionError:
+            antlr_time, antlr_rate = None, f"{'RecursionError':>18}"
+
+        table_time, _ = best_of(
+            lambda: DispatchTableWalker().walk(listener, tree)
+        )
+        speedup = f"{antlr_time / table_time:.1f}x" if antlr_time else "-"
+        print(f"{scale:>6} | {nodes:>9,} | {antlr_rate} | "
+              f"{nodes / table_time:>12,.0f} nodes/s | {speedup}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,18 @@
 # coding=utf-8
 """ Main compile function that calls the CLI """
-import parac_cli
-from parac.logging import init_rich_console
+import sys
+
+import parac_client
 
 if __name__ == '__main__':
+    # Running the command on the compile server if one is running, which
+    # avoids importing the compiler
+    exit_code = parac_client.main()
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    import parac_cli
+    from parac.logging import init_rich_console
+
     init_rich_console()
     parac_cli.cli_entry()
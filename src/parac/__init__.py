@@ -12,24 +12,30 @@ __code_name__ = ""
 __release__ = f"{__code_name__} {__version__}"
 __copyright__ = "Luna Klatzer"
 
+import importlib
+import logging as lib_logging
+from typing import Any
+
 from .const import *
 from . import const
 from .exceptions import *
 from . import exceptions
-from . import abc
 from . import logging
-from . import util
-from . import compiler
-from . import preprocessor
+
+# Submodules, which are only imported once they are accessed, since they
+# import the Antlr4 runtime and the generated parsers (see __getattr__)
+LAZY_MODULES = [
+    "abc",
+    "util",
+    "compiler",
+    "preprocessor"
+]
 
 MODULES = [
     "const",
     "exceptions",
-    "abc",
     "logging",
-    "util"
-    "compiler",
-    "preprocessor"
+    *LAZY_MODULES
 ]
 
 __all__ = [
@@ -43,30 +49,31 @@ __all__ = [
     '__code_name__',
     '__release__',
     '__copyright__',
-    'compiler',
-    'preprocessor',
-    'BASE_DIR',
-    'C_LIB_PATH',
-    'WIN',
-    'CONFIG_PATH',
-    'VALID_FILE_ENDINGS',
-    'DEFAULT_LOG_PATH',
-    'DEFAULT_DIST_PATH',
-    'DEFAULT_BUILD_PATH',
-    'DEFAULT_CONFIG',
-    'C_COM_EXISTENCE_OVERWRITE',
     'RUNTIME_COMPILER',
     *exceptions.__all__,
     *const.__all__,
+    *const.LAZY_CONSTANTS,
     *MODULES
 ]
 
-import logging as lib_logging
-import colorama
-
-colorama.init(autoreset=True)
 lib_logging.getLogger(__name__).addHandler(lib_logging.NullHandler())
 
-# An instance of the compiler, which should be generally used in the module
-# due to the logging logic
-RUNTIME_COMPILER: compiler.ParacCompiler = compiler.ParacCompiler()
+
+def __getattr__(name: str) -> Any:
+    """
+    Imports the LAZY_MODULES and creates the RUNTIME_COMPILER on first access
+    and forwards the lazy constants of parac.const
+    """
+    if name in LAZY_MODULES:
+        return importlib.import_module(f".{name}", __name__)
+    elif name == "RUNTIME_COMPILER":
+        from .compiler import ParacCompiler
+
+        # An instance of the compiler, which should be generally used in the
+        # module due to the logging logic
+        compiler = ParacCompiler()
+        globals()[name] = compiler
+        return compiler
+    elif name in const.LAZY_CONSTANTS:
+        return getattr(const, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,12 +2,16 @@
 """
 Base Program ABC classes for the Pre-Processor and Compiler Context Classes
 """
+import asyncio
 import logging
+import os
 from abc import ABC, abstractmethod
 from os import PathLike
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, Optional, Tuple
 import antlr4
 
+from ..util.parse_mode import ParseMode
+
 __all__ = [
     'FileRunContext',
     'ProgramRunContext'
@@ -16,11 +20,23 @@ __all__ = [
 logger = logging.getLogger(__name__)
 
 
+def _encode_source(source: Optional[str]) -> Optional[bytes]:
+    """ Encodes an in-memory source for the key of the build cache """
+    return source.encode('utf-8', 'surrogatepass') if source is not None \
+        else None
+
+
 class FileRunContext(ABC):
     """
     Base ABC Class for a File Run Context. Used in both
     FilePreProcessorContext and FileCompilationContext
     """
+    # Defaults for contexts restored from the build cache, which were created
+    # before these values were stored
+    _token_count: int = 0
+    _parse_time: float = 0.0
+    _node_count: int = 0
+    _step_times: Dict[str, Tuple[float, float]] = {}
 
     @abstractmethod
     def __init__(
@@ -34,6 +50,16 @@ class FileRunContext(ABC):
         self._logic_stream = logic_stream
         self._processed_stream = processed_stream
         self._relative_file_name = relative_file_name
+        self._syntax_errors: int = 0
+
+    def __getstate__(self) -> dict:
+        """
+        Returns the state for pickling. The program context is not included,
+        since it's reassigned when the context is added to a program
+        """
+        state = self.__dict__.copy()
+        state['_program_ctx'] = None
+        return state
 
     @property
     def relative_file_name(self) -> Union[str, PathLike]:
@@ -43,6 +69,69 @@ class FileRunContext(ABC):
         """
         return self._relative_file_name
 
+    @property
+    def syntax_errors(self) -> int:
+        """ Returns the amount of syntax errors encountered in the file """
+        return self._syntax_errors
+
+    def set_syntax_errors(self, syntax_errors: int) -> None:
+        """ Sets the amount of syntax errors encountered in the file """
+        self._syntax_errors = syntax_errors
+
+    @property
+    def token_count(self) -> int:
+        """ Returns the amount of tokens the file was lexed into """
+        return self._token_count
+
+    def set_token_count(self, token_count: int) -> None:
+        """ Sets the amount of tokens the file was lexed into """
+        self._token_count = token_count
+
+    @property
+    def parse_time(self) -> float:
+        """ Returns the seconds lexing, parsing and walking the file took """
+        return self._parse_time
+
+    def set_parse_time(self, parse_time: float) -> None:
+        """ Sets the seconds lexing, parsing and walking the file took """
+        self._parse_time = parse_time
+
+    @property
+    def node_count(self) -> int:
+        """ Returns the amount of parse tree nodes the listener walked """
+        return self._node_count
+
+    def set_node_count(self, node_count: int) -> None:
+        """ Sets the amount of parse tree nodes the listener walked """
+        self._node_count = node_count
+
+    @property
+    def step_times(self) -> Dict[str, Tuple[float, float]]:
+        """
+        Returns the wall and CPU time in seconds of the steps (lex, parse,
+        walk) processing the file took
+        """
+        return self._step_times
+
+    def set_step_times(self, step_times: Dict[str, Tuple[float, float]]) \
+            -> None:
+        """ Sets the wall and CPU time of the steps (see step_times) """
+        self._step_times = step_times
+
+    def release_antlr4_contexts(self, source: str) -> None:
+        """
+        Replaces the antlr4 contexts of the tokens in the logic stream with
+        the offsets of their text (see ParacLogicToken.release_antlr4_ctx())
+
+        :param source: The text the file was parsed from
+        """
+        stack = list(self._logic_stream)
+        while stack:
+            token = stack.pop()
+            token.release_antlr4_ctx(source)
+            if isinstance(token.children, list):
+                stack.extend(token.children)
+
     @property
     @abstractmethod
     def program_ctx(self) -> Any:
@@ -74,6 +163,10 @@ class ProgramRunContext(ABC):
     Base ABC Class for a Program Context. Used in both
     ProgramPreProcessorContext and ProgramCompilationContext
     """
+    # Namespace of the file contexts inside the build cache
+    build_cache_namespace: str = ""
+    # Phase the files are reported in to the progress tracker
+    progress_phase: str = ""
 
     @abstractmethod
     def __init__(self, process):
@@ -147,6 +240,107 @@ class ProgramRunContext(ABC):
         ctx.set_program_ctx(self)
         self._context_dict[relative_file_name] = ctx
 
+    def get_cached_file_ctx(
+            self,
+            file_path: Union[str, PathLike],
+            source: Optional[str] = None
+    ) -> Optional[FileRunContext]:
+        """
+        Returns the cached file context for the passed file if the build cache
+        of the process is enabled and contains an entry for the current
+        content of the file. Files that include a changed file are never
+        returned from the cache
+
+        :param file_path: Path to the file
+        :param source: The in-memory source of the file, which is used
+        instead of the content on disk if passed
+        :returns: The cached file context or None
+        """
+        build_cache = self._process.build_cache
+        if build_cache is None:
+            return None
+        elif self._process.requires_rebuild(file_path):
+            # An included file changed, so the cached result is outdated
+            build_cache.statistics.misses += 1
+            return None
+        return build_cache.get(
+            self.build_cache_namespace, file_path, _encode_source(source)
+        )
+
+    def cache_file_ctx(
+            self,
+            file_path: Union[str, PathLike],
+            ctx: FileRunContext,
+            source: Optional[str] = None
+    ) -> None:
+        """
+        Stores the passed file context in the build cache of the process if
+        it's enabled and the file did not contain syntax errors
+
+        :param file_path: Path to the file
+        :param ctx: The file context that was generated for the file
+        :param source: The in-memory source of the file, which is used
+        instead of the content on disk if passed
+        """
+        build_cache = self._process.build_cache
+        if build_cache is not None and ctx.syntax_errors == 0:
+            build_cache.put(
+                self.build_cache_namespace, file_path, ctx,
+                _encode_source(source)
+            )
+
+    def report_files_queued(self, count: int) -> None:
+        """
+        Reports files, which will be processed, to the progress tracker of
+        the process if it has one
+        """
+        progress = self._process.progress
+        if progress is not None:
+            progress.add_files(self.progress_phase, count)
+
+    async def report_file_progress(
+            self,
+            file_path: Union[str, PathLike],
+            ctx: FileRunContext,
+            cached: bool
+    ) -> None:
+        """
+        Reports a processed file to the progress tracker and the profiler of
+        the process if it has them and passes control to the event loop, so
+        the progress events can be consumed while the compilation is running
+
+        :param file_path: Path to the file
+        :param ctx: The file context that was generated for the file
+        :param cached: True if the context was taken from the build cache
+        """
+        progress = self._process.progress
+        profiler = self._process.profiler
+        if progress is None and profiler is None:
+            return
+
+        file = os.path.relpath(file_path, self.work_dir).replace(os.sep, '/')
+        if profiler is not None:
+            # The timings of cached contexts are from the compilation that
+            # created the cache entry
+            profiler.add_file(
+                self.progress_phase,
+                file,
+                {} if cached else ctx.step_times,
+                ctx.token_count,
+                ctx.node_count,
+                cached
+            )
+        if progress is not None:
+            progress.file_completed(
+                self.progress_phase,
+                file,
+                os.path.getsize(file_path),
+                ctx.token_count,
+                0.0 if cached else ctx.parse_time,
+                cached
+            )
+            await asyncio.sleep(0)
+
     @abstractmethod
     async def get_stream_and_parse(
             self,
@@ -154,7 +348,7 @@ class ProgramRunContext(ABC):
             enable_out: bool
     ) -> FileRunContext:
         """
-        Gets a FileStream, converts it to a string stream and parses it
+        Reads the file into a stream without comments and parses it
         returning the resulting FilePreProcessorContext
 
         :param file_path: Path to the file
@@ -172,6 +366,7 @@ class ProgramRunContext(ABC):
             stream: antlr4.InputStream,
             relative_file_name: str,
             enable_out: bool,
+            parse_mode: Union[str, ParseMode, None] = None
     ) -> FileRunContext:
         """
         Parses a single file and generates a file context for it
@@ -183,6 +378,8 @@ class ProgramRunContext(ABC):
         logged onto the console using the local logger instance. If an
         exception is raised or error is encountered, it will be reraised with
         the FailedToProcessError.
+        :param parse_mode: The ParseMode, which should be used for the
+        prediction. If None the DEFAULT_PARSE_MODE (two-stage) is used
         :returns: The generated FilePreProcessorContext instance
         """
         ...
@@ -57,6 +57,7 @@ class BaseErrorListener(ErrorListener, ABC):
         and not just log them
         """
         self.reraise = reraise
+        self.syntax_errors: int = 0
 
     @abstractmethod
     def reportAmbiguity(
@@ -23,7 +23,16 @@ NULL_CHILDREN = TypeVar('NULL_CHILDREN')
 
 
 class Token(ABC):
-    """ Base Token Class """
+    """
+    Base Token Class.
+
+    The token hierarchy uses __slots__, since a program can consist of
+    millions of tokens. Subclasses have to define __slots__ as well (empty if
+    they do not add attributes), else every instance gets a __dict__ again
+    """
+    __slots__ = (
+        '_name', '_as_str', '_line', '_column', '_relative_parent_file_name'
+    )
 
     @abstractmethod
     def __init__(
@@ -44,7 +53,24 @@ class Token(ABC):
         return self.get_as_str()
 
     def __repr__(self) -> str:
-        return f"<{self.get_name()}: '{self.get_as_str()}'>"
+        return f"<{self._name}: '{self.get_as_str()}'>"
+
+    def __getstate__(self) -> dict:
+        """ Returns the state for pickling, which are the set slots """
+        state = {}
+        for cls in type(self).__mro__:
+            for slot in cls.__dict__.get('__slots__', ()):
+                if hasattr(self, slot):
+                    state[slot] = getattr(self, slot)
+        # Attributes of subclasses outside of parac, which do not define
+        # __slots__
+        state.update(getattr(self, '__dict__', {}))
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """ Restores the state returned by __getstate__() """
+        for name, value in state.items():
+            setattr(self, name, value)
 
     @property
     @abstractmethod
@@ -75,7 +101,7 @@ class Token(ABC):
 
 class SpecialToken(Token, ABC):
     """ Special Token that is not a keyword or built-in """
-    ...
+    __slots__ = ()
 
 
 class LogicToken(Token, ABC):
@@ -83,6 +109,7 @@ class LogicToken(Token, ABC):
     Logic token class, which represents entire expressions, statements,
     selection statement and more
     """
+    __slots__ = ('children', 'parent')
 
     @abstractmethod
     def __init__(
@@ -106,11 +133,17 @@ class LogicToken(Token, ABC):
 
 class CLogicToken(LogicToken, ABC):
     """ Native C tokens """
-    ...
+    __slots__ = ()
 
 
 class ParacLogicToken(LogicToken, ABC):
-    """ Tokens of the Para-C language """
+    """
+    Tokens of the Para-C language.
+
+    The token references its antlr4 context until release_antlr4_ctx() is
+    called, after which it only keeps the offsets of its text in the source
+    """
+    __slots__ = ('antlr4_ctx', '_source', '_start_index', '_stop_index')
 
     @abstractmethod
     def __init__(
@@ -125,18 +158,74 @@ class ParacLogicToken(LogicToken, ABC):
             children: Optional[List[Any]] = NULL_CHILDREN,
     ):
         self.antlr4_ctx = antlr4_ctx
+        self._source: Optional[str] = None
+        self._start_index: int = -1
+        self._stop_index: int = -1
         super().__init__(
             name, as_str, line, column, relative_parent_file_name,
-            antlr4_ctx, parent, children
+            parent, children
         )
 
+    def __getstate__(self) -> dict:
+        """
+        Returns the state for pickling. The antlr4 context is not included,
+        since it references the entire parser and token stream
+        """
+        state = super().__getstate__()
+        state['antlr4_ctx'] = None
+        return state
+
     @property
     def input_stream(self) -> antlr4.FileStream:
-        """ Input Stream for the file of this element """
+        """
+        Input Stream for the file of this element. Only available until
+        release_antlr4_ctx() was called
+        """
         return self.antlr4_ctx.start.getTokenSource().inputStream
 
+    @property
+    def has_source_text(self) -> bool:
+        """
+        Returns whether the original text can be extracted, which is the case
+        if the token still has its antlr4 context or released it using
+        release_antlr4_ctx()
+        """
+        return self.antlr4_ctx is not None or self._source is not None
+
+    def release_antlr4_ctx(self, source: str) -> None:
+        """
+        Replaces the antlr4 context with the offsets of the token in the
+        passed source, so the parse tree can be freed
+
+        :param source: The text the antlr4 context was parsed from, which is
+        shared by all tokens of the file
+        """
+        if self.antlr4_ctx is None:
+            return
+        self.set_source_range(
+            source, self.antlr4_ctx.start.start, self.antlr4_ctx.stop.stop
+        )
+        self.antlr4_ctx = None
+
+    def set_source_range(
+            self, source: str, start_index: int, stop_index: int
+    ) -> None:
+        """
+        Sets the text of the token to a range of the passed source, which is
+        not copied and shared by all tokens of the file
+
+        :param source: The source of the file
+        :param start_index: The index of the first character
+        :param stop_index: The index of the last character (inclusive)
+        """
+        self._source = source
+        self._start_index = start_index
+        self._stop_index = stop_index
+
     def extract_original_text(self) -> str:
-        """ Extracts the original text based on the ctx """
+        """ Extracts the original text based on the ctx or the offsets """
+        if self.antlr4_ctx is None:
+            return self._source[self._start_index:self._stop_index + 1]
         return self.input_stream.getText(
             self.antlr4_ctx.start.start, self.antlr4_ctx.stop.stop
         )
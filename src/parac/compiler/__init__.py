@@ -10,6 +10,8 @@ from . import process
 from .ctx import *
 from . import compiler
 from .compiler import *
+from . import grammar_profiler
+from . import ast_nodes
 
 __all__ = [
     *compiler.__all__,
@@ -20,7 +22,9 @@ __all__ = [
     'error_handler',
     'logic_stream',
     'ctx',
-    'compiler'
+    'compiler',
+    'grammar_profiler',
+    'ast_nodes'
 ]
 
 # Main-Class
@@ -0,0 +1,668 @@
+# coding=utf-8
+"""
+Compact abstract syntax tree of a Para-C file, which is created while walking
+the Antlr4 parse tree (see parser.ast_builder.AstBuilder) and replaces it in
+the later compilation phases, so the parse tree can be freed right after the
+walk.
+
+Every node uses __slots__ and stores its source span as integer offsets into
+the parsed source string (stop inclusive). Identifiers, keywords and
+operators are interned using sys.intern(), so equal names share one string.
+Constructs that are not modelled yet are kept as RawNode, whose text can
+still be fetched from the source using its span.
+"""
+from __future__ import annotations
+import logging
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+__all__ = [
+    'Node',
+    'Expression',
+    'Statement',
+    'RawNode',
+    'TranslationUnit',
+    'FunctionDefinition',
+    'Declaration',
+    'InitDeclarator',
+    'Declarator',
+    'BitField',
+    'ArraySuffix',
+    'ParameterList',
+    'Parameter',
+    'TypeName',
+    'LambdaType',
+    'StructSpecifier',
+    'EnumSpecifier',
+    'Enumerator',
+    'StaticAssert',
+    'InitializerList',
+    'Designated',
+    'CompoundStatement',
+    'ExpressionStatement',
+    'IfStatement',
+    'SwitchStatement',
+    'WhileStatement',
+    'DoWhileStatement',
+    'ForStatement',
+    'ReturnStatement',
+    'BreakStatement',
+    'ContinueStatement',
+    'GotoStatement',
+    'LabeledStatement',
+    'CaseStatement',
+    'DefaultStatement',
+    'TryStatement',
+    'ExceptHandler',
+    'Identifier',
+    'Constant',
+    'StringLiteral',
+    'Spawn',
+    'BinaryOperation',
+    'UnaryOperation',
+    'PostfixOperation',
+    'TypeOperation',
+    'Assignment',
+    'Conditional',
+    'Call',
+    'Subscript',
+    'MemberAccess',
+    'Cast',
+    'Conversion',
+    'CompoundLiteral',
+    'Sequence',
+    'Lambda',
+    'walk',
+    'count_nodes',
+    'dump'
+]
+
+logger = logging.getLogger(__name__)
+
+# Specifiers are either interned keywords / typedef names or nodes, like
+# StructSpecifier, EnumSpecifier, LambdaType or RawNode
+Specifier = Union[str, 'Node']
+
+
+class Node:
+    """
+    Base class of all AST nodes.
+
+    The attributes of a node are listed in _fields, which is also used as
+    __slots__ by the subclasses. Subclasses without additional attributes
+    have to define empty __slots__, else every instance gets a __dict__
+    """
+    __slots__ = ('start', 'stop')
+    _fields: Tuple[str, ...] = ()
+
+    def __init__(self, *values: Any, start: int = -1, stop: int = -2):
+        if len(values) != len(self._fields):
+            raise TypeError(
+                f"{type(self).__name__} expects {len(self._fields)} values, "
+                f"got {len(values)}"
+            )
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+        self.start: int = start
+        self.stop: int = stop
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self._fields
+        )
+        return f"{type(self).__name__}({values})"
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        """
+        Pickles the node together with its descendants as flat list (see
+        _flatten()), since the default pickling recurses once per nesting
+        level and long operator chains exceed the recursion limit
+        """
+        return _load_tree, (_flatten(self),)
+
+    def iter_children(self) -> Iterator[Node]:
+        """
+        Yields the child nodes in source order, which are the attributes
+        being a node or a (nested) tuple containing nodes
+        """
+        stack = [getattr(self, name) for name in reversed(self._fields)]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, Node):
+                yield value
+            elif type(value) is tuple:
+                stack.extend(reversed(value))
+
+    def get_text(self, source: str) -> str:
+        """
+        Returns the text of the node
+
+        :param source: The source string the node was created from
+        """
+        return source[self.start:self.stop + 1]
+
+    def get_position(self, source: str) -> Tuple[int, int]:
+        """
+        Returns the line (starting at 1) and column (starting at 0) of the
+        node, same as the Antlr4 tokens
+
+        :param source: The source string the node was created from
+        """
+        line_start = source.rfind('\n', 0, self.start) + 1
+        return source.count('\n', 0, self.start) + 1, self.start - line_start
+
+
+class Expression(Node):
+    """ Base class of the expression nodes """
+    __slots__ = ()
+
+
+class Statement(Node):
+    """ Base class of the statement nodes """
+    __slots__ = ()
+
+
+class RawNode(Expression, Statement):
+    """
+    Construct, which is not modelled by the AST yet, like generic selections,
+    inline assembly or GCC attributes. The kind is the name of the grammar
+    rule or the keyword of the construct and the children are the AST values
+    of its sub-rules
+    """
+    __slots__ = _fields = ('kind', 'children')
+    kind: str
+    children: Tuple[Any, ...]
+
+
+# =========================================
+# Declarations
+# =========================================
+class TranslationUnit(Node):
+    """ Root of the AST containing the external declarations of a file """
+    __slots__ = _fields = ('items',)
+    items: Tuple[Node, ...]
+
+
+class FunctionDefinition(Node):
+    """
+    Function definition. The body is a CompoundStatement or the expression of
+    a simple function definition ('int f() => 1;')
+    """
+    __slots__ = _fields = (
+        'decorators', 'specifiers', 'declarator', 'declarations', 'body'
+    )
+    decorators: Tuple[str, ...]
+    specifiers: Tuple[Specifier, ...]
+    declarator: Declarator
+    declarations: Tuple[Declaration, ...]
+    body: Node
+
+
+class Declaration(Statement):
+    """
+    Declaration, also used for struct members, where the declarators are
+    Declarator or BitField nodes
+    """
+    __slots__ = _fields = ('specifiers', 'declarators')
+    specifiers: Tuple[Specifier, ...]
+    declarators: Tuple[Node, ...]
+
+
+class InitDeclarator(Node):
+    """ Declarator with an optional initializer """
+    __slots__ = _fields = ('declarator', 'initializer')
+    declarator: Declarator
+    initializer: Optional[Node]
+
+
+class Declarator(Node):
+    """
+    Declarator of a name, which is None for abstract declarators. Every
+    pointer level is the tuple of its qualifiers and the suffixes are
+    ArraySuffix and ParameterList nodes. Parenthesised declarators, like
+    function pointers, are stored as inner declarator
+    """
+    __slots__ = _fields = (
+        'name', 'pointers', 'suffixes', 'inner', 'attributes'
+    )
+    name: Optional[str]
+    pointers: Tuple[Tuple[str, ...], ...]
+    suffixes: Tuple[Node, ...]
+    inner: Optional[Declarator]
+    attributes: Tuple[Node, ...]
+
+
+class BitField(Node):
+    """ Bit field declarator of a struct member """
+    __slots__ = _fields = ('declarator', 'width')
+    declarator: Optional[Declarator]
+    width: Expression
+
+
+class ArraySuffix(Node):
+    """ Array suffix of a declarator, e.g. '[10]' """
+    __slots__ = _fields = ('qualifiers', 'size')
+    qualifiers: Tuple[str, ...]
+    size: Optional[Expression]
+
+
+class ParameterList(Node):
+    """
+    Parameter suffix of a declarator, e.g. '(int a, ...)'. The parameters of
+    an old-style identifier list are Identifier nodes
+    """
+    __slots__ = _fields = ('parameters', 'variadic')
+    parameters: Tuple[Node, ...]
+    variadic: bool
+
+
+class Parameter(Node):
+    """ Parameter declaration with an optional (abstract) declarator """
+    __slots__ = _fields = ('specifiers', 'declarator')
+    specifiers: Tuple[Specifier, ...]
+    declarator: Optional[Declarator]
+
+
+class TypeName(Node):
+    """ Type name, e.g. 'unsigned int *' """
+    __slots__ = _fields = ('specifiers', 'declarator')
+    specifiers: Tuple[Specifier, ...]
+    declarator: Optional[Declarator]
+
+
+class LambdaType(Node):
+    """ Type specifier of a lambda, e.g. 'lambda<int, char *>' """
+    __slots__ = _fields = ('parameters',)
+    parameters: ParameterList
+
+
+class StructSpecifier(Node):
+    """
+    Struct or union specifier. The members are None if the struct is only
+    referenced
+    """
+    __slots__ = _fields = ('kind', 'name', 'members')
+    kind: str
+    name: Optional[str]
+    members: Optional[Tuple[Node, ...]]
+
+
+class EnumSpecifier(Node):
+    """
+    Enum specifier. The enumerators are None if the enum is only referenced
+    """
+    __slots__ = _fields = ('name', 'enumerators')
+    name: Optional[str]
+    enumerators: Optional[Tuple[Enumerator, ...]]
+
+
+class Enumerator(Node):
+    """ Enum constant with an optional value """
+    __slots__ = _fields = ('name', 'value')
+    name: str
+    value: Optional[Expression]
+
+
+class StaticAssert(Statement):
+    """ _Static_assert declaration """
+    __slots__ = _fields = ('condition', 'message')
+    condition: Expression
+    message: Tuple[str, ...]
+
+
+class InitializerList(Node):
+    """ Brace-enclosed initializer, e.g. '{1, [2] = 3}' """
+    __slots__ = _fields = ('items',)
+    items: Tuple[Node, ...]
+
+
+class Designated(Node):
+    """
+    Designated initializer. The designators are member names and index
+    expressions
+    """
+    __slots__ = _fields = ('designators', 'value')
+    designators: Tuple[Union[str, Expression], ...]
+    value: Node
+
+
+# =========================================
+# Statements
+# =========================================
+class CompoundStatement(Statement):
+    """ Block of declarations and statements """
+    __slots__ = _fields = ('items',)
+    items: Tuple[Node, ...]
+
+
+class ExpressionStatement(Statement):
+    """ Expression statement, where the expression is None for ';' """
+    __slots__ = _fields = ('expression',)
+    expression: Optional[Expression]
+
+
+class IfStatement(Statement):
+    """ If statement with an optional else branch """
+    __slots__ = _fields = ('condition', 'then', 'otherwise')
+    condition: Expression
+    then: Statement
+    otherwise: Optional[Statement]
+
+
+class SwitchStatement(Statement):
+    """ Switch statement """
+    __slots__ = _fields = ('condition', 'body')
+    condition: Expression
+    body: Statement
+
+
+class WhileStatement(Statement):
+    """ While loop """
+    __slots__ = _fields = ('condition', 'body')
+    condition: Expression
+    body: Statement
+
+
+class DoWhileStatement(Statement):
+    """ Do-while loop """
+    __slots__ = _fields = ('body', 'condition')
+    body: Statement
+    condition: Expression
+
+
+class ForStatement(Statement):
+    """
+    For loop. The init is a Declaration or an expression and every part is
+    optional
+    """
+    __slots__ = _fields = ('init', 'condition', 'step', 'body')
+    init: Optional[Node]
+    condition: Optional[Expression]
+    step: Optional[Expression]
+    body: Statement
+
+
+class ReturnStatement(Statement):
+    """ Return statement with an optional value """
+    __slots__ = _fields = ('value',)
+    value: Optional[Expression]
+
+
+class BreakStatement(Statement):
+    """ Break statement """
+    __slots__ = ()
+
+
+class ContinueStatement(Statement):
+    """ Continue statement """
+    __slots__ = ()
+
+
+class GotoStatement(Statement):
+    """
+    Goto statement. The target is a label name or an expression for computed
+    gotos (GCC extension)
+    """
+    __slots__ = _fields = ('target',)
+    target: Union[str, Expression]
+
+
+class LabeledStatement(Statement):
+    """ Statement with a label, e.g. 'end: return 0;' """
+    __slots__ = _fields = ('label', 'statement')
+    label: str
+    statement: Statement
+
+
+class CaseStatement(Statement):
+    """ Case label of a switch """
+    __slots__ = _fields = ('value', 'statement')
+    value: Expression
+    statement: Statement
+
+
+class DefaultStatement(Statement):
+    """ Default label of a switch """
+    __slots__ = _fields = ('statement',)
+    statement: Statement
+
+
+class TryStatement(Statement):
+    """ Try-except statement with optional else and finally blocks """
+    __slots__ = _fields = ('body', 'handlers', 'orelse', 'finalbody')
+    body: CompoundStatement
+    handlers: Tuple[ExceptHandler, ...]
+    orelse: Optional[CompoundStatement]
+    finalbody: Optional[CompoundStatement]
+
+
+class ExceptHandler(Node):
+    """ Except block of a try-except statement """
+    __slots__ = _fields = ('exceptions', 'name', 'body')
+    exceptions: Tuple[str, ...]
+    name: Optional[str]
+    body: CompoundStatement
+
+
+# =========================================
+# Expressions
+# =========================================
+class Identifier(Expression):
+    """ Identifier, whose name is interned """
+    __slots__ = _fields = ('name',)
+    name: str
+
+
+class Constant(Expression):
+    """ Numeric or character constant as written in the source """
+    __slots__ = _fields = ('value',)
+    value: str
+
+
+class StringLiteral(Expression):
+    """ String literal consisting of one or more adjacent literals """
+    __slots__ = _fields = ('parts',)
+    parts: Tuple[str, ...]
+
+
+class Spawn(Expression):
+    """ Spawn expression of a task, e.g. 'spawn task' """
+    __slots__ = _fields = ('name',)
+    name: str
+
+
+class BinaryOperation(Expression):
+    """ Binary operation, e.g. 'a + b' """
+    __slots__ = _fields = ('operator', 'left', 'right')
+    operator: str
+    left: Expression
+    right: Expression
+
+
+class UnaryOperation(Expression):
+    """ Prefix operation, e.g. '-a', '++a' or 'sizeof a' """
+    __slots__ = _fields = ('operator', 'operand')
+    operator: str
+    operand: Expression
+
+
+class PostfixOperation(Expression):
+    """ Postfix increment or decrement """
+    __slots__ = _fields = ('operator', 'operand')
+    operator: str
+    operand: Expression
+
+
+class TypeOperation(Expression):
+    """ Operation on a type name, e.g. 'sizeof(int)' or '_Alignof(long)' """
+    __slots__ = _fields = ('operator', 'type_name')
+    operator: str
+    type_name: TypeName
+
+
+class Assignment(Expression):
+    """ Assignment, e.g. 'a = b' or 'a += b' """
+    __slots__ = _fields = ('operator', 'target', 'value')
+    operator: str
+    target: Expression
+    value: Expression
+
+
+class Conditional(Expression):
+    """ Conditional expression, e.g. 'a ? b : c' """
+    __slots__ = _fields = ('condition', 'then', 'otherwise')
+    condition: Expression
+    then: Expression
+    otherwise: Expression
+
+
+class Call(Expression):
+    """ Function call """
+    __slots__ = _fields = ('function', 'arguments')
+    function: Expression
+    arguments: Tuple[Expression, ...]
+
+
+class Subscript(Expression):
+    """ Array subscript, e.g. 'a[i]' """
+    __slots__ = _fields = ('value', 'index')
+    value: Expression
+    index: Expression
+
+
+class MemberAccess(Expression):
+    """ Member access using '.' or '->' (arrow) """
+    __slots__ = _fields = ('value', 'member', 'arrow')
+    value: Expression
+    member: str
+    arrow: bool
+
+
+class Cast(Expression):
+    """ C cast, e.g. '(int) a' """
+    __slots__ = _fields = ('type_name', 'operand')
+    type_name: TypeName
+    operand: Expression
+
+
+class Conversion(Expression):
+    """ Para-C conversion, e.g. 'a as int' """
+    __slots__ = _fields = ('operand', 'type_name')
+    operand: Expression
+    type_name: TypeName
+
+
+class CompoundLiteral(Expression):
+    """ Compound literal, e.g. '(struct point) {1, 2}' """
+    __slots__ = _fields = ('type_name', 'initializer')
+    type_name: TypeName
+    initializer: InitializerList
+
+
+class Sequence(Expression):
+    """ Comma separated expressions, e.g. 'a = 1, b = 2' """
+    __slots__ = _fields = ('expressions',)
+    expressions: Tuple[Expression, ...]
+
+
+class Lambda(Expression):
+    """
+    Lambda function. The body is a CompoundStatement or an expression
+    """
+    __slots__ = _fields = ('parameters', 'body')
+    parameters: Tuple[Parameter, ...]
+    body: Node
+
+
+def _encode(value: Any, indexes: Dict[int, int]) -> Any:
+    """ Replaces the nodes in the passed value with their indexes """
+    if isinstance(value, Node):
+        return indexes[id(value)]
+    elif type(value) is tuple:
+        return tuple(_encode(item, indexes) for item in value)
+    return value
+
+
+def _decode(value: Any, nodes: List[Node]) -> Any:
+    """
+    Replaces the indexes in the passed value with their nodes and interns
+    the names again, since unpickled strings are not interned
+    """
+    if type(value) is int:
+        return nodes[value]
+    elif type(value) is str:
+        return sys.intern(value)
+    elif type(value) is tuple:
+        return tuple(_decode(item, nodes) for item in value)
+    return value
+
+
+def _flatten(root: Node) -> List[Tuple[type, int, int, Tuple[Any, ...]]]:
+    """
+    Returns the nodes of the tree in pre-order as tuples of their type, span
+    and values, where the child nodes are replaced by their index in the list.
+    The values of the fields are never integers, so indexes are unambiguous
+    """
+    nodes = list(walk(root))
+    indexes = {id(node): i for i, node in enumerate(nodes)}
+    return [
+        (type(node), node.start, node.stop, tuple(
+            _encode(getattr(node, name), indexes) for name in node._fields
+        ))
+        for node in nodes
+    ]
+
+
+def _load_tree(entries: List[Tuple[type, int, int, Tuple[Any, ...]]]) \
+        -> Node:
+    """ Restores the tree flattened by _flatten() and returns its root """
+    nodes: List[Any] = [None] * len(entries)
+    # Children come after their parent, so they are created first
+    for i in range(len(entries) - 1, -1, -1):
+        cls, start, stop, values = entries[i]
+        node = nodes[i] = cls.__new__(cls)
+        for name, value in zip(cls._fields, values):
+            setattr(node, name, _decode(value, nodes))
+        node.start = start
+        node.stop = stop
+    return nodes[0]
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """
+    Yields the passed node and all its descendants in source order (pre-order)
+    without using recursion
+    """
+    stack: List[Node] = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(tuple(node.iter_children())))
+
+
+def count_nodes(node: Node) -> int:
+    """ Returns the amount of nodes of the passed tree """
+    return sum(1 for _ in walk(node))
+
+
+def dump(node: Any, include_spans: bool = False) -> str:
+    """
+    Returns a formatted dump of the passed tree, which can be used to compare
+    trees
+
+    :param node: The node to dump. Tuples and plain values are dumped as well
+    :param include_spans: If set to True the spans of the nodes are included
+    """
+    if isinstance(node, Node):
+        values = [
+            f"{name}={dump(getattr(node, name), include_spans)}"
+            for name in node._fields
+        ]
+        if include_spans:
+            values.append(f"span={node.start}:{node.stop}")
+        return f"{type(node).__name__}({', '.join(values)})"
+    elif type(node) is tuple:
+        items = [dump(item, include_spans) for item in node]
+        return f"({items[0]},)" if len(items) == 1 else \
+            f"({', '.join(items)})"
+    return repr(node)
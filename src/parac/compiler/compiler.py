@@ -3,20 +3,24 @@
 from __future__ import annotations
 
 import logging
+import re
 from os import PathLike
 from pathlib import Path
-from typing import Union, TYPE_CHECKING, Tuple, Literal
+from typing import Union, TYPE_CHECKING, Tuple, List, Optional, Pattern
 import antlr4
 
 from .process import BasicProcess
 from .error_handler import ParacErrorListener
 from .logic_stream import ParacLogicStream, CLogicStream
 from .parser.python import ParaCLexer
-from .parser.python import ParaCParser
+from .parser.fast_lexer import FastParaCLexer
+from .parser.flat_parser import FlatParaCParser
 from .parser.listener import Listener
 from ..logging import (ParacFormatter, ParacFileHandler, ParacStreamHandler,
                        print_log_banner)
-from ..util import get_relative_file_name, get_input_stream, get_file_stream
+from ..util import (get_relative_file_name, get_file_stream, SourceStream,
+                    ParseMode, ParseModeStatistics, parse_with_mode,
+                    StepTimer, STEP_LEX, LexerKind, get_lexer_kind)
 from ..exceptions import (FilePermissionError, LexerError, LinkerError,
                           ParacCompilerError)
 
@@ -34,12 +38,31 @@ ONE_LINE_COMMENT_END: Tuple[str, str, str] = ('\n', '\r\n', '\r')
 MULTI_LINE_COMMENT_START: str = '/*'
 MULTI_LINE_COMMENT_END: str = '*/'
 
+# Single regex matching either a comment or a string/char literal. Literals
+# are matched as well, so that comment-like sequences inside them (e.g.
+# "http://...") are skipped over and left untouched. Unterminated literals
+# do not match and are treated as regular characters, while an unterminated
+# multi-line comment runs until the end of the string.
+COMMENT_OR_LITERAL_REGEX: Pattern = re.compile(
+    r'(?P<one_c>{one_s}[^\n]*)'
+    r'|(?P<mult_c>{mult_s}.*?(?:{mult_e}|\Z))'
+    r'|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*'".format(
+        one_s=re.escape(ONE_LINE_COMMENT_START),
+        mult_s=re.escape(MULTI_LINE_COMMENT_START),
+        mult_e=re.escape(MULTI_LINE_COMMENT_END)
+    ),
+    re.DOTALL
+)
+
 
 class ParacCompiler:
     """ Main Class for the entire Compiler containing processing functions """
     logger: logging.Logger = None
     stream_handler: ParacStreamHandler = None
     file_handler: ParacFileHandler = None
+    # Counters for the prediction stages used by parse()
+    parse_statistics: ParseModeStatistics = ParseModeStatistics()
 
     @property
     def log_initialised(self) -> bool:
@@ -104,10 +127,15 @@ class ParacCompiler:
                     "The log-path does not contain the '.log' file-ending"
                 )
 
-    @staticmethod
+    @classmethod
     async def parse(
+            cls,
             input_stream: antlr4.InputStream,
-            enable_out: bool = True
+            enable_out: bool = True,
+            parse_mode: Union[str, ParseMode, None] = None,
+            error_listener: Optional[ParacErrorListener] = None,
+            step_timer: Optional[StepTimer] = None,
+            lexer: Union[str, LexerKind, None] = None
     ) -> CompilationUnitContext:
         """
         Parses the passed input_stream using antlr4 and returns the
@@ -119,15 +147,28 @@ class ParacCompiler:
         logged onto the console using the local logger instance. If an
         exception is raised or error is encountered, it will be reraised with
         the FailedToProcessError.
+        :param parse_mode: The ParseMode, which should be used for the
+        prediction. If None the DEFAULT_PARSE_MODE (two-stage) is used
+        :param error_listener: The error listener that should be used. If None
+        a new one is created. Can be passed to read the amount of syntax
+        errors after parsing
+        :param step_timer: If passed the tokens are lexed before parsing and
+        the lexing is recorded as the step STEP_LEX
+        :param lexer: The LexerKind, which should be used for lexing. If None
+        the DEFAULT_LEXER_KIND (fast) is used
         :returns: The compilationUnit (file) context
         """
         # Error handler which uses the default error strategy to handle the 
         # incoming antlr4 errors
-        error_listener = ParacErrorListener(enable_out)
+        if error_listener is None:
+            error_listener = ParacErrorListener(enable_out)
 
         # Initialising the lexer, which will tokenize the input_stream and
         # raise basic errors if needed
-        lexer = ParaCLexer.ParaCLexer(input_stream)
+        if get_lexer_kind(lexer) is LexerKind.FAST:
+            lexer = FastParaCLexer(input_stream)
+        else:
+            lexer = ParaCLexer.ParaCLexer(input_stream)
         lexer.removeErrorListeners()
         lexer.addErrorListener(error_listener)
 
@@ -135,12 +176,23 @@ class ParacCompiler:
 
         # Parsing the lexer and generating a token stream
         stream = antlr4.CommonTokenStream(lexer)
+        if step_timer is not None:
+            # Lexing all tokens upfront, so lexing and parsing can be
+            # measured separately
+            stream.fill()
+            step_timer.lap(STEP_LEX)
 
         # Parser which generates based on the top entry rule the logic tree
-        parser = ParaCParser.ParaCParser(stream)
+        # with a flattened expression precedence chain
+        parser = FlatParaCParser(stream)
         parser.removeErrorListeners()
-        parser.addErrorListener(error_listener)
-        return parser.compilationUnit()
+        return parse_with_mode(
+            parser,
+            parser.compilationUnit,
+            error_listener,
+            parse_mode,
+            cls.parse_statistics
+        )
 
     @classmethod
     async def validate_syntax(
@@ -158,20 +210,20 @@ class ParacCompiler:
         the FailedToProcessError.
         :returns: True if the syntax check was successful else False
         """
-        file_stream: antlr4.FileStream = get_file_stream(
-            process.entry_file_path, process.encoding
-        )
-        stream: antlr4.InputStream = get_input_stream(
-            cls.remove_comments_from_str(file_stream.strdata),  # rm comments
-            name=file_stream.name
+        stream: SourceStream = get_file_stream(
+            process.entry_file_path, process.encoding,
+            transform=cls.remove_comments_from_str  # rm comments
         )
         try:
-            cls.logger.info(f"Parsing file ({file_stream.fileName})")
-            antlr4_file_ctx = await cls.parse(stream, enable_out)
+            cls.logger.info(f"Parsing file ({stream.fileName})")
+            antlr4_file_ctx = await cls.parse(
+                stream, enable_out, process.parse_mode,
+                lexer=process.lexer
+            )
 
             relative_file_name = get_relative_file_name(
-                file_stream.name,
-                file_stream.fileName,
+                stream.name,
+                stream.fileName,
                 process.work_dir
             )
 
@@ -197,42 +249,70 @@ class ParacCompiler:
         """
         Removes comments from the passed string and returns the modified
         string. Only comments in the (// ... \\n) and (/* ... */) format will
-        be removed, but else the string will be ignored.
+        be removed, but else the string will be ignored. Comment-like
+        sequences inside string and char literals are preserved.
+
+        Line numbers stay intact: A one-line comment is removed up to its
+        line-ending and a multi-line comment is replaced with the newlines it
+        contained, or a single space if it did not span multiple lines.
 
         For proper handling line-endings are all set to \\n, if this is
         not wanted the wanted line ending should be passed. Note: This will
         not make the function ignore every other line-ending but simply in the
         end replace every occurrence of \n with the wanted line-ending.
         """
-        prev_c: str = ""
-        result: str = ""
-        in_type: Literal['std', 'one_c', 'mult_c'] = "std"
-
         # For ease replacing \r and \r\n with \n
         string = string.replace('\r\n', '\n').replace('\r', '\n')
 
-        for c in string:
-            c: str
-            _: str = f'{prev_c}{c}'
-            if in_type == "std":
-                if _ == ONE_LINE_COMMENT_START:
-                    result = result[0:-1]  # Removing the previous char
-                    in_type = "one_c"
-                elif _ == MULTI_LINE_COMMENT_START:
-                    result = result[0:-1]  # Removing the previous char
-                    in_type = "mult_c"
-                else:
-                    result += c
-            else:
-                if any((
-                    in_type == "one_c" and c in ONE_LINE_COMMENT_END,
-                    in_type == "mult_c" and _ == MULTI_LINE_COMMENT_END
-                )):
-                    in_type = 'std'
-                    result += '\n'
-                    prev_c = '\n'
-            prev_c = c
-        return result.replace('\n', line_ending)
+        result: List[str] = []
+        last_end: int = 0
+        for match in COMMENT_OR_LITERAL_REGEX.finditer(string):
+            if match.lastgroup is None:
+                continue  # string or char literal -> stays in the output
+
+            start, end = match.span()
+            result.append(string[last_end:start])
+            if match.lastgroup == "mult_c":
+                result.append('\n' * string.count('\n', start, end) or ' ')
+            last_end = end
+        result.append(string[last_end:])
+
+        result_str = "".join(result)
+        if line_ending != '\n':
+            return result_str.replace('\n', line_ending)
+        return result_str
+
+    @staticmethod
+    def extract_c_regions(
+        string: str, regions: List[Tuple[int, int]]
+    ) -> Tuple[str, List[Tuple[int, str]]]:
+        """
+        Removes the C regions from the passed string, so they are not lexed
+        and parsed as Para-C, and returns the modified string and the
+        verbatim code of the regions.
+
+        Line numbers stay intact: Every line of a region is replaced with an
+        empty line.
+
+        :param string: The code of the file
+        :param regions: The C regions as tuples of the first line and the line
+        after the region (see ProcessedFileStream.c_regions)
+        :returns: The string without the regions and the regions as tuples of
+        the first line and their verbatim code
+        """
+        lines = string.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        extracted: List[Tuple[int, str]] = []
+        for start, end in regions:
+            # Line numbers start at 1
+            first, last = max(start - 1, 0), min(end - 1, len(lines))
+            if first >= last:
+                continue
+            code = '\n'.join(lines[first:last])
+            if last < len(lines):
+                code += '\n'
+            extracted.append((start, code))
+            lines[first:last] = [""] * (last - first)
+        return '\n'.join(lines), extracted
 
     @classmethod
     async def compile_logic_stream(
@@ -6,12 +6,19 @@ information.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from os import PathLike
-from typing import Dict, Union, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 import antlr4
 
 from ..abc import FileRunContext, ProgramRunContext
+from ..util import (ParseMode, LexerKind, PHASE_COMPILER, StepTimer,
+                    STEP_PARSE, STEP_WALK, free_parse_tree)
+from .ast_nodes import TranslationUnit
 from .logic_stream import ParacLogicStream
 
 if TYPE_CHECKING:
@@ -25,6 +32,41 @@ __all__ = [
 logger = logging.getLogger(__name__ )
 
 
+def _init_parse_worker(dfa_cache_path: Optional[str]) -> None:
+    """
+    Initialises a worker process of the parse pool by loading the persisted
+    prediction tables, so the worker does not start with a cold DFA
+
+    :param dfa_cache_path: Path to the DFA cache or None if it's disabled
+    """
+    from ..util import get_dfa_cache
+    if dfa_cache_path:
+        get_dfa_cache().load(dfa_cache_path)
+
+
+def _parse_file_worker(
+        file_path: Union[str, PathLike],
+        encoding: str,
+        work_dir: Union[str, PathLike],
+        enable_out: bool,
+        parse_mode: Union[str, ParseMode, None],
+        release_parse_tree: bool,
+        source: Optional[str] = None,
+        c_regions: Optional[List[Tuple[int, int]]] = None,
+        lexer: Union[str, LexerKind, None] = None
+) -> FileCompilationContext:
+    """
+    Entry point for a worker process of the parse pool, which lexes, parses
+    and walks a single file and returns the resulting file context
+    """
+    return asyncio.run(
+        ProgramCompilationContext.read_and_parse_file(
+            file_path, encoding, work_dir, enable_out, parse_mode,
+            release_parse_tree, source, c_regions, lexer
+        )
+    )
+
+
 class FileCompilationContext(FileRunContext):
     """
     Class used inside the listener for managing the context of a single file,
@@ -37,6 +79,11 @@ class FileCompilationContext(FileRunContext):
     track of all files and in the end process the resulting dependencies and
     whether they work. (-> Linker and Semantic Analysis)
     """
+    # Set after parsing, since the regions are removed before the file is
+    # parsed (see set_c_regions())
+    _c_regions: List[Tuple[int, str]] = []
+    # Set by the listener after walking the parse tree
+    _ast: Optional[TranslationUnit] = None
 
     def __init__(
             self,
@@ -45,6 +92,7 @@ class FileCompilationContext(FileRunContext):
         self._program_ctx: Union[ProgramCompilationContext, None] = None
         self._logic_stream: ParacLogicStream = ParacLogicStream()
         self._relative_file_name = relative_file_name
+        self._syntax_errors: int = 0
 
     @property
     def relative_file_name(self) -> Union[str, PathLike]:
@@ -69,6 +117,32 @@ class FileCompilationContext(FileRunContext):
         """
         return self._logic_stream
 
+    @property
+    def c_regions(self) -> List[Tuple[int, str]]:
+        """
+        Returns the C regions of the file ('#pragma PARAC lang C'), which
+        were not parsed and are passed verbatim to the C compiler. Every
+        region is a tuple of its first line and its code
+        """
+        return self._c_regions
+
+    def set_c_regions(self, c_regions: List[Tuple[int, str]]) -> None:
+        """ Sets the verbatim C regions of the file """
+        self._c_regions = c_regions
+
+    @property
+    def ast(self) -> Optional[TranslationUnit]:
+        """
+        Returns the AST of the file, which is used by the later compilation
+        phases instead of the Antlr4 parse tree. None if the file was not
+        walked yet
+        """
+        return self._ast
+
+    def set_ast(self, ast: Optional[TranslationUnit]) -> None:
+        """ Sets the AST of the file """
+        self._ast = ast
+
     def set_program_ctx(self, ctx: ProgramCompilationContext) -> None:
         """
         Sets the program context, containing the information for the entire
@@ -84,6 +158,8 @@ class ProgramCompilationContext(ProgramRunContext):
     entire context of the program and is used in the linker and last step of
     semantic analysis to validate the program.
     """
+    build_cache_namespace: str = "compiler"
+    progress_phase: str = PHASE_COMPILER
 
     def __init__(self, process: ProgramCompilationProcess):
         self._entry_ctx: Union[FileCompilationContext, None] = None
@@ -176,9 +252,126 @@ class ProgramCompilationContext(ProgramRunContext):
         exception is raised or error is encountered, it will be reraised with
         the FailedToProcessError.
         """
-        await self.parse_entry_file(enable_out)
+        # The output of the Pre-Processor is passed in memory. Files it did
+        # not modify are read from disk
+        sources = {
+            os.path.normpath(path): source
+            for path, source in self.process.processed_sources.items()
+        }
+        c_regions = {
+            os.path.normpath(path): regions
+            for path, regions in self.process.c_regions.items()
+        }
+        entry_path = self.process.entry_file_path
+        file_paths = [entry_path] + [
+            path for path in sources if path != os.path.normpath(entry_path)
+        ]
+        logger.debug(f"Parsing entry-file ({entry_path})")
+
+        entry_ctx, *file_ctx_list = await self.parse_files(
+            file_paths,
+            enable_out,
+            [sources.get(os.path.normpath(path)) for path in file_paths],
+            [c_regions.get(os.path.normpath(path)) for path in file_paths]
+        )
+        self.set_entry_ctx(entry_ctx)
+        for ctx in file_ctx_list:
+            self.add_file_ctx(ctx, ctx.relative_file_name)
+
+    async def parse_files(
+            self,
+            file_paths: List[Union[str, PathLike]],
+            enable_out: bool,
+            sources: Optional[List[Optional[str]]] = None,
+            c_regions: Optional[List[Optional[List[Tuple[int, int]]]]] = None
+    ) -> List[FileCompilationContext]:
+        """
+        Parses the passed files and returns their contexts in the same order.
+        If the process allows more than one job and more than one file is
+        passed, the files are lexed, parsed and walked concurrently in a
+        process pool, else they are parsed one after another in this process.
+        Files with an entry in the build cache are not parsed again.
 
-        ...  # TODO! Run listener for every file
+        The returned contexts are not yet added to this program context.
+
+        :param file_paths: Paths to the files that should be parsed
+        :param enable_out: If set to True errors, warnings and info will be
+        logged onto the console using the local logger instance. If an
+        exception is raised or error is encountered, it will be reraised with
+        the FailedToProcessError.
+        :param sources: The in-memory sources of the files in the same order
+        as file_paths. Files without a source (None) are read from disk
+        :param c_regions: The C regions of the files in the same order as
+        file_paths, which are not parsed (see read_and_parse_file())
+        :returns: The FileCompilationContext instances for the files
+        """
+        if sources is None:
+            sources = [None] * len(file_paths)
+        if c_regions is None:
+            c_regions = [None] * len(file_paths)
+        self.report_files_queued(len(file_paths))
+        file_ctx_list: List[Optional[FileCompilationContext]] = [
+            self.get_cached_file_ctx(path, source)
+            for path, source in zip(file_paths, sources)
+        ]
+        missing = [i for i, ctx in enumerate(file_ctx_list) if ctx is None]
+        for path, ctx in zip(file_paths, file_ctx_list):
+            if ctx is not None:
+                await self.report_file_progress(path, ctx, True)
+
+        jobs = min(self.process.jobs, len(missing))
+        if jobs <= 1:
+            for i in missing:
+                file_ctx_list[i] = await self.read_and_parse_file(
+                    file_paths[i],
+                    self.encoding,
+                    self.work_dir,
+                    enable_out,
+                    self.process.parse_mode,
+                    self.process.release_parse_trees,
+                    sources[i],
+                    c_regions[i],
+                    self.process.lexer
+                )
+                await self.report_file_progress(
+                    file_paths[i], file_ctx_list[i], False
+                )
+        else:
+            logger.debug(f"Parsing {len(missing)} files using {jobs} jobs")
+            dfa_cache_path = self.process.dfa_cache_path \
+                if self.process.use_dfa_cache else None
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(
+                    max_workers=jobs,
+                    initializer=_init_parse_worker,
+                    initargs=(dfa_cache_path,)
+            ) as executor:
+                async def _parse(i: int) -> FileCompilationContext:
+                    # Reporting every file once it's done and not only after
+                    # all files were parsed
+                    ctx = await loop.run_in_executor(
+                        executor,
+                        _parse_file_worker,
+                        file_paths[i],
+                        self.encoding,
+                        self.work_dir,
+                        enable_out,
+                        self.process.parse_mode,
+                        self.process.release_parse_trees,
+                        sources[i],
+                        c_regions[i],
+                        self.process.lexer
+                    )
+                    await self.report_file_progress(file_paths[i], ctx, False)
+                    return ctx
+
+                results = await asyncio.gather(*(_parse(i) for i in missing))
+            for i, ctx in zip(missing, results):
+                file_ctx_list[i] = ctx
+
+        for i in missing:
+            self.cache_file_ctx(file_paths[i], file_ctx_list[i], sources[i])
+        return file_ctx_list
 
     async def get_stream_and_parse(
             self,
@@ -186,7 +379,7 @@ class ProgramCompilationContext(ProgramRunContext):
             enable_out: bool
     ) -> FileCompilationContext:
         """
-        Gets a FileStream, converts it to a string stream and parses it
+        Reads the file into a stream without comments and parses it
         returning the resulting FilePreProcessorContext
 
         :param file_path: Path to the file
@@ -196,30 +389,100 @@ class ProgramCompilationContext(ProgramRunContext):
         the FailedToProcessError.
         :returns: The FilePreProcessorContext instance for the file
         """
-        from .compiler import ParacCompiler
-        from ..util import (get_file_stream, get_relative_file_name,
-                            get_input_stream)
+        self.report_files_queued(1)
+        ctx = self.get_cached_file_ctx(file_path)
+        cached = ctx is not None
+        if not cached:
+            ctx = await self.read_and_parse_file(
+                file_path,
+                self.encoding,
+                self.work_dir,
+                enable_out,
+                self.process.parse_mode,
+                self.process.release_parse_trees,
+                lexer=self.process.lexer
+            )
+            self.cache_file_ctx(file_path, ctx)
+        await self.report_file_progress(file_path, ctx, cached)
+        return ctx
 
-        file_stream = get_file_stream(file_path, self.encoding)
+    @staticmethod
+    async def read_and_parse_file(
+            file_path: Union[str, PathLike],
+            encoding: str,
+            work_dir: Union[str, PathLike],
+            enable_out: bool,
+            parse_mode: Union[str, ParseMode, None] = None,
+            release_parse_tree: bool = False,
+            source: Optional[str] = None,
+            c_regions: Optional[List[Tuple[int, int]]] = None,
+            lexer: Union[str, LexerKind, None] = None
+    ) -> FileCompilationContext:
+        """
+        Reads the file, removes the comments and parses it. Does not depend on
+        a program context, so it can also be run in a worker process.
+
+        :param file_path: Path to the file
+        :param encoding: Encoding of the file
+        :param work_dir: The working directory, which is used to generate the
+        relative file name
+        :param enable_out: If set to True errors, warnings and info will be
+        logged onto the console using the local logger instance. If an
+        exception is raised or error is encountered, it will be reraised with
+        the FailedToProcessError.
+        :param parse_mode: The ParseMode, which should be used for the
+        prediction. If None the DEFAULT_PARSE_MODE (two-stage) is used
+        :param release_parse_tree: If set to True the parse tree is released
+        after walking it (see parse_single_file())
+        :param source: The in-memory source of the file (e.g. the output of
+        the Pre-Processor). If passed the file is not read from disk
+        :param c_regions: The C regions of the file as tuples of the first
+        line and the line after the region. They are replaced with empty lines
+        before lexing and stored verbatim in the file context
+        :param lexer: The LexerKind, which should be used for lexing. If None
+        the DEFAULT_LEXER_KIND (fast) is used
+        :returns: The FileCompilationContext instance for the file
+        """
+        from .compiler import ParacCompiler
+        from ..util import (get_file_stream, get_source_stream,
+                            get_relative_file_name)
+
+        extracted_regions: List[Tuple[int, str]] = []
+        if c_regions:
+            if source is None:
+                with open(file_path, 'r', encoding=encoding) as file:
+                    source = file.read()
+            source, extracted_regions = ParacCompiler.extract_c_regions(
+                source, c_regions
+            )
+
+        # rm comments
+        transform = ParacCompiler.remove_comments_from_str
+        if source is None:
+            stream = get_file_stream(file_path, encoding, transform)
+        else:
+            stream = get_source_stream(source, file_path, transform)
         relative_file_name = get_relative_file_name(
-            file_name=file_stream.name,
-            file_path=file_stream.fileName,
-            base_path=self.work_dir
-        )
-        stream = get_input_stream(
-            # rm comments
-            ParacCompiler.remove_comments_from_str(file_stream.strdata),
-            name=file_stream.name
+            file_name=stream.name,
+            file_path=stream.fileName,
+            base_path=work_dir
         )
-        return await self.parse_single_file(
-            stream, relative_file_name, enable_out
+        file_ctx = await ProgramCompilationContext.parse_single_file(
+            stream, relative_file_name, enable_out, parse_mode,
+            release_parse_tree, lexer
         )
+        if extracted_regions:
+            file_ctx.set_c_regions(extracted_regions)
+        return file_ctx
 
     @staticmethod
     async def parse_single_file(
             stream: antlr4.InputStream,
             relative_file_name: str,
             enable_out: bool,
+            parse_mode: Union[str, ParseMode, None] = None,
+            release_parse_tree: bool = False,
+            lexer: Union[str, LexerKind, None] = None
     ) -> FileCompilationContext:
         """
         Parses a single file and generates the FilePreProcessorContext
@@ -231,14 +494,42 @@ class ProgramCompilationContext(ProgramRunContext):
         logged onto the console using the local logger instance. If an
         exception is raised or error is encountered, it will be reraised with
         the FailedToProcessError.
+        :param parse_mode: The ParseMode, which should be used for the
+        prediction. If None the DEFAULT_PARSE_MODE (two-stage) is used
+        :param release_parse_tree: If set to True the tokens of the logic
+        stream only keep the offsets of their text and the parse tree is
+        released after walking it (see free_parse_tree()). The AST of the
+        file context is kept
+        :param lexer: The LexerKind, which should be used for lexing. If None
+        the DEFAULT_LEXER_KIND (fast) is used
         :returns: The generated FilePreProcessorContext instance
         """
         from .compiler import ParacCompiler
+        from .error_handler import ParacErrorListener
         from .parser.listener import Listener
 
         logger.debug(f"Parsing file ({relative_file_name})")
-        antlr4_file_ctx = await ParacCompiler.parse(stream, enable_out)
+        start = time.perf_counter()
+        step_timer = StepTimer()
+        error_listener = ParacErrorListener(enable_out)
+        antlr4_file_ctx = await ParacCompiler.parse(
+            stream, enable_out, parse_mode, error_listener, step_timer,
+            lexer
+        )
+        step_timer.lap(STEP_PARSE)
 
         listener = Listener(antlr4_file_ctx, stream, relative_file_name)
         await listener.walk_and_generate_logic_stream(enable_out)
+        step_timer.lap(STEP_WALK)
+        listener.file_ctx.set_step_times(step_timer.steps)
+        listener.file_ctx.set_syntax_errors(error_listener.syntax_errors)
+        listener.file_ctx.set_token_count(
+            len(antlr4_file_ctx.parser.getTokenStream().tokens)
+        )
+        if release_parse_tree:
+            # The file context now only references the text of the file, so
+            # the memory of the tree is not kept until the compilation ends
+            listener.file_ctx.release_antlr4_contexts(stream.strdata)
+            free_parse_tree(antlr4_file_ctx)
+        listener.file_ctx.set_parse_time(time.perf_counter() - start)
         return listener.file_ctx
@@ -96,5 +96,7 @@ class ParacErrorListener(BaseErrorListener):
         an error inside the program
         """
 
+        self.syntax_errors += 1
+
         # TODO! Add proper error handling
         logger.error(f"At line: {line}, column: {column} - {msg}")
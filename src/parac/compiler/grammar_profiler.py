@@ -0,0 +1,379 @@
+# coding=utf-8
+"""
+Profiler for the prediction decisions of the Antlr4 parsers, which shows the
+decisions of the grammars that are expensive to predict, require a long
+lookahead or fall back to the full-context (LL) prediction.
+
+The Python runtime of Antlr4 does not contain the ProfilingATNSimulator of
+the Java runtime, so the same measurements are done by the
+ProfilingATNSimulator of this module, which is installed on the parsers
+instead of the default ParserATNSimulator
+"""
+import logging
+import os
+import time
+from os import PathLike
+from typing import (Any, Callable, Dict, List, Optional, Tuple, Union,
+                    Type, TYPE_CHECKING)
+
+import antlr4
+from antlr4.atn.ParserATNSimulator import ParserATNSimulator
+
+from .compiler import ParacCompiler
+from .error_handler import ParacErrorListener
+from .parser.fast_lexer import FastParaCLexer
+from .parser.flat_parser import FlatParaCParser
+from ..preprocessor.error_handler import PreProcessorErrorListener
+from ..preprocessor.python.ParaCPreProcessorLexer import \
+    ParaCPreProcessorLexer
+from ..preprocessor.python.ParaCPreProcessorParser import \
+    ParaCPreProcessorParser
+from ..util import (ParseMode, ParseModeStatistics, parse_with_mode,
+                    get_file_stream, GrammarKind, get_grammar_kind)
+
+if TYPE_CHECKING:
+    from ..abc import BaseErrorListener
+
+__all__ = [
+    'DecisionProfile',
+    'ProfilingATNSimulator',
+    'GrammarProfiler',
+    'DECISION_SORT_KEYS',
+    'PROFILED_FILE_EXTENSIONS'
+]
+
+logger = logging.getLogger(__name__)
+
+# Extensions of the files, which are profiled when a directory is passed
+PROFILED_FILE_EXTENSIONS: Tuple[str, ...] = (".para", ".ph", ".c", ".h")
+
+
+class DecisionProfile:
+    """
+    Profiling counters of a single prediction decision of a parser. The
+    lookahead depths are the amount of tokens, which had to be looked at to
+    predict the alternative
+    """
+
+    def __init__(self, decision: int, rule_name: str):
+        self.decision: int = decision
+        self.rule_name: str = rule_name
+        self.invocations: int = 0
+        # Time spent in adaptivePredict in seconds
+        self.time: float = 0.0
+        self.sll_total_lookahead: int = 0
+        self.sll_max_lookahead: int = 0
+        self.ll_predictions: int = 0
+        self.ll_total_lookahead: int = 0
+        self.ll_max_lookahead: int = 0
+        # Predictions where the SLL prediction ended in a conflict, which
+        # requires the LL prediction. In the SLL prediction mode the
+        # conflict is resolved by picking the lowest alternative
+        self.sll_conflicts: int = 0
+        self.full_context_events: int = 0
+        self.context_sensitivities: int = 0
+        self.ambiguities: int = 0
+        self.errors: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: decision={self.decision}, " \
+               f"rule={self.rule_name}, invocations={self.invocations}>"
+
+    @property
+    def sll_avg_lookahead(self) -> float:
+        """ Returns the average lookahead depth of the SLL prediction """
+        if self.invocations == 0:
+            return 0.0
+        return self.sll_total_lookahead / self.invocations
+
+    @property
+    def ll_avg_lookahead(self) -> float:
+        """ Returns the average lookahead depth of the LL predictions """
+        if self.ll_predictions == 0:
+            return 0.0
+        return self.ll_total_lookahead / self.ll_predictions
+
+
+# Sort keys of the decision profiles, which sort in descending order
+DECISION_SORT_KEYS: Dict[str, Callable[[DecisionProfile], Any]] = {
+    "time": lambda d: d.time,
+    "invocations": lambda d: d.invocations,
+    "sll-lookahead": lambda d: (d.sll_max_lookahead, d.sll_avg_lookahead),
+    "ll-lookahead": lambda d: (d.ll_max_lookahead, d.ll_avg_lookahead),
+    "full-context": lambda d: (d.full_context_events, d.sll_conflicts),
+    "ambiguities": lambda d: d.ambiguities
+}
+
+
+def _get_min_alt(configs) -> int:
+    """ Returns the lowest alternative of the ATNConfigSet """
+    return min(config.alt for config in configs)
+
+
+class ProfilingATNSimulator(ParserATNSimulator):
+    """
+    ParserATNSimulator, which records the prediction time, lookahead depth,
+    full-context events and ambiguities of every decision. Port of the
+    ProfilingATNSimulator of the Antlr4 Java runtime
+    """
+    __slots__ = (
+        'decisions', '_sll_stop_index', '_ll_stop_index', '_current_state',
+        '_conflicting_alt_resolved_by_sll'
+    )
+
+    def __init__(
+            self,
+            parser: antlr4.Parser,
+            decisions: List[DecisionProfile]
+    ):
+        """
+        Initialises the simulator for the parser
+
+        :param parser: The parser, which should be profiled
+        :param decisions: The profiles of the decisions of the parser, which
+        are updated by the simulator. Can be shared by multiple simulators
+        """
+        super().__init__(
+            parser, parser.atn, parser.decisionsToDFA,
+            parser.sharedContextCache
+        )
+        self.decisions: List[DecisionProfile] = decisions
+        self._sll_stop_index: int = -1
+        self._ll_stop_index: int = -1
+        self._current_state = None
+        self._conflicting_alt_resolved_by_sll: int = 0
+
+    def adaptivePredict(self, input, decision: int, outerContext):
+        self._sll_stop_index = -1
+        self._ll_stop_index = -1
+        self._current_state = None
+        start = time.perf_counter()
+        try:
+            return super().adaptivePredict(input, decision, outerContext)
+        finally:
+            profile = self.decisions[decision]
+            profile.time += time.perf_counter() - start
+            profile.invocations += 1
+
+            state = self._current_state
+            if state is not None and state.requiresFullContext:
+                profile.sll_conflicts += 1
+
+            if self._sll_stop_index >= 0:
+                k = self._sll_stop_index - self._startIndex + 1
+                profile.sll_total_lookahead += k
+                profile.sll_max_lookahead = max(profile.sll_max_lookahead, k)
+            if self._ll_stop_index >= 0:
+                k = self._ll_stop_index - self._startIndex + 1
+                profile.ll_predictions += 1
+                profile.ll_total_lookahead += k
+                profile.ll_max_lookahead = max(profile.ll_max_lookahead, k)
+
+    def getExistingTargetState(self, previousD, t: int):
+        # Called for every SLL step, so the index is the last token looked at
+        self._sll_stop_index = self._input.index
+        state = super().getExistingTargetState(previousD, t)
+        if state is not None:
+            self._current_state = state
+            if state is self.ERROR:
+                self.decisions[self._dfa.decision].errors += 1
+        return state
+
+    def computeTargetState(self, dfa, previousD, t: int):
+        state = super().computeTargetState(dfa, previousD, t)
+        self._current_state = state
+        if state is self.ERROR:
+            self.decisions[dfa.decision].errors += 1
+        return state
+
+    def computeReachSet(self, closure, t: int, fullCtx: bool):
+        if fullCtx:
+            self._ll_stop_index = self._input.index
+        reach = super().computeReachSet(closure, t, fullCtx)
+        if fullCtx and reach is None:
+            self.decisions[self._dfa.decision].errors += 1
+        return reach
+
+    def reportAttemptingFullContext(
+            self, dfa, conflictingAlts, configs, startIndex, stopIndex
+    ):
+        if conflictingAlts is not None:
+            self._conflicting_alt_resolved_by_sll = min(conflictingAlts)
+        else:
+            self._conflicting_alt_resolved_by_sll = _get_min_alt(configs)
+        self.decisions[dfa.decision].full_context_events += 1
+        super().reportAttemptingFullContext(
+            dfa, conflictingAlts, configs, startIndex, stopIndex
+        )
+
+    def reportContextSensitivity(
+            self, dfa, prediction, configs, startIndex, stopIndex
+    ):
+        if prediction != self._conflicting_alt_resolved_by_sll:
+            self.decisions[dfa.decision].context_sensitivities += 1
+        super().reportContextSensitivity(
+            dfa, prediction, configs, startIndex, stopIndex
+        )
+
+    def reportAmbiguity(
+            self, dfa, D, startIndex, stopIndex, exact, ambigAlts, configs
+    ):
+        profile = self.decisions[dfa.decision]
+        if ambigAlts is not None:
+            prediction = min(ambigAlts)
+        else:
+            prediction = _get_min_alt(configs)
+        if configs.fullCtx and \
+                prediction != self._conflicting_alt_resolved_by_sll:
+            # The SLL prediction would have picked a different alternative
+            profile.context_sensitivities += 1
+        profile.ambiguities += 1
+        super().reportAmbiguity(
+            dfa, D, startIndex, stopIndex, exact, ambigAlts, configs
+        )
+
+
+class GrammarProfiler:
+    """
+    Profiles the decisions of a grammar over multiple parsed files. The
+    decision profiles of all files are accumulated
+    """
+
+    def __init__(
+            self,
+            grammar: Union[str, GrammarKind] = GrammarKind.PARAC,
+            parse_mode: Union[str, ParseMode, None] = None
+    ):
+        """
+        Initialises the profiler
+
+        :param grammar: The grammar, which should be profiled
+        :param parse_mode: The ParseMode, which should be used for the
+        prediction. If None the DEFAULT_PARSE_MODE (two-stage) is used
+        """
+        self.grammar: GrammarKind = get_grammar_kind(grammar)
+        self.parse_mode: Union[str, ParseMode, None] = parse_mode
+        self.parse_statistics: ParseModeStatistics = ParseModeStatistics()
+        self.files: int = 0
+        self.tokens: int = 0
+        self.syntax_errors: int = 0
+        # Total time of the parses in seconds
+        self.parse_time: float = 0.0
+
+        if self.grammar is GrammarKind.PARAC:
+            self.lexer_cls: Type[antlr4.Lexer] = FastParaCLexer
+            self.parser_cls: Type[antlr4.Parser] = FlatParaCParser
+        else:
+            self.lexer_cls = ParaCPreProcessorLexer
+            self.parser_cls = ParaCPreProcessorParser
+
+        atn = self.parser_cls.atn
+        self.decisions: List[DecisionProfile] = [
+            DecisionProfile(
+                decision,
+                self.parser_cls.ruleNames[
+                    atn.getDecisionState(decision).ruleIndex
+                ]
+            )
+            for decision in range(len(atn.decisionToState))
+        ]
+
+    def _create_error_listener(self) -> 'BaseErrorListener':
+        """ Returns the error listener for a parsed file """
+        if self.grammar is GrammarKind.PARAC:
+            return ParacErrorListener(False)
+        return PreProcessorErrorListener(False)
+
+    def profile_stream(self, input_stream: antlr4.InputStream) -> int:
+        """
+        Lexes and parses the passed input stream using the profiling
+        simulator
+
+        :param input_stream: The input stream of the file
+        :returns: The amount of syntax errors of the file
+        """
+        error_listener = self._create_error_listener()
+        lexer = self.lexer_cls(input_stream)
+        lexer.removeErrorListeners()
+        lexer.addErrorListener(error_listener)
+        stream = antlr4.CommonTokenStream(lexer)
+        stream.fill()
+
+        parser = self.parser_cls(stream)
+        parser.removeErrorListeners()
+        parser._interp = ProfilingATNSimulator(parser, self.decisions)
+
+        start = time.perf_counter()
+        parse_with_mode(
+            parser, parser.compilationUnit, error_listener,
+            self.parse_mode, self.parse_statistics
+        )
+        self.parse_time += time.perf_counter() - start
+
+        self.files += 1
+        self.tokens += len(stream.tokens)
+        self.syntax_errors += error_listener.syntax_errors
+        return error_listener.syntax_errors
+
+    def profile_file(
+            self, path: Union[str, PathLike], encoding: str = 'utf-8'
+    ) -> int:
+        """
+        Profiles the parse of the passed file. Comments are removed before
+        lexing, same as in the compiler
+
+        :param path: The path to the file
+        :param encoding: The encoding the file should be read with
+        :returns: The amount of syntax errors of the file
+        """
+        logger.debug(f"Profiling the parse of {path}")
+        return self.profile_stream(get_file_stream(
+            path, encoding, transform=ParacCompiler.remove_comments_from_str
+        ))
+
+    def profile_path(
+            self, path: Union[str, PathLike], encoding: str = 'utf-8'
+    ) -> int:
+        """
+        Profiles the parse of the passed file or of all files with one of the
+        PROFILED_FILE_EXTENSIONS in the passed directory and its
+        subdirectories
+
+        :param path: The path to the file or directory
+        :param encoding: The encoding the files should be read with
+        :returns: The amount of syntax errors of the files
+        """
+        if not os.path.isdir(path):
+            return self.profile_file(path, encoding)
+
+        syntax_errors = 0
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(PROFILED_FILE_EXTENSIONS):
+                    syntax_errors += self.profile_file(
+                        os.path.join(root, name), encoding
+                    )
+        return syntax_errors
+
+    def get_sorted_decisions(
+            self,
+            sort_by: str = "time",
+            key: Optional[Callable[[DecisionProfile], Any]] = None
+    ) -> List[DecisionProfile]:
+        """
+        Returns the profiles of the invoked decisions sorted in descending
+        order
+
+        :param sort_by: The name of the sort key (see DECISION_SORT_KEYS)
+        :param key: Custom sort key, which overrides sort_by
+        :raises ValueError: If sort_by is not a valid sort key
+        """
+        if key is None:
+            if sort_by not in DECISION_SORT_KEYS:
+                raise ValueError(f"Invalid sort key '{sort_by}'")
+            key = DECISION_SORT_KEYS[sort_by]
+        return sorted(
+            (d for d in self.decisions if d.invocations > 0),
+            key=key, reverse=True
+        )
@@ -0,0 +1,1082 @@
+# coding=utf-8
+"""
+Builder creating the compact AST (see ast_nodes) from the Antlr4 parse tree
+of a Para-C file in one pass of the listener.
+
+The builder is called on the exit of every rule context. Since the children
+of a context are exited before the context itself, the AST values of its
+sub-rules are on top of the value stack and are replaced by the value of the
+context. Values are AST nodes, interned names or tuples of them for list
+rules, like declarationSpecifiers.
+
+Builds for both the FlatParaCParser and ParaCParser tree, since contexts with
+a single child are passed through.
+"""
+from __future__ import annotations
+import logging
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from antlr4 import ParserRuleContext, Token
+from antlr4.tree.Tree import ErrorNode, TerminalNode
+
+from .python.ParaCParser import ParaCParser
+from .. import ast_nodes as ast
+
+__all__ = [
+    'AstBuilder'
+]
+
+logger = logging.getLogger(__name__)
+
+intern = sys.intern
+# Children of a context, where terminals are their tokens and rule contexts
+# are replaced by their AST value: (token, None) or (None, value)
+Pairs = List[Tuple[Optional[Token], Any]]
+BuildFunction = Callable[[ParserRuleContext, List[Any]], Any]
+
+
+def _start(ctx: ParserRuleContext) -> int:
+    """ Returns the offset of the first char of the context """
+    return ctx.start.start
+
+
+def _stop(ctx: ParserRuleContext) -> int:
+    """
+    Returns the offset of the last char of the context, which is the one
+    before the start for empty contexts
+    """
+    if ctx.stop is None or ctx.stop.tokenIndex < ctx.start.tokenIndex:
+        return ctx.start.start - 1
+    return ctx.stop.stop
+
+
+def _pairs(ctx: ParserRuleContext, values: List[Any]) -> Pairs:
+    """ Returns the children of the context with the values of the rules """
+    result = []
+    it = iter(values)
+    for child in ctx.children or ():
+        if isinstance(child, TerminalNode):
+            result.append((child.symbol, None))
+        else:
+            result.append((None, next(it)))
+    return result
+
+
+def _rule_pairs(
+        ctx: ParserRuleContext, values: List[Any]
+) -> List[Tuple[type, Any]]:
+    """ Returns the types of the rule children together with their values """
+    return [
+        (type(child), value) for child, value in zip(
+            (c for c in ctx.children or ()
+             if not isinstance(c, TerminalNode)),
+            values
+        )
+    ]
+
+
+def _texts(ctx: ParserRuleContext) -> List[str]:
+    """ Returns the texts of the terminal children of the context """
+    return [
+        child.symbol.text for child in ctx.children
+        if isinstance(child, TerminalNode)
+    ]
+
+
+def _build_raw(ctx: ParserRuleContext, values: List[Any]) -> ast.RawNode:
+    """ Builds a RawNode named by the rule of the context """
+    return ast.RawNode(
+        ParaCParser.ruleNames[ctx.getRuleIndex()], tuple(values),
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_default(ctx: ParserRuleContext, values: List[Any]) -> Any:
+    """
+    Default for contexts without a build function. A single rule child is
+    passed through, a single terminal is returned as interned text (e.g.
+    keywords or operators) and every other context becomes a RawNode
+    """
+    children = ctx.children
+    if children is not None and len(children) == 1:
+        if values:
+            return values[0]
+        return intern(children[0].symbol.text)
+    return _build_raw(ctx, values)
+
+
+def _build_first(_: ParserRuleContext, values: List[Any]) -> Any:
+    """ Passes the value of the first rule child through """
+    return values[0]
+
+
+def _build_tuple(_: ParserRuleContext, values: List[Any]) -> Tuple[Any, ...]:
+    """ Builds the tuple of the values of a list rule """
+    return tuple(values)
+
+
+class _PointerSpecifier:
+    """
+    Value of the typeSpecifier alternative 'typeSpecifier pointer', which the
+    grammar prefers for declarations like 'char *p'. The pointers are moved
+    to the first declarator by _move_pointers()
+    """
+    __slots__ = ('specifier', 'pointers')
+
+    def __init__(self, specifier: Any, pointers: Tuple[Tuple[str, ...], ...]):
+        self.specifier = specifier
+        self.pointers = pointers
+
+
+def _move_pointers(
+        ctx: ParserRuleContext, specifiers: Tuple[Any, ...], declarator: Any
+) -> Tuple[Tuple[Any, ...], Any]:
+    """
+    Moves the pointers of the specifiers to the passed declarator, which
+    can be an InitDeclarator, BitField, Declarator or None
+
+    :returns: The specifiers without pointers and the declarator
+    """
+    if not any(type(s) is _PointerSpecifier for s in specifiers):
+        return specifiers, declarator
+
+    pointers = ()
+    result = []
+    for specifier in specifiers:
+        while type(specifier) is _PointerSpecifier:
+            pointers = specifier.pointers + pointers
+            specifier = specifier.specifier
+        result.append(specifier)
+
+    target = declarator
+    if type(target) in (ast.InitDeclarator, ast.BitField):
+        target = target.declarator
+    if target is None:
+        target = ast.Declarator(
+            None, pointers, (), None, (), start=_stop(ctx) + 1, stop=_stop(ctx)
+        )
+        if declarator is None:
+            declarator = target
+        else:
+            declarator.declarator = target
+    else:
+        target.pointers = pointers + target.pointers
+    return tuple(result), declarator
+
+
+def _build_declarators(
+        ctx: ParserRuleContext, specifiers: Tuple[Any, ...],
+        declarators: Tuple[Any, ...]
+) -> ast.Declaration:
+    """ Builds a Declaration of the specifiers and declarators """
+    if declarators:
+        specifiers, first = _move_pointers(ctx, specifiers, declarators[0])
+        declarators = (first, *declarators[1:])
+    else:
+        specifiers, _ = _move_pointers(ctx, specifiers, None)
+    return ast.Declaration(
+        specifiers, declarators, start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+# =========================================
+# Declarations
+# =========================================
+def _build_compilation_unit(
+        ctx: ParaCParser.CompilationUnitContext, values: List[Any]
+) -> ast.TranslationUnit:
+    if values:
+        return values[0]
+    return ast.TranslationUnit((), start=0, stop=-1)
+
+
+def _build_translation_unit(
+        ctx: ParaCParser.TranslationUnitContext, values: List[Any]
+) -> ast.TranslationUnit:
+    return ast.TranslationUnit(
+        tuple(values), start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_function_definition(
+        ctx: ParaCParser.FunctionDefinitionContext, values: List[Any]
+) -> ast.FunctionDefinition:
+    (decorators, specifiers), declarator = values[0], values[1]
+    specifiers, declarator = _move_pointers(ctx, specifiers, declarator)
+    return ast.FunctionDefinition(
+        decorators, specifiers, declarator,
+        values[2] if len(values) == 4 else (), values[-1],
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_function_declaration_specifiers(
+        ctx: ParaCParser.FunctionDeclarationSpecifiersContext,
+        values: List[Any]
+) -> Tuple[Tuple[str, ...], Tuple[Any, ...]]:
+    decorators = []
+    specifiers = ()
+    for child_type, value in _rule_pairs(ctx, values):
+        if child_type is ParaCParser.DecoratorSpecifierContext:
+            decorators.append(value)
+        else:
+            specifiers = value
+    return tuple(decorators), specifiers
+
+
+def _build_decorator_specifier(
+        ctx: ParaCParser.DecoratorSpecifierContext, _: List[Any]
+) -> str:
+    return intern(ctx.children[-1].symbol.text)
+
+
+def _build_declaration(
+        ctx: ParaCParser.DeclarationContext, values: List[Any]
+) -> Any:
+    if type(ctx.children[0]) is ParaCParser.StaticAssertDeclarationContext:
+        return values[0]
+    return _build_declarators(
+        ctx, values[0], values[1] if len(values) > 1 else ()
+    )
+
+
+def _build_init_declarator(
+        ctx: ParaCParser.InitDeclaratorContext, values: List[Any]
+) -> ast.InitDeclarator:
+    return ast.InitDeclarator(
+        values[0], values[1] if len(values) > 1 else None,
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_type_specifier(
+        ctx: ParaCParser.TypeSpecifierContext, values: List[Any]
+) -> Any:
+    if len(values) == 2 and \
+            type(ctx.children[1]) is ParaCParser.PointerContext:
+        return _PointerSpecifier(values[0], values[1])
+    elif ctx.start.text == 'lambda':
+        return ast.LambdaType(values[0], start=_start(ctx), stop=_stop(ctx))
+    return _build_default(ctx, values)
+
+
+def _build_struct_or_union_specifier(
+        ctx: ParaCParser.StructOrUnionSpecifierContext, values: List[Any]
+) -> ast.StructSpecifier:
+    name = None
+    members = None
+    for token, value in _pairs(ctx, values)[1:]:
+        if token is None:
+            members += value
+        elif token.type == ParaCParser.Identifier:
+            name = intern(token.text)
+        elif token.text == '{':
+            members = ()
+    return ast.StructSpecifier(
+        values[0], name, members, start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_struct_declaration(
+        ctx: ParaCParser.StructDeclarationContext, values: List[Any]
+) -> Any:
+    if type(ctx.children[0]) is ParaCParser.StaticAssertDeclarationContext:
+        return values[0]
+    return _build_declarators(
+        ctx, values[0], values[1] if len(values) > 1 else ()
+    )
+
+
+def _build_specifier_qualifier_list(
+        _: ParaCParser.SpecifierQualifierListContext, values: List[Any]
+) -> Tuple[Any, ...]:
+    # Right recursive, the second value is the tuple of the nested list
+    return (values[0],) + values[1] if len(values) > 1 else (values[0],)
+
+
+def _build_struct_declarator(
+        ctx: ParaCParser.StructDeclaratorContext, values: List[Any]
+) -> Any:
+    if len(ctx.children) == 1:
+        return values[0]
+    return ast.BitField(
+        values[0] if len(values) > 1 else None, values[-1],
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_enum_specifier(
+        ctx: ParaCParser.EnumSpecifierContext, values: List[Any]
+) -> ast.EnumSpecifier:
+    name = None
+    identifier = ctx.children[1]
+    if isinstance(identifier, TerminalNode) and \
+            identifier.symbol.type == ParaCParser.Identifier:
+        name = intern(identifier.symbol.text)
+    return ast.EnumSpecifier(
+        name, values[0] if values else None,
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_enumerator(
+        ctx: ParaCParser.EnumeratorContext, values: List[Any]
+) -> ast.Enumerator:
+    return ast.Enumerator(
+        values[0], values[1] if len(values) > 1 else None,
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_declarator(ctx: ParserRuleContext, values: List[Any]) -> Any:
+    """
+    Builds a declarator or abstractDeclarator by adding the pointers and
+    extensions to the Declarator of the direct declarator
+    """
+    pointers = ()
+    declarator = None
+    attributes = []
+    for child_type, value in _rule_pairs(ctx, values):
+        if child_type is ParaCParser.PointerContext:
+            pointers = value
+        elif child_type is ParaCParser.GccDeclaratorExtensionContext:
+            attributes.append(value)
+        else:
+            declarator = value
+
+    if declarator is None:
+        # Abstract declarator only consisting of a pointer
+        return ast.Declarator(
+            None, pointers, (), None, (), start=_start(ctx), stop=_stop(ctx)
+        )
+    target = declarator
+    if type(declarator) is ast.BitField:
+        target = declarator.declarator
+    target.pointers = pointers
+    target.attributes += tuple(attributes)
+    declarator.start = _start(ctx)
+    declarator.stop = _stop(ctx)
+    return declarator
+
+
+def _add_suffix(
+        declarator: ast.Declarator, ctx: ParserRuleContext, pairs: Pairs,
+        first: int
+) -> ast.Declarator:
+    """
+    Adds the array or parameter suffix starting at the child with the index
+    first and the following extensions to the declarator
+    """
+    qualifiers = []
+    size = None
+    parameters = ()
+    variadic = False
+    attributes = []
+    for child, (token, value) in zip(
+            ctx.children[first + 1:], pairs[first + 1:]
+    ):
+        child_type = type(child)
+        if token is not None:
+            if token.text == 'static':
+                qualifiers.append('static')
+        elif child_type is ParaCParser.ParameterTypeListContext:
+            parameters = value.parameters
+            variadic = value.variadic
+        elif child_type is ParaCParser.IdentifierListContext:
+            parameters = value
+        elif child_type is ParaCParser.TypeQualifierListContext:
+            qualifiers.extend(value)
+        elif child_type is ParaCParser.GccDeclaratorExtensionContext:
+            attributes.append(value)
+        else:
+            size = value
+
+    opening = pairs[first][0]
+    stop = _stop(ctx)
+    if opening.text == '[':
+        suffix = ast.ArraySuffix(
+            tuple(qualifiers), size, start=opening.start, stop=stop
+        )
+    else:
+        suffix = ast.ParameterList(
+            parameters, variadic, start=opening.start, stop=stop
+        )
+    declarator.suffixes += (suffix,)
+    declarator.attributes += tuple(attributes)
+    declarator.start = _start(ctx)
+    declarator.stop = stop
+    return declarator
+
+
+def _build_direct_declarator(
+        ctx: ParaCParser.DirectDeclaratorContext, values: List[Any]
+) -> Any:
+    start, stop = _start(ctx), _stop(ctx)
+    pairs = _pairs(ctx, values)
+    first = pairs[0][0]
+    if first is None:
+        # directDeclarator followed by an array or parameter suffix
+        return _add_suffix(pairs[0][1], ctx, pairs, 1)
+    elif first.type == ParaCParser.Identifier:
+        declarator = ast.Declarator(
+            intern(first.text), (), (), None, (), start=start, stop=stop
+        )
+        if len(pairs) == 1:
+            return declarator
+        # Bit field: Identifier ':' DigitSequence
+        declarator.stop = first.stop
+        width = pairs[2][0]
+        return ast.BitField(
+            declarator,
+            ast.Constant(width.text, start=width.start, stop=width.stop),
+            start=start, stop=stop
+        )
+
+    # Parenthesised declarator '(' declarator ')' or function pointer with
+    # a calling convention '(' typeSpecifier? pointer directDeclarator ')'
+    inner = values[-1]
+    if type(ctx.children[-2]) is ParaCParser.DirectDeclaratorContext:
+        inner.pointers = values[-2]
+    return ast.Declarator(
+        inner.name, (), (), inner, (), start=start, stop=stop
+    )
+
+
+def _build_direct_abstract_declarator(
+        ctx: ParaCParser.DirectAbstractDeclaratorContext, values: List[Any]
+) -> ast.Declarator:
+    start, stop = _start(ctx), _stop(ctx)
+    pairs = _pairs(ctx, values)
+    if pairs[0][0] is None:
+        return _add_suffix(pairs[0][1], ctx, pairs, 1)
+    elif type(ctx.children[1]) is ParaCParser.AbstractDeclaratorContext:
+        # '(' abstractDeclarator ')' gccDeclaratorExtension*
+        return ast.Declarator(
+            None, (), (), values[0], tuple(values[1:]),
+            start=start, stop=stop
+        )
+    return _add_suffix(
+        ast.Declarator(None, (), (), None, (), start=start, stop=stop),
+        ctx, pairs, 0
+    )
+
+
+def _build_pointer(
+        ctx: ParaCParser.PointerContext, values: List[Any]
+) -> Tuple[Tuple[str, ...], ...]:
+    levels = []
+    for token, value in _pairs(ctx, values):
+        if token is not None:
+            levels.append(())
+        else:
+            levels[-1] = value
+    return tuple(levels)
+
+
+def _build_parameter_type_list(
+        ctx: ParaCParser.ParameterTypeListContext, values: List[Any]
+) -> ast.ParameterList:
+    return ast.ParameterList(
+        values[0], len(ctx.children) > 1, start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_parameter_declaration(
+        ctx: ParaCParser.ParameterDeclarationContext, values: List[Any]
+) -> ast.Parameter:
+    specifiers, declarator = _move_pointers(
+        ctx, values[0], values[1] if len(values) > 1 else None
+    )
+    return ast.Parameter(
+        specifiers, declarator, start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_identifier_list(
+        ctx: ParaCParser.IdentifierListContext, _: List[Any]
+) -> Tuple[ast.Identifier, ...]:
+    return tuple(
+        ast.Identifier(
+            intern(child.symbol.text),
+            start=child.symbol.start, stop=child.symbol.stop
+        )
+        for child in ctx.children
+        if child.symbol.type == ParaCParser.Identifier
+    )
+
+
+def _build_type_name(
+        ctx: ParaCParser.TypeNameContext, values: List[Any]
+) -> ast.TypeName:
+    specifiers, declarator = _move_pointers(
+        ctx, values[0], values[1] if len(values) > 1 else None
+    )
+    return ast.TypeName(
+        specifiers, declarator, start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_initializer(
+        ctx: ParaCParser.InitializerContext, values: List[Any]
+) -> Any:
+    if len(ctx.children) == 1:
+        return values[0]
+    return ast.InitializerList(
+        values[0] if values else (), start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_initializer_list(
+        ctx: ParaCParser.InitializerListContext, values: List[Any]
+) -> Tuple[Any, ...]:
+    items = []
+    designation = None
+    for child, value in zip(
+            (c for c in ctx.children if not isinstance(c, TerminalNode)),
+            values
+    ):
+        if type(child) is ParaCParser.DesignationContext:
+            designation = (child, value)
+        elif designation is not None:
+            items.append(ast.Designated(
+                designation[1], value,
+                start=_start(designation[0]), stop=_stop(child)
+            ))
+            designation = None
+        else:
+            items.append(value)
+    return tuple(items)
+
+
+def _build_designator(
+        ctx: ParaCParser.DesignatorContext, values: List[Any]
+) -> Any:
+    if values:
+        return values[0]
+    return intern(ctx.children[-1].symbol.text)
+
+
+def _build_static_assert_declaration(
+        ctx: ParaCParser.StaticAssertDeclarationContext, values: List[Any]
+) -> ast.StaticAssert:
+    return ast.StaticAssert(
+        values[0], tuple(
+            child.symbol.text for child in ctx.children
+            if isinstance(child, TerminalNode)
+            and child.symbol.type == ParaCParser.StringLiteral
+        ),
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+# =========================================
+# Statements
+# =========================================
+def _build_statement(
+        ctx: ParaCParser.StatementContext, values: List[Any]
+) -> Any:
+    if len(ctx.children) == 1:
+        return values[0]
+    # Inline assembly
+    return ast.RawNode(
+        intern(ctx.start.text), tuple(values),
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_labeled_statement(
+        ctx: ParaCParser.LabeledStatementContext, values: List[Any]
+) -> ast.Statement:
+    start, stop = _start(ctx), _stop(ctx)
+    keyword = ctx.start.text
+    if keyword == 'case':
+        return ast.CaseStatement(
+            values[0], values[1], start=start, stop=stop
+        )
+    elif keyword == 'default':
+        return ast.DefaultStatement(values[0], start=start, stop=stop)
+    return ast.LabeledStatement(
+        intern(keyword), values[0], start=start, stop=stop
+    )
+
+
+def _build_compound_statement(
+        ctx: ParaCParser.CompoundStatementContext, values: List[Any]
+) -> ast.CompoundStatement:
+    return ast.CompoundStatement(
+        values[0] if values else (), start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_expression_statement(
+        ctx: ParaCParser.ExpressionStatementContext, values: List[Any]
+) -> ast.ExpressionStatement:
+    return ast.ExpressionStatement(
+        values[0] if values else None, start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_try_except_statement(
+        ctx: ParaCParser.TryExceptStatementContext, values: List[Any]
+) -> ast.TryStatement:
+    handlers = []
+    orelse = None
+    finalbody = None
+    for child_type, value in _rule_pairs(ctx, values)[1:]:
+        if child_type is ParaCParser.ExceptBlockContext:
+            handlers.append(value)
+        elif child_type is ParaCParser.ElseBlockContext:
+            orelse = value
+        else:
+            finalbody = value
+    return ast.TryStatement(
+        values[0], tuple(handlers), orelse, finalbody,
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_except_block(
+        ctx: ParaCParser.ExceptBlockContext, values: List[Any]
+) -> ast.ExceptHandler:
+    exceptions = ()
+    name = None
+    pairs = _pairs(ctx, values)
+    for index, (token, value) in enumerate(pairs):
+        if token is None:
+            if type(value) is tuple:
+                exceptions = tuple(i.name for i in value)
+        elif token.type == ParaCParser.Identifier:
+            if pairs[index - 1][0].text == 'as':
+                name = intern(token.text)
+            else:
+                exceptions = (intern(token.text),)
+    return ast.ExceptHandler(
+        exceptions, name, values[-1], start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_selection_statement(
+        ctx: ParaCParser.SelectionStatementContext, values: List[Any]
+) -> ast.Statement:
+    start, stop = _start(ctx), _stop(ctx)
+    if ctx.start.text == 'switch':
+        return ast.SwitchStatement(
+            values[0], values[1], start=start, stop=stop
+        )
+    return ast.IfStatement(
+        values[0], values[1], values[2] if len(values) > 2 else None,
+        start=start, stop=stop
+    )
+
+
+def _build_iteration_statement(
+        ctx: ParaCParser.IterationStatementContext, values: List[Any]
+) -> ast.Statement:
+    start, stop = _start(ctx), _stop(ctx)
+    keyword = ctx.start.type
+    if keyword == ParaCParser.While:
+        return ast.WhileStatement(
+            values[0], values[1], start=start, stop=stop
+        )
+    elif keyword == ParaCParser.Do:
+        return ast.DoWhileStatement(
+            values[0], values[1], start=start, stop=stop
+        )
+    return ast.ForStatement(*values[0], values[1], start=start, stop=stop)
+
+
+def _build_for_condition(
+        ctx: ParaCParser.ForConditionContext, values: List[Any]
+) -> Tuple[Any, Any, Any]:
+    parts = [None, None, None]
+    index = 0
+    for token, value in _pairs(ctx, values):
+        if token is not None:
+            index += 1
+        else:
+            parts[index] = value
+    return parts[0], parts[1], parts[2]
+
+
+def _build_for_declaration(
+        ctx: ParaCParser.ForDeclarationContext, values: List[Any]
+) -> ast.Declaration:
+    return _build_declarators(
+        ctx, values[0], values[1] if len(values) > 1 else ()
+    )
+
+
+def _build_jump_statement(
+        ctx: ParaCParser.JumpStatementContext, values: List[Any]
+) -> ast.Statement:
+    start, stop = _start(ctx), _stop(ctx)
+    keyword = ctx.start.text
+    if keyword == 'return':
+        return ast.ReturnStatement(
+            values[0] if values else None, start=start, stop=stop
+        )
+    elif keyword == 'break':
+        return ast.BreakStatement(start=start, stop=stop)
+    elif keyword == 'continue':
+        return ast.ContinueStatement(start=start, stop=stop)
+    return ast.GotoStatement(
+        values[0] if values else intern(ctx.children[1].symbol.text),
+        start=start, stop=stop
+    )
+
+
+# =========================================
+# Expressions
+# =========================================
+def _build_primary_expression(
+        ctx: ParaCParser.PrimaryExpressionContext, values: List[Any]
+) -> ast.Expression:
+    start, stop = _start(ctx), _stop(ctx)
+    first = ctx.children[0]
+    if not isinstance(first, TerminalNode):
+        # genericSelection or lambdaFunction
+        return values[0]
+
+    token_type = first.symbol.type
+    if token_type == ParaCParser.Identifier:
+        return ast.Identifier(
+            intern(first.symbol.text), start=start, stop=stop
+        )
+    elif token_type == ParaCParser.Constant:
+        return ast.Constant(first.symbol.text, start=start, stop=stop)
+    elif token_type == ParaCParser.StringLiteral:
+        return ast.StringLiteral(tuple(_texts(ctx)), start=start, stop=stop)
+    elif token_type == ParaCParser.Spawn:
+        return ast.Spawn(
+            intern(ctx.children[1].symbol.text), start=start, stop=stop
+        )
+    elif len(ctx.children) == 3 and \
+            type(ctx.children[1]) is ParaCParser.ExpressionContext:
+        # Parenthesised expression
+        return values[0]
+    # Statement expressions and builtins, like '__builtin_va_arg'
+    kind = 'statementExpression' if type(ctx.children[-2]) is \
+        ParaCParser.CompoundStatementContext else intern(first.symbol.text)
+    return ast.RawNode(kind, tuple(values), start=start, stop=stop)
+
+
+def _build_lambda_function(
+        ctx: ParaCParser.LambdaFunctionContext, values: List[Any]
+) -> ast.Lambda:
+    return ast.Lambda(
+        values[0] if len(values) > 1 else (), values[-1],
+        start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_postfix_expression(
+        ctx: ParaCParser.PostfixExpressionContext, values: List[Any]
+) -> ast.Expression:
+    children = ctx.children
+    if len(children) == 1:
+        return values[0]
+
+    start = _start(ctx)
+    pairs = _pairs(ctx, values)
+    index = 0
+    if pairs[0][0] is None:
+        node = pairs[0][1]
+        index = 1
+    else:
+        # Compound literal: '__extension__'? '(' typeName ')' '{'
+        # initializerList ','? '}'
+        index = next(
+            i for i, (token, _) in enumerate(pairs)
+            if token is not None and token.text == '{'
+        )
+        opening = pairs[index][0]
+        while pairs[index][0] is None or pairs[index][0].text != '}':
+            index += 1
+        closing = pairs[index][0]
+        node = ast.CompoundLiteral(
+            values[0], ast.InitializerList(
+                values[1], start=opening.start, stop=closing.stop
+            ),
+            start=start, stop=closing.stop
+        )
+        index += 1
+
+    while index < len(pairs):
+        token = pairs[index][0]
+        text = token.text
+        if text in ('++', '--'):
+            node = ast.PostfixOperation(
+                intern(text), node, start=start, stop=token.stop
+            )
+            index += 1
+        elif text in ('.', '->'):
+            member = pairs[index + 1][0]
+            node = ast.MemberAccess(
+                node, intern(member.text), text == '->',
+                start=start, stop=member.stop
+            )
+            index += 2
+        elif text == '[':
+            close = pairs[index + 2][0]
+            node = ast.Subscript(
+                node, pairs[index + 1][1], start=start, stop=close.stop
+            )
+            index += 3
+        else:
+            # Call with optional arguments
+            arguments = ()
+            if pairs[index + 1][0] is None:
+                arguments = pairs[index + 1][1]
+                index += 1
+            close = pairs[index + 1][0]
+            node = ast.Call(node, arguments, start=start, stop=close.stop)
+            index += 2
+    return node
+
+
+def _build_unary_expression(
+        ctx: ParaCParser.UnaryExpressionContext, values: List[Any]
+) -> ast.Expression:
+    children = ctx.children
+    if len(children) == 1:
+        return values[0]
+
+    stop = _stop(ctx)
+    pairs = _pairs(ctx, values)
+    index = 0
+    while pairs[index][0] is not None and \
+            pairs[index][0].text in ('++', '--', 'sizeof'):
+        # 'sizeof' '(' typeName ')' is not a prefix of the operand
+        if index + 2 < len(children) and \
+                type(children[index + 2]) is ParaCParser.TypeNameContext:
+            break
+        index += 1
+    prefixes = [token for token, _ in pairs[:index]]
+
+    token, value = pairs[index]
+    if token is None:
+        if type(children[index]) is ParaCParser.UnaryOperatorContext:
+            node = ast.UnaryOperation(
+                value, pairs[index + 1][1],
+                start=children[index].start.start, stop=stop
+            )
+        else:
+            node = value
+    elif token.text == '&&':
+        # Address of a label (GCC extension)
+        label = pairs[index + 1][0]
+        node = ast.UnaryOperation(
+            '&&', ast.Identifier(
+                intern(label.text), start=label.start, stop=label.stop
+            ),
+            start=token.start, stop=stop
+        )
+    else:
+        # ('sizeof' | '_Alignof') '(' typeName ')'
+        node = ast.TypeOperation(
+            intern(token.text), pairs[index + 2][1],
+            start=token.start, stop=stop
+        )
+
+    for prefix in reversed(prefixes):
+        node = ast.UnaryOperation(
+            intern(prefix.text), node, start=prefix.start, stop=stop
+        )
+    return node
+
+
+def _build_cast_or_convert_expression(
+        ctx: ParaCParser.CastOrConvertExpressionContext, values: List[Any]
+) -> ast.Expression:
+    children = ctx.children
+    start, stop = _start(ctx), _stop(ctx)
+    if len(children) == 1:
+        if values:
+            return values[0]
+        # DigitSequence
+        return ast.Constant(ctx.start.text, start=start, stop=stop)
+    elif not isinstance(children[0], TerminalNode):
+        return ast.Conversion(values[0], values[1], start=start, stop=stop)
+    return ast.Cast(values[0], values[1], start=start, stop=stop)
+
+
+def _build_binary_expression(
+        ctx: ParserRuleContext, values: List[Any]
+) -> ast.Expression:
+    """ Builds the left associative operations of a binary level """
+    node = values[0]
+    if len(values) == 1:
+        return node
+
+    start = _start(ctx)
+    operators = _texts(ctx)
+    for operator, right in zip(operators, values[1:]):
+        node = ast.BinaryOperation(
+            intern(operator), node, right, start=start, stop=right.stop
+        )
+    return node
+
+
+def _build_conditional_expression(
+        ctx: ParaCParser.ConditionalExpressionContext, values: List[Any]
+) -> ast.Expression:
+    if len(values) == 1:
+        return values[0]
+    return ast.Conditional(
+        values[0], values[1], values[2], start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_assignment_expression(
+        ctx: ParaCParser.AssignmentExpressionContext, values: List[Any]
+) -> ast.Expression:
+    if len(values) == 1:
+        return values[0]
+    elif not values:
+        # DigitSequence
+        return ast.Constant(
+            ctx.start.text, start=_start(ctx), stop=_stop(ctx)
+        )
+    return ast.Assignment(
+        values[1], values[0], values[2], start=_start(ctx), stop=_stop(ctx)
+    )
+
+
+def _build_expression(
+        ctx: ParserRuleContext, values: List[Any]
+) -> ast.Expression:
+    """ Builds an expression or forExpression """
+    if len(values) == 1:
+        return values[0]
+    return ast.Sequence(tuple(values), start=_start(ctx), stop=_stop(ctx))
+
+
+_P = ParaCParser
+_BUILD_FUNCTIONS: Dict[type, BuildFunction] = {
+    _P.CompilationUnitContext: _build_compilation_unit,
+    _P.TranslationUnitContext: _build_translation_unit,
+    _P.StandardFunctionDefinitionContext: _build_function_definition,
+    _P.SimpleFunctionDefinitionContext: _build_function_definition,
+    _P.FunctionDeclarationSpecifiersContext:
+        _build_function_declaration_specifiers,
+    _P.DecoratorSpecifierContext: _build_decorator_specifier,
+    _P.DeclarationListContext: _build_tuple,
+    _P.DeclarationContext: _build_declaration,
+    _P.DeclarationSpecifiersContext: _build_tuple,
+    _P.InitDeclaratorListContext: _build_tuple,
+    _P.InitDeclaratorContext: _build_init_declarator,
+    _P.TypeSpecifierContext: _build_type_specifier,
+    _P.StructOrUnionSpecifierContext: _build_struct_or_union_specifier,
+    _P.StructDeclarationListContext: _build_tuple,
+    _P.StructDeclarationContext: _build_struct_declaration,
+    _P.SpecifierQualifierListContext: _build_specifier_qualifier_list,
+    _P.StructDeclaratorListContext: _build_tuple,
+    _P.StructDeclaratorContext: _build_struct_declarator,
+    _P.EnumSpecifierContext: _build_enum_specifier,
+    _P.EnumeratorListContext: _build_tuple,
+    _P.EnumeratorContext: _build_enumerator,
+    _P.DeclaratorContext: _build_declarator,
+    _P.DirectDeclaratorContext: _build_direct_declarator,
+    _P.PointerContext: _build_pointer,
+    _P.TypeQualifierListContext: _build_tuple,
+    _P.ParameterTypeListContext: _build_parameter_type_list,
+    _P.ParameterListContext: _build_tuple,
+    _P.RegularParameterDeclarationContext: _build_parameter_declaration,
+    _P.AbstractParameterDeclarationContext: _build_parameter_declaration,
+    _P.IdentifierListContext: _build_identifier_list,
+    _P.TypeNameContext: _build_type_name,
+    _P.AbstractDeclaratorContext: _build_declarator,
+    _P.DirectAbstractDeclaratorContext: _build_direct_abstract_declarator,
+    _P.InitializerContext: _build_initializer,
+    _P.InitializerListContext: _build_initializer_list,
+    _P.DesignationContext: _build_first,
+    _P.DesignatorListContext: _build_tuple,
+    _P.DesignatorContext: _build_designator,
+    _P.StaticAssertDeclarationContext: _build_static_assert_declaration,
+    _P.StatementContext: _build_statement,
+    _P.LabeledStatementContext: _build_labeled_statement,
+    _P.CompoundStatementContext: _build_compound_statement,
+    _P.BlockItemListContext: _build_tuple,
+    _P.ExpressionStatementContext: _build_expression_statement,
+    _P.TryExceptStatementContext: _build_try_except_statement,
+    _P.ExceptBlockContext: _build_except_block,
+    _P.FinallyBlockContext: _build_first,
+    _P.ElseBlockContext: _build_first,
+    _P.SelectionStatementContext: _build_selection_statement,
+    _P.IterationStatementContext: _build_iteration_statement,
+    _P.ForConditionContext: _build_for_condition,
+    _P.ForDeclarationContext: _build_for_declaration,
+    _P.ForExpressionContext: _build_expression,
+    _P.JumpStatementContext: _build_jump_statement,
+    _P.PrimaryExpressionContext: _build_primary_expression,
+    _P.LambdaFunctionContext: _build_lambda_function,
+    _P.ExpressionLambdaContext: _build_first,
+    _P.StatementLambdaContext: _build_first,
+    _P.PostfixExpressionContext: _build_postfix_expression,
+    _P.ArgumentExpressionListContext: _build_tuple,
+    _P.UnaryExpressionContext: _build_unary_expression,
+    _P.CastOrConvertExpressionContext: _build_cast_or_convert_expression,
+    _P.MultiplicativeExpressionContext: _build_binary_expression,
+    _P.AdditiveExpressionContext: _build_binary_expression,
+    _P.ShiftExpressionContext: _build_binary_expression,
+    _P.RelationalExpressionContext: _build_binary_expression,
+    _P.EqualityExpressionContext: _build_binary_expression,
+    _P.AndExpressionContext: _build_binary_expression,
+    _P.ExclusiveOrExpressionContext: _build_binary_expression,
+    _P.InclusiveOrExpressionContext: _build_binary_expression,
+    _P.LogicalAndExpressionContext: _build_binary_expression,
+    _P.LogicalOrExpressionContext: _build_binary_expression,
+    _P.ConditionalExpressionContext: _build_conditional_expression,
+    _P.AssignmentExpressionContext: _build_assignment_expression,
+    _P.ExpressionContext: _build_expression,
+}
+del _P
+
+
+class AstBuilder:
+    """
+    Builds the AST of a file while the parse tree is walked. exit_rule()
+    has to be called on the exit of every rule context, e.g. in
+    exitEveryRule() of a listener, and the finished tree can be fetched
+    using the result property after the walk.
+
+    Contexts containing syntax errors are built as RawNode, since their
+    children are incomplete.
+    """
+
+    def __init__(self):
+        self._stack: List[Any] = []
+
+    @property
+    def result(self) -> Optional[ast.TranslationUnit]:
+        """
+        Returns the TranslationUnit of the walked tree or None if no
+        compilation unit was walked yet
+        """
+        if len(self._stack) == 1 and \
+                type(self._stack[0]) is ast.TranslationUnit:
+            return self._stack[0]
+        return None
+
+    def exit_rule(self, ctx: ParserRuleContext) -> None:
+        """
+        Replaces the values of the children of the exited context on the
+        stack with the value of the context
+        """
+        count = 0
+        erroneous = ctx.exception is not None
+        for child in ctx.children or ():
+            if not isinstance(child, TerminalNode):
+                count += 1
+            elif isinstance(child, ErrorNode):
+                erroneous = True
+
+        stack = self._stack
+        values = stack[len(stack) - count:]
+        del stack[len(stack) - count:]
+        if erroneous:
+            stack.append(_build_raw(ctx, values))
+        else:
+            build = _BUILD_FUNCTIONS.get(type(ctx), _build_default)
+            stack.append(build(ctx, values))
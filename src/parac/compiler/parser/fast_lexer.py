@@ -0,0 +1,209 @@
+# coding=utf-8
+"""
+Regex based lexer for the Para-C grammar, which emits the same tokens as the
+generated ParaCLexer, but matches every token using a single compiled regex
+instead of interpreting the lexer ATN one character at a time
+"""
+import logging
+import re
+from typing import Dict, List, Optional, Pattern
+
+from antlr4.Token import CommonToken, Token
+
+from .python.ParaCLexer import ParaCLexer
+
+__all__ = [
+    'FastParaCLexer',
+    'KEYWORDS',
+    'OPERATORS'
+]
+
+logger = logging.getLogger(__name__)
+
+
+def _get_literals() -> Dict[str, int]:
+    """
+    Returns the literal tokens (keywords and operators) of the generated lexer
+    and their token types, so the lexers can not get out of sync
+    """
+    return {
+        name[1:-1]: token_type
+        for token_type, name in enumerate(ParaCLexer.literalNames)
+        if name.startswith("'")
+    }
+
+
+# Keywords are matched as identifiers and then looked up, since a keyword
+# only wins against an identifier of the same length
+KEYWORDS: Dict[str, int] = {
+    literal: token_type for literal, token_type in _get_literals().items()
+    if re.fullmatch(r'[a-zA-Z_][a-zA-Z_0-9]*', literal)
+}
+OPERATORS: Dict[str, int] = {
+    literal: token_type for literal, token_type in _get_literals().items()
+    if literal not in KEYWORDS
+}
+
+_HEX_QUAD = r'[0-9a-fA-F]{4}'
+_UNIVERSAL_CHARACTER_NAME = rf'\\u{_HEX_QUAD}|\\U{_HEX_QUAD}{_HEX_QUAD}'
+_IDENTIFIER = rf'(?:[a-zA-Z_]|{_UNIVERSAL_CHARACTER_NAME})' \
+              rf'(?:[a-zA-Z_0-9]|{_UNIVERSAL_CHARACTER_NAME})*'
+_ESCAPE_SEQUENCE = r'\\[\'"?abfnrtv\\]|\\[0-7]{1,3}|\\x[0-9a-fA-F]+|' \
+                   rf'{_UNIVERSAL_CHARACTER_NAME}'
+_INTEGER_SUFFIX = r'(?:[uU](?:ll|LL|[lL])?|(?:ll|LL|[lL])[uU]?)?'
+
+# The alternatives are ordered, so the first matching alternative is also the
+# longest match of the Antlr4 lexer. Numbers are resolved separately, since
+# their alternatives can not be ordered by length (see _match_number())
+_TOKEN_REGEX: Pattern = re.compile(
+    r'(?P<Whitespace>[ \t]+)'
+    r'|(?P<Newline>\r\n?|\n)'
+    r'|(?P<Directive>#[^\r\n]*)'
+    rf'|(?P<ExtensionTaskLambda>@[ \t]*{_IDENTIFIER}[ \t]*'
+    r'\{[^\uffff]*\}[ \t]*@[ \t]*end(?:\r\n?|\n))'
+    r'|(?P<AsmBlock>asm[^{]*\{[^}]*\})'
+    rf'|(?P<CharacterConstant>[LuU]?\'(?:[^\'\\\r\n]|{_ESCAPE_SEQUENCE})+\')'
+    rf'|(?P<StringLiteral>(?:u8|[uUL])?"'
+    rf'(?:[^"\\\r\n]|{_ESCAPE_SEQUENCE}|\\\r?\n)*")'
+    r'|(?P<Number>\.?[0-9])'
+    rf'|(?P<Identifier>{_IDENTIFIER})'
+    r'|(?P<Operator>' + '|'.join(
+        re.escape(op) for op in sorted(OPERATORS, key=len, reverse=True)
+    ) + ')'
+)
+
+_NUMBER_REGEXES: List[Pattern] = [
+    # DecimalFloatingConstant
+    re.compile(
+        r'(?:[0-9]*\.[0-9]+|[0-9]+\.)(?:[eE][+-]?[0-9]+)?[flFL]?'
+    ),
+    re.compile(r'[0-9]+[eE][+-]?[0-9]+[flFL]?'),
+    # HexadecimalFloatingConstant
+    re.compile(
+        r'0[xX](?:[0-9a-fA-F]*\.[0-9a-fA-F]+|[0-9a-fA-F]+\.?)'
+        r'[pP][+-]?[0-9]+[flFL]?'
+    ),
+    # IntegerConstant
+    re.compile(rf'0[xX][0-9a-fA-F]+{_INTEGER_SUFFIX}'),
+    re.compile(r'0[bB][01]+'),
+    re.compile(rf'0[0-7]*{_INTEGER_SUFFIX}'),
+    re.compile(rf'[1-9][0-9]*{_INTEGER_SUFFIX}'),
+]
+_DIGIT_SEQUENCE_REGEX: Pattern = re.compile(r'[0-9]+')
+
+_SKIPPED_TOKENS = frozenset(
+    {'Whitespace', 'Newline', 'Directive', 'AsmBlock'}
+)
+_MULTI_LINE_TOKENS = frozenset({'ExtensionTaskLambda', 'StringLiteral'})
+_TOKEN_TYPES: Dict[str, int] = {
+    'ExtensionTaskLambda': ParaCLexer.ExtensionTaskLambda,
+    'CharacterConstant': ParaCLexer.Constant,
+    'StringLiteral': ParaCLexer.StringLiteral,
+}
+
+
+def _match_number(source: str, pos: int) -> Optional[tuple]:
+    """
+    Returns the end and token type of the longest Constant or DigitSequence
+    at the passed position. A Constant wins against a DigitSequence of the
+    same length, since it is defined first in the grammar
+
+    :returns: The end and token type or None if no number matches
+    """
+    end = max(
+        (m.end() for m in (r.match(source, pos) for r in _NUMBER_REGEXES)
+         if m is not None),
+        default=-1
+    )
+    m = _DIGIT_SEQUENCE_REGEX.match(source, pos)
+    if m is not None and m.end() > end:
+        return m.end(), ParaCLexer.DigitSequence
+    elif end > pos:
+        return end, ParaCLexer.Constant
+    return None
+
+
+class FastParaCLexer(ParaCLexer):
+    """
+    Lexer for the Para-C grammar, which is a drop-in replacement for the
+    generated ParaCLexer and can be passed to an antlr4.CommonTokenStream.
+
+    Every token is matched using a single compiled regex, whose alternatives
+    replicate the longest-match rule of the Antlr4 lexer, and keywords are
+    looked up in a dictionary. The tokens have the same types, channels,
+    offsets, lines and columns as the tokens of the ParaCLexer.
+
+    If no token matches at a position (invalid input) the token is lexed
+    using the ParaCLexer, so the token recognition errors and the recovery
+    are the same as with the generated lexer.
+    """
+
+    def nextToken(self) -> Token:
+        """
+        Returns the next token of the input stream. Whitespace, newlines,
+        directives and asm blocks are skipped, same as in the ParaCLexer
+        """
+        if self._hitEOF:
+            return super().nextToken()
+
+        stream = self._input
+        source: str = stream.strdata
+        pos: int = stream.index
+        interp = self._interp
+        line: int = interp.line
+        column: int = interp.column
+        match = _TOKEN_REGEX.match
+        while True:
+            m = match(source, pos)
+            if m is None:
+                # Invalid input or EOF -> Handled by the Antlr4 lexer
+                stream.seek(pos)
+                interp.line = line
+                interp.column = column
+                return super().nextToken()
+
+            kind = m.lastgroup
+            end = m.end()
+            if kind == 'Identifier':
+                token_type = KEYWORDS.get(m.group(), ParaCLexer.Identifier)
+            elif kind == 'Operator':
+                token_type = OPERATORS[m.group()]
+            elif kind == 'Number':
+                end, token_type = _match_number(source, pos)
+            elif kind in _SKIPPED_TOKENS:
+                newlines = source.count('\n', pos, end)
+                if newlines:
+                    line += newlines
+                    column = end - source.rfind('\n', pos, end) - 1
+                else:
+                    column += end - pos
+                pos = end
+                continue
+            else:
+                token_type = _TOKEN_TYPES[kind]
+
+            token = CommonToken.__new__(CommonToken)
+            token.source = self._tokenFactorySourcePair
+            token.type = token_type
+            token.channel = Token.DEFAULT_CHANNEL
+            token.start = pos
+            token.stop = end - 1
+            token.tokenIndex = -1
+            token.line = line
+            token.column = column
+            token._text = None
+
+            # Only string literals (line continuations) and extension task
+            # lambdas can span multiple lines
+            newlines = source.count('\n', pos, end) \
+                if kind in _MULTI_LINE_TOKENS else 0
+            if newlines:
+                line += newlines
+                column = end - source.rfind('\n', pos, end) - 1
+            else:
+                column += end - pos
+            stream.seek(end)
+            interp.line = line
+            interp.column = column
+            self._token = token
+            return token
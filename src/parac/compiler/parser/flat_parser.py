@@ -0,0 +1,451 @@
+# coding=utf-8
+"""
+Parser for the Para-C grammar, which flattens the expression precedence chain
+of the generated ParaCParser. An expression only creates the contexts of the
+precedence levels that actually contain an operator, instead of one context
+for every level of the chain (assignmentExpression -> conditionalExpression ->
+logicalOrExpression -> ... -> postfixExpression -> primaryExpression)
+"""
+import logging
+from typing import Callable, Dict, FrozenSet, List, Tuple, Type
+
+from antlr4 import ParserRuleContext
+from antlr4.atn.Transition import AtomTransition, RuleTransition
+from antlr4.error.ErrorStrategy import BailErrorStrategy
+
+from .python.ParaCParser import ParaCParser
+
+__all__ = [
+    'FlatParaCParser',
+    'BINARY_LEVELS'
+]
+
+logger = logging.getLogger(__name__)
+
+
+def _get_invoking_state(rule: str, target: str) -> int:
+    """
+    Returns the ATN state of the generated ParaCParser, in which the passed
+    rule invokes the target rule for the first time
+    """
+    rule_index = ParaCParser.ruleNames.index(rule)
+    target_index = ParaCParser.ruleNames.index(target)
+    for state in ParaCParser.atn.states:
+        if state is not None and state.ruleIndex == rule_index and any(
+                isinstance(t, RuleTransition)
+                and t.target.ruleIndex == target_index
+                for t in state.transitions
+        ):
+            return state.stateNumber
+    raise RuntimeError(f"The rule '{rule}' does not invoke '{target}'")
+
+
+def _get_match_state(rule: str, token_type: int) -> int:
+    """
+    Returns the ATN state of the generated ParaCParser, in which the passed
+    rule matches the token type for the first time
+    """
+    rule_index = ParaCParser.ruleNames.index(rule)
+    for state in ParaCParser.atn.states:
+        if state is not None and state.ruleIndex == rule_index and any(
+                isinstance(t, AtomTransition) and t.label_ == token_type
+                for t in state.transitions
+        ):
+            return state.stateNumber
+    raise RuntimeError(f"The rule '{rule}' does not match {token_type}")
+
+
+# The binary precedence levels from the lowest to the highest precedence with
+# their context, the ATN state in which the rule invokes the next higher level
+# and their operators. The states are looked up in the ATN, so they stay
+# valid when the parser is generated again
+BINARY_LEVELS: List[Tuple[Type[ParserRuleContext], int, FrozenSet[int]]] = [
+    (ParaCParser.LogicalOrExpressionContext,
+     _get_invoking_state("logicalOrExpression", "logicalAndExpression"),
+     frozenset({ParaCParser.OrOr})),
+    (ParaCParser.LogicalAndExpressionContext,
+     _get_invoking_state("logicalAndExpression", "inclusiveOrExpression"),
+     frozenset({ParaCParser.AndAnd})),
+    (ParaCParser.InclusiveOrExpressionContext,
+     _get_invoking_state("inclusiveOrExpression", "exclusiveOrExpression"),
+     frozenset({ParaCParser.Or})),
+    (ParaCParser.ExclusiveOrExpressionContext,
+     _get_invoking_state("exclusiveOrExpression", "andExpression"),
+     frozenset({ParaCParser.Caret})),
+    (ParaCParser.AndExpressionContext,
+     _get_invoking_state("andExpression", "equalityExpression"),
+     frozenset({ParaCParser.And})),
+    (ParaCParser.EqualityExpressionContext,
+     _get_invoking_state("equalityExpression", "relationalExpression"),
+     frozenset({ParaCParser.Equal, ParaCParser.NotEqual})),
+    (ParaCParser.RelationalExpressionContext,
+     _get_invoking_state("relationalExpression", "shiftExpression"),
+     frozenset({ParaCParser.Less, ParaCParser.Greater,
+                ParaCParser.LessEqual, ParaCParser.GreaterEqual})),
+    (ParaCParser.ShiftExpressionContext,
+     _get_invoking_state("shiftExpression", "additiveExpression"),
+     frozenset({ParaCParser.LeftShift, ParaCParser.RightShift})),
+    (ParaCParser.AdditiveExpressionContext,
+     _get_invoking_state("additiveExpression", "multiplicativeExpression"),
+     frozenset({ParaCParser.Plus, ParaCParser.Minus})),
+    (ParaCParser.MultiplicativeExpressionContext,
+     _get_invoking_state(
+         "multiplicativeExpression", "castOrConvertExpression"
+     ),
+     frozenset({ParaCParser.Star, ParaCParser.Div, ParaCParser.Mod})),
+]
+_OPERATOR_LEVELS: Dict[int, int] = {
+    operator: level
+    for level, (_, _, operators) in enumerate(BINARY_LEVELS)
+    for operator in operators
+}
+
+# ATN states of the conditionalExpression ('logicalOrExpression ? expression
+# : conditionalExpression')
+_CONDITIONAL_STATE: int = _get_invoking_state(
+    "conditionalExpression", "logicalOrExpression"
+)
+_QUESTION_STATE: int = _get_match_state(
+    "conditionalExpression", ParaCParser.Question
+)
+_TRUE_BRANCH_STATE: int = _get_invoking_state(
+    "conditionalExpression", "expression"
+)
+_COLON_STATE: int = _get_match_state(
+    "conditionalExpression", ParaCParser.Colon
+)
+_FALSE_BRANCH_STATE: int = _get_invoking_state(
+    "conditionalExpression", "conditionalExpression"
+)
+# ATN states of the assignmentExpression ('conditionalExpression' or
+# 'unaryExpression assignmentOperator assignmentExpression')
+_ASSIGNMENT_STATE: int = _get_invoking_state(
+    "assignmentExpression", "conditionalExpression"
+)
+_ASSIGNMENT_OPERATOR_STATE: int = _get_invoking_state(
+    "assignmentExpression", "assignmentOperator"
+)
+_ASSIGNED_VALUE_STATE: int = _get_invoking_state(
+    "assignmentExpression", "assignmentExpression"
+)
+
+_ASSIGNMENT_OPERATORS: FrozenSet[int] = frozenset({
+    ParaCParser.Assign, ParaCParser.StarAssign, ParaCParser.DivAssign,
+    ParaCParser.ModAssign, ParaCParser.PlusAssign, ParaCParser.MinusAssign,
+    ParaCParser.LeftShiftAssign, ParaCParser.RightShiftAssign,
+    ParaCParser.AndAssign, ParaCParser.XorAssign, ParaCParser.OrAssign
+})
+# Contexts, which can be the result of a flattened unaryExpression
+_UNARY_CONTEXTS: Tuple[Type[ParserRuleContext], ...] = (
+    ParaCParser.UnaryExpressionContext,
+    ParaCParser.PostfixExpressionContext,
+    ParaCParser.PrimaryExpressionContext
+)
+
+
+class FlatParaCParser(ParaCParser):
+    """
+    Parser for the Para-C grammar, which is a drop-in replacement for the
+    generated ParaCParser, but returns a flattened expression tree.
+
+    An expression context, which only has a single child rule context (for
+    example an additiveExpression without '+' or '-'), is replaced with its
+    child in the parse tree. The remaining contexts keep their generated
+    types, so the enter/exit callbacks of a Listener are still called for
+    every expression that contains an operator of the level, and a bare
+    identifier or constant is a primaryExpression directly below the
+    expression that uses it.
+
+    If the parser bails out on syntax errors (SLL stage of the two-stage
+    parse) the binary operators are parsed using precedence climbing, which
+    only creates the contexts of levels with operators and decides using the
+    next token instead of the adaptive prediction. The left side of an
+    assignment is parsed as an expression, so assignments no longer need the
+    LL fallback. Otherwise the generated rules are used and flattened after
+    they were parsed, so syntax errors are reported and recovered from
+    exactly like before.
+    """
+
+    @property
+    def _use_precedence_climbing(self) -> bool:
+        """
+        Returns whether the binary operators can be parsed using precedence
+        climbing, which requires that syntax errors bail out and that no
+        parse listeners expect the events of the generated rules
+        """
+        return isinstance(self._errHandler, BailErrorStrategy) \
+            and self.buildParseTrees and self._parseListeners is None
+
+    @staticmethod
+    def _collapse(ctx: ParserRuleContext) -> ParserRuleContext:
+        """
+        Replaces the passed context in the parse tree with its child, if the
+        child is the only child and also a rule context
+
+        :returns: The context, which is now in the parse tree
+        """
+        children = ctx.children
+        if children is None or len(children) != 1 \
+                or ctx.exception is not None \
+                or not isinstance(children[0], ParserRuleContext):
+            return ctx
+
+        child = children[0]
+        parent = ctx.parentCtx
+        if parent is not None and parent.children \
+                and parent.children[-1] is ctx:
+            parent.children[-1] = child
+        child.parentCtx = parent
+
+        # The replaced context might still be referenced by the error
+        # strategy, so it must not keep the tree and the parser alive
+        ctx.parentCtx = None
+        ctx.children = None
+        ctx.parser = None
+        return child
+
+    def _create_level_stack(
+            self,
+            parent: ParserRuleContext,
+            invoking_state: int
+    ) -> List[ParserRuleContext]:
+        """
+        Creates the contexts of the binary levels, which are only used as
+        rule invocation stack for the prediction inside the operands and are
+        never added to the parse tree
+
+        :param parent: The context invoking the logicalOrExpression
+        :param invoking_state: The state in which it is invoked
+        :returns: The contexts indexed by their level
+        """
+        stack = []
+        for _, state, _ in BINARY_LEVELS:
+            parent = ParserRuleContext(parent, invoking_state)
+            stack.append(parent)
+            invoking_state = state
+        return stack
+
+    def _parse_operand(
+            self,
+            stack: List[ParserRuleContext]
+    ) -> ParserRuleContext:
+        """ Parses a castOrConvertExpression as operand of a binary level """
+        invoking_ctx = stack[-1]
+        self._ctx = invoking_ctx
+        self.state = BINARY_LEVELS[-1][1]
+        ctx = self.castOrConvertExpression(0)
+        invoking_ctx.children = None
+        return ctx
+
+    def _climb(
+            self,
+            stack: List[ParserRuleContext],
+            min_level: int
+    ) -> ParserRuleContext:
+        """
+        Parses the binary operators with a precedence of at least the passed
+        level using precedence climbing
+
+        :param stack: The rule invocation stack of the levels
+        :param min_level: The lowest level, which may be parsed
+        :returns: The context of the parsed expression
+        """
+        left = self._parse_operand(stack)
+        stream = self._input
+        while True:
+            level = _OPERATOR_LEVELS.get(stream.LA(1))
+            if level is None or level < min_level:
+                return left
+
+            ctx_type, _, operators = BINARY_LEVELS[level]
+            ctx = ctx_type(self, None, stack[level].invokingState)
+            ctx.start = left.start
+            ctx.addChild(left)
+            left.parentCtx = ctx
+            try:
+                while stream.LA(1) in operators:
+                    ctx.addTokenNode(stream.LT(1))
+                    stream.consume()
+                    right = self._climb(stack, level + 1)
+                    ctx.addChild(right)
+                    right.parentCtx = ctx
+            except BaseException:
+                # The context is not part of the parse tree yet, but must be
+                # reachable from the rule invocation stack, so the partial
+                # tree of a cancelled parse can be freed
+                stack[level].addChild(ctx)
+                raise
+            ctx.stop = stream.LT(-1)
+            left = ctx
+
+    def _parse_conditional(
+            self,
+            parent: ParserRuleContext,
+            invoking_state: int
+    ) -> ParserRuleContext:
+        """
+        Parses a conditionalExpression without adding it to the parse tree
+
+        :param parent: The context invoking the conditionalExpression
+        :param invoking_state: The state in which it is invoked
+        :returns: The context of the parsed expression
+        """
+        localctx = ParaCParser.ConditionalExpressionContext(
+            self, parent, invoking_state
+        )
+        ctx = self._climb(
+            self._create_level_stack(localctx, _CONDITIONAL_STATE), 0
+        )
+        if self._input.LA(1) != ParaCParser.Question:
+            return ctx
+
+        localctx.start = ctx.start
+        localctx.addChild(ctx)
+        ctx.parentCtx = localctx
+        self._ctx = localctx
+        self.state = _QUESTION_STATE
+        self.match(ParaCParser.Question)
+        self.state = _TRUE_BRANCH_STATE
+        self.expression()
+        self.state = _COLON_STATE
+        self.match(ParaCParser.Colon)
+        self.state = _FALSE_BRANCH_STATE
+        self.conditionalExpression()
+        localctx.stop = self._input.LT(-1)
+        return localctx
+
+    def _parse_assignment(
+            self,
+            parent: ParserRuleContext,
+            invoking_state: int
+    ) -> ParserRuleContext:
+        """
+        Parses an assignmentExpression without adding it to the parse tree.
+        The left side of an assignment is parsed as conditionalExpression,
+        which is an unaryExpression if it's followed by an assignment
+        operator, instead of predicting the alternative upfront
+
+        :param parent: The context invoking the assignmentExpression
+        :param invoking_state: The state in which it is invoked
+        :returns: The context of the parsed expression
+        """
+        localctx = ParaCParser.AssignmentExpressionContext(
+            self, parent, invoking_state
+        )
+        ctx = self._parse_conditional(localctx, _ASSIGNMENT_STATE)
+        if self._input.LA(1) not in _ASSIGNMENT_OPERATORS \
+                or not isinstance(ctx, _UNARY_CONTEXTS):
+            return ctx
+
+        localctx.start = ctx.start
+        localctx.addChild(ctx)
+        ctx.parentCtx = localctx
+        self._ctx = localctx
+        self.state = _ASSIGNMENT_OPERATOR_STATE
+        self.assignmentOperator()
+        self.state = _ASSIGNED_VALUE_STATE
+        self.assignmentExpression()
+        localctx.stop = self._input.LT(-1)
+        return localctx
+
+    def _parse_logical_or(
+            self,
+            parent: ParserRuleContext,
+            invoking_state: int
+    ) -> ParserRuleContext:
+        """
+        Parses a logicalOrExpression without adding it to the parse tree
+
+        :param parent: The context invoking the logicalOrExpression
+        :param invoking_state: The state in which it is invoked
+        :returns: The context of the parsed expression
+        """
+        return self._climb(self._create_level_stack(parent, invoking_state), 0)
+
+    def _invoke_flat_rule(
+            self,
+            parse: Callable[[ParserRuleContext, int], ParserRuleContext]
+    ) -> ParserRuleContext:
+        """
+        Invokes the passed parse method like a generated rule and adds the
+        returned context to the parse tree
+
+        :param parse: The method parsing the rule without adding it to the
+        parse tree
+        :returns: The context, which was added to the parse tree
+        """
+        parent, invoking_state = self._ctx, self.state
+        try:
+            ctx = parse(parent, invoking_state)
+        finally:
+            # Returning to the invoking rule, same as Parser.exitRule()
+            self._ctx = parent
+            self.state = invoking_state
+        if parent is not None:
+            parent.addChild(ctx)
+        ctx.parentCtx = parent
+        return ctx
+
+    def castOrConvertExpression(self, _p: int = 0):
+        ctx = super().castOrConvertExpression(_p)
+
+        # The converted expression of 'as' is the innermost context of the
+        # left-recursive rule and has never been returned by the rule
+        operand = ctx
+        while operand.children and isinstance(
+                operand.children[0], ParaCParser.CastOrConvertExpressionContext
+        ):
+            operand = operand.children[0]
+        if operand is not ctx:
+            parent = operand.parentCtx
+            parent.children[0] = self._collapse(operand)
+            parent.children[0].parentCtx = parent
+        return self._collapse(ctx)
+
+    def unaryExpression(self):
+        return self._collapse(super().unaryExpression())
+
+    def postfixExpression(self):
+        return self._collapse(super().postfixExpression())
+
+    def multiplicativeExpression(self):
+        return self._collapse(super().multiplicativeExpression())
+
+    def additiveExpression(self):
+        return self._collapse(super().additiveExpression())
+
+    def shiftExpression(self):
+        return self._collapse(super().shiftExpression())
+
+    def relationalExpression(self):
+        return self._collapse(super().relationalExpression())
+
+    def equalityExpression(self):
+        return self._collapse(super().equalityExpression())
+
+    def andExpression(self):
+        return self._collapse(super().andExpression())
+
+    def exclusiveOrExpression(self):
+        return self._collapse(super().exclusiveOrExpression())
+
+    def inclusiveOrExpression(self):
+        return self._collapse(super().inclusiveOrExpression())
+
+    def logicalAndExpression(self):
+        return self._collapse(super().logicalAndExpression())
+
+    def logicalOrExpression(self):
+        if not self._use_precedence_climbing:
+            return self._collapse(super().logicalOrExpression())
+        return self._invoke_flat_rule(self._parse_logical_or)
+
+    def conditionalExpression(self):
+        if not self._use_precedence_climbing:
+            return self._collapse(super().conditionalExpression())
+        return self._invoke_flat_rule(self._parse_conditional)
+
+    def assignmentExpression(self):
+        if not self._use_precedence_climbing:
+            return self._collapse(super().assignmentExpression())
+        return self._invoke_flat_rule(self._parse_assignment)
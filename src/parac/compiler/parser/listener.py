@@ -7,9 +7,11 @@ from typing import TYPE_CHECKING, Union
 
 import antlr4
 
+from .ast_builder import AstBuilder
 from .python import ParaCListener
 from .python import ParaCParser as parser
 from ..ctx import FileCompilationContext
+from ...util import DispatchTableWalker
 
 logger = logging.getLogger(__name__)
 ParaCParser = parser.ParaCParser
@@ -43,6 +45,7 @@ class Listener(ParaCListener.ParaCListener):
         self._file_ctx = FileCompilationContext(relative_file_name)
         self.antlr4_file_ctx: CompilationUnitContext = antlr4_file_ctx
         self.file_stream: antlr4.InputStream = file_stream
+        self._ast_builder = AstBuilder()
 
         self._compiling: bool = False
         self._enable_out: bool = False
@@ -67,8 +70,11 @@ class Listener(ParaCListener.ParaCListener):
         )
         self._enable_out = enable_out
 
-        walker = antlr4.ParseTreeWalker()
-        walker.walk(self, self.antlr4_file_ctx)
+        walker = DispatchTableWalker()
+        self.file_ctx.set_node_count(
+            walker.walk(self, self.antlr4_file_ctx)
+        )
+        self.file_ctx.set_ast(self._ast_builder.result)
 
         ...
 
@@ -90,6 +96,15 @@ class Listener(ParaCListener.ParaCListener):
         self._compiling = True
         await self.walk(enable_out)
 
+    def exitEveryRule(self, ctx: antlr4.ParserRuleContext):
+        """
+        Exit every parse tree produced by ParaCParser.
+
+        Builds the AST node of the context, so the AST of the file is
+        finished once the walk is done (see AstBuilder)
+        """
+        self._ast_builder.exit_rule(ctx)
+
     # =========================================
     # Beginning of the file
     # =========================================
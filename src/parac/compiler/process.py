@@ -5,17 +5,28 @@ one execution of the compiler as a whole
 """
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import os
 from os import PathLike
-from typing import Union, Tuple, List, Optional, AsyncGenerator
+from typing import (Union, Tuple, List, Optional, AsyncGenerator, Set,
+                    ContextManager, Dict)
 
-from ..preprocessor import PreProcessorProcessResult
+from ..preprocessor import (PreProcessorProcessResult, IncludeGraph,
+                            INCLUDE_GRAPH_FILE_NAME)
 from ..preprocessor.ctx import ProgramPreProcessorContext
 
 from .ctx import ProgramCompilationContext
 from ..util import (decode_if_bytes, cleanup_path_str, validate_file_ending,
-                    validate_path_like)
+                    validate_path_like, ParseMode, get_parse_mode,
+                    LexerKind, get_lexer_kind,
+                    get_dfa_cache, DFA_CACHE_FILE_NAME, get_job_count,
+                    BuildCache, BUILD_CACHE_FOLDER_NAME,
+                    DEFAULT_BUILD_CACHE_SIZE, ProgressTracker, ProgressEvent,
+                    PhaseStartedEvent, CompilationFinishedEvent,
+                    PHASE_PREPROCESSOR, PHASE_TEMP_FILES, PHASE_COMPILER,
+                    Profiler)
 from ..exceptions import FileAccessError
 
 __all__ = [
@@ -33,7 +44,10 @@ class BasicProcess:
     def __init__(
             self,
             entry_file_path: Union[str, bytes, PathLike],
-            encoding: str
+            encoding: str,
+            parse_mode: Union[str, ParseMode, None] = None,
+            include_paths: Optional[List[Union[str, PathLike]]] = None,
+            lexer: Union[str, LexerKind, None] = None
     ):
         """
         Initialises the instance and validates the passed entry file for
@@ -42,6 +56,12 @@ class BasicProcess:
         :param entry_file_path: The entry-file of the program. The compiler
         will use the working directory as base dir if
         the path is relative
+        :param parse_mode: The ParseMode used for parsing the files. If None
+        the DEFAULT_PARSE_MODE (two-stage) is used
+        :param include_paths: Additional directories, which are searched for
+        included files before the working directory and the lib path
+        :param lexer: The LexerKind used for lexing the Para-C files. If None
+        the DEFAULT_LEXER_KIND (fast) is used
         """
         entry_file_path = cleanup_path_str(decode_if_bytes(entry_file_path))
 
@@ -78,6 +98,12 @@ class BasicProcess:
             entry_file_path = absolute_path
         self._entry_file_path = entry_file_path
         self._encoding = encoding
+        self._parse_mode = get_parse_mode(parse_mode)
+        self._lexer = get_lexer_kind(lexer)
+        self._include_paths: List[str] = [
+            cleanup_path_str(str(decode_if_bytes(path)))
+            for path in include_paths or []
+        ]
         self._work_dir = self._get_work_dir()
 
     @property
@@ -99,6 +125,63 @@ class BasicProcess:
         """ Returns the encoding of the process """
         return self._encoding
 
+    @property
+    def parse_mode(self) -> ParseMode:
+        """ Returns the ParseMode used for parsing the files """
+        return self._parse_mode
+
+    @property
+    def lexer(self) -> LexerKind:
+        """ Returns the LexerKind used for lexing the Para-C files """
+        return self._lexer
+
+    @property
+    def include_paths(self) -> List[str]:
+        """
+        Returns the additional directories, which are searched for included
+        files
+        """
+        return self._include_paths
+
+    @property
+    def build_cache(self) -> Optional[BuildCache]:
+        """
+        Returns the build cache for the per-file results or None if it's
+        disabled. Always None for a BasicProcess
+        """
+        return None
+
+    def requires_rebuild(self, file_path: Union[str, PathLike]) -> bool:
+        """
+        Returns whether the passed file needs to be rebuilt, because it or
+        one of the files it includes changed. Always False for a BasicProcess
+        """
+        return False
+
+    @property
+    def progress(self) -> Optional[ProgressTracker]:
+        """
+        Returns the tracker for the progress events of the compilation or
+        None if the progress is not tracked. Always None for a BasicProcess
+        """
+        return None
+
+    @property
+    def profiler(self) -> Optional[Profiler]:
+        """
+        Returns the profiler collecting the timings of the compilation or None
+        if profiling is disabled. Always None for a BasicProcess
+        """
+        return None
+
+    @property
+    def release_parse_trees(self) -> bool:
+        """
+        Returns whether the parse trees are released after generating the
+        logic streams. Always False for a BasicProcess
+        """
+        return False
+
     def _get_work_dir(self) -> str:
         """ Gets the working directory for the program """
         from .. import SEPARATOR
@@ -124,7 +207,10 @@ class FinishedProcess(BasicProcess):
 
     def __init__(self, process: ProgramCompilationProcess):
         self.done_process = process
-        super().__init__(process.entry_file_path, process.encoding)
+        super().__init__(
+            process.entry_file_path, process.encoding, process.parse_mode,
+            process.include_paths, process.lexer
+        )
 
 
 class ProgramCompilationProcess(BasicProcess):
@@ -141,7 +227,18 @@ class ProgramCompilationProcess(BasicProcess):
             entry_file_path: Union[str, bytes, PathLike],
             encoding: str,
             build_path: Union[str, bytes, PathLike],
-            dist_path: Union[str, bytes, PathLike]
+            dist_path: Union[str, bytes, PathLike],
+            parse_mode: Union[str, ParseMode, None] = None,
+            use_dfa_cache: bool = True,
+            jobs: Optional[int] = 1,
+            use_build_cache: bool = True,
+            build_cache_size: int = DEFAULT_BUILD_CACHE_SIZE,
+            profile: bool = False,
+            profile_phases: bool = False,
+            release_parse_trees: bool = True,
+            keep_temp: bool = False,
+            include_paths: Optional[List[Union[str, PathLike]]] = None,
+            lexer: Union[str, LexerKind, None] = None
     ):
         """
         Initialises and validates the provided parameter for the compilation
@@ -153,10 +250,41 @@ class ProgramCompilationProcess(BasicProcess):
         if the path is relative
         :param build_path: The path to the output folder
         :param dist_path: The path to the dist folder
+        :param parse_mode: The ParseMode used for parsing the files. If None
+        the DEFAULT_PARSE_MODE (two-stage) is used
+        :param use_dfa_cache: If set to True the prediction tables of the
+        parsers will be loaded from and saved to the cache folder in the
+        build folder
+        :param jobs: The amount of worker processes used for parsing the
+        files. If None or 0 the amount of CPUs is used. If 1 the files are
+        parsed in this process
+        :param use_build_cache: If set to True the results of the
+        Pre-Processor and Compiler will be cached per file in the cache folder
+        and unchanged files will not be parsed again
+        :param build_cache_size: The max size of the build cache in bytes.
+        If the cache grows larger the least recently used entries are removed
+        :param profile: If set to True the wall and CPU time of the phases
+        and files are recorded by a Profiler (see profiler)
+        :param profile_phases: If set to True the phases are additionally run
+        under cProfile. Implies profile
+        :param release_parse_trees: If set to True the parse trees of the
+        files are released once their logic streams were generated and the
+        tokens only keep the offsets of their text. This means the memory
+        scales with the largest file and not the entire program, but the
+        antlr4 contexts of the tokens are None afterwards
+        :param keep_temp: If set to True the processed files of the
+        Pre-Processor are additionally written to the temp folder in the
+        build folder. The compiler always gets them in memory
+        :param include_paths: Additional directories, which are searched for
+        included files before the working directory and the lib path
+        :param lexer: The LexerKind used for lexing the Para-C files. If None
+        the DEFAULT_LEXER_KIND (fast) is used
         :returns: The file name, the output build path, the output dist path
         and the arguments passed for the compilation
         """
-        super().__init__(entry_file_path, encoding)
+        super().__init__(
+            entry_file_path, encoding, parse_mode, include_paths, lexer
+        )
 
         build_path: Union[str, PathLike] = decode_if_bytes(build_path)
         dist_path: Union[str, PathLike] = decode_if_bytes(dist_path)
@@ -165,9 +293,28 @@ class ProgramCompilationProcess(BasicProcess):
         self._dist_path = cleanup_path_str(dist_path)
         self._temp_files: List[str] = []
         self._temp_entry_file_path: Union[str, None] = None
+        self._keep_temp = keep_temp
+        self._processed_sources: Dict[str, str] = {}
+        self._c_regions: Dict[str, List[Tuple[int, int]]] = {}
+        self._use_dfa_cache = use_dfa_cache
+        self._release_parse_trees = release_parse_trees
+        self._jobs = get_job_count(jobs)
+        self._build_cache: Optional[BuildCache] = None
+        self._rebuild_set: Set[str] = set()
+        self._expected_file_count: int = 0
+        self._progress = ProgressTracker()
+        self._profiler: Optional[Profiler] = None
+        if profile or profile_phases:
+            self._profiler = Profiler(profile_phases)
+        if use_build_cache:
+            from .. import SEPARATOR
+            self._build_cache = BuildCache(
+                f"{self.cache_folder}{SEPARATOR}{BUILD_CACHE_FOLDER_NAME}",
+                encoding,
+                max_size=build_cache_size
+            )
         self._preprocessor_ctx = ProgramPreProcessorContext(self)
         self._compilation_ctx = ProgramCompilationContext(self)
-        self._make_temp_folder()
 
     @property
     def preprocessor_ctx(self) -> ProgramPreProcessorContext:
@@ -201,17 +348,138 @@ class ProgramCompilationProcess(BasicProcess):
         else:
             return cleanup_path_str(f"{self.dist_path}{SEPARATOR}temp")
 
+    @property
+    def cache_folder(self) -> Union[str, PathLike]:
+        """
+        Returns the folder in the build folder, where persistent caches are
+        stored
+        """
+        from .. import SEPARATOR, CACHE_FOLDER_NAME
+        return cleanup_path_str(
+            f"{self.build_path.rstrip(SEPARATOR)}{SEPARATOR}"
+            f"{CACHE_FOLDER_NAME}"
+        )
+
+    @property
+    def use_dfa_cache(self) -> bool:
+        """
+        Returns whether the prediction tables of the parsers should be
+        persisted in the cache folder
+        """
+        return self._use_dfa_cache
+
+    @property
+    def build_cache(self) -> Optional[BuildCache]:
+        """
+        Returns the build cache for the per-file results or None if it's
+        disabled
+        """
+        return self._build_cache
+
+    @property
+    def include_graph_path(self) -> Union[str, PathLike]:
+        """ Returns the path of the persisted include graph """
+        from .. import SEPARATOR
+        return f"{self.cache_folder}{SEPARATOR}{INCLUDE_GRAPH_FILE_NAME}"
+
+    @property
+    def rebuild_set(self) -> Set[str]:
+        """
+        Returns the names of the files that need to be rebuilt, because they
+        or one of the files they include changed since the last compilation.
+        Only available after the include graph was loaded in the compilation
+        """
+        return self._rebuild_set
+
+    def requires_rebuild(self, file_path: Union[str, PathLike]) -> bool:
+        """
+        Returns whether the passed file needs to be rebuilt, because it or
+        one of the files it includes changed since the last compilation
+        """
+        return IncludeGraph.get_file_name(
+            file_path, self.work_dir
+        ) in self._rebuild_set
+
+    @property
+    def progress(self) -> ProgressTracker:
+        """ Returns the tracker for the progress events of the compilation """
+        return self._progress
+
+    @property
+    def profiler(self) -> Optional[Profiler]:
+        """
+        Returns the profiler collecting the timings of the compilation or None
+        if profiling is disabled
+        """
+        return self._profiler
+
+    def _measure_phase(self, phase: str) -> ContextManager:
+        """
+        Returns a context manager, which measures the passed phase if
+        profiling is enabled
+        """
+        if self._profiler is None:
+            return contextlib.nullcontext()
+        return self._profiler.measure_phase(phase)
+
+    @property
+    def release_parse_trees(self) -> bool:
+        """
+        Returns whether the parse trees are released after generating the
+        logic streams
+        """
+        return self._release_parse_trees
+
+    @property
+    def jobs(self) -> int:
+        """ Returns the amount of worker processes used for parsing """
+        return self._jobs
+
+    @property
+    def dfa_cache_path(self) -> Union[str, PathLike]:
+        """ Returns the path of the persisted prediction tables """
+        from .. import SEPARATOR
+        return f"{self.cache_folder}{SEPARATOR}{DFA_CACHE_FILE_NAME}"
+
+    @property
+    def keep_temp(self) -> bool:
+        """
+        Returns whether the processed files of the Pre-Processor are written
+        to the temp folder
+        """
+        return self._keep_temp
+
+    @property
+    def processed_sources(self) -> Dict[str, str]:
+        """
+        Returns the processed code of the files modified by the Pre-Processor,
+        which is parsed by the compiler instead of the original files. The key
+        is the path to the original file
+        """
+        return self._processed_sources
+
+    @property
+    def c_regions(self) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Returns the C regions ('#pragma PARAC lang C') of the processed files,
+        which are not parsed by the compiler. The key is the path to the
+        original file
+        """
+        return self._c_regions
+
     @property
     def temp_files(self) -> List[str]:
         """
-        Returns the temporary files that were created by the Pre-Processor
+        Returns the temporary files that were created by the Pre-Processor.
+        Only written if keep_temp is set
         """
         return self._temp_files
 
     @property
-    def temp_entry_file_path(self) -> str:
+    def temp_entry_file_path(self) -> Optional[str]:
         """
-        Returns the temporary entry-file that was created by the Pre-Processor
+        Returns the temporary entry-file that was created by the Pre-Processor.
+        Only written if keep_temp is set
         """
         return self._temp_entry_file_path
 
@@ -239,6 +507,34 @@ class ProgramCompilationProcess(BasicProcess):
         os.makedirs(self.temp_dist_folder, exist_ok=True)
         logger.debug("Created temp folders for the Pre-Processor")
 
+    async def compile_with_progress_events(self) -> AsyncGenerator[
+        ProgressEvent, None
+    ]:
+        """
+        Runs the compilation and yields the ProgressEvents while it's running.
+        The last event is a CompilationFinishedEvent containing the
+        FinishedProcess. Exceptions of the compilation are reraised after the
+        events emitted before were yielded.
+
+        For info about compilation see compile()
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self.progress.subscribe(queue.put_nowait)
+        task = asyncio.ensure_future(self._compile())
+        # None signals that the compilation finished or failed
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            await task
+        finally:
+            self.progress.unsubscribe(queue.put_nowait)
+            if not task.done():
+                task.cancel()
+
     async def compile_with_progress_iterator(self) -> AsyncGenerator[
         Tuple[
             int,
@@ -250,24 +546,64 @@ class ProgramCompilationProcess(BasicProcess):
         """
         Runs the compilation but yields the progress in form of tuples:
 
-        int - Progress count from 0 to 1000 (0 = 0%, 1000 = 100%)
+        int - Progress count from 0 to 100
         Optional[str] - Name of the next step in form of a string. Is None
                         when the  process finished
         int - Log level for the returned string message
         Optional[FinishedProcess] - None until the process finally finished
 
-        For info about compilation see compile()
+        The progress is computed from the files processed in the phases.
+        See compile_with_progress_events() for the detailed events.
         """
-        return self._compile(True)
+        async def _iterate():
+            async for event in self.compile_with_progress_events():
+                if isinstance(event, PhaseStartedEvent):
+                    yield int(event.progress * 100), event.description, \
+                          logging.INFO, None
+                elif isinstance(event, CompilationFinishedEvent):
+                    yield 100, None, logging.INFO, event.finished_process
+        return _iterate()
 
     async def compile(self) -> FinishedProcess:
         """
         Default function which compiles the passed input data and returns
         a new finished process instance
         """
-        async for result in self._compile(False):
-            if type(result[3]) is FinishedProcess:
-                return result[3]  # Optional[FinishedProcess]
+        return await self._compile()
+
+    def _load_dfa_cache(self) -> None:
+        """
+        Loads the persisted prediction tables, so the parsers start warm
+        """
+        if self.use_dfa_cache and get_dfa_cache().load(self.dfa_cache_path):
+            logger.debug("Loaded the parser prediction tables from the cache")
+
+    def _save_dfa_cache(self) -> None:
+        """
+        Saves the prediction tables for the next compilation if they grew
+        """
+        if self.use_dfa_cache and get_dfa_cache().save(self.dfa_cache_path):
+            logger.debug("Saved the parser prediction tables to the cache")
+
+    def _load_include_graph(self) -> None:
+        """
+        Loads the include graph of the last compilation and determines the
+        files that need to be rebuilt, which are the changed files and all
+        their transitive dependents
+        """
+        if self.build_cache is None:
+            return
+        graph = IncludeGraph.load(self.include_graph_path)
+        if graph is not None:
+            self._expected_file_count = len(graph.files)
+            self._rebuild_set = graph.get_rebuild_set(self.work_dir)
+            logger.debug(
+                f"{len(self._rebuild_set)} file(s) need to be rebuilt"
+            )
+
+    def _save_include_graph(self) -> None:
+        """ Saves the include graph of the Pre-Processor """
+        self.preprocessor_ctx.include_graph.save(self.include_graph_path)
 
     async def _run_preprocessor(
             self, enable_out: bool
@@ -278,53 +614,70 @@ class ProgramCompilationProcess(BasicProcess):
         )
         return await self.preprocessor_ctx.process_program(enable_out)
 
-    async def _gen_preprocessor_temp_files(
+    async def _pass_preprocessor_output(
             self, preprocessor_result: PreProcessorProcessResult
     ) -> None:
         """
-        Generates the temp files based on the output of the preprocessor
+        Passes the output of the preprocessor to the compiler in memory and
+        writes the temp files if keep_temp is set
         """
-        logger.debug("Generating the modified temporary files")
+        self._processed_sources = preprocessor_result.sources
+        self._c_regions = preprocessor_result.c_regions
+        logger.debug(
+            f"Passing {len(self._processed_sources)} processed files to the "
+            "compiler"
+        )
+        if not self.keep_temp:
+            return
 
-        # Generating the temp files which are then used for the further
-        # compilation
+        self._make_temp_folder()
         tmp = await self.preprocessor_ctx.make_temp_files(
             preprocessor_result
         )
         self._temp_entry_file_path, self._temp_files = tmp
         logger.debug("Wrote processed files to temp storage")
 
-    async def _compile(self, track_progress: bool) -> AsyncGenerator[
-        Tuple[
-            int,
-            Optional[str],
-            int,
-            Optional[FinishedProcess]
-        ], None, None
-    ]:
+    async def _compile(self) -> FinishedProcess:
         """
-        Actual compile that serves as c-implementation for compile() and
-        compile_with_progress_iterator()
+        Actual compile that serves as implementation for compile() and
+        compile_with_progress_events(), which reports the phases and
+        processed files to the progress tracker
         """
-        if track_progress:
-            # Currently only a replacement for testing purposes
-            yield 5, "Running Pre-Processor", logging.INFO, None
-
-        preprocessor_result = await self._run_preprocessor(True)
-
-        if track_progress:
-            # Currently only a replacement for testing purposes
-            yield 15, "Generating modified temp files", logging.INFO, None
-
-        await self._gen_preprocessor_temp_files(preprocessor_result)
+        progress = self.progress
+        progress.restart()
+        self._load_dfa_cache()
+        self._load_include_graph()
+
+        # The files of the last compilation are the best estimate, since the
+        # included files are only found while processing
+        progress.start_phase(
+            PHASE_PREPROCESSOR, "Running Pre-Processor",
+            expected_files=self._expected_file_count
+        )
+        with self._measure_phase(PHASE_PREPROCESSOR):
+            preprocessor_result = await self._run_preprocessor(True)
+        self._save_include_graph()
+        progress.finish_phase(PHASE_PREPROCESSOR)
 
-        if track_progress:
-            # Currently only a replacement for testing purposes
-            yield 20, "Parsing files and generating logic streams",\
-                  logging.INFO, None
+        progress.start_phase(
+            PHASE_TEMP_FILES, "Passing processed files to the compiler"
+        )
+        with self._measure_phase(PHASE_TEMP_FILES):
+            await self._pass_preprocessor_output(preprocessor_result)
+        progress.finish_phase(PHASE_TEMP_FILES)
 
-        await self.compilation_ctx.process_program(True)
+        progress.start_phase(
+            PHASE_COMPILER, "Parsing files and generating logic streams"
+        )
+        with self._measure_phase(PHASE_COMPILER):
+            await self.compilation_ctx.process_program(True)
+        self._save_dfa_cache()
+        if self.build_cache is not None:
+            self.build_cache.evict()
+        progress.finish_phase(PHASE_COMPILER)
 
         ...
 
-        yield 100, None, logging.INFO, FinishedProcess(self)
+        finished_process = FinishedProcess(self)
+        progress.finish(finished_process)
+        return finished_process
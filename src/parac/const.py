@@ -1,27 +1,23 @@
 # coding=utf-8
 """ Constant values used in the module """
-from typing import List
+from typing import Any, List, Tuple
 from pathlib import Path
-import click
+import functools
 import os
+import sys
 
 __all__ = [
     "BASE_DIR",
-    "C_LIB_PATH",
-    "DIST_VERSION",
-    "MODULE_VERSION",
     "C_COM_EXISTENCE_OVERWRITE",
     "DEFAULT_CONFIG",
-    "DEFAULT_BUILD_PATH",
-    "DEFAULT_DIST_PATH",
-    "DEFAULT_LOG_PATH",
+    "CACHE_FOLDER_NAME",
+    "LAZY_CONSTANTS",
     "VALID_FILE_ENDINGS",
     "CONFIG_PATH",
     "SEPARATOR",
     "INVALID_UNIX_FILE_NAME_CHARS",
     "INVALID_WIN_FILE_NAME_CHARS",
-    "WIN",
-    "WORK_DIR"
+    "WIN"
 ]
 
 # Base dir / root folder
@@ -33,37 +29,14 @@ BIN_DIR: Path = Path(
     os.path.dirname(os.path.realpath(__file__))
 ).parent.resolve()
 
-# Directory where the script was executed
-WORK_DIR: Path = Path(os.getcwd()).resolve()
-
-# If the lib folder is in the bin folder or /src/ folder then it's the module
-# runtime, else if in the source folder then it's the dist runtime aka. the
-# pyinstaller compiled runtime
-if os.path.exists(BIN_DIR / "lib"):
-    DIST_VERSION: bool = False
-    MODULE_VERSION: bool = True
-    C_LIB_PATH: Path = BIN_DIR / "lib"
-elif os.path.exists(BASE_DIR / "lib"):
-    DIST_VERSION: bool = True
-    MODULE_VERSION: bool = False
-    C_LIB_PATH: Path = BASE_DIR / "lib"
-
-    if not os.path.exists(BASE_DIR / "compiler-config.json"):
-        raise RuntimeError(
-            f"compiler-config.json not found! "
-            f"Expected {BASE_DIR / 'compiler-config.json'}"
-        )
-else:
-    raise RuntimeError("Cannot locate lib folder")
-
-
-WIN: bool = click.utils.WIN
+# Same check as click.utils.WIN, without having to import click
+WIN: bool = sys.platform.startswith("win")
 SEPARATOR: str = "\\" if WIN else "/"
 CONFIG_PATH: Path = (BASE_DIR / "compiler-config.json").resolve()
 VALID_FILE_ENDINGS: List[str] = [".para", ".parah", ".c", ".h", ".ph"]
-DEFAULT_LOG_PATH: Path = (WORK_DIR / "para.log").resolve()
-DEFAULT_BUILD_PATH: Path = (WORK_DIR / "build").resolve()
-DEFAULT_DIST_PATH: Path = (WORK_DIR / "dist").resolve()
+# Name of the folder inside the build folder, where persistent caches are
+# stored. This folder is kept when the build folder is overwritten
+CACHE_FOLDER_NAME: str = ".parac_cache"
 # If the init overwrite is true =>
 # Existence check for the c-compiler will always return True
 C_COM_EXISTENCE_OVERWRITE: bool = False
@@ -77,3 +50,62 @@ INVALID_UNIX_FILE_NAME_CHARS: List[str] = [
 INVALID_WIN_FILE_NAME_CHARS: List[str] = [
     '<', '>', ':', '"', '/', '\\', '|', '?', '*'
 ]
+
+# Constants, which depend on the file system or the current working directory
+# and are therefore only computed when they are accessed (see __getattr__).
+# They are not part of the star-import, since it would compute them
+LAZY_CONSTANTS: Tuple[str, ...] = (
+    "WORK_DIR",
+    "DEFAULT_LOG_PATH",
+    "DEFAULT_BUILD_PATH",
+    "DEFAULT_DIST_PATH",
+    "C_LIB_PATH",
+    "DIST_VERSION",
+    "MODULE_VERSION"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _locate_lib_folder() -> Tuple[Path, bool]:
+    """
+    Returns the path of the lib folder and whether it's the dist runtime
+
+    If the lib folder is in the bin folder or /src/ folder then it's the
+    module runtime, else if in the source folder then it's the dist runtime
+    aka. the pyinstaller compiled runtime
+    """
+    if os.path.exists(BIN_DIR / "lib"):
+        return BIN_DIR / "lib", False
+    elif os.path.exists(BASE_DIR / "lib"):
+        if not os.path.exists(BASE_DIR / "compiler-config.json"):
+            raise RuntimeError(
+                f"compiler-config.json not found! "
+                f"Expected {BASE_DIR / 'compiler-config.json'}"
+            )
+        return BASE_DIR / "lib", True
+    else:
+        raise RuntimeError("Cannot locate lib folder")
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Computes the LAZY_CONSTANTS on access. The paths based on the working
+    directory are resolved every time, since it might change during the
+    runtime (e.g. in the requests of the compile server)
+    """
+    if name == "WORK_DIR":
+        # Directory where the script was executed
+        return Path(os.getcwd()).resolve()
+    elif name == "DEFAULT_LOG_PATH":
+        return (Path(os.getcwd()) / "para.log").resolve()
+    elif name == "DEFAULT_BUILD_PATH":
+        return (Path(os.getcwd()) / "build").resolve()
+    elif name == "DEFAULT_DIST_PATH":
+        return (Path(os.getcwd()) / "dist").resolve()
+    elif name == "C_LIB_PATH":
+        return _locate_lib_folder()[0]
+    elif name == "DIST_VERSION":
+        return _locate_lib_folder()[1]
+    elif name == "MODULE_VERSION":
+        return not _locate_lib_folder()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -12,7 +12,8 @@ from typing import Optional, Callable, Tuple, Type, Union, Literal
 from types import FunctionType, TracebackType
 from rich.theme import Theme
 
-from .const import WIN, DEFAULT_LOG_PATH
+from . import const
+from .const import WIN
 
 __all__ = [
     'OVERWRITE_AVOID_PRINT_BANNER',
@@ -90,14 +91,26 @@ def _get_color_system() -> Union[Literal["windows", "auto"], str]:
     return "windows" if WIN else "auto"
 
 
-def init_rich_console() -> None:
-    """ Initialises the rich console used for special console formatting """
+def init_rich_console(
+        width: Optional[int] = None,
+        force_terminal: Optional[bool] = None
+) -> None:
+    """
+    Initialises the rich console used for special console formatting
+
+    :param width: The width of the console. If None the terminal size is
+    used
+    :param force_terminal: If set the console will (not) be treated as a
+    terminal, regardless of the output stream. Used if the output is
+    forwarded to another terminal
+    """
 
     global output_console
     output_console = Console(
-        width=get_terminal_size(),
+        width=width or get_terminal_size(),
         color_system=_get_color_system(),
-        theme=custom_theme
+        theme=custom_theme,
+        force_terminal=force_terminal
     )
 
 
@@ -160,12 +173,14 @@ class ParacFileHandler(logging.FileHandler):
 
     def __init__(
             self,
-            filename=DEFAULT_LOG_PATH,
+            filename=None,
             encoding='utf-8',
             mode='w',
             *args,
             **kwargs
     ):
+        if filename is None:
+            filename = const.DEFAULT_LOG_PATH
         super().__init__(
             filename=filename,
             encoding=encoding,
@@ -12,7 +12,19 @@ from . import __main__
 from . import listener
 from . import ctx
 from . import logic_tokens
+from . import include_graph
+from . import include_guards
+from . import include_resolver
+from . import line_scanner
+from . import macros
+from . import conditions
 from .logic_tokens import *
+from .include_graph import *
+from .include_guards import *
+from .include_resolver import *
+from .line_scanner import *
+from .macros import *
+from .conditions import *
 from .__main__ import *
 
 
@@ -24,6 +36,12 @@ __all__ = [
     'listener',
     'ctx',
     *logic_tokens.__all__,
+    *include_graph.__all__,
+    *include_guards.__all__,
+    *include_resolver.__all__,
+    *line_scanner.__all__,
+    *macros.__all__,
+    *conditions.__all__,
     *ctx.__all__,
     *__main__.__all__
 ]
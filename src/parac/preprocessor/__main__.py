@@ -5,15 +5,21 @@ File containing the functions and class for the Pre-Processor parsing process
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Dict
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
 import antlr4
 
 from .python.ParaCPreProcessorParser import ParaCPreProcessorParser
 from .python.ParaCPreProcessorLexer import ParaCPreProcessorLexer
 from .error_handler import PreProcessorErrorListener
+from ..exceptions import LogicalError
+from ..util import (ParseMode, ParseModeStatistics, parse_with_mode,
+                    StepTimer, STEP_LEX)
 
 if TYPE_CHECKING:
     from .ctx import ProgramPreProcessorContext, FilePreProcessorContext
+    from .logic_stream import ProcessedFileStream
+    from .logic_tokens import SelectionDirective
 
 __all__ = [
     'PreProcessor',
@@ -30,6 +36,49 @@ class PreProcessorProcessResult:
     Pre-Processor
     """
 
+    def __init__(
+            self,
+            processed_files: Optional[Dict[str, ProcessedFileStream]] = None
+    ):
+        """
+        :param processed_files: The processed files of the program. The key
+        is the path to the original file
+        """
+        self._processed_files: Dict[str, ProcessedFileStream] = \
+            processed_files or {}
+
+    @property
+    def processed_files(self) -> Dict[str, ProcessedFileStream]:
+        """
+        Returns the processed files of the program. The key is the path to the
+        original file
+        """
+        return self._processed_files
+
+    @property
+    def sources(self) -> Dict[str, str]:
+        """
+        Returns the processed code of the files, which is passed to the
+        compiler. The key is the path to the original file
+        """
+        return {
+            path: stream.file_string
+            for path, stream in self._processed_files.items()
+        }
+
+    @property
+    def c_regions(self) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Returns the C regions of the files containing any (see
+        ProcessedFileStream.c_regions), which are not parsed by the compiler.
+        The key is the path to the original file
+        """
+        return {
+            path: stream.c_regions
+            for path, stream in self._processed_files.items()
+            if stream.c_regions
+        }
+
     def generated_files(self) -> Dict[str, Dict[str, FilePreProcessorContext]]:
         """
         Returns the generated files, which are represented in a dictionary.
@@ -59,11 +108,17 @@ class PreProcessor:
     The output will be a file-stream / str, which can be used to write to a
     file or parsed to the main Para-C compiler for further processing.
     """
+    # Counters for the prediction stages used by parse()
+    parse_statistics: ParseModeStatistics = ParseModeStatistics()
 
-    @staticmethod
+    @classmethod
     async def parse(
+            cls,
             input_stream: antlr4.InputStream,
-            enable_out: bool = True
+            enable_out: bool = True,
+            parse_mode: Union[str, ParseMode, None] = None,
+            error_listener: Optional[PreProcessorErrorListener] = None,
+            step_timer: Optional[StepTimer] = None
     ) -> ParaCPreProcessorParser.CompilationUnitContext:
         """
         Parses the passed input_stream using antlr4 and returns the
@@ -75,11 +130,19 @@ class PreProcessor:
         logged onto the console using the local logger instance. If an
         exception is raised or error is encountered, it will be reraised with
         the FailedToProcessError.
+        :param parse_mode: The ParseMode, which should be used for the
+        prediction. If None the DEFAULT_PARSE_MODE (two-stage) is used
+        :param error_listener: The error listener that should be used. If None
+        a new one is created. Can be passed to read the amount of syntax
+        errors after parsing
+        :param step_timer: If passed the tokens are lexed before parsing and
+        the lexing is recorded as the step STEP_LEX
         :returns: The compilationUnit (file) context
         """
         # Error handler which uses the default error strategy to handle the
         # incoming antlr4 errors
-        error_listener = PreProcessorErrorListener(enable_out)
+        if error_listener is None:
+            error_listener = PreProcessorErrorListener(enable_out)
 
         # Initialising the lexer, which will tokenize the input_stream and
         # raise basic errors if needed
@@ -91,6 +154,11 @@ class PreProcessor:
 
         # Parsing the lexer and generating a token stream
         stream = antlr4.CommonTokenStream(lexer)
+        if step_timer is not None:
+            # Lexing all tokens upfront, so lexing and parsing can be
+            # measured separately
+            stream.fill()
+            step_timer.lap(STEP_LEX)
 
         logger.debug(
             "Parsing the tokens and generating the logic tree"
@@ -98,18 +166,222 @@ class PreProcessor:
         # Parser which generates based on the top entry rule the logic tree
         parser = ParaCPreProcessorParser(stream)
         parser.removeErrorListeners()
-        parser.addErrorListener(error_listener)
+        result = parse_with_mode(
+            parser,
+            parser.compilationUnit,
+            error_listener,
+            parse_mode,
+            cls.parse_statistics
+        )
         logger.debug(
             "Finished generation of compilationUnit for the file"
         )
-        return parser.compilationUnit()
+        return result
 
-    @staticmethod
+    @classmethod
     async def process_directives(
+            cls,
             ctx: ProgramPreProcessorContext,
             enable_out: bool = True
     ) -> PreProcessorProcessResult:
         """
-        Processing the directives in the passed ctx and
+        Processing the directives in the passed ctx and returns the processed
+        files.
+
+        The files are processed in the order they are included starting with
+        the entry file, so the macros of an included file are defined after
+        its include directive. Defines and undefs update the macro table of
+        the ctx and the macros in the code are expanded. The directives are
+        kept as they are, since the compiler skips them, so the lines of the
+        code do not change. The conditions of the selection directives are
+        evaluated using the condition_evaluator of the ctx and the skipped
+        groups are replaced with empty lines. Includes of files, which were
+        already processed and are guarded by '#pragma once' or an include
+        guard whose macro is still defined, are skipped (see
+        MultipleIncludeOptimizer). The code between '#pragma PARAC lang C' and
+        '#pragma PARAC lang PARAC' is copied verbatim and recorded as a C
+        region of the file.
+
+        :param ctx: The program context, whose files were parsed using
+        parse_program_files()
+        :param enable_out: If set to True errors, warnings and info will be
+        logged onto the console using the local logger instance. If an
+        exception is raised or error is encountered, it will be reraised with
+        the FailedToProcessError.
+        :returns: The PreProcessorProcessResult containing the processed files
         """
-        ...
+        processed_files: Dict[str, ProcessedFileStream] = {}
+        entry_path = os.path.normpath(ctx.entry_file_path)
+        if entry_path in ctx.file_contexts:
+            cls._process_file(ctx, entry_path, processed_files, set())
+
+        statistics = ctx.macro_table.statistics
+        include_statistics = ctx.include_optimizer.statistics
+        logger.debug(
+            f"Processed {len(processed_files)} files ({statistics.expansions}"
+            f" macro expansions, {statistics.cache_hits} cached, "
+            f"{include_statistics.skipped_includes} skipped includes)"
+        )
+        return PreProcessorProcessResult(processed_files)
+
+    @classmethod
+    def _process_file(
+            cls,
+            ctx: ProgramPreProcessorContext,
+            file_path: str,
+            processed_files: Dict[str, ProcessedFileStream],
+            include_stack: Set[str]
+    ) -> None:
+        """
+        Processes the logic stream of a single file and adds its processed
+        stream to processed_files. Included files are processed when their
+        include directive is reached. If a file was already processed, its
+        directives are processed again, but only the output of the first
+        time is kept. The code and directives of skipped selection groups are
+        replaced with empty lines. C regions are not processed at all, since
+        they are passed to the C compiler as they are
+
+        :param ctx: The program context
+        :param file_path: The canonical path to the file
+        :param processed_files: The already processed files
+        :param include_stack: The files, which are currently processed, so
+        recursive includes are skipped
+        """
+        from .logic_stream import ProcessedFileStream
+        from .logic_tokens import (DefineDirective, IncludeDirective,
+                                   NonPreProcessorItem, PragmaDirective,
+                                   SelectionDirective, UndefDirective,
+                                   LANG_C, LANG_PARAC)
+
+        file_ctx = ctx.file_contexts[file_path]
+        table = ctx.macro_table
+        optimizer = ctx.include_optimizer
+        processed_stream = ProcessedFileStream()
+        processed_files.setdefault(file_path, processed_stream)
+        include_stack.add(file_path)
+
+        # Open selection blocks, containing whether the enclosing group is
+        # active, whether a group was already taken and whether #else was
+        # reached
+        blocks: List[List[bool]] = []
+        active = True
+        line = 1
+        # First line of the current C region or None outside of C regions
+        c_region_start: Optional[int] = None
+        for token in file_ctx.logic_stream:
+            if c_region_start is not None:
+                if isinstance(token, PragmaDirective) and \
+                        token.language == LANG_PARAC:
+                    processed_stream.add_c_region(
+                        c_region_start, token.get_line
+                    )
+                    c_region_start = None
+                text = token.get_as_str()
+            elif isinstance(token, SelectionDirective):
+                active = cls._select_group(ctx, token, blocks, active)
+                text = token.get_as_str()
+            elif not active:
+                text = ""
+            else:
+                if isinstance(token, DefineDirective):
+                    table.define(token.macro)
+                elif isinstance(token, UndefDirective):
+                    table.undefine(token.macro_name)
+                elif isinstance(token, PragmaDirective) and \
+                        token.language == LANG_C:
+                    c_region_start = token.get_line + 1
+                elif isinstance(token, IncludeDirective):
+                    include_path = ctx.resolve_include(token, file_path)
+                    if include_path is not None:
+                        include_path = optimizer.get_canonical_path(
+                            include_path
+                        )
+                        if include_path in include_stack or \
+                                optimizer.can_skip(include_path, table):
+                            optimizer.statistics.skipped_includes += 1
+                        elif include_path in ctx.file_contexts:
+                            cls._process_file(
+                                ctx, include_path, processed_files,
+                                include_stack
+                            )
+
+                text = token.get_as_str()
+                if not token.is_directive:
+                    text = table.expand(text)
+
+            # Directives do not include their line ending, so the missing
+            # lines are added to keep every token on its original line
+            if token.get_line > line:
+                text = '\n' * (token.get_line - line) + text
+            line += text.count('\n')
+            processed_stream.append(
+                NonPreProcessorItem(
+                    text, token.get_line, 0, file_ctx.relative_file_name, None
+                )
+            )
+
+        if processed_stream and file_ctx.logic_stream[-1].is_directive:
+            # Line ending of the last directive
+            processed_stream.append(
+                NonPreProcessorItem(
+                    '\n', line, 0, file_ctx.relative_file_name, None
+                )
+            )
+            line += 1
+        if c_region_start is not None:
+            # The region ends with the file
+            processed_stream.add_c_region(c_region_start, line + 1)
+        if blocks:
+            raise LogicalError(
+                f"{file_ctx.relative_file_name}: Unterminated selection "
+                f"directive (missing #endif)"
+            )
+        include_stack.discard(file_path)
+        optimizer.mark_processed(file_path)
+
+    @staticmethod
+    def _select_group(
+            ctx: ProgramPreProcessorContext,
+            directive: SelectionDirective,
+            blocks: List[List[bool]],
+            active: bool
+    ) -> bool:
+        """
+        Updates the open selection blocks for the passed directive and returns
+        whether the following group is active. Conditions are only evaluated
+        if no previous group of the block was taken and the block is inside
+        of an active group, same as in C
+
+        :param ctx: The program context
+        :param directive: The selection directive
+        :param blocks: The open selection blocks (see _process_file())
+        :param active: Whether the current group is active
+        """
+        from .logic_tokens import (ElseSelectionDirective, EndIfDirective,
+                                   StartSelectionDirective)
+
+        evaluator = ctx.condition_evaluator
+        if isinstance(directive, StartSelectionDirective):
+            satisfied = active and evaluator.is_satisfied(directive)
+            blocks.append([active, satisfied, False])
+            return satisfied
+
+        location = f"{directive.relative_parent_file_name}:{directive.get_line}"
+        if not blocks:
+            raise LogicalError(
+                f"{location}: {directive.get_as_str().strip()} without #if"
+            )
+        parent_active, taken, has_else = blocks[-1]
+        if isinstance(directive, EndIfDirective):
+            blocks.pop()
+            return parent_active
+        elif has_else:
+            raise LogicalError(
+                f"{location}: {directive.get_as_str().strip()} after #else"
+            )
+
+        blocks[-1][2] = isinstance(directive, ElseSelectionDirective)
+        satisfied = parent_active and not taken and \
+            evaluator.is_satisfied(directive)
+        blocks[-1][1] = taken or satisfied
+        return satisfied
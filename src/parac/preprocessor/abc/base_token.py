@@ -15,6 +15,7 @@ __all__ = [
 
 class PreProcessorLogicToken(ParacLogicToken, ABC):
     """ Pre-Processor Logic-Token, which is used to represent Directives """
+    __slots__ = ()
 
     @abstractmethod
     def __init__(
@@ -35,6 +36,9 @@ class PreProcessorLogicToken(ParacLogicToken, ABC):
 
     def get_as_str(self) -> str:
         """ Gets the value of the Pre-Processor token as a string """
+        if not self.has_source_text:
+            # Token was restored from the build cache without its source
+            return self._as_str
         return self.extract_original_text()
 
     @abstractmethod
@@ -0,0 +1,414 @@
+# coding=utf-8
+"""
+Evaluator for the constant expressions of the #if and #elif directives, which
+compiles every condition once into a Python code object
+"""
+from __future__ import annotations
+
+import re
+from typing import (TYPE_CHECKING, Any, Dict, List, Optional, Pattern, Set,
+                    Tuple)
+from types import CodeType
+
+from ..exceptions import LogicalError
+from .macros import Macro, MacroTable, tokenize
+
+if TYPE_CHECKING:
+    from .logic_tokens import SelectionDirective
+
+__all__ = [
+    'CONDITION_IF',
+    'CONDITION_IFDEF',
+    'CONDITION_IFNDEF',
+    'ConditionStatistics',
+    'ConditionEvaluator'
+]
+
+CONDITION_IF: str = "if"
+CONDITION_IFDEF: str = "ifdef"
+CONDITION_IFNDEF: str = "ifndef"
+
+_EXPRESSION_TOKEN_PATTERN: Pattern = re.compile(
+    r'\.?\d(?:[eEpP][+-]|[\w.])*'     # number
+    r'|[A-Za-z_]\w*'                  # identifier
+    r"|'(?:\\.|[^'\\\n])*'"           # char literal
+    r'|"(?:\\.|[^"\\\n])*"'           # string literal (invalid)
+    r'|&&|\|\||<<|>>|<=|>=|==|!='
+    r'|[-+*/%<>&|^!~?:()]'
+    r'|\S'
+)
+_INTEGER_PATTERN: Pattern = re.compile(
+    r'(0[xX][0-9a-fA-F]+|0[bB][01]+|\d+)[uUlL]*'
+)
+_IDENTIFIER_PATTERN: Pattern = re.compile(r'[A-Za-z_]\w*')
+
+# Precedence of the binary operators, same as in C
+_BINARY_PRECEDENCE: Dict[str, int] = {
+    '||': 1,
+    '&&': 2,
+    '|': 3,
+    '^': 4,
+    '&': 5,
+    '==': 6, '!=': 6,
+    '<': 7, '>': 7, '<=': 7, '>=': 7,
+    '<<': 8, '>>': 8,
+    '+': 9, '-': 9,
+    '*': 10, '/': 10, '%': 10
+}
+_CHAR_ESCAPES: Dict[str, int] = {
+    'n': 10, 't': 9, 'r': 13, 'a': 7, 'b': 8, 'f': 12, 'v': 11,
+    '\\': 92, "'": 39, '"': 34, '?': 63
+}
+
+
+def _div(a: int, b: int) -> int:
+    """ Integer division, which truncates towards zero like C """
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+def _mod(a: int, b: int) -> int:
+    """ Remainder, which has the sign of the dividend like C """
+    return a - b * _div(a, b)
+
+
+_EVAL_GLOBALS: Dict[str, Any] = {
+    '__builtins__': {}, '_div': _div, '_mod': _mod
+}
+
+
+def _char_value(literal: str) -> int:
+    """ Returns the value of a char literal """
+    text = literal[1:-1]
+    if not text:
+        raise LogicalError(f"Empty character constant {literal}")
+    elif text[0] != '\\':
+        return ord(text[0])
+    elif text[1] in _CHAR_ESCAPES:
+        return _CHAR_ESCAPES[text[1]]
+    elif text[1] in 'xX':
+        return int(text[2:], 16)
+    return int(text[1:], 8)
+
+
+def _integer_value(literal: str) -> int:
+    """ Returns the value of an integer literal """
+    match = _INTEGER_PATTERN.fullmatch(literal)
+    if match is None:
+        raise LogicalError(
+            f"Invalid integer constant '{literal}' in preprocessor expression"
+        )
+    digits = match.group(1)
+    if digits[:2] in ('0x', '0X'):
+        return int(digits[2:], 16)
+    elif digits[:2] in ('0b', '0B'):
+        return int(digits[2:], 2)
+    elif len(digits) > 1 and digits[0] == '0':
+        try:
+            return int(digits[1:], 8)
+        except ValueError:
+            raise LogicalError(f"Invalid octal constant '{literal}'")
+    return int(digits)
+
+
+class _ExpressionCompiler:
+    """
+    Parser for a macro-expanded constant expression, which generates the
+    Python source of the expression. Every sub-expression is put into
+    parentheses, so the precedence and the comparisons are the ones of C
+    """
+
+    def __init__(self, tokens: List[str], expression: str):
+        self._tokens = tokens
+        self._expression = expression
+        self._pos = 0
+
+    def _error(self, message: str) -> LogicalError:
+        """ Returns the error for an invalid expression """
+        return LogicalError(
+            f"{message} in #if expression '{self._expression}'"
+        )
+
+    def _peek(self) -> Optional[str]:
+        """ Returns the next token without consuming it """
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos]
+        return None
+
+    def _next(self) -> str:
+        """ Consumes and returns the next token """
+        token = self._peek()
+        if token is None:
+            raise self._error("Unexpected end")
+        self._pos += 1
+        return token
+
+    def _expect(self, expected: str) -> None:
+        """ Consumes the next token, which must be the expected one """
+        token = self._next()
+        if token != expected:
+            raise self._error(f"Expected '{expected}' instead of '{token}'")
+
+    def compile(self) -> str:
+        """ Parses the tokens and returns the Python source """
+        if not self._tokens:
+            raise self._error("Missing expression")
+        source = self._parse_conditional()
+        if self._pos < len(self._tokens):
+            raise self._error(f"Unexpected token '{self._peek()}'")
+        return source
+
+    def _parse_conditional(self) -> str:
+        """ Parses a conditional expression (a ? b : c) """
+        condition = self._parse_binary(1)
+        if self._peek() != '?':
+            return condition
+        self._next()
+        if_true = self._parse_conditional()
+        self._expect(':')
+        if_false = self._parse_conditional()
+        return f"({if_true} if {condition} else {if_false})"
+
+    def _parse_binary(self, min_precedence: int) -> str:
+        """ Parses binary operations using precedence climbing """
+        left = self._parse_unary()
+        while True:
+            operator = self._peek()
+            precedence = _BINARY_PRECEDENCE.get(operator)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self._next()
+            right = self._parse_binary(precedence + 1)
+            if operator == '&&':
+                left = f"(1 if {left} and {right} else 0)"
+            elif operator == '||':
+                left = f"(1 if {left} or {right} else 0)"
+            elif precedence in (6, 7):
+                left = f"(1 if {left} {operator} {right} else 0)"
+            elif operator == '/':
+                left = f"_div({left}, {right})"
+            elif operator == '%':
+                left = f"_mod({left}, {right})"
+            else:
+                left = f"({left} {operator} {right})"
+
+    def _parse_unary(self) -> str:
+        """ Parses unary operations, parentheses and constants """
+        token = self._next()
+        if token in ('+', '-', '~'):
+            return f"({token}{self._parse_unary()})"
+        elif token == '!':
+            return f"(0 if {self._parse_unary()} else 1)"
+        elif token == '(':
+            inner = self._parse_conditional()
+            self._expect(')')
+            return inner
+        elif token[0] == "'":
+            return str(_char_value(token))
+        elif token[0].isdigit() or token[0] == '.':
+            return str(_integer_value(token))
+        elif _IDENTIFIER_PATTERN.fullmatch(token):
+            # Identifiers that are not macros are replaced with 0
+            return "0"
+        raise self._error(f"Unexpected token '{token}'")
+
+
+class _CompiledCondition:
+    """
+    Compiled condition, which is valid as long as the macros it depends on
+    did not change
+    """
+    __slots__ = ('code', 'macros', 'generation')
+
+    def __init__(
+            self,
+            code: CodeType,
+            macros: Tuple[Tuple[str, Optional[Macro]], ...],
+            generation: int
+    ):
+        self.code = code
+        self.macros = macros
+        self.generation = generation
+
+    def is_valid(self, table: MacroTable) -> bool:
+        """
+        Returns whether the macros the condition depends on are still defined
+        the same way as when it was compiled
+        """
+        return all(table.get(name) is macro for name, macro in self.macros)
+
+
+class ConditionStatistics:
+    """ Counters for the conditions evaluated by a ConditionEvaluator """
+
+    def __init__(self):
+        self.evaluations: int = 0
+        self.cache_hits: int = 0
+        self.compilations: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: " \
+               f"evaluations={self.evaluations}, " \
+               f"cache_hits={self.cache_hits}, " \
+               f"compilations={self.compilations}>"
+
+    def reset(self) -> None:
+        """ Resets all counters to 0 """
+        self.evaluations = 0
+        self.cache_hits = 0
+        self.compilations = 0
+
+
+class ConditionEvaluator:
+    """
+    Evaluator for the conditions of the selection directives, which uses the
+    macros of a MacroTable.
+
+    The constant expressions are evaluated with the semantics of C, but with
+    integers of arbitrary size. A condition is macro-expanded and compiled
+    once into a Python code object, which is cached by the expression text
+    together with the generation of the macro table. If the generation
+    changed, the entry is still used if none of the macros the condition
+    depends on changed, so conditions like '__cplusplus', which are repeated
+    in every header, are only compiled once.
+    """
+
+    def __init__(self, macro_table: MacroTable, cache_conditions: bool = True):
+        """
+        :param macro_table: The macros used for the conditions
+        :param cache_conditions: If set to True the compiled conditions are
+        cached
+        """
+        self._macro_table = macro_table
+        self._cache_conditions = cache_conditions
+        self._cache: Dict[str, _CompiledCondition] = {}
+        self._statistics = ConditionStatistics()
+
+    @property
+    def macro_table(self) -> MacroTable:
+        """ Returns the macro table used for the conditions """
+        return self._macro_table
+
+    @property
+    def statistics(self) -> ConditionStatistics:
+        """ Returns the evaluation and cache statistics """
+        return self._statistics
+
+    def is_satisfied(self, directive: SelectionDirective) -> bool:
+        """
+        Returns whether the condition of the passed selection directive is
+        satisfied. Directives without a condition (#else) are always satisfied
+
+        :raises LogicalError: If the condition is invalid
+        """
+        condition_type = directive.condition_type
+        if condition_type is None:
+            return True
+        elif condition_type == CONDITION_IF:
+            return self.evaluate(directive.condition) != 0
+
+        name = directive.condition
+        if not name or _IDENTIFIER_PATTERN.fullmatch(name) is None:
+            raise LogicalError(
+                f"Expected a macro name in #{condition_type} instead of "
+                f"'{name}'"
+            )
+        return (name in self._macro_table) == (
+            condition_type == CONDITION_IFDEF
+        )
+
+    def evaluate(self, expression: str) -> int:
+        """
+        Evaluates the passed constant expression and returns its value
+
+        :raises LogicalError: If the expression is invalid
+        """
+        self._statistics.evaluations += 1
+        table = self._macro_table
+        compiled = self._cache.get(expression)
+        if compiled is not None and (
+                compiled.generation == table.generation or
+                compiled.is_valid(table)
+        ):
+            self._statistics.cache_hits += 1
+            compiled.generation = table.generation
+        else:
+            compiled = self.compile(expression)
+            if self._cache_conditions:
+                self._cache[expression] = compiled
+
+        try:
+            return eval(compiled.code, _EVAL_GLOBALS)
+        except ZeroDivisionError:
+            raise LogicalError(f"Division by zero in #if '{expression}'")
+        except ValueError:
+            raise LogicalError(f"Negative shift count in #if '{expression}'")
+
+    def compile(self, expression: str) -> _CompiledCondition:
+        """
+        Expands the macros of the passed expression and compiles it using the
+        current macros of the table
+
+        :raises LogicalError: If the expression is invalid
+        """
+        self._statistics.compilations += 1
+        table = self._macro_table
+        deps: Set[str] = set()
+        tokens = self._replace_defined(tokenize(expression), deps)
+        expanded = "".join(table.expand_tokens(tokens, deps))
+
+        source = _ExpressionCompiler(
+            _EXPRESSION_TOKEN_PATTERN.findall(expanded), expression
+        ).compile()
+        code = compile(source, "<#if>", 'eval')
+        return _CompiledCondition(
+            code,
+            tuple((name, table.get(name)) for name in deps),
+            table.generation
+        )
+
+    def _replace_defined(self, tokens: List[str], deps: Set[str]) \
+            -> List[str]:
+        """
+        Replaces the 'defined X' and 'defined(X)' operators with 1 or 0 before
+        the expression is expanded
+
+        :param tokens: The tokens of the expression
+        :param deps: The set the checked macro names are added to
+        """
+        result: List[str] = []
+        i, count = 0, len(tokens)
+        while i < count:
+            token = tokens[i]
+            i += 1
+            if token != 'defined':
+                result.append(token)
+                continue
+
+            names: List[str] = []
+            parenthesised = False
+            while i < count:
+                token = tokens[i]
+                i += 1
+                if token.isspace():
+                    continue
+                elif token == '(' and not parenthesised and not names:
+                    parenthesised = True
+                elif token == ')' and parenthesised and names:
+                    break
+                elif not names and _IDENTIFIER_PATTERN.fullmatch(token):
+                    names.append(token)
+                    if not parenthesised:
+                        break
+                else:
+                    names = []
+                    break
+            else:
+                if parenthesised:
+                    names = []
+
+            if not names:
+                raise LogicalError("Expected a macro name after 'defined'")
+            deps.add(names[0])
+            result.append('1' if names[0] in self._macro_table else '0')
+        return result
@@ -6,12 +6,24 @@ commands as given in the file.
 """
 from __future__ import annotations
 
+import heapq
+import logging
+import os
+import time
 from os import PathLike
-from typing import Dict, Union, List, TYPE_CHECKING, Tuple
+from typing import Dict, Union, List, Optional, TYPE_CHECKING, Tuple
 import antlr4
 
 from ..abc import ProgramRunContext, FileRunContext
+from ..util import (ParseMode, PHASE_PREPROCESSOR, StepTimer, STEP_LEX,
+                    STEP_PARSE, STEP_WALK, free_parse_tree)
+from .include_graph import IncludeGraph
+from .include_guards import MultipleIncludeOptimizer
+from .include_resolver import IncludeResolver
 from .logic_stream import PreProcessorStream
+from .logic_tokens import IncludeDirective, FileIncludeDirective
+from .conditions import ConditionEvaluator
+from .macros import MacroTable
 from .__main__ import PreProcessor, PreProcessorProcessResult
 
 if TYPE_CHECKING:
@@ -22,6 +34,8 @@ __all__ = [
     'ProgramPreProcessorContext'
 ]
 
+logger = logging.getLogger(__name__)
+
 
 class FilePreProcessorContext(FileRunContext):
     """
@@ -68,13 +82,23 @@ class ProgramPreProcessorContext(ProgramRunContext):
     Program Compilation Context, which serves as the base for an entire
     pre-processor compilation
     """
+    build_cache_namespace: str = "preprocessor"
+    progress_phase: str = PHASE_PREPROCESSOR
 
     def __init__(self, process: ProgramCompilationProcess):
         self._entry_ctx: Union[FilePreProcessorContext, None] = None
         self._context_dict: Dict[
             Union[str, PathLike], FilePreProcessorContext
         ] = {}
+        self._include_graph: IncludeGraph = IncludeGraph()
+        self._file_contexts: Dict[str, FilePreProcessorContext] = {}
+        self._macro_table: MacroTable = MacroTable()
+        self._condition_evaluator = ConditionEvaluator(self._macro_table)
+        self._include_optimizer = MultipleIncludeOptimizer()
         super().__init__(process=process)
+        self._include_resolver = IncludeResolver(
+            process.include_paths, self.work_dir, self._get_lib_path()
+        )
 
     @property
     def process(self) -> ProgramCompilationProcess:
@@ -105,6 +129,64 @@ class ProgramPreProcessorContext(ProgramRunContext):
         """ Returns the entry context """
         return self._entry_ctx
 
+    @property
+    def include_graph(self) -> IncludeGraph:
+        """
+        Returns the include graph of the program, which is populated by
+        parse_program_files()
+        """
+        return self._include_graph
+
+    @property
+    def file_contexts(self) -> Dict[str, FilePreProcessorContext]:
+        """
+        Returns the contexts of the files, which were parsed by
+        parse_program_files(). The key is the normalised path to the file
+        """
+        return self._file_contexts
+
+    @property
+    def macro_table(self) -> MacroTable:
+        """
+        Returns the table of the macros, which are defined while processing
+        the directives of the program
+        """
+        return self._macro_table
+
+    @property
+    def condition_evaluator(self) -> ConditionEvaluator:
+        """
+        Returns the evaluator for the conditions of the selection directives,
+        which uses the macro_table
+        """
+        return self._condition_evaluator
+
+    @property
+    def include_optimizer(self) -> MultipleIncludeOptimizer:
+        """
+        Returns the multiple-include optimisation of the program, which maps
+        every path to the canonical path of its file and skips includes of
+        already processed guarded files
+        """
+        return self._include_optimizer
+
+    @property
+    def include_resolver(self) -> IncludeResolver:
+        """
+        Returns the resolver for the included files, which searches the
+        include paths of the process, the working directory and the lib path
+        """
+        return self._include_resolver
+
+    @staticmethod
+    def _get_lib_path() -> Optional[str]:
+        """ Returns the C_LIB_PATH or None if the lib folder is missing """
+        from .. import const
+        try:
+            return str(const.C_LIB_PATH)
+        except RuntimeError:
+            return None
+
     @property
     def context_dict(self) -> Dict[
         Union[str, PathLike], FilePreProcessorContext
@@ -138,15 +220,36 @@ class ProgramPreProcessorContext(ProgramRunContext):
 
     async def make_temp_files(
             self, process: PreProcessorProcessResult
-    ) -> Tuple[str, List[str]]:
+    ) -> Tuple[Optional[str], List[str]]:
         """
-        Creates the temporary files based on the passed output of
-        process_program()
+        Writes the processed files of the passed output of process_program()
+        into the temp build folder of the process, where they keep their path
+        relative to the working directory.
+
+        The compiler gets the processed files in memory, so this is only
+        needed if the temp files should be kept for inspection.
 
-        :returns: A tuple containing at 0 the path to the entry-file and at 1
-        a list of all paths of all other files.
+        :returns: A tuple containing at 0 the path to the entry-file (None if
+        the entry-file was not processed) and at 1 a list of all paths of all
+        other files.
         """
-        ...
+        entry_path = os.path.normpath(self.entry_file_path)
+        temp_entry_file_path: Optional[str] = None
+        temp_files: List[str] = []
+        for file_path, stream in process.processed_files.items():
+            temp_path = os.path.join(
+                self.process.temp_build_folder,
+                self.include_graph.get_file_name(file_path, self.work_dir)
+            )
+            os.makedirs(os.path.dirname(temp_path), exist_ok=True)
+            with open(temp_path, 'w', encoding=self.encoding) as file:
+                file.write(stream.file_string)
+
+            if os.path.normpath(file_path) == entry_path:
+                temp_entry_file_path = temp_path
+            else:
+                temp_files.append(temp_path)
+        return temp_entry_file_path, temp_files
 
     async def process_program(
             self, enable_out: bool
@@ -161,20 +264,107 @@ class ProgramPreProcessorContext(ProgramRunContext):
         the FailedToProcessError.
         :returns: A PreProcessorProcessResult instance
         """
-        await self.parse_entry_file(enable_out)
-
-        ...  # TODO! Run listener for every file
+        await self.parse_program_files(enable_out)
 
         # Processing the directives
         return await PreProcessor.process_directives(self)
 
+    def resolve_include(
+            self,
+            directive: IncludeDirective,
+            file_path: Union[str, PathLike]
+    ) -> Optional[str]:
+        """
+        Resolves the path of the file included by the passed directive using
+        the include_resolver
+
+        String includes (#include "file") are searched relative to the
+        including file first and library includes (#include <file>) only in
+        the include paths and the lib path. Computed includes return None.
+
+        :param directive: The include directive
+        :param file_path: The path to the file containing the directive
+        :returns: The path to the included file or None if it could not be
+        resolved
+        """
+        if not isinstance(directive, FileIncludeDirective):
+            return None
+        return self._include_resolver.resolve(
+            directive.include_name,
+            os.path.dirname(file_path),
+            directive.is_lib_include
+        )
+
+    async def parse_program_files(self, enable_out: bool) -> None:
+        """
+        Parses the entry file and all files it includes directly or
+        indirectly, adds their contexts to this instance and records the
+        includes in the include_graph
+
+        :param enable_out: If set to True errors, warnings and info will be
+        logged onto the console using the local logger instance. If an
+        exception is raised or error is encountered, it will be reraised with
+        the FailedToProcessError.
+        """
+        self.report_files_queued(1)
+        await self.parse_entry_file(enable_out)
+
+        entry_path = os.path.normpath(self.entry_file_path)
+        self._file_contexts[entry_path] = self.entry_ctx
+        queue = [(entry_path, self.entry_ctx)]
+        while queue:
+            file_path, ctx = queue.pop(0)
+            includes: List[str] = []
+            for token in ctx.logic_stream:
+                if not isinstance(token, IncludeDirective):
+                    continue
+
+                include_path = self.resolve_include(token, file_path)
+                if include_path is None:
+                    logger.debug(
+                        f"Skipping unresolved include '{token.include_name}'"
+                        f" ({ctx.relative_file_name}:{token.get_line})"
+                    )
+                    continue
+
+                # Other paths to an already parsed file are not read again
+                include_path = self._include_optimizer.get_canonical_path(
+                    include_path
+                )
+                if include_path not in self._file_contexts:
+                    self.report_files_queued(1)
+                    include_ctx = await self.get_stream_and_parse(
+                        include_path, enable_out
+                    )
+                    canonical_path = self._include_optimizer \
+                        .get_canonical_path(include_path)
+                    if canonical_path == include_path:
+                        self.add_file_ctx(
+                            include_ctx, include_ctx.relative_file_name
+                        )
+                        self._file_contexts[include_path] = include_ctx
+                        queue.append((include_path, include_ctx))
+                    include_path = canonical_path
+
+                includes.append(
+                    self.include_graph.get_file_name(
+                        include_path, self.work_dir
+                    )
+                )
+
+            self.include_graph.add_file(
+                self.include_graph.get_file_name(file_path, self.work_dir),
+                file_path,
+                includes
+            )
+
     async def get_stream_and_parse(
             self,
             file_path: Union[str, PathLike],
             enable_out: bool
     ) -> FilePreProcessorContext:
         """
-        Gets a FileStream, converts it to a string stream and parses it
+        Reads the file into a stream without comments and parses it
         returning the resulting FilePreProcessorContext
 
         :param file_path: Path to the file
@@ -185,32 +375,63 @@ class ProgramPreProcessorContext(ProgramRunContext):
         :returns: The FilePreProcessorContext instance for the file
         """
         from ..compiler import ParacCompiler
-        from ..util import (get_file_stream, get_relative_file_name,
-                            get_input_stream)
+        from ..util import get_file_stream, get_relative_file_name
+
+        normalised_path = os.path.normpath(file_path)
+        cached_ctx = self.get_cached_file_ctx(file_path)
+        if cached_ctx is not None:
+            self._include_optimizer.add_file(
+                normalised_path, cached_ctx.logic_stream
+            )
+            await self.report_file_progress(file_path, cached_ctx, True)
+            return cached_ctx
+
+        stream = get_file_stream(
+            file_path, self.encoding,
+            transform=ParacCompiler.remove_comments_from_str  # rm comments
+        )
+        # Copies of guarded files are not parsed again, since their
+        # directives are only processed once
+        duplicate = self._include_optimizer.find_duplicate(
+            normalised_path, stream.strdata
+        )
+        if duplicate is not None:
+            duplicate_ctx = self._file_contexts[duplicate]
+            await self.report_file_progress(file_path, duplicate_ctx, True)
+            return duplicate_ctx
 
-        file_stream = get_file_stream(file_path, self.encoding)
         relative_file_name = get_relative_file_name(
-            file_name=file_stream.name,
-            file_path=file_stream.fileName,
+            file_name=stream.name,
+            file_path=stream.fileName,
             base_path=self.work_dir
         )
-        stream = get_input_stream(
-            # rm comments
-            ParacCompiler.remove_comments_from_str(file_stream.strdata),
-            name=file_stream.name
+        ctx = await self.parse_single_file(
+            stream, relative_file_name, enable_out, self.process.parse_mode,
+            self.process.release_parse_trees
         )
-        return await self.parse_single_file(
-            stream, relative_file_name, enable_out
+        self._include_optimizer.add_file(
+            normalised_path, ctx.logic_stream, stream.strdata
         )
+        self.cache_file_ctx(file_path, ctx)
+        await self.report_file_progress(file_path, ctx, False)
+        return ctx
 
     @staticmethod
     async def parse_single_file(
             stream: antlr4.InputStream,
             relative_file_name: str,
             enable_out: bool,
+            parse_mode: Union[str, ParseMode, None] = None,
+            release_parse_tree: bool = False
     ) -> FilePreProcessorContext:
         """
-        Parses a single file and generates the FilePreProcessorContext
+        Parses a single file and generates the FilePreProcessorContext.
+
+        Only the directive lines are parsed by the Pre-Processor parser (see
+        scan_directive_lines()). The code in between is added to the logic
+        stream as NonPreProcessorItem tokens, which reference their range of
+        the source instead of an antlr4 context. Defines, undefs, pragmas and
+        selection directives are directly created by the scanner.
 
         :param stream: The Antlr4 InputStream which represents a string stream
         :param relative_file_name: Relative name of the file (fetch-able
@@ -219,12 +440,70 @@ class ProgramPreProcessorContext(ProgramRunContext):
         logged onto the console using the local logger instance. If an
         exception is raised or error is encountered, it will be reraised with
         the FailedToProcessError.
+        :param parse_mode: The ParseMode, which should be used for the
+        prediction. If None the DEFAULT_PARSE_MODE (two-stage) is used
+        :param release_parse_tree: If set to True the tokens of the logic
+        stream only keep the offsets of their text and the parse tree is
+        released after walking it (see free_parse_tree())
         :returns: The generated FilePreProcessorContext instance
         """
+        from .error_handler import PreProcessorErrorListener
+        from .line_scanner import scan_directive_lines
         from .listener import Listener
-
-        antlr4_file_ctx = await PreProcessor.parse(stream, enable_out)
-        listener = Listener(antlr4_file_ctx, stream, relative_file_name)
+        from ..util import SourceStream
+
+        start = time.perf_counter()
+        step_timer = StepTimer()
+
+        # Only the directive lines are parsed. The code in between is kept as
+        # tokens referencing the source
+        scanned = scan_directive_lines(stream.strdata, relative_file_name)
+        if not scanned.has_directives:
+            step_timer.lap(STEP_LEX)
+            file_ctx = FilePreProcessorContext(relative_file_name)
+            file_ctx.logic_stream.extend(heapq.merge(
+                scanned.code_items,
+                scanned.directive_items,
+                key=lambda token: token.get_line
+            ))
+            file_ctx.set_step_times(step_timer.steps)
+            file_ctx.set_parse_time(time.perf_counter() - start)
+            return file_ctx
+
+        directive_stream = SourceStream(
+            scanned.directive_text,
+            name=stream.name,
+            file_name=getattr(stream, 'fileName', None)
+        )
+        error_listener = PreProcessorErrorListener(enable_out)
+        antlr4_file_ctx = await PreProcessor.parse(
+            directive_stream, enable_out, parse_mode, error_listener,
+            step_timer
+        )
+        step_timer.lap(STEP_PARSE)
+        listener = Listener(
+            antlr4_file_ctx, directive_stream, relative_file_name, scanned
+        )
         await listener.walk_and_process_directives(enable_out)
-
-        return listener.file_ctx
+        step_timer.lap(STEP_WALK)
+
+        file_ctx = listener.file_ctx
+        file_ctx.logic_stream[:] = heapq.merge(
+            scanned.code_items,
+            scanned.directive_items,
+            list(file_ctx.logic_stream),
+            key=lambda token: token.get_line
+        )
+        file_ctx.set_step_times(step_timer.steps)
+        file_ctx.set_syntax_errors(error_listener.syntax_errors)
+        file_ctx.set_token_count(
+            len(antlr4_file_ctx.parser.getTokenStream().tokens)
+        )
+        if release_parse_tree:
+            # The file context now only references the text of the file, so
+            # the memory of the tree is not kept until the compilation ends
+            file_ctx.release_antlr4_contexts(directive_stream.strdata)
+            free_parse_tree(antlr4_file_ctx)
+        file_ctx.set_parse_time(time.perf_counter() - start)
+
+        return file_ctx
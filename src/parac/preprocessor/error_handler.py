@@ -94,5 +94,7 @@ class PreProcessorErrorListener(BaseErrorListener):
         Method which will be called if the ANTLR4 Lexer or Parser detect
         an error inside the program
         """
+        self.syntax_errors += 1
+
         # TODO! Add proper error handling
         logger.error(f"At line: {line}, column: {column} - {msg}")
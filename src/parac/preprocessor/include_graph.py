@@ -0,0 +1,188 @@
+# coding=utf-8
+"""
+Include graph of a program, which records which files include which and is
+used to find the files that need to be rebuilt after a file changed
+"""
+import hashlib
+import json
+import logging
+import os
+from os import PathLike
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+__all__ = [
+    'INCLUDE_GRAPH_FILE_NAME',
+    'IncludeGraph'
+]
+
+logger = logging.getLogger(__name__)
+
+INCLUDE_GRAPH_FILE_NAME: str = "include_graph.json"
+# Version of the file format. Needs to be increased if the format changes
+_FORMAT_VERSION: int = 1
+
+
+class IncludeGraph:
+    """
+    Directed graph of the file includes of a program. Every file is
+    identified by its path relative to the working directory of the program
+    and stores the hash of its content at the time it was added, so changed
+    files and their transitive dependents can be found in a later compilation
+    """
+
+    def __init__(self):
+        self._includes: Dict[str, List[str]] = {}
+        self._hashes: Dict[str, str] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {len(self._includes)} files>"
+
+    @property
+    def includes(self) -> Dict[str, List[str]]:
+        """ Returns the files directly included by each file """
+        return self._includes
+
+    @property
+    def files(self) -> List[str]:
+        """ Returns the names of all files in the graph """
+        return list(self._includes)
+
+    @staticmethod
+    def get_file_name(
+            file_path: Union[str, PathLike],
+            base_path: Union[str, PathLike]
+    ) -> str:
+        """
+        Returns the name of the file inside the graph, which is the path
+        relative to the base path using '/' as separator
+        """
+        return os.path.relpath(file_path, base_path).replace(os.sep, '/')
+
+    @staticmethod
+    def _hash_file(file_path: Union[str, PathLike]) -> Optional[str]:
+        """ Returns the hash of the content or None if it can't be read """
+        try:
+            with open(file_path, 'rb') as file:
+                return hashlib.sha256(file.read()).hexdigest()
+        except OSError:
+            return None
+
+    def add_file(
+            self,
+            name: str,
+            file_path: Union[str, PathLike],
+            includes: List[str]
+    ) -> None:
+        """
+        Adds a file to the graph
+
+        :param name: The name of the file (see get_file_name())
+        :param file_path: The path to the file, which is used to hash the
+        current content
+        :param includes: The names of the files directly included by the file
+        """
+        self._includes[name] = list(includes)
+        self._hashes[name] = self._hash_file(file_path)
+
+    def get_includes(self, name: str) -> List[str]:
+        """ Returns the files directly included by the passed file """
+        return self._includes.get(name, [])
+
+    def get_dependents(self, name: str) -> Set[str]:
+        """ Returns the files which directly include the passed file """
+        return {
+            file for file, includes in self._includes.items()
+            if name in includes
+        }
+
+    def get_transitive_dependents(self, names: Iterable[str]) -> Set[str]:
+        """
+        Returns all files which directly or indirectly include one of the
+        passed files. The passed files are only part of the result if they
+        are included by another passed file
+        """
+        dependents: Dict[str, Set[str]] = {}
+        for file, includes in self._includes.items():
+            for include in includes:
+                dependents.setdefault(include, set()).add(file)
+
+        result: Set[str] = set()
+        stack = list(names)
+        while stack:
+            for dependent in dependents.get(stack.pop(), ()):
+                if dependent not in result:
+                    result.add(dependent)
+                    stack.append(dependent)
+        return result
+
+    def get_changed_files(self, base_path: Union[str, PathLike]) -> Set[str]:
+        """
+        Returns the files whose content differs from the time they were added
+        or which do not exist anymore
+
+        :param base_path: The base path the file names are relative to
+        """
+        return {
+            name for name, _hash in self._hashes.items()
+            if _hash is None or
+            self._hash_file(os.path.join(base_path, name)) != _hash
+        }
+
+    def get_rebuild_set(self, base_path: Union[str, PathLike]) -> Set[str]:
+        """
+        Returns the files that need to be rebuilt, which are the changed files
+        and all their transitive dependents
+
+        :param base_path: The base path the file names are relative to
+        """
+        changed = self.get_changed_files(base_path)
+        return changed | self.get_transitive_dependents(changed)
+
+    def to_dict(self) -> dict:
+        """ Returns the graph as a JSON serializable dict """
+        return {
+            'version': _FORMAT_VERSION,
+            'files': {
+                name: {
+                    'hash': self._hashes.get(name),
+                    'includes': includes
+                }
+                for name, includes in self._includes.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'IncludeGraph':
+        """ Creates a graph from a dict created with to_dict() """
+        graph = cls()
+        for name, file in data['files'].items():
+            graph._includes[name] = list(file['includes'])
+            graph._hashes[name] = file['hash']
+        return graph
+
+    def save(self, path: Union[str, PathLike]) -> None:
+        """ Saves the graph as JSON to the passed path """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=2)
+        logger.debug(f"Saved the include graph ({path})")
+
+    @classmethod
+    def load(cls, path: Union[str, PathLike]) -> Optional['IncludeGraph']:
+        """
+        Loads the graph from the passed path
+
+        :returns: The loaded graph or None if the file does not exist or is
+        invalid
+        """
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('version') != _FORMAT_VERSION:
+                return None
+            return cls.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Failed to load the include graph ({path}): {e}")
+            return None
@@ -0,0 +1,293 @@
+# coding=utf-8
+"""
+Multiple-include optimisation, which detects include guards and
+'#pragma once', so files that were already processed are not processed again
+when they are included a second time
+"""
+import hashlib
+import logging
+import os
+import re
+from os import PathLike
+from typing import (Dict, Iterable, List, Optional, Pattern, Set, Tuple,
+                    TYPE_CHECKING, Union)
+
+from .abc import PreProcessorLogicToken
+from .logic_tokens import (NonPreProcessorItem, PragmaDirective,
+                           SelectionDirective, StartSelectionDirective,
+                           IfDirective, IfNotDefinedDirective, EndIfDirective)
+
+if TYPE_CHECKING:
+    from .macros import MacroTable
+
+__all__ = [
+    'IncludeStatistics',
+    'MultipleIncludeOptimizer',
+    'detect_include_guard',
+    'has_pragma_once',
+    'get_file_identity'
+]
+
+logger = logging.getLogger(__name__)
+
+# '#if !defined(X)' and '#if !defined X' are guards as well, same as in GCC
+_NOT_DEFINED_PATTERN: Pattern = re.compile(
+    r'!\s*defined\s*(?:\(\s*([A-Za-z_]\w*)\s*\)|([A-Za-z_]\w*))'
+)
+
+
+def _is_blank(token: PreProcessorLogicToken) -> bool:
+    """ Returns whether the token is code that only contains whitespace """
+    return isinstance(token, NonPreProcessorItem) and \
+        not token.get_as_str().strip()
+
+
+def _get_guard_macro(directive: SelectionDirective) -> Optional[str]:
+    """
+    Returns the macro checked by #ifndef X or #if !defined(X) or None if the
+    directive is not of this form
+    """
+    if isinstance(directive, IfNotDefinedDirective):
+        return directive.condition or None
+    elif isinstance(directive, IfDirective):
+        match = _NOT_DEFINED_PATTERN.fullmatch(directive.condition.strip())
+        if match is not None:
+            return match.group(1) or match.group(2)
+    return None
+
+
+def detect_include_guard(
+        tokens: Iterable[PreProcessorLogicToken]
+) -> Optional[str]:
+    """
+    Detects an include guard in the logic stream of a file. The file is
+    guarded if everything except whitespace is inside one '#ifndef X' or
+    '#if !defined(X)' block without #elif or #else. The macro does not have to
+    be defined by the file, since it is only checked when the file is included
+    again
+
+    :param tokens: The logic stream of the file
+    :returns: The guard macro or None if the file is not guarded
+    """
+    guard: Optional[str] = None
+    depth = 0
+    closed = False
+    for token in tokens:
+        if _is_blank(token):
+            continue
+        elif closed:
+            # Code or directives after the #endif of the guard
+            return None
+        elif guard is None:
+            if not isinstance(token, StartSelectionDirective):
+                return None
+            guard = _get_guard_macro(token)
+            if guard is None:
+                return None
+            depth = 1
+        elif isinstance(token, StartSelectionDirective):
+            depth += 1
+        elif isinstance(token, EndIfDirective):
+            depth -= 1
+            closed = depth == 0
+        elif depth == 1 and isinstance(token, SelectionDirective):
+            # #elif or #else of the guard
+            return None
+    return guard if closed else None
+
+
+def has_pragma_once(tokens: Iterable[PreProcessorLogicToken]) -> bool:
+    """
+    Returns whether the logic stream of a file contains '#pragma once'
+    outside of selection blocks
+    """
+    depth = 0
+    for token in tokens:
+        if isinstance(token, StartSelectionDirective):
+            depth += 1
+        elif isinstance(token, EndIfDirective):
+            depth -= 1
+        elif depth == 0 and isinstance(token, PragmaDirective) and \
+                token.pragma == "once":
+            return True
+    return False
+
+
+def get_file_identity(
+        file_path: Union[str, PathLike]
+) -> Optional[Tuple[int, int]]:
+    """
+    Returns the device and inode of the file, which are the same for every
+    path to the file (including symlinks and hard links), or None if the
+    file can't be accessed or the file system does not support inodes
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino) if stat.st_ino else None
+
+
+class IncludeStatistics:
+    """ Counters for the includes handled by a MultipleIncludeOptimizer """
+
+    def __init__(self):
+        self.skipped_includes: int = 0
+        self.skipped_reads: int = 0
+        self.skipped_parses: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: " \
+               f"skipped_includes={self.skipped_includes}, " \
+               f"skipped_reads={self.skipped_reads}, " \
+               f"skipped_parses={self.skipped_parses}>"
+
+    def reset(self) -> None:
+        """ Resets all counters to 0 """
+        self.skipped_includes = 0
+        self.skipped_reads = 0
+        self.skipped_parses = 0
+
+
+class MultipleIncludeOptimizer:
+    """
+    Multiple-include optimisation of a program, same as in GCC.
+
+    Every file is identified by a canonical path. Paths to a file that was
+    already added (e.g. through symlinks or different relative paths) are
+    mapped to it using the device and inode, so the file is not read again.
+    Guarded files, which contain '#pragma once' or an include guard, are also
+    identified by the hash of their content, so copies of them are not parsed
+    again.
+
+    Once a guarded file was processed, later includes of it are skipped if it
+    contains '#pragma once' or its guard macro is still defined.
+    """
+
+    def __init__(self):
+        self._aliases: Dict[str, str] = {}
+        self._identities: Dict[Tuple[int, int], str] = {}
+        self._hashes: Dict[str, str] = {}
+        self._guards: Dict[str, str] = {}
+        self._once: Set[str] = set()
+        self._processed: Set[str] = set()
+        self._statistics = IncludeStatistics()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {len(self._aliases)} paths, " \
+               f"{len(self._guards) + len(self._once)} guarded>"
+
+    @property
+    def statistics(self) -> IncludeStatistics:
+        """ Returns the counters of the skipped includes, reads and parses """
+        return self._statistics
+
+    @property
+    def guards(self) -> Dict[str, str]:
+        """
+        Returns the guard macros of the files with include guards. The key is
+        the canonical path of the file
+        """
+        return self._guards
+
+    @property
+    def once_files(self) -> List[str]:
+        """ Returns the canonical paths of the files with '#pragma once' """
+        return sorted(self._once)
+
+    @staticmethod
+    def _hash_source(source: str) -> str:
+        """ Returns the hash of the source of a file """
+        return hashlib.sha256(source.encode('utf-8', 'surrogatepass')) \
+            .hexdigest()
+
+    def get_canonical_path(self, file_path: str) -> str:
+        """
+        Returns the canonical path of the passed normalised path. If the path
+        references an added file, the path it was added with is returned
+
+        :param file_path: The normalised path to the file
+        """
+        canonical_path = self._aliases.get(file_path)
+        if canonical_path is not None:
+            return canonical_path
+
+        identity = get_file_identity(file_path)
+        canonical_path = self._identities.get(identity, file_path) \
+            if identity is not None else file_path
+        if canonical_path != file_path:
+            logger.debug(f"'{file_path}' is the same file as '{canonical_path}'")
+            self._aliases[file_path] = canonical_path
+            self._statistics.skipped_reads += 1
+        return canonical_path
+
+    def find_duplicate(self, file_path: str, source: str) -> Optional[str]:
+        """
+        Returns the canonical path of an added guarded file with the same
+        content as the passed file and maps the path to it. Unguarded files
+        are never returned, since their directives have to be processed every
+        time they are included
+
+        :param file_path: The normalised path to the file
+        :param source: The source of the file
+        """
+        duplicate = self._hashes.get(self._hash_source(source))
+        if duplicate is not None and duplicate != file_path:
+            logger.debug(f"'{file_path}' is a copy of '{duplicate}'")
+            self._aliases[file_path] = duplicate
+            self._statistics.skipped_parses += 1
+            return duplicate
+        return None
+
+    def add_file(
+            self,
+            file_path: str,
+            tokens: Iterable[PreProcessorLogicToken],
+            source: Optional[str] = None
+    ) -> None:
+        """
+        Adds a file using its path as canonical path and detects whether it
+        is guarded
+
+        :param file_path: The normalised path to the file
+        :param tokens: The logic stream of the file
+        :param source: The source of the file. If passed and the file is
+        guarded, copies of it are detected using find_duplicate()
+        """
+        tokens = list(tokens)
+        self._aliases[file_path] = file_path
+        identity = get_file_identity(file_path)
+        if identity is not None:
+            self._identities.setdefault(identity, file_path)
+
+        guard = detect_include_guard(tokens)
+        if guard is not None:
+            self._guards[file_path] = guard
+        if has_pragma_once(tokens):
+            self._once.add(file_path)
+        if source is not None and self.is_guarded(file_path):
+            self._hashes.setdefault(self._hash_source(source), file_path)
+
+    def is_guarded(self, file_path: str) -> bool:
+        """
+        Returns whether the file with the passed canonical path contains
+        '#pragma once' or an include guard
+        """
+        return file_path in self._once or file_path in self._guards
+
+    def mark_processed(self, file_path: str) -> None:
+        """ Marks the file with the passed canonical path as processed """
+        self._processed.add(file_path)
+
+    def can_skip(self, file_path: str, macro_table: 'MacroTable') -> bool:
+        """
+        Returns whether an include of the file with the passed canonical path
+        can be skipped, since it was already processed and contains
+        '#pragma once' or its guard macro is still defined
+        """
+        if file_path not in self._processed:
+            return False
+        elif file_path in self._once:
+            return True
+        guard = self._guards.get(file_path)
+        return guard is not None and guard in macro_table
@@ -0,0 +1,264 @@
+# coding=utf-8
+"""
+Resolver for the files included by the include directives, which searches
+the include paths using in-memory listings of the directories instead of
+checking every candidate path on the file system
+"""
+import logging
+import os
+from os import PathLike
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+__all__ = [
+    'DirectoryIndex',
+    'IncludeResolverStatistics',
+    'IncludeResolver',
+    'get_directory_index'
+]
+
+logger = logging.getLogger(__name__)
+
+
+class DirectoryIndex:
+    """
+    Index of the listings of directories, which stores the names of the files
+    in every listed directory.
+
+    Every listing stores the modification time of its directory. Listing the
+    directory again only costs a stat, if it did not change, so the index can
+    be shared by multiple compilations (e.g. in the compile server) and only
+    changed directories are read again.
+    """
+
+    def __init__(self):
+        self._listings: Dict[str, Tuple[int, Dict[str, bool]]] = {}
+        self._listing_count: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: " \
+               f"{len(self._listings)} directories>"
+
+    @property
+    def listing_count(self) -> int:
+        """ Returns how often a directory was read using os.scandir() """
+        return self._listing_count
+
+    @staticmethod
+    def _get_key(name: str) -> str:
+        """ Returns the key of a name, which ignores the case on Windows """
+        return os.path.normcase(name)
+
+    def list_directory(
+            self,
+            directory: Union[str, PathLike]
+    ) -> Optional[Dict[str, bool]]:
+        """
+        Returns the entries of the directory and whether they are files
+        (following symlinks). The listing is only read again if the
+        modification time of the directory changed
+
+        :param directory: The normalised path of the directory
+        :returns: The entries or None if the directory can't be accessed
+        """
+        key = self._get_key(str(directory))
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._listings.pop(key, None)
+            return None
+
+        listing = self._listings.get(key)
+        if listing is not None and listing[0] == mtime:
+            return listing[1]
+
+        entries: Dict[str, bool] = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        entries[self._get_key(entry.name)] = entry.is_file()
+                    except OSError:
+                        entries[self._get_key(entry.name)] = False
+        except OSError:
+            return None
+        self._listing_count += 1
+        self._listings[key] = (mtime, entries)
+        return entries
+
+    def clear(self) -> None:
+        """ Removes all listings """
+        self._listings.clear()
+
+
+# Shared by all compilations of the process (see get_directory_index())
+_directory_index: Optional[DirectoryIndex] = None
+
+
+def get_directory_index() -> DirectoryIndex:
+    """ Returns the directory index shared by all compilations """
+    global _directory_index
+    if _directory_index is None:
+        _directory_index = DirectoryIndex()
+    return _directory_index
+
+
+class IncludeResolverStatistics:
+    """ Counters for the lookups done by an IncludeResolver """
+
+    def __init__(self):
+        self.lookups: int = 0
+        self.cache_hits: int = 0
+        self.directories: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: lookups={self.lookups}, " \
+               f"cache_hits={self.cache_hits}, " \
+               f"directories={self.directories}>"
+
+    def reset(self) -> None:
+        """ Resets all counters to 0 """
+        self.lookups = 0
+        self.cache_hits = 0
+        self.directories = 0
+
+
+class IncludeResolver:
+    """
+    Resolver for the included files of a compilation.
+
+    String includes (#include "file") are searched in the directory of the
+    including file, the include paths, the working directory and the lib
+    path. Library includes (#include <file>) are only searched in the include
+    paths and the lib path, same as the system headers in C.
+
+    Every searched directory is listed once per compilation using the shared
+    DirectoryIndex and the result of every lookup is cached by the directory
+    of the including file and the included name, so repeated includes only
+    cost a dictionary lookup.
+    """
+
+    def __init__(
+            self,
+            include_paths: Iterable[Union[str, PathLike]] = (),
+            work_dir: Optional[Union[str, PathLike]] = None,
+            lib_path: Optional[Union[str, PathLike]] = None,
+            index: Optional[DirectoryIndex] = None
+    ):
+        """
+        :param include_paths: The additional directories, which are searched
+        before the working directory and the lib path
+        :param work_dir: The working directory of the compilation
+        :param lib_path: The directory of the library headers
+        :param index: The directory index. If None the index shared by all
+        compilations is used
+        """
+        self._include_paths: List[str] = [
+            os.path.normpath(os.path.abspath(path)) for path in include_paths
+        ]
+        lib_paths = [
+            os.path.normpath(os.path.abspath(path))
+            for path in (lib_path,) if path is not None
+        ]
+        work_dirs = [
+            os.path.normpath(os.path.abspath(path))
+            for path in (work_dir,) if path is not None
+        ]
+        self._string_search_paths: List[str] = [
+            *self._include_paths, *work_dirs, *lib_paths
+        ]
+        self._lib_search_paths: List[str] = [
+            *self._include_paths, *lib_paths
+        ]
+        self._index: DirectoryIndex = index or get_directory_index()
+        self._listings: Dict[str, Optional[Dict[str, bool]]] = {}
+        self._resolved: Dict[Tuple[str, str, bool], Optional[str]] = {}
+        self._statistics = IncludeResolverStatistics()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: " \
+               f"{len(self._resolved)} resolved includes>"
+
+    @property
+    def include_paths(self) -> List[str]:
+        """ Returns the normalised additional include paths """
+        return self._include_paths
+
+    @property
+    def statistics(self) -> IncludeResolverStatistics:
+        """ Returns the counters of the lookups """
+        return self._statistics
+
+    def get_search_paths(
+            self,
+            includer_dir: str,
+            is_lib_include: bool
+    ) -> List[str]:
+        """
+        Returns the directories searched for an include in the passed order
+
+        :param includer_dir: The directory of the including file
+        :param is_lib_include: Whether the include is a library include
+        (#include <file>)
+        """
+        if is_lib_include:
+            return self._lib_search_paths
+        return [includer_dir, *self._string_search_paths]
+
+    def is_file(self, path: str) -> bool:
+        """
+        Returns whether the passed normalised path is an existing file. The
+        directory of the path is listed once and then looked up in memory
+        """
+        directory, name = os.path.split(path)
+        directory = directory or os.curdir
+        try:
+            listing = self._listings[directory]
+        except KeyError:
+            listing = self._listings[directory] = \
+                self._index.list_directory(directory)
+            self._statistics.directories += 1
+        return listing is not None and \
+            listing.get(os.path.normcase(name), False)
+
+    def resolve(
+            self,
+            name: str,
+            includer_dir: Union[str, PathLike],
+            is_lib_include: bool = False
+    ) -> Optional[str]:
+        """
+        Resolves the path of the included file
+
+        :param name: The name of the include (e.g. 'dir/file.ph')
+        :param includer_dir: The directory of the including file
+        :param is_lib_include: Whether the include is a library include
+        (#include <file>)
+        :returns: The normalised path to the included file or None if it
+        could not be found
+        """
+        self._statistics.lookups += 1
+        # Library includes do not depend on the including file
+        key = ("" if is_lib_include else str(includer_dir), name,
+               is_lib_include)
+        try:
+            result = self._resolved[key]
+            self._statistics.cache_hits += 1
+            return result
+        except KeyError:
+            pass
+
+        if os.path.isabs(name):
+            search_paths = [""]
+        else:
+            search_paths = self.get_search_paths(
+                os.path.normpath(includer_dir), is_lib_include
+            )
+
+        result = None
+        for directory in search_paths:
+            path = os.path.normpath(os.path.join(directory, name))
+            if self.is_file(path):
+                result = path
+                break
+        self._resolved[key] = result
+        return result
@@ -0,0 +1,232 @@
+# coding=utf-8
+"""
+Line scanner, which separates the directive lines of a file from the ordinary
+code, so only the directives have to be parsed by the Pre-Processor parser
+"""
+import re
+from os import PathLike
+from typing import Dict, List, Match, Pattern, Type, Union
+
+from .logic_tokens import (DefineDirective, NonPreProcessorItem,
+                           PreProcessorDirective, UndefDirective,
+                           PragmaDirective,
+                           SelectionDirective, IfDirective,
+                           IfDefinedDirective, IfNotDefinedDirective,
+                           ElIfDirective, ElIfDefinedDirective,
+                           ElIfNotDefinedDirective, ElseSelectionDirective,
+                           EndIfDirective)
+from .macros import parse_define, parse_undef
+
+__all__ = [
+    'DIRECTIVE_LINE_PATTERN',
+    'ScannedFile',
+    'scan_directive_lines'
+]
+
+# A directive line is a line whose first character that is not a whitespace
+# is '#'. Directives can not span multiple lines, same as in the grammar
+DIRECTIVE_LINE_PATTERN: Pattern = re.compile(
+    r'^[ \t]*#[^\n]*\n?', re.MULTILINE
+)
+# Defines, undefs, pragmas and the selection directives are handled by the
+# scanner, since the grammar can not parse function-like macros and only
+# allows other selection directives inside of selection blocks
+_SCANNED_DIRECTIVE_PATTERN: Pattern = re.compile(
+    r'[ \t]*#[ \t]*(define|undef|pragma|ifdef|ifndef|if|elifdef|elifndef|'
+    r'elif|else|endif)\b[ \t]*'
+)
+_SELECTION_DIRECTIVES: Dict[str, Type[SelectionDirective]] = {
+    'if': IfDirective,
+    'ifdef': IfDefinedDirective,
+    'ifndef': IfNotDefinedDirective,
+    'elif': ElIfDirective,
+    'elifdef': ElIfDefinedDirective,
+    'elifndef': ElIfNotDefinedDirective,
+    'else': ElseSelectionDirective,
+    'endif': EndIfDirective
+}
+
+
+class ScannedFile:
+    """
+    Result of scan_directive_lines(). The directive lines are concatenated
+    into the directive text, which is parsed instead of the entire file, and
+    the code in between is represented by NonPreProcessorItem tokens that
+    only reference their range of the source. Defines, undefs, pragmas and
+    selection directives are not added to the directive text, but directly
+    converted into tokens
+    """
+    __slots__ = (
+        '_source', '_directive_text', '_line_map', '_code_items',
+        '_directive_items'
+    )
+
+    def __init__(
+            self,
+            source: str,
+            directive_text: str,
+            line_map: List[int],
+            code_items: List[NonPreProcessorItem],
+            directive_items: List[PreProcessorDirective]
+    ):
+        self._source = source
+        self._directive_text = directive_text
+        self._line_map = line_map
+        self._code_items = code_items
+        self._directive_items = directive_items
+
+    @property
+    def source(self) -> str:
+        """ Returns the scanned source """
+        return self._source
+
+    @property
+    def directive_text(self) -> str:
+        """
+        Returns the directive lines of the source (including their line
+        endings) concatenated into one string
+        """
+        return self._directive_text
+
+    @property
+    def line_map(self) -> List[int]:
+        """
+        Returns the line in the source for every line of the directive text
+        """
+        return self._line_map
+
+    @property
+    def code_items(self) -> List[NonPreProcessorItem]:
+        """ Returns the tokens for the code between the directive lines """
+        return self._code_items
+
+    @property
+    def directive_items(self) -> List[PreProcessorDirective]:
+        """
+        Returns the tokens of the directives handled by the scanner, which
+        are not part of the directive text (defines, undefs, pragmas and
+        selection directives)
+        """
+        return self._directive_items
+
+    @property
+    def has_directives(self) -> bool:
+        """
+        Returns whether the directive text contains any directive lines,
+        which have to be parsed
+        """
+        return len(self._line_map) > 0
+
+    def get_source_line(self, line: int) -> int:
+        """
+        Returns the line in the source for the passed line of the directive
+        text. Lines after the last directive (EOF) are mapped to the last one
+        """
+        return self._line_map[min(line, len(self._line_map)) - 1]
+
+
+def _create_code_item(
+        source: str,
+        start: int,
+        stop: int,
+        line: int,
+        relative_file_name: Union[str, PathLike]
+) -> NonPreProcessorItem:
+    """ Creates a code token referencing source[start:stop] """
+    item = NonPreProcessorItem("", line, 0, relative_file_name, None)
+    item.set_source_range(source, start, stop - 1)
+    return item
+
+
+def _create_scanned_directive(
+        source: str,
+        start: int,
+        stop: int,
+        line: int,
+        relative_file_name: Union[str, PathLike],
+        match: Match
+) -> PreProcessorDirective:
+    """
+    Creates the token for the directive in source[start:stop], which is the
+    directive line without its line ending
+
+    :param match: The match of _SCANNED_DIRECTIVE_PATTERN for the line
+    """
+    text = source[start:stop]
+    column = len(text) - len(text.lstrip(' \t'))
+    keyword = match.group(1)
+    if keyword == 'define':
+        item = DefineDirective(
+            "", line, column, relative_file_name, None, parse_define(text)
+        )
+    elif keyword == 'undef':
+        item = UndefDirective(
+            "", line, column, relative_file_name, None, parse_undef(text)
+        )
+    elif keyword == 'pragma':
+        item = PragmaDirective(
+            "", line, column, relative_file_name, None,
+            source[match.end():stop].strip()
+        )
+    else:
+        # The condition is the rest of the line, for (el)ifdef and (el)ifndef
+        # only the macro name
+        condition = source[match.end():stop].strip()
+        if keyword.endswith('def'):
+            condition = condition.split(maxsplit=1)[0] if condition else ""
+        item = _SELECTION_DIRECTIVES[keyword](
+            "", line, column, relative_file_name, None,
+            condition if keyword not in ('else', 'endif') else None
+        )
+    item.set_source_range(source, start, stop - 1)
+    return item
+
+
+def scan_directive_lines(
+        source: str,
+        relative_file_name: Union[str, PathLike]
+) -> ScannedFile:
+    """
+    Scans the source for directive lines. The code between them is not
+    copied or tokenized, which means the cost of files with few directives
+    is mostly the cost of reading them
+
+    :param source: The source of the file without comments
+    :param relative_file_name: The relative name of the file, which is used
+    for the code tokens
+    :returns: The ScannedFile containing the directive text and code tokens
+    """
+    directives: List[str] = []
+    line_map: List[int] = []
+    code_items: List[NonPreProcessorItem] = []
+    directive_items: List[PreProcessorDirective] = []
+
+    pos = 0
+    line = 1
+    for match in DIRECTIVE_LINE_PATTERN.finditer(source):
+        start = match.start()
+        if start > pos:
+            code_items.append(
+                _create_code_item(source, pos, start, line, relative_file_name)
+            )
+            line += source.count('\n', pos, start)
+
+        pos = match.end()
+        scanned_match = _SCANNED_DIRECTIVE_PATTERN.match(source, start, pos)
+        if scanned_match is not None:
+            directive_items.append(_create_scanned_directive(
+                source, start, pos - (source[pos - 1] == '\n'), line,
+                relative_file_name, scanned_match
+            ))
+        else:
+            directives.append(match.group())
+            line_map.append(line)
+        line += 1
+
+    if pos < len(source):
+        code_items.append(
+            _create_code_item(source, pos, len(source), line, relative_file_name)
+        )
+    return ScannedFile(
+        source, "".join(directives), line_map, code_items, directive_items
+    )
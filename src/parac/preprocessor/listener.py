@@ -1,14 +1,16 @@
 # coding=utf-8
 """ Logic Tree Listener for the Para-C Pre-Processor """
 import logging
-from typing import List
+from typing import List, Optional
 import antlr4
-import logging
 
 from .abc import PreProcessorLogicToken
+from .logic_tokens import FileIncludeDirective, ComputedIncludeDirective
 from .python import ParaCPreProcessorListener
 from .ctx import FilePreProcessorContext
+from .line_scanner import ScannedFile
 from .python import ParaCPreProcessorParser as parser
+from ..util import DispatchTableWalker
 
 __all__ = [
     'Listener'
@@ -29,11 +31,20 @@ class Listener(ParaCPreProcessorListener.ParaCPreProcessorListener):
             self,
             antlr4_file_ctx: _p.CompilationUnitContext,
             file_stream: antlr4.InputStream,
-            relative_file_name: str
+            relative_file_name: str,
+            scanned_file: Optional[ScannedFile] = None
     ):
+        """
+        :param antlr4_file_ctx: The parsed compilation unit
+        :param file_stream: The stream the compilation unit was parsed from
+        :param relative_file_name: Relative name of the file
+        :param scanned_file: The ScannedFile if only the directive text of the
+        file was parsed. Used to map the lines of the tokens to the file
+        """
         self._file_ctx = FilePreProcessorContext(relative_file_name)
         self.antlr4_file_ctx: _p.CompilationUnitContext = antlr4_file_ctx
         self.file_stream: antlr4.InputStream = file_stream
+        self.scanned_file: Optional[ScannedFile] = scanned_file
         self._enable_out = False
 
     @property
@@ -62,6 +73,44 @@ class Listener(ParaCPreProcessorListener.ParaCPreProcessorListener):
         )
         self._enable_out = enable_out
 
+        walker = DispatchTableWalker()
+        self.file_ctx.set_node_count(
+            walker.walk(self, self.antlr4_file_ctx)
+        )
+
+    def _get_line(self, ctx: antlr4.ParserRuleContext) -> int:
+        """ Returns the line of the passed ctx in the file """
+        if self.scanned_file is None:
+            return ctx.start.line
+        return self.scanned_file.get_source_line(ctx.start.line)
+
+    def _add_file_include(
+            self,
+            ctx: _p.FileIncludeDirectiveContext,
+            literal: str,
+            is_lib_include: bool
+    ) -> None:
+        """
+        Adds a FileIncludeDirective to the logic stream
+
+        :param ctx: The parent fileIncludeDirective context
+        :param literal: The string or lib string literal including the quotes
+        :param is_lib_include: True if it's a library include (<file>)
+        """
+        self.logic_stream.append(
+            FileIncludeDirective(
+                as_str=self.file_stream.getText(
+                    ctx.start.start, ctx.stop.stop
+                ).strip(),
+                line=self._get_line(ctx),
+                column=ctx.start.column,
+                relative_parent_file_name=self._file_ctx.relative_file_name,
+                antlr4_ctx=ctx,
+                include_name=literal[1:-1],
+                is_lib_include=is_lib_include
+            )
+        )
+
     def enterCompilationUnit(
             self,
             ctx: _p.CompilationUnitContext
@@ -281,7 +330,18 @@ class Listener(ParaCPreProcessorListener.ParaCPreProcessorListener):
         """
         Enter a parse tree produced by parser#computedIncludeDirective.
         """
-        ...
+        self.logic_stream.append(
+            ComputedIncludeDirective(
+                as_str=self.file_stream.getText(
+                    ctx.start.start, ctx.stop.stop
+                ).strip(),
+                line=self._get_line(ctx),
+                column=ctx.start.column,
+                relative_parent_file_name=self._file_ctx.relative_file_name,
+                antlr4_ctx=ctx,
+                include_name=ctx.Identifier().getText()
+            )
+        )
 
     def exitComputedIncludeDirective(
             self,
@@ -507,7 +567,9 @@ class Listener(ParaCPreProcessorListener.ParaCPreProcessorListener):
         Enter a parse tree produced by
         ParaCPreProcessorParser#libIncludeDirective.
         """
-        ...
+        self._add_file_include(
+            ctx.parentCtx, ctx.LibStringLiteral().getText(), True
+        )
 
     def exitLibIncludeDirective(
             self,
@@ -527,7 +589,9 @@ class Listener(ParaCPreProcessorListener.ParaCPreProcessorListener):
         Enter a parse tree produced by
          ParaCPreProcessorParser#stringIncludeDirective.
         """
-        ...
+        self._add_file_include(
+            ctx.parentCtx, ctx.StringLiteral().getText(), False
+        )
 
     #
     def exitStringIncludeDirective(
@@ -1,6 +1,6 @@
 # coding=utf-8
 """ Logic Stream for Pre-Processor Items """
-from typing import List
+from typing import List, Tuple
 from cached_property import cached_property
 
 from ..abc import LogicStream
@@ -42,15 +42,31 @@ class ProcessedFileStream(LogicStream):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._c_regions: List[Tuple[int, int]] = []
+
+    @property
+    def c_regions(self) -> List[Tuple[int, int]]:
+        """
+        Returns the C regions of the file, which are the lines between
+        '#pragma PARAC lang C' and '#pragma PARAC lang PARAC' (or the end of
+        the file). Every region is a tuple of the first line and the line
+        after the region
+        """
+        return self._c_regions
+
+    def add_c_region(self, start: int, end: int) -> None:
+        """
+        Adds a C region from the line start until the line end (exclusive)
+        """
+        if end > start:
+            self._c_regions.append((start, end))
 
     @cached_property
     def file_string(self) -> str:
         """
         File-string, which is the merged version of the content of this stream
         """
-        ...
-
-        return str()
+        return "".join(item.get_as_str() for item in self)
 
     @property
     def content(self) -> List[NonPreProcessorItem]:
@@ -2,36 +2,51 @@
 """ Tokens in the Para-C compiler """
 from os import PathLike
 from typing import Optional, Any, List, Union
-from cached_property import cached_property
 
 from ..abc import NULL_CHILDREN
 from .abc import PreProcessorLogicToken
+from .conditions import CONDITION_IF, CONDITION_IFDEF, CONDITION_IFNDEF
+from .macros import Macro
 
 __all__ = [
     'NonPreProcessorItem',
     'PreProcessorDirective',
     'DefineDirective',
+    'UndefDirective',
     'IncludeDirective',
     'ComputedIncludeDirective',
     'FileIncludeDirective',
     'SelectionDirective',
     'StartSelectionDirective',
+    'IfDirective',
+    'IfDefinedDirective',
+    'IfNotDefinedDirective',
     'AlternativeSelectionDirective',
+    'ElIfDirective',
+    'ElIfDefinedDirective',
+    'ElIfNotDefinedDirective',
     'ElseSelectionDirective',
     'EndIfDirective',
     'ErrorDirective',
     'LineDirective',
     'PragmaDirective',
+    'LANG_C',
+    'LANG_PARAC',
 ]
 
 from .python.ParaCPreProcessorParser import ParaCPreProcessorParser as _p
 
+# Languages of the '#pragma PARAC lang <language>' directives
+LANG_C: str = "C"
+LANG_PARAC: str = "PARAC"
+
 
 class NonPreProcessorItem(PreProcessorLogicToken):
     """
     Non Pre-Processor Token, which can be either a Para-C statement or a
     comment
     """
+    __slots__ = ()
     name = "NonPreProcessorItem"
 
     def __init__(
@@ -49,34 +64,34 @@ class NonPreProcessorItem(PreProcessorLogicToken):
             antlr4_ctx, parent, children
         )
 
-    @cached_property
+    @property
     def relative_parent_file_name(self) -> str:
         """ Returns the relative name of the parent file """
         return self._relative_parent_file_name
 
-    @cached_property
+    @property
     def get_name(self) -> str:
         """ Gets the name of the token """
         return self._name
 
-    @cached_property
+    @property
     def get_line(self) -> int:
         """ Gets the line of code of the token in the file """
-        return self.antlr4_ctx.start.getLine()
+        return self._line
 
-    @cached_property
+    @property
     def get_column(self) -> int:
         """ Gets the column of the token in the file """
-        return self.antlr4_ctx.start.getCharPositionInLine()
+        return self._column
 
-    @cached_property
+    @property
     def is_directive(self) -> bool:
         """
         Returns whether the token is a directive. Always false for this class
         """
         return False
 
-    @cached_property
+    @property
     def has_children(self) -> bool:
         """
         Returns whether the token has children that are other tokens.
@@ -84,7 +99,7 @@ class NonPreProcessorItem(PreProcessorLogicToken):
         """
         return False
 
-    @cached_property
+    @property
     def has_code_block_scope(self) -> bool:
         """
         Returns whether it is possible to pass a code-block after the
@@ -92,7 +107,7 @@ class NonPreProcessorItem(PreProcessorLogicToken):
         """
         return False
 
-    @cached_property
+    @property
     def has_code_block_child(self) -> bool:
         """
         Returns whether the token has code-block children that are associated
@@ -106,6 +121,7 @@ class PreProcessorDirective(PreProcessorLogicToken):
     Pre-Processor Directive representing a Para-C PreProcessor Directive
     used to interact with the Compiler
     """
+    __slots__ = ('_children_code_block', '_has_code_block_scope')
 
     def __init__(
             self,
@@ -150,22 +166,22 @@ class PreProcessorDirective(PreProcessorLogicToken):
         """
         return self._children_code_block
 
-    @cached_property
+    @property
     def get_name(self) -> str:
         """ Gets the name of the token """
         return self._name
 
-    @cached_property
+    @property
     def get_line(self) -> int:
         """ Gets the line of code of the token in the file """
-        return self.antlr4_ctx.start.getLine()
+        return self._line
 
-    @cached_property
+    @property
     def get_column(self) -> int:
         """ Gets the column of the token in the file """
-        return self.antlr4_ctx.start.getCharPositionInLine()
+        return self._column
 
-    @cached_property
+    @property
     def is_directive(self) -> bool:
         """ Returns whether the token is a directive """
         return True
@@ -199,7 +215,32 @@ class IncludeDirective(PreProcessorDirective):
     Include Directive for including code from other files. This serves as the
     parent class for FileIncludeDirective and ComputedIncludeDirective
     """
-    ...
+    __slots__ = ('_include_name',)
+
+    def __init__(
+            self,
+            name: str,
+            as_str: str,
+            line: int,
+            column: int,
+            relative_parent_file_name: Union[str, PathLike],
+            antlr4_ctx,
+            include_name: str,
+            parent: Optional[Any] = None
+    ):
+        self._include_name = include_name
+        super().__init__(
+            name, as_str, line, column, relative_parent_file_name,
+            antlr4_ctx, False, parent
+        )
+
+    @property
+    def include_name(self) -> str:
+        """
+        Returns the name that is included. For a FileIncludeDirective this is
+        the file name and for a ComputedIncludeDirective the name of the macro
+        """
+        return self._include_name
 
 
 class FileIncludeDirective(IncludeDirective):
@@ -207,14 +248,56 @@ class FileIncludeDirective(IncludeDirective):
     Include Directive which includes a file based on a string literal. This
     can be either a library include or a regular file include.
     """
-    ...
+    __slots__ = ('_is_lib_include',)
+    name = "FileIncludeDirective"
+
+    def __init__(
+            self,
+            as_str: str,
+            line: int,
+            column: int,
+            relative_parent_file_name: Union[str, PathLike],
+            antlr4_ctx: _p.FileIncludeDirectiveContext,
+            include_name: str,
+            is_lib_include: bool,
+            parent: Optional[Any] = None
+    ):
+        self._is_lib_include = is_lib_include
+        super().__init__(
+            self.name, as_str, line, column, relative_parent_file_name,
+            antlr4_ctx, include_name, parent
+        )
+
+    @property
+    def is_lib_include(self) -> bool:
+        """
+        Returns whether the include is a library include (#include <file>),
+        which is not resolved relative to the including file
+        """
+        return self._is_lib_include
 
 
 class ComputedIncludeDirective(IncludeDirective):
     """
     Computed Include Directive, which includes based on a macro a header.
     """
-    ...
+    __slots__ = ()
+    name = "ComputedIncludeDirective"
+
+    def __init__(
+            self,
+            as_str: str,
+            line: int,
+            column: int,
+            relative_parent_file_name: Union[str, PathLike],
+            antlr4_ctx: _p.ComputedIncludeDirectiveContext,
+            include_name: str,
+            parent: Optional[Any] = None
+    ):
+        super().__init__(
+            self.name, as_str, line, column, relative_parent_file_name,
+            antlr4_ctx, include_name, parent
+        )
 
 
 class DefineDirective(PreProcessorDirective):
@@ -222,7 +305,63 @@ class DefineDirective(PreProcessorDirective):
     Define Directive for defining a macro (identifier). The macro can either
     be empty, an expression or a statement
     """
-    ...
+    __slots__ = ('_macro',)
+    name = "DefineDirective"
+
+    def __init__(
+            self,
+            as_str: str,
+            line: int,
+            column: int,
+            relative_parent_file_name: Union[str, PathLike],
+            antlr4_ctx: Optional[_p.ComplexDefineDirectiveContext],
+            macro: Macro,
+            parent: Optional[Any] = None
+    ):
+        self._macro = macro
+        super().__init__(
+            self.name, as_str, line, column, relative_parent_file_name,
+            antlr4_ctx, False, parent
+        )
+
+    @property
+    def macro(self) -> Macro:
+        """ Returns the macro, which is defined by the directive """
+        return self._macro
+
+    @property
+    def macro_name(self) -> str:
+        """ Returns the name of the defined macro """
+        return self._macro.name
+
+
+class UndefDirective(PreProcessorDirective):
+    """
+    Undef Directive, which removes the definition of a macro
+    """
+    __slots__ = ('_macro_name',)
+    name = "UndefDirective"
+
+    def __init__(
+            self,
+            as_str: str,
+            line: int,
+            column: int,
+            relative_parent_file_name: Union[str, PathLike],
+            antlr4_ctx: Optional[_p.UndefDirectiveContext],
+            macro_name: str,
+            parent: Optional[Any] = None
+    ):
+        self._macro_name = macro_name
+        super().__init__(
+            self.name, as_str, line, column, relative_parent_file_name,
+            antlr4_ctx, False, parent
+        )
+
+    @property
+    def macro_name(self) -> str:
+        """ Returns the name of the macro that is undefined """
+        return self._macro_name
 
 
 class SelectionDirective(PreProcessorDirective):
@@ -231,7 +370,40 @@ class SelectionDirective(PreProcessorDirective):
     Block, which consist of two or more directives, which specify
     based on evaluated expressions, which child code-block should be used.
     """
-    ...
+    __slots__ = ('_condition',)
+    # Type of the condition, which is either CONDITION_IF (constant
+    # expression), CONDITION_IFDEF, CONDITION_IFNDEF (macro name) or None if
+    # the directive has no condition
+    condition_type: Optional[str] = None
+
+    def __init__(
+            self,
+            as_str: str,
+            line: int,
+            column: int,
+            relative_parent_file_name: Union[str, PathLike],
+            antlr4_ctx,
+            condition: Optional[str] = None,
+            parent: Optional[Any] = None
+    ):
+        """
+        The name of the token is the name attribute of the class
+
+        :param condition: The constant expression or the macro name
+        """
+        self._condition = condition
+        super().__init__(
+            self.name, as_str, line, column, relative_parent_file_name,
+            antlr4_ctx, True, parent
+        )
+
+    @property
+    def condition(self) -> Optional[str]:
+        """
+        Returns the constant expression for #if and #elif or the macro name
+        for the (el)ifdef and (el)ifndef directives
+        """
+        return self._condition
 
 
 class StartSelectionDirective(SelectionDirective):
@@ -241,6 +413,28 @@ class StartSelectionDirective(SelectionDirective):
     AlternativeSelectionDirective or a EndIfDirective MUST be placed after this
     directive.
     """
+    __slots__ = ()
+
+
+class IfDirective(StartSelectionDirective):
+    """ #if directive, which evaluates a constant expression """
+    __slots__ = ()
+    name = "IfDirective"
+    condition_type = CONDITION_IF
+
+
+class IfDefinedDirective(StartSelectionDirective):
+    """ #ifdef directive, which checks whether a macro is defined """
+    __slots__ = ()
+    name = "IfDefinedDirective"
+    condition_type = CONDITION_IFDEF
+
+
+class IfNotDefinedDirective(StartSelectionDirective):
+    """ #ifndef directive, which checks whether a macro is not defined """
+    __slots__ = ()
+    name = "IfNotDefinedDirective"
+    condition_type = CONDITION_IFNDEF
 
 
 class AlternativeSelectionDirective(SelectionDirective):
@@ -251,7 +445,28 @@ class AlternativeSelectionDirective(SelectionDirective):
 
     The entire statement must be closed with an EndIfDirective
     """
-    ...
+    __slots__ = ()
+
+
+class ElIfDirective(AlternativeSelectionDirective):
+    """ #elif directive, which evaluates a constant expression """
+    __slots__ = ()
+    name = "ElIfDirective"
+    condition_type = CONDITION_IF
+
+
+class ElIfDefinedDirective(AlternativeSelectionDirective):
+    """ #elifdef directive, which checks whether a macro is defined """
+    __slots__ = ()
+    name = "ElIfDefinedDirective"
+    condition_type = CONDITION_IFDEF
+
+
+class ElIfNotDefinedDirective(AlternativeSelectionDirective):
+    """ #elifndef directive, which checks whether a macro is not defined """
+    __slots__ = ()
+    name = "ElIfNotDefinedDirective"
+    condition_type = CONDITION_IFNDEF
 
 
 class ElseSelectionDirective(SelectionDirective):
@@ -260,7 +475,8 @@ class ElseSelectionDirective(SelectionDirective):
     or StartSelectionDirective. This directive must be followed by an +
     EndIfDirective.
     """
-    ...
+    __slots__ = ()
+    name = "ElseSelectionDirective"
 
 
 class EndIfDirective(SelectionDirective):
@@ -275,14 +491,15 @@ class EndIfDirective(SelectionDirective):
     # endif // nested endif
     #endif
     """
-    ...
+    __slots__ = ()
+    name = "EndIfDirective"
 
 
 class ErrorDirective(PreProcessorDirective):
     """
     Error Directive, which if encountered writes a string to stderr and
     """
-    ...
+    __slots__ = ()
 
 
 class LineDirective(PreProcessorDirective):
@@ -290,7 +507,7 @@ class LineDirective(PreProcessorDirective):
     Line Directive, which sets the __LINE__ and __FILE__ (optional) macros.
     If set the numeric value will be the __LINE__ macro in the next line.
     """
-    ...
+    __slots__ = ()
 
 
 class PragmaDirective(PreProcessorDirective):
@@ -298,4 +515,45 @@ class PragmaDirective(PreProcessorDirective):
     Pragma Directive for using compiler specific commands, which affect the
     code, compilation or execution.
     """
-    ...
+    __slots__ = ('_pragma',)
+    name = "PragmaDirective"
+
+    def __init__(
+            self,
+            as_str: str,
+            line: int,
+            column: int,
+            relative_parent_file_name: Union[str, PathLike],
+            antlr4_ctx: Optional[_p.PragmaDirectiveContext],
+            pragma: str,
+            parent: Optional[Any] = None
+    ):
+        """
+        :param pragma: The text after '#pragma' without the surrounding
+        whitespace
+        """
+        self._pragma = pragma
+        super().__init__(
+            self.name, as_str, line, column, relative_parent_file_name,
+            antlr4_ctx, False, parent
+        )
+
+    @property
+    def pragma(self) -> str:
+        """
+        Returns the text after '#pragma' without the surrounding whitespace,
+        e.g. 'once'
+        """
+        return self._pragma
+
+    @property
+    def language(self) -> Optional[str]:
+        """
+        Returns the language set by '#pragma PARAC lang <language>' (LANG_C
+        or LANG_PARAC) or None if the pragma does not set the language
+        """
+        parts = self._pragma.split()
+        if len(parts) == 3 and parts[:2] == ["PARAC", "lang"] and \
+                parts[2] in (LANG_C, LANG_PARAC):
+            return parts[2]
+        return None
@@ -0,0 +1,630 @@
+# coding=utf-8
+"""
+Macro table and expansion engine of the Pre-Processor, which handles
+object-like and function-like macros including the '#' and '##' operators
+"""
+import re
+from typing import Dict, FrozenSet, List, Optional, Pattern, Set, Tuple
+
+from ..exceptions import LogicalError
+
+__all__ = [
+    'VA_ARGS',
+    'Macro',
+    'MacroStatistics',
+    'MacroTable',
+    'parse_define',
+    'parse_undef',
+    'tokenize'
+]
+
+VA_ARGS: str = "__VA_ARGS__"
+
+_TOKEN_PATTERN: Pattern = re.compile(
+    r'[ \t\r\n\f\v]+'                 # whitespace
+    r'|[A-Za-z_]\w*'                  # identifier
+    r'|\.?\d(?:[eEpP][+-]|[\w.])*'    # number
+    r'|"(?:\\.|[^"\\\n])*"'           # string literal
+    r"|'(?:\\.|[^'\\\n])*'"           # char literal
+    r'|##|\.\.\.|.',
+    re.DOTALL
+)
+_IDENTIFIER_PATTERN: Pattern = re.compile(r'[A-Za-z_]\w*')
+# Tokens that may contain identifiers, used for the substitution of
+# object-like macros without tokenizing the entire text. The group makes
+# re.split() return the words at the odd indices
+_WORD_PATTERN: Pattern = re.compile(
+    r'([A-Za-z_]\w*'
+    r'|\.?\d(?:[eEpP][+-]|[\w.])*'
+    r'|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*')"
+)
+_DEFINE_PATTERN: Pattern = re.compile(
+    r'[ \t]*#[ \t]*define[ \t]+([A-Za-z_]\w*)(\(([^)]*)\))?(.*)', re.DOTALL
+)
+_UNDEF_PATTERN: Pattern = re.compile(
+    r'[ \t]*#[ \t]*undef[ \t]+([A-Za-z_]\w*)[ \t]*\r?\n?$'
+)
+
+# Key of a cached expansion, which is the name of the macro and the macros
+# that were disabled while expanding it
+_CacheKey = Tuple[str, FrozenSet[str]]
+
+
+class _BlockedName(str):
+    """
+    Name of a macro, which was found while the macro was being expanded.
+    The name may never be expanded again, even if it's rescanned after the
+    expansion of the macro finished
+    """
+    __slots__ = ()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits the passed text into preprocessing tokens. Whitespace is kept as
+    separate tokens, so joining the tokens returns the original text
+    """
+    return _TOKEN_PATTERN.findall(text)
+
+
+def _is_space(token: str) -> bool:
+    """ Returns whether the token is a whitespace token """
+    return token[0] in ' \t\r\n\f\v'
+
+
+def _strip_space(tokens: List[str]) -> List[str]:
+    """ Removes the whitespace tokens at the start and end """
+    start, stop = 0, len(tokens)
+    while start < stop and _is_space(tokens[start]):
+        start += 1
+    while stop > start and _is_space(tokens[stop - 1]):
+        stop -= 1
+    return tokens[start:stop]
+
+
+class Macro:
+    """
+    Macro defined using #define. If params is None the macro is object-like,
+    else function-like
+    """
+    __slots__ = ('_name', '_params', '_is_variadic', '_body', '_body_tokens')
+
+    def __init__(
+            self,
+            name: str,
+            body: str = "",
+            params: Optional[Tuple[str, ...]] = None,
+            is_variadic: bool = False
+    ):
+        """
+        :param name: The name of the macro
+        :param body: The replacement list of the macro
+        :param params: The names of the parameters or None if the macro is
+        object-like. The variable arguments are named __VA_ARGS__
+        :param is_variadic: True if the last parameter are the variable
+        arguments (...)
+        """
+        self._name = name
+        self._params = params
+        self._is_variadic = is_variadic
+        self._body = body.strip()
+        self._body_tokens: Tuple[str, ...] = tuple(tokenize(self._body))
+
+    def __repr__(self) -> str:
+        params = "" if self._params is None else f"({', '.join(self._params)})"
+        return f"<{self.__class__.__name__}: {self._name}{params}>"
+
+    def __getstate__(self) -> dict:
+        """ Returns the state for pickling """
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        """ Restores the state returned by __getstate__() """
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @property
+    def name(self) -> str:
+        """ Returns the name of the macro """
+        return self._name
+
+    @property
+    def params(self) -> Optional[Tuple[str, ...]]:
+        """ Returns the parameters or None if the macro is object-like """
+        return self._params
+
+    @property
+    def is_function_like(self) -> bool:
+        """ Returns whether the macro is function-like """
+        return self._params is not None
+
+    @property
+    def is_variadic(self) -> bool:
+        """ Returns whether the macro accepts variable arguments """
+        return self._is_variadic
+
+    @property
+    def body(self) -> str:
+        """ Returns the replacement list of the macro """
+        return self._body
+
+    @property
+    def body_tokens(self) -> Tuple[str, ...]:
+        """ Returns the tokens of the replacement list """
+        return self._body_tokens
+
+
+def parse_define(text: str) -> Macro:
+    """
+    Parses the text of a #define directive and returns the defined Macro
+
+    :raises LogicalError: If the directive is not a valid define
+    """
+    match = _DEFINE_PATTERN.match(text)
+    if match is None:
+        raise LogicalError(f"Invalid define directive: {text.strip()}")
+
+    name, has_params, params_str, body = match.groups()
+    if not has_params:
+        return Macro(name, body)
+
+    params: List[str] = [p.strip() for p in params_str.split(',')]
+    if params == [""]:
+        params = []
+    is_variadic = bool(params) and params[-1] == "..."
+    if is_variadic:
+        params[-1] = VA_ARGS
+
+    for param in params:
+        if _IDENTIFIER_PATTERN.fullmatch(param) is None:
+            raise LogicalError(
+                f"Invalid parameter '{param}' in the define of '{name}'"
+            )
+    if len(set(params)) != len(params):
+        raise LogicalError(f"Duplicate parameter in the define of '{name}'")
+    return Macro(name, body, tuple(params), is_variadic)
+
+
+def parse_undef(text: str) -> str:
+    """
+    Parses the text of an #undef directive and returns the name of the macro
+
+    :raises LogicalError: If the directive is not a valid undef
+    """
+    match = _UNDEF_PATTERN.match(text)
+    if match is None:
+        raise LogicalError(f"Invalid undef directive: {text.strip()}")
+    return match.group(1)
+
+
+class MacroStatistics:
+    """ Counters for the expansions done by a MacroTable """
+
+    def __init__(self):
+        self.expansions: int = 0
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.invalidations: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: expansions={self.expansions}, " \
+               f"cache_hits={self.cache_hits}, " \
+               f"cache_misses={self.cache_misses}, " \
+               f"invalidations={self.invalidations}>"
+
+    def reset(self) -> None:
+        """ Resets all counters to 0 """
+        self.expansions = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.invalidations = 0
+
+
+class MacroTable:
+    """
+    Table of the defined macros of a program, which expands them in code.
+
+    The expansions of object-like macros are cached. Every cache entry
+    records the identifiers it looked up, so defining or undefining a macro
+    only invalidates the entries that depend on it. Recursive macros are not
+    expanded again inside their own expansion, same as in C.
+    """
+
+    def __init__(self, cache_expansions: bool = True):
+        """
+        :param cache_expansions: If set to True the expansions of object-like
+        macros are cached
+        """
+        self._macros: Dict[str, Macro] = {}
+        self._cache_expansions = cache_expansions
+        self._cache: Dict[_CacheKey, Tuple[Tuple[str, ...], FrozenSet[str]]] \
+            = {}
+        self._dependents: Dict[str, Set[_CacheKey]] = {}
+        self._generation: int = 0
+        self._function_like_count: int = 0
+        self._statistics = MacroStatistics()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {len(self._macros)} macros>"
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._macros
+
+    def __len__(self) -> int:
+        return len(self._macros)
+
+    @property
+    def macros(self) -> Dict[str, Macro]:
+        """ Returns the defined macros by their name """
+        return self._macros
+
+    @property
+    def generation(self) -> int:
+        """
+        Returns the generation of the table, which is increased every time a
+        macro is defined or undefined
+        """
+        return self._generation
+
+    @property
+    def statistics(self) -> MacroStatistics:
+        """ Returns the expansion and cache statistics """
+        return self._statistics
+
+    def get(self, name: str) -> Optional[Macro]:
+        """ Returns the macro with the passed name or None """
+        return self._macros.get(name)
+
+    def define(self, macro: Macro) -> None:
+        """ Defines the passed macro, replacing a macro with the same name """
+        previous = self._macros.get(macro.name)
+        if previous is not None and previous.is_function_like:
+            self._function_like_count -= 1
+        if macro.is_function_like:
+            self._function_like_count += 1
+        self._macros[macro.name] = macro
+        self._invalidate(macro.name)
+
+    def undefine(self, name: str) -> None:
+        """ Removes the macro with the passed name if it's defined """
+        macro = self._macros.pop(name, None)
+        if macro is not None:
+            if macro.is_function_like:
+                self._function_like_count -= 1
+            self._invalidate(name)
+
+    def _invalidate(self, name: str) -> None:
+        """ Removes the cached expansions that depend on the passed name """
+        self._generation += 1
+        for key in self._dependents.pop(name, ()):
+            if self._cache.pop(key, None) is not None:
+                self._statistics.invalidations += 1
+
+    def expand(self, text: str) -> str:
+        """
+        Expands the macros in the passed code. Newlines inside the arguments
+        of a function-like macro are added after its expansion, so the lines
+        of the following code do not change
+
+        :raises LogicalError: If a function-like macro is called with the
+        wrong amount of arguments or the arguments are not closed
+        """
+        if not self._macros or self._macros.keys().isdisjoint(
+                _IDENTIFIER_PATTERN.findall(text)):
+            return text
+        elif self._function_like_count == 0:
+            return self._substitute_objects(text)
+        return "".join(
+            self._expand_tokens(tokenize(text), frozenset(), None)
+        )
+
+    def expand_tokens(
+            self,
+            tokens: List[str],
+            deps: Optional[Set[str]] = None
+    ) -> List[str]:
+        """
+        Expands the macros in the passed tokens (see tokenize())
+
+        :param tokens: The tokens, which should be expanded
+        :param deps: If passed the identifiers that were looked up are added
+        to it, which are the names the expansion depends on
+        :returns: The expanded tokens
+        :raises LogicalError: If a function-like macro is called with the
+        wrong amount of arguments or the arguments are not closed
+        """
+        return self._expand_tokens(tokens, frozenset(), deps)
+
+    def _substitute_objects(self, text: str) -> str:
+        """
+        Expands the macros in text, which may only contain object-like
+        macros. Every macro is replaced on its own, so only the words of the
+        text have to be matched instead of all tokens
+        """
+        parts = _WORD_PATTERN.split(text)
+        disabled: FrozenSet[str] = frozenset()
+        for i in range(1, len(parts), 2):
+            macro = self._macros.get(parts[i])
+            if macro is not None:
+                parts[i] = "".join(self._expand_object(macro, disabled, None))
+        return "".join(parts)
+
+    def _expand_tokens(
+            self,
+            tokens: List[str],
+            disabled: FrozenSet[str],
+            deps: Optional[Set[str]]
+    ) -> List[str]:
+        """
+        Expands the macros in the passed tokens
+
+        :param tokens: The tokens, which should be expanded
+        :param disabled: The macros that are currently being expanded and
+        may not be expanded again
+        :param deps: If not None the looked up identifiers are added to it
+        :returns: The expanded tokens
+        """
+        macros = self._macros
+        out: List[str] = []
+        i, count = 0, len(tokens)
+        while i < count:
+            token = tokens[i]
+            i += 1
+            if deps is not None and (token[0].isalpha() or token[0] == '_'):
+                # Undefined names are recorded as well, since defining them
+                # later changes the expansion
+                deps.add(token)
+            macro = macros.get(token)
+            if macro is None or type(token) is _BlockedName:
+                out.append(token)
+                continue
+            elif token in disabled:
+                out.append(_BlockedName(token))
+                continue
+
+            newlines = 0
+            while True:
+                if macro.params is None:
+                    expansion = self._expand_object(macro, disabled, deps)
+                else:
+                    start = i
+                    while i < count and _is_space(tokens[i]):
+                        i += 1
+                    if i == count or tokens[i] != '(':
+                        # Not a call, so the name is used as is
+                        i = start
+                        out.append(token)
+                        break
+
+                    args, end = self._collect_args(tokens, i, macro)
+                    expansion = self._expand_function(
+                        macro, args, disabled, deps
+                    )
+                    newlines += sum(
+                        t.count('\n') for t in tokens[start:end]
+                        if _is_space(t)
+                    )
+                    i = end
+
+                # The expansion is rescanned together with the following
+                # tokens, so a function-like macro name at its end may be
+                # called by them. The expanded macro is only disabled inside
+                # of its replacement list, where its name was already blocked
+                macro = self._get_trailing_call(
+                    expansion, disabled, tokens, i
+                )
+                if macro is None:
+                    out.extend(expansion)
+                    break
+                token = macro.name
+            if newlines:
+                out.append('\n' * newlines)
+        return out
+
+    def _get_trailing_call(
+            self,
+            expansion: List[str],
+            disabled: FrozenSet[str],
+            tokens: List[str],
+            index: int
+    ) -> Optional[Macro]:
+        """
+        Returns the function-like macro, whose name is the last token of the
+        expansion and which is called by the tokens following the expansion.
+        The name is removed from the expansion in that case
+
+        :param expansion: The expanded tokens of a macro
+        :param disabled: The macros that may not be expanded again
+        :param tokens: The tokens the macro was expanded in
+        :param index: The index of the token after the expanded macro
+        :returns: The called macro or None if the expansion is complete
+        """
+        last = len(expansion) - 1
+        while last >= 0 and _is_space(expansion[last]):
+            last -= 1
+        if last < 0:
+            return None
+        name = expansion[last]
+        macro = self._macros.get(name)
+        if macro is None or macro.params is None \
+                or type(name) is _BlockedName or name in disabled:
+            return None
+
+        count = len(tokens)
+        while index < count and _is_space(tokens[index]):
+            index += 1
+        if index == count or tokens[index] != '(':
+            return None
+        del expansion[last]
+        return macro
+
+    def _expand_object(
+            self,
+            macro: Macro,
+            disabled: FrozenSet[str],
+            deps: Optional[Set[str]]
+    ) -> List[str]:
+        """ Expands an object-like macro using the cache if enabled """
+        self._statistics.expansions += 1
+        key = (macro.name, disabled)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._statistics.cache_hits += 1
+            tokens, cached_deps = cached
+            if deps is not None:
+                deps.update(cached_deps)
+            return list(tokens)
+
+        local_deps: Set[str] = {macro.name}
+        tokens = self._expand_tokens(
+            list(macro.body_tokens), disabled | {macro.name}, local_deps
+        )
+        if deps is not None:
+            deps.update(local_deps)
+        self._statistics.cache_misses += 1
+        if self._cache_expansions:
+            self._cache[key] = (tuple(tokens), frozenset(local_deps))
+            for name in local_deps:
+                self._dependents.setdefault(name, set()).add(key)
+        return tokens
+
+    @staticmethod
+    def _collect_args(
+            tokens: List[str], start: int, macro: Macro
+    ) -> Tuple[List[List[str]], int]:
+        """
+        Collects the arguments of a function-like macro call
+
+        :param tokens: The tokens containing the call
+        :param start: The index of the opening parenthesis
+        :param macro: The called macro
+        :returns: The arguments and the index after the closing parenthesis
+        """
+        args: List[List[str]] = []
+        current: List[str] = []
+        depth = 0
+        for i in range(start + 1, len(tokens)):
+            token = tokens[i]
+            if token == '(':
+                depth += 1
+            elif token == ')':
+                if depth == 0:
+                    args.append(current)
+                    return args, i + 1
+                depth -= 1
+            elif token == ',' and depth == 0:
+                args.append(current)
+                current = []
+                continue
+            # Newlines inside of arguments are ordinary whitespace
+            current.append(' ' if _is_space(token) else token)
+        raise LogicalError(
+            f"Unterminated argument list invoking macro '{macro.name}'"
+        )
+
+    def _expand_function(
+            self,
+            macro: Macro,
+            args: List[List[str]],
+            disabled: FrozenSet[str],
+            deps: Optional[Set[str]]
+    ) -> List[str]:
+        """ Substitutes the arguments of a function-like macro and expands it """
+        self._statistics.expansions += 1
+        params = macro.params
+        args = [_strip_space(arg) for arg in args]
+        if not params and args == [[]]:
+            args = []
+        if macro.is_variadic and len(args) >= len(params) - 1:
+            variadic: List[str] = []
+            for arg in args[len(params) - 1:]:
+                if variadic:
+                    variadic.extend((',', ' '))
+                variadic.extend(arg)
+            args = args[:len(params) - 1] + [variadic]
+        if len(args) != len(params):
+            raise LogicalError(
+                f"Macro '{macro.name}' requires {len(params)} arguments, but "
+                f"{len(args)} were passed"
+            )
+
+        raw_args = dict(zip(params, args))
+        expanded_args: Dict[str, List[str]] = {}
+        body = macro.body_tokens
+        result: List[str] = []
+        i, count = 0, len(body)
+        while i < count:
+            token = body[i]
+            i += 1
+            if token == '#':
+                # Stringification of the next parameter
+                j = i
+                while j < count and _is_space(body[j]):
+                    j += 1
+                if j < count and body[j] in raw_args:
+                    result.append(_stringify(raw_args[body[j]]))
+                    i = j + 1
+                    continue
+            elif token in raw_args:
+                if _is_paste_operand(body, i - 1):
+                    result.extend(raw_args[token])
+                else:
+                    if token not in expanded_args:
+                        expanded_args[token] = self._expand_tokens(
+                            raw_args[token], disabled, deps
+                        )
+                    result.extend(expanded_args[token])
+                continue
+            result.append(token)
+
+        return self._expand_tokens(
+            _paste_tokens(result), disabled | {macro.name}, deps
+        )
+
+
+def _is_paste_operand(tokens: Tuple[str, ...], index: int) -> bool:
+    """ Returns whether the token at index is an operand of '##' """
+    i = index - 1
+    while i >= 0 and _is_space(tokens[i]):
+        i -= 1
+    if i >= 0 and tokens[i] == '##':
+        return True
+    i = index + 1
+    while i < len(tokens) and _is_space(tokens[i]):
+        i += 1
+    return i < len(tokens) and tokens[i] == '##'
+
+
+def _paste_tokens(tokens: List[str]) -> List[str]:
+    """ Concatenates the operands of the '##' operators """
+    out: List[str] = []
+    i, count = 0, len(tokens)
+    while i < count:
+        token = tokens[i]
+        i += 1
+        if token != '##':
+            out.append(token)
+            continue
+
+        while out and _is_space(out[-1]):
+            out.pop()
+        while i < count and _is_space(tokens[i]):
+            i += 1
+        if i < count:
+            out.append(out.pop() + tokens[i] if out else tokens[i])
+            i += 1
+    return out
+
+
+def _stringify(tokens: List[str]) -> str:
+    """ Converts the passed argument to a string literal ('#' operator) """
+    parts: List[str] = []
+    for token in _strip_space(tokens):
+        if _is_space(token):
+            parts.append(' ')
+        elif token[0] in '"\'':
+            parts.append(token.replace('\\', '\\\\').replace('"', '\\"'))
+        else:
+            parts.append(token)
+    return f'"{"".join(parts)}"'
@@ -1,9 +1,19 @@
 # coding=utf-8
 """ Util module for the Para-C Compiler """
 
+from .build_cache import *
 from .c_compiler import *
 from .cleanup_man import *
 from .decorators import *
+from .dfa_cache import *
+from .grammar_kind import *
+from .jobs import *
+from .lexer_kind import *
+from .parse_mode import *
+from .parse_tree import *
 from .pathtools import *
+from .profiling import *
+from .progress import *
 from .stream import *
 from .strtools import *
+from .tree_walker import *
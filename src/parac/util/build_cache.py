@@ -0,0 +1,260 @@
+# coding=utf-8
+"""
+Persistent content-hash cache for the per-file results of the Pre-Processor
+and Compiler, which allows skipping the parsing of unchanged files
+"""
+import hashlib
+import logging
+import os
+import pickle
+from os import PathLike
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+__all__ = [
+    "BUILD_CACHE_FOLDER_NAME",
+    "DEFAULT_BUILD_CACHE_SIZE",
+    "BuildCacheStatistics",
+    "BuildCache"
+]
+
+logger = logging.getLogger(__name__)
+
+BUILD_CACHE_FOLDER_NAME: str = "files"
+# Default max size of the cache folder in bytes (64MB)
+DEFAULT_BUILD_CACHE_SIZE: int = 64 * 1024 * 1024
+# Version of the entry format. Needs to be increased if the format changes
+_FORMAT_VERSION: int = 3
+_ENTRY_EXTENSION: str = ".pickle"
+
+
+class BuildCacheStatistics:
+    """ Counters for the lookups done in a BuildCache """
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: hits={self.hits}, " \
+               f"misses={self.misses}, evictions={self.evictions}>"
+
+    @property
+    def lookups(self) -> int:
+        """ Returns the amount of lookups """
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """ Returns the ratio of lookups that were cache hits """
+        if self.lookups == 0:
+            return 0.0
+        return self.hits / self.lookups
+
+    def reset(self) -> None:
+        """ Resets all counters to 0 """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class BuildCache:
+    """
+    On-disk cache for the file contexts generated by the Pre-Processor and
+    Compiler.
+
+    Every entry is keyed by a hash of the file content, the file path, the
+    compiler version, the encoding and the Pre-Processor defines, meaning a
+    change to any of them results in a cache miss. The entries are stored as
+    separate files, whose modification time is updated on every hit, so the
+    least recently used entries can be evicted once the cache grows larger
+    than max_size.
+    """
+
+    def __init__(
+            self,
+            path: Union[str, PathLike],
+            encoding: str,
+            defines: Optional[Dict[str, str]] = None,
+            max_size: int = DEFAULT_BUILD_CACHE_SIZE
+    ):
+        """
+        :param path: The folder where the entries are stored
+        :param encoding: Encoding the files are read with
+        :param defines: The Pre-Processor defines of the compilation
+        :param max_size: The max size of the cache folder in bytes
+        """
+        from .. import __version__
+
+        self._path = path
+        self._max_size = max_size
+        self._statistics = BuildCacheStatistics()
+
+        _hash = hashlib.sha256()
+        _hash.update(f"{_FORMAT_VERSION}:{__version__}:{encoding}".encode())
+        for name, value in sorted((defines or {}).items()):
+            _hash.update(f"\0{name}={value}".encode())
+        self._base_key: str = _hash.hexdigest()
+
+    @property
+    def path(self) -> Union[str, PathLike]:
+        """ Returns the folder where the entries are stored """
+        return self._path
+
+    @property
+    def max_size(self) -> int:
+        """ Returns the max size of the cache folder in bytes """
+        return self._max_size
+
+    @property
+    def statistics(self) -> BuildCacheStatistics:
+        """ Returns the hit/miss statistics of this cache """
+        return self._statistics
+
+    def get_key(
+            self,
+            namespace: str,
+            file_path: Union[str, PathLike],
+            content: Optional[bytes] = None
+    ) -> Optional[str]:
+        """
+        Returns the key for the passed file, which is generated using the
+        content of the file. Returns None if the file can not be read.
+
+        :param namespace: The namespace of the entry, e.g. 'compiler'
+        :param file_path: The path to the file
+        :param content: The content that should be used instead of the
+        content of the file on disk, e.g. the output of the Pre-Processor
+        """
+        if content is None:
+            try:
+                with open(file_path, 'rb') as file:
+                    content = file.read()
+            except OSError:
+                return None
+
+        _hash = hashlib.sha256()
+        _hash.update(f"{self._base_key}:{namespace}:{file_path}\0".encode())
+        _hash.update(content)
+        return _hash.hexdigest()
+
+    def _get_entry_path(self, key: str) -> str:
+        """ Returns the path to the file of the passed entry """
+        return os.path.join(self.path, f"{key}{_ENTRY_EXTENSION}")
+
+    def get(
+            self,
+            namespace: str,
+            file_path: Union[str, PathLike],
+            content: Optional[bytes] = None
+    ) -> Optional[Any]:
+        """
+        Returns the cached value for the passed file or None if there is no
+        valid entry for the current content of the file
+
+        :param namespace: The namespace of the entry, e.g. 'compiler'
+        :param file_path: The path to the file
+        :param content: The content that should be used instead of the
+        content of the file on disk (see get_key())
+        """
+        key = self.get_key(namespace, file_path, content)
+        entry_path = self._get_entry_path(key) if key else None
+        if entry_path is None or not os.path.isfile(entry_path):
+            self._statistics.misses += 1
+            return None
+
+        try:
+            with open(entry_path, 'rb') as file:
+                value = pickle.load(file)
+        except Exception as e:
+            logger.debug(f"Failed to load the cache entry ({entry_path}): {e}")
+            self._statistics.misses += 1
+            return None
+
+        # Marking the entry as recently used
+        os.utime(entry_path)
+        self._statistics.hits += 1
+        logger.debug(f"Build cache hit for {namespace} ({file_path})")
+        return value
+
+    def put(
+            self,
+            namespace: str,
+            file_path: Union[str, PathLike],
+            value: Any,
+            content: Optional[bytes] = None
+    ) -> bool:
+        """
+        Stores the passed value for the current content of the file
+
+        :param namespace: The namespace of the entry, e.g. 'compiler'
+        :param file_path: The path to the file
+        :param value: The picklable value that should be stored
+        :param content: The content that should be used instead of the
+        content of the file on disk (see get_key())
+        :returns: True if the value was stored
+        """
+        key = self.get_key(namespace, file_path, content)
+        if key is None:
+            return False
+
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Failed to pickle the cache entry ({file_path}): {e}")
+            return False
+
+        entry_path = self._get_entry_path(key)
+        tmp_path = f"{entry_path}.tmp"
+        os.makedirs(self.path, exist_ok=True)
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, entry_path)
+        return True
+
+    def _get_entries(self) -> List[Tuple[float, int, str]]:
+        """
+        Returns the entries of the cache folder as tuples of
+        (last use, size, path)
+        """
+        if not os.path.isdir(self.path):
+            return []
+
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.is_file() and entry.name.endswith(_ENTRY_EXTENSION):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    @property
+    def size(self) -> int:
+        """ Returns the size of all entries in bytes """
+        return sum(size for _, size, _ in self._get_entries())
+
+    def evict(self) -> int:
+        """
+        Removes the least recently used entries until the cache is not larger
+        than max_size
+
+        :returns: The amount of removed entries
+        """
+        entries = sorted(self._get_entries())
+        size = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, entry_size, entry_path in entries:
+            if size <= self.max_size:
+                break
+            os.remove(entry_path)
+            size -= entry_size
+            removed += 1
+
+        self._statistics.evictions += removed
+        if removed:
+            logger.debug(f"Evicted {removed} entries from the build cache")
+        return removed
+
+    def clear(self) -> None:
+        """ Removes all entries of the cache """
+        for _, _, entry_path in self._get_entries():
+            os.remove(entry_path)
@@ -26,6 +26,18 @@ __all__ = [
 logger = logging.getLogger(__name__)
 
 
+def _init_logging_session() -> None:
+    """
+    Initialises the logging session of the RUNTIME_COMPILER if it wasn't
+    already. The compiler is only imported here, since importing it at the
+    start of every decorated call would defeat the lazy import of parac
+    """
+    from .. import RUNTIME_COMPILER
+
+    if not RUNTIME_COMPILER.log_initialised:
+        RUNTIME_COMPILER.init_logging_session()
+
+
 def abortable(
         _func=None,
         *,
@@ -64,7 +76,6 @@ def abortable(
                 exit(1)
 
             try:
-                from .. import RUNTIME_COMPILER
                 try:
                     return func(*args, **kwargs)
                 except InterruptError:
@@ -77,8 +88,7 @@ def abortable(
                         raise InterruptError(exc=e) from e
 
                 except ParacCompilerError as e:
-                    if not RUNTIME_COMPILER.log_initialised:
-                        RUNTIME_COMPILER.init_logging_session()
+                    _init_logging_session()
 
                     log_traceback(
                         level="critical",
@@ -91,8 +101,7 @@ def abortable(
                         raise InterruptError(exc=e) from e
 
                 except Exception as e:
-                    if not RUNTIME_COMPILER.log_initialised:
-                        RUNTIME_COMPILER.init_logging_session()
+                    _init_logging_session()
 
                     if preserve_exception:
                         raise e
@@ -127,13 +136,11 @@ def requires_init(_func=None):
     def _decorator(func):
         @functools.wraps(func)
         def _wrapper(*args, **kwargs):
-            from .. import RUNTIME_COMPILER
             from .. import C_COM_EXISTENCE_OVERWRITE
             from . import (is_c_compiler_ready, cli_initialise_c_compiler)
 
             if not is_c_compiler_ready() and not C_COM_EXISTENCE_OVERWRITE:
-                if not RUNTIME_COMPILER.log_initialised:
-                    RUNTIME_COMPILER.init_logging_session()
+                _init_logging_session()
 
                 init_rich_console()
                 console().print('')
@@ -0,0 +1,304 @@
+# coding=utf-8
+"""
+Process-wide cache for the prediction tables (DFA) of the Antlr4 lexers and
+parsers, which can be persisted to disk to start a compilation with warm
+prediction tables
+"""
+import functools
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import threading
+from os import PathLike
+from typing import (Callable, Dict, List, Optional, Type, Union, Any,
+                    Tuple, TYPE_CHECKING)
+
+if TYPE_CHECKING:
+    from antlr4 import Recognizer
+
+__all__ = [
+    "DFA_CACHE_FILE_NAME",
+    "DFACache",
+    "get_dfa_cache"
+]
+
+logger = logging.getLogger(__name__)
+
+DFA_CACHE_FILE_NAME: str = "dfa.pickle"
+# Version of the file format. Needs to be increased if the format changes
+_FORMAT_VERSION: int = 1
+# The ATN and DFA are deeply linked graphs, which require a large recursion
+# depth for pickling
+_PICKLE_RECURSION_LIMIT: int = 50000
+_PICKLE_STACK_SIZE: int = 256 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _get_runtime_singletons() -> Tuple[Dict[str, Any], Dict[int, str]]:
+    """
+    Returns the singletons of the Antlr4 runtime, which are compared by
+    identity and therefore may not be copied when pickling, by name and the
+    names by the id of the singletons
+    """
+    from antlr4.PredictionContext import PredictionContext
+    from antlr4.atn.ATNSimulator import ATNSimulator
+    from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+    from antlr4.atn.SemanticContext import SemanticContext
+
+    singletons = {
+        "PredictionContext.EMPTY": PredictionContext.EMPTY,
+        "SemanticContext.NONE": SemanticContext.NONE,
+        "ATNSimulator.ERROR": ATNSimulator.ERROR,
+        "LexerATNSimulator.ERROR": LexerATNSimulator.ERROR
+    }
+    return singletons, {id(value): key for key, value in singletons.items()}
+
+
+class _DFAPickler(pickle.Pickler):
+    """ Pickler, which references the runtime singletons by their name """
+
+    def persistent_id(self, obj: Any) -> Optional[str]:
+        """ Returns the name of the object if it's a runtime singleton """
+        return _get_runtime_singletons()[1].get(id(obj))
+
+
+class _DFAUnpickler(pickle.Unpickler):
+    """ Unpickler, which restores the referenced runtime singletons """
+
+    def persistent_load(self, pid: str) -> Any:
+        """ Returns the runtime singleton with the passed name """
+        return _get_runtime_singletons()[0][pid]
+
+
+def _run_with_deep_stack(func: Callable[[], Any]) -> Any:
+    """
+    Runs the passed function in a thread with a larger stack and recursion
+    limit and returns the result or reraises the exception
+    """
+    result: Dict[str, Any] = {}
+
+    def _target():
+        try:
+            result['value'] = func()
+        except BaseException as e:
+            result['exc'] = e
+
+    prev_limit = sys.getrecursionlimit()
+    prev_stack_size = threading.stack_size(_PICKLE_STACK_SIZE)
+    sys.setrecursionlimit(max(prev_limit, _PICKLE_RECURSION_LIMIT))
+    try:
+        thread = threading.Thread(target=_target)
+        thread.start()
+        thread.join()
+    finally:
+        threading.stack_size(prev_stack_size)
+        sys.setrecursionlimit(prev_limit)
+
+    if 'exc' in result:
+        raise result['exc']
+    return result.get('value')
+
+
+class DFACache:
+    """
+    Cache for the prediction tables of the passed recognizer classes.
+
+    The generated Antlr4 recognizers store their ATN and DFA on the class,
+    meaning the DFA is already shared between all lexer and parser instances
+    (and therefore all files) inside a single process. This class manages
+    that shared state, so it can be saved to disk and loaded again in a new
+    process, which avoids the cold start of the prediction, where every
+    decision needs to be computed using the ATN simulation.
+    """
+
+    def __init__(self, recognizers: List[Type['Recognizer']]):
+        self._recognizers: List[Type['Recognizer']] = recognizers
+        self._key: Optional[str] = None
+        self._saved_path: Optional[str] = None
+
+    @property
+    def recognizers(self) -> List[Type['Recognizer']]:
+        """ Returns the recognizer classes managed by this cache """
+        return self._recognizers
+
+    @property
+    def key(self) -> str:
+        """
+        Returns the key of the cache, which identifies the grammars and
+        runtime, the prediction tables were generated with
+        """
+        if self._key is None:
+            _hash = hashlib.sha256()
+            _hash.update(f"{_FORMAT_VERSION}:{sys.version}".encode())
+            for recognizer in self._recognizers:
+                module = sys.modules[recognizer.__module__]
+                _hash.update(recognizer.__name__.encode())
+                _hash.update(module.serializedATN().encode())
+            self._key = _hash.hexdigest()
+        return self._key
+
+    @property
+    def saved_path(self) -> Optional[str]:
+        """
+        Returns the path of the file, which the prediction tables were last
+        saved to or which already contained them, or None if they were never
+        saved
+        """
+        return self._saved_path
+
+    @property
+    def state_count(self) -> int:
+        """ Returns the amount of DFA states of all recognizers """
+        return sum(
+            len(dfa._states)
+            for recognizer in self._recognizers
+            for dfa in recognizer.decisionsToDFA
+        )
+
+    def clear(self) -> None:
+        """
+        Resets the prediction tables of all recognizers, which means the
+        next parse will have to compute every decision again
+        """
+        from antlr4.PredictionContext import PredictionContextCache
+        from antlr4.dfa.DFA import DFA
+
+        for recognizer in self._recognizers:
+            recognizer.decisionsToDFA = [
+                DFA(state, i)
+                for i, state in enumerate(recognizer.atn.decisionToState)
+            ]
+            if hasattr(recognizer, 'sharedContextCache'):
+                recognizer.sharedContextCache = PredictionContextCache()
+
+    def _get_state(self) -> Dict[str, tuple]:
+        """ Returns the state of the recognizers, which will be pickled """
+        return {
+            recognizer.__name__: (
+                recognizer.atn,
+                recognizer.decisionsToDFA,
+                getattr(recognizer, 'sharedContextCache', None)
+            )
+            for recognizer in self._recognizers
+        }
+
+    def _set_state(self, state: Dict[str, tuple]) -> None:
+        """ Sets the unpickled state of the recognizers """
+        for recognizer in self._recognizers:
+            atn, decisions_to_dfa, context_cache = state[recognizer.__name__]
+            recognizer.atn = atn
+            recognizer.decisionsToDFA = decisions_to_dfa
+            if context_cache is not None:
+                recognizer.sharedContextCache = context_cache
+
+    def save(self, path: Union[str, PathLike]) -> bool:
+        """
+        Saves the prediction tables to the passed path
+
+        :returns: True if the file was written. False if the cache was empty
+        or the file on disk already contains as many states
+        """
+        state_count = self.state_count
+        if state_count == 0:
+            return False
+
+        header = self._read_header(path)
+        if header and header['key'] == self.key and \
+                header['states'] >= state_count:
+            self._saved_path = os.fspath(path)
+            return False
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+
+        def _dump():
+            with open(tmp_path, 'wb') as file:
+                pickle.dump(
+                    {
+                        'version': _FORMAT_VERSION,
+                        'key': self.key,
+                        'states': state_count
+                    },
+                    file
+                )
+                _DFAPickler(file, protocol=pickle.HIGHEST_PROTOCOL).dump(
+                    self._get_state()
+                )
+
+        _run_with_deep_stack(_dump)
+        os.replace(tmp_path, path)
+        self._saved_path = os.fspath(path)
+        logger.debug(f"Saved {state_count} DFA states to the cache ({path})")
+        return True
+
+    def load(self, path: Union[str, PathLike]) -> bool:
+        """
+        Loads the prediction tables from the passed path. Will be skipped if
+        the file does not exist, was created for other grammars or if the
+        in-memory prediction tables are already larger.
+
+        :returns: True if the prediction tables were loaded
+        """
+        header = self._read_header(path)
+        if header is None or header['key'] != self.key:
+            return False
+        elif header['states'] <= self.state_count:
+            return False
+
+        try:
+            with open(path, 'rb') as file:
+                pickle.load(file)  # skipping the header
+                state = _DFAUnpickler(file).load()
+        except Exception as e:
+            logger.warning(f"Failed to load the DFA cache ({path}): {e}")
+            return False
+
+        self._set_state(state)
+        logger.debug(
+            f"Loaded {header['states']} DFA states from the cache ({path})"
+        )
+        return True
+
+    @staticmethod
+    def _read_header(path: Union[str, PathLike]) -> Optional[dict]:
+        """ Reads the header of the cache file if it exists and is valid """
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, 'rb') as file:
+                header = pickle.load(file)
+        except Exception:
+            return None
+
+        if type(header) is not dict or \
+                header.get('version') != _FORMAT_VERSION:
+            return None
+        return header
+
+
+_dfa_cache: Optional[DFACache] = None
+
+
+def get_dfa_cache() -> DFACache:
+    """
+    Returns the process-wide DFACache for the lexers and parsers of the
+    Pre-Processor and Compiler
+    """
+    global _dfa_cache
+    if _dfa_cache is None:
+        from ..compiler.parser.python.ParaCLexer import ParaCLexer
+        from ..compiler.parser.python.ParaCParser import ParaCParser
+        from ..preprocessor.python.ParaCPreProcessorLexer import \
+            ParaCPreProcessorLexer
+        from ..preprocessor.python.ParaCPreProcessorParser import \
+            ParaCPreProcessorParser
+
+        _dfa_cache = DFACache([
+            ParaCPreProcessorLexer,
+            ParaCPreProcessorParser,
+            ParaCLexer,
+            ParaCParser
+        ])
+    return _dfa_cache
@@ -0,0 +1,40 @@
+# coding=utf-8
+"""
+Grammar kinds, which select the grammar (lexer and parser) of the compiler
+that should be used, e.g. for profiling its prediction decisions
+"""
+import logging
+from enum import Enum
+from typing import Union
+
+__all__ = [
+    "GrammarKind",
+    "get_grammar_kind"
+]
+
+logger = logging.getLogger(__name__)
+
+
+class GrammarKind(Enum):
+    """
+    Grammars of the compiler
+
+    - PARAC:
+        The Para-C grammar (ParaC.g4), which is lexed using the FastParaCLexer
+        and parsed using the FlatParaCParser, same as in the compiler.
+    - PREPROCESSOR:
+        The Pre-Processor grammar (ParaCPreProcessor.g4).
+    """
+    PARAC = "parac"
+    PREPROCESSOR = "preprocessor"
+
+
+def get_grammar_kind(kind: Union[str, GrammarKind]) -> GrammarKind:
+    """
+    Converts the passed str to a GrammarKind
+
+    :raises ValueError: If the passed string is not a valid grammar kind
+    """
+    if isinstance(kind, GrammarKind):
+        return kind
+    return GrammarKind(kind.strip().lower())
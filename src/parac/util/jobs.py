@@ -0,0 +1,25 @@
+# coding=utf-8
+""" Helper for the amount of worker processes used by the compiler """
+import logging
+import os
+from typing import Optional
+
+__all__ = [
+    "get_job_count"
+]
+
+logger = logging.getLogger(__name__)
+
+
+def get_job_count(jobs: Optional[int]) -> int:
+    """
+    Returns the amount of worker processes that should be used. If jobs is
+    None or 0 the amount of CPUs is returned
+
+    :raises ValueError: If jobs is negative
+    """
+    if not jobs:
+        return os.cpu_count() or 1
+    elif jobs < 0:
+        raise ValueError(f"The amount of jobs must be positive, not {jobs}")
+    return jobs
@@ -0,0 +1,48 @@
+# coding=utf-8
+"""
+Lexer kinds, which select the lexer used for tokenizing the Para-C files
+"""
+import logging
+from enum import Enum
+from typing import Union
+
+__all__ = [
+    "LexerKind",
+    "DEFAULT_LEXER_KIND",
+    "get_lexer_kind"
+]
+
+logger = logging.getLogger(__name__)
+
+
+class LexerKind(Enum):
+    """
+    Lexers that can be used for tokenizing a Para-C file
+
+    - FAST:
+        Regex based lexer (FastParaCLexer), which matches every token using a
+        single compiled regex. Emits the same tokens as the Antlr4 lexer and
+        only uses the Antlr4 lexer for invalid input.
+    - ANTLR:
+        The generated Antlr4 lexer (ParaCLexer), which interprets the lexer
+        ATN one character at a time.
+    """
+    FAST = "fast"
+    ANTLR = "antlr"
+
+
+DEFAULT_LEXER_KIND: LexerKind = LexerKind.FAST
+
+
+def get_lexer_kind(kind: Union[str, LexerKind, None]) -> LexerKind:
+    """
+    Converts the passed str to a LexerKind. If the kind is None the
+    DEFAULT_LEXER_KIND is returned
+
+    :raises ValueError: If the passed string is not a valid lexer kind
+    """
+    if kind is None:
+        return DEFAULT_LEXER_KIND
+    elif isinstance(kind, LexerKind):
+        return kind
+    return LexerKind(kind.strip().lower())
@@ -0,0 +1,175 @@
+# coding=utf-8
+"""
+Parse-modes for the Antlr4 parsers, which control the prediction strategy
+used while parsing a file
+"""
+import logging
+from enum import Enum
+from typing import Callable, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import antlr4
+    from antlr4 import ParserRuleContext
+    from antlr4.error.ErrorListener import ErrorListener
+
+__all__ = [
+    "ParseMode",
+    "ParseModeStatistics",
+    "DEFAULT_PARSE_MODE",
+    "get_parse_mode",
+    "parse_with_mode"
+]
+
+logger = logging.getLogger(__name__)
+
+
+class ParseMode(Enum):
+    """
+    Prediction modes that can be used for parsing a file
+
+    - TWO_STAGE:
+        Parses first using the fast SLL prediction with a bail-out error
+        strategy and only re-parses using the full LL prediction if the SLL
+        stage failed. If SLL succeeds the result is identical to an LL parse.
+    - SLL:
+        Only uses the SLL prediction. Faster, but might report syntax errors
+        for valid input that requires full-context prediction.
+    - LL:
+        Only uses the full LL prediction (default Antlr4 behaviour).
+    """
+    TWO_STAGE = "two-stage"
+    SLL = "sll"
+    LL = "ll"
+
+
+DEFAULT_PARSE_MODE: ParseMode = ParseMode.TWO_STAGE
+
+
+class ParseModeStatistics:
+    """
+    Counters for the parses done with a parser, which show how often the
+    SLL stage succeeded and how often the LL fallback was required
+    """
+
+    def __init__(self):
+        self.sll_parses: int = 0
+        self.ll_parses: int = 0
+        self.ll_fallbacks: int = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: sll_parses={self.sll_parses}, " \
+               f"ll_parses={self.ll_parses}, " \
+               f"ll_fallbacks={self.ll_fallbacks}>"
+
+    @property
+    def total_parses(self) -> int:
+        """ Returns the amount of parsed files (fallbacks not included) """
+        return self.sll_parses + self.ll_parses - self.ll_fallbacks
+
+    @property
+    def fallback_rate(self) -> float:
+        """
+        Returns the ratio of two-stage parses that required the LL fallback
+        """
+        if self.sll_parses == 0:
+            return 0.0
+        return self.ll_fallbacks / self.sll_parses
+
+    def reset(self) -> None:
+        """ Resets all counters to 0 """
+        self.sll_parses = 0
+        self.ll_parses = 0
+        self.ll_fallbacks = 0
+
+
+def get_parse_mode(mode: Union[str, ParseMode, None]) -> ParseMode:
+    """
+    Converts the passed str to a ParseMode. If the mode is None the
+    DEFAULT_PARSE_MODE is returned
+
+    :raises ValueError: If the passed string is not a valid parse-mode
+    """
+    if mode is None:
+        return DEFAULT_PARSE_MODE
+    elif isinstance(mode, ParseMode):
+        return mode
+    return ParseMode(mode.strip().lower())
+
+
+def _free_cancelled_parse(e: Exception) -> None:
+    """
+    Frees the partial tree of a parse cancelled by the BailErrorStrategy. The
+    nodes and the traceback of the exception reference each other, so the
+    tree would otherwise stay alive until the next full garbage collection
+    """
+    from .parse_tree import free_parse_tree
+
+    # The BailErrorStrategy passes the RecognitionException as argument.
+    # Every context of the rule invocation stack is freed, since a context
+    # might not have been added to its parent yet (see FlatParaCParser)
+    cause = e.args[0] if e.args else None
+    ctx = getattr(cause, 'ctx', None)
+    while ctx is not None:
+        parent = getattr(ctx, 'parentCtx', None)
+        free_parse_tree(ctx, free_recognizers=False)
+        ctx = parent
+
+    for exc in (e, cause):
+        if isinstance(exc, BaseException):
+            exc.__traceback__ = None
+
+
+def parse_with_mode(
+        parser: 'antlr4.Parser',
+        start_rule: Callable[[], 'ParserRuleContext'],
+        error_listener: 'ErrorListener',
+        mode: Union[str, ParseMode, None],
+        statistics: ParseModeStatistics
+) -> 'ParserRuleContext':
+    """
+    Parses using the passed parser and start rule with the prediction
+    strategy of the passed mode.
+
+    :param parser: The parser, which should not have any error listeners
+    attached, since they are managed by this function
+    :param start_rule: The bound rule method of the parser, which should be
+    used as entry point (e.g. parser.compilationUnit)
+    :param error_listener: The error listener that should be used for the
+    actual error reporting
+    :param mode: The ParseMode that should be used
+    :param statistics: The statistics instance, which should be updated
+    :returns: The context returned by the start rule
+    """
+    from antlr4.atn.PredictionMode import PredictionMode
+    from antlr4.error.ErrorStrategy import (BailErrorStrategy,
+                                            DefaultErrorStrategy)
+    from antlr4.error.Errors import ParseCancellationException
+
+    mode = get_parse_mode(mode)
+
+    if mode is not ParseMode.LL:
+        statistics.sll_parses += 1
+        parser._interp.predictionMode = PredictionMode.SLL
+
+        if mode is ParseMode.SLL:
+            parser.addErrorListener(error_listener)
+            return start_rule()
+
+        # Errors in this stage are not reported, since they will be
+        # reported by the LL stage if it's a real syntax error
+        parser.removeErrorListeners()
+        parser._errHandler = BailErrorStrategy()
+        try:
+            return start_rule()
+        except ParseCancellationException as e:
+            statistics.ll_fallbacks += 1
+            logger.debug("SLL prediction failed. Falling back to LL")
+            _free_cancelled_parse(e)
+
+        parser.reset()
+        parser._errHandler = DefaultErrorStrategy()
+
+    statistics.ll_parses += 1
+    parser._interp.predictionMode = PredictionMode.LL
+    parser.addErrorListener(error_listener)
+    return start_rule()
@@ -0,0 +1,66 @@
+# coding=utf-8
+"""
+Helpers for releasing Antlr4 parse trees once they are not needed anymore
+"""
+import logging
+from typing import Any, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from antlr4 import ParserRuleContext
+
+__all__ = [
+    "free_parse_tree"
+]
+
+logger = logging.getLogger(__name__)
+
+
+def free_parse_tree(
+        tree: 'ParserRuleContext', free_recognizers: bool = True
+) -> int:
+    """
+    Breaks the reference cycles of the passed parse tree and of the parser and
+    lexer that created it.
+
+    The nodes reference their parents and the exceptions raised while
+    parsing them, the parser and lexer reference their ATN simulators and the
+    lexer references itself, which means the tree, the token buffer and the
+    input stream would otherwise stay alive until the next full collection of
+    the garbage collector. After freeing them they are released as soon as
+    the last reference is dropped.
+
+    The tree, its tokens and the parser can not be used afterwards.
+
+    :param tree: The root of the tree
+    :param free_recognizers: If set to True the parser and lexer are freed as
+    well. Should be False if they are reused for parsing again
+    :returns: The amount of freed nodes
+    """
+    parser = getattr(tree, 'parser', None)
+
+    freed = 0
+    stack: List[Any] = [tree]
+    while stack:
+        node = stack.pop()
+        freed += 1
+        children = getattr(node, 'children', None)
+        if children:
+            stack.extend(children)
+            node.children = None
+        node.parentCtx = None
+        if getattr(node, 'exception', None) is not None:
+            node.exception = None
+        if getattr(node, 'parser', None) is not None:
+            node.parser = None
+
+    if free_recognizers and parser is not None:
+        lexer = getattr(parser._input, 'tokenSource', None)
+        parser._interp = None
+        parser._input = None
+        parser._ctx = None
+        if lexer is not None:
+            lexer._interp = None
+            lexer._input = None
+            lexer._tokenFactorySourcePair = None
+            lexer._token = None
+    return freed
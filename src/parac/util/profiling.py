@@ -0,0 +1,209 @@
+# coding=utf-8
+"""
+Instrumentation of a compilation, which measures the wall and CPU time of the
+phases and the steps (lexing, parsing, walking) of every processed file.
+
+The measurement of the steps is done per file and is always enabled, since it
+only costs a few clock reads per file. The Profiler, which collects the
+measurements and optionally runs cProfile per phase, is only created if
+profiling was requested (parac compile --profile)
+"""
+import contextlib
+import logging
+import time
+from os import PathLike
+from typing import Dict, Iterator, List, Optional, Tuple, Union, \
+    TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import cProfile
+
+__all__ = [
+    'STEP_LEX',
+    'STEP_PARSE',
+    'STEP_WALK',
+    'STEPS',
+    'StepTimer',
+    'TimingRecord',
+    'Profiler'
+]
+
+logger = logging.getLogger(__name__)
+
+STEP_LEX: str = "lex"
+STEP_PARSE: str = "parse"
+STEP_WALK: str = "walk"
+STEPS: List[str] = [STEP_LEX, STEP_PARSE, STEP_WALK]
+
+# Wall and CPU time in seconds
+Timing = Tuple[float, float]
+
+
+class StepTimer:
+    """ Measures the wall and CPU time of consecutive steps """
+    __slots__ = ('_wall', '_cpu', 'steps')
+
+    def __init__(self):
+        self._wall: float = time.perf_counter()
+        self._cpu: float = time.process_time()
+        self.steps: Dict[str, Timing] = {}
+
+    def lap(self, step: str) -> None:
+        """ Records the time since the last lap (or the creation) as step """
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        self.steps[step] = (wall - self._wall, cpu - self._cpu)
+        self._wall, self._cpu = wall, cpu
+
+
+class TimingRecord:
+    """ Timings of a phase or of a file processed in a phase """
+
+    def __init__(
+            self,
+            phase: str,
+            file: Optional[str],
+            wall: float = 0.0,
+            cpu: float = 0.0,
+            tokens: int = 0,
+            nodes: int = 0,
+            steps: Optional[Dict[str, Timing]] = None,
+            cached: bool = False
+    ):
+        """
+        :param phase: The name of the phase
+        :param file: The relative name of the file or None if the record
+        covers the entire phase
+        :param wall: The wall time in seconds
+        :param cpu: The CPU time in seconds
+        :param tokens: The amount of tokens
+        :param nodes: The amount of parse tree nodes
+        :param steps: The timings of the steps (see STEPS)
+        :param cached: True if the file was taken from the build cache
+        """
+        self.phase: str = phase
+        self.file: Optional[str] = file
+        self.wall: float = wall
+        self.cpu: float = cpu
+        self.tokens: int = tokens
+        self.nodes: int = nodes
+        self.steps: Dict[str, Timing] = steps or {}
+        self.cached: bool = cached
+
+    def __repr__(self) -> str:
+        return (
+            f"<TimingRecord phase={self.phase} file={self.file} "
+            f"wall={self.wall:.6f} cpu={self.cpu:.6f}>"
+        )
+
+
+class Profiler:
+    """
+    Collects the timings of a compilation. If profile_phases is True every
+    phase is additionally run under its own cProfile.Profile, so the
+    statistics of the hottest phase can be dumped using dump_hottest_phase()
+    """
+
+    def __init__(self, profile_phases: bool = False):
+        """
+        :param profile_phases: If set to True the phases are run under
+        cProfile. Note that only the current process is profiled, which means
+        files parsed by worker processes (--jobs) are not included
+        """
+        self._profile_phases = profile_phases
+        self._phases: Dict[str, TimingRecord] = {}
+        self._files: List[TimingRecord] = []
+        self._profiles: Dict[str, 'cProfile.Profile'] = {}
+
+    @property
+    def phases(self) -> Dict[str, TimingRecord]:
+        """ Returns the records of the measured phases """
+        return self._phases
+
+    @property
+    def files(self) -> List[TimingRecord]:
+        """ Returns the records of the processed files """
+        return self._files
+
+    @contextlib.contextmanager
+    def measure_phase(self, phase: str) -> Iterator[TimingRecord]:
+        """
+        Measures the wall and CPU time of the code run inside the context and
+        records it as the passed phase
+        """
+        record = self._phases[phase] = TimingRecord(phase, None)
+        profile = None
+        if self._profile_phases:
+            import cProfile
+            profile = self._profiles[phase] = cProfile.Profile()
+
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+            record.wall = time.perf_counter() - wall
+            record.cpu = time.process_time() - cpu
+
+    def add_file(
+            self,
+            phase: str,
+            file: str,
+            steps: Dict[str, Timing],
+            tokens: int,
+            nodes: int,
+            cached: bool
+    ) -> None:
+        """
+        Records a file processed in the passed phase. The tokens and nodes are
+        also added to the record of the phase
+        """
+        self._files.append(
+            TimingRecord(
+                phase, file,
+                wall=sum(wall for wall, _ in steps.values()),
+                cpu=sum(cpu for _, cpu in steps.values()),
+                tokens=tokens,
+                nodes=nodes,
+                steps=steps,
+                cached=cached
+            )
+        )
+        if phase not in self._phases:
+            self._phases[phase] = TimingRecord(phase, None)
+        self._phases[phase].tokens += tokens
+        self._phases[phase].nodes += nodes
+
+    def get_sorted_records(self) -> List[TimingRecord]:
+        """
+        Returns the records of the phases and files sorted by their wall time
+        (descending)
+        """
+        return sorted(
+            [*self._phases.values(), *self._files],
+            key=lambda r: r.wall,
+            reverse=True
+        )
+
+    def dump_hottest_phase(
+            self, path: Union[str, PathLike]
+    ) -> Optional[str]:
+        """
+        Writes the cProfile statistics of the hottest phase to the passed path,
+        which can be read using pstats or snakeviz
+
+        :returns: The name of the dumped phase or None if no phase was profiled
+        """
+        import pstats
+
+        profiled = [p for p in self._phases if p in self._profiles]
+        if not profiled:
+            return None
+        phase = max(profiled, key=lambda p: self._phases[p].wall)
+        pstats.Stats(self._profiles[phase]).dump_stats(path)
+        logger.debug(f"Wrote the profile of phase '{phase}' to {path}")
+        return phase
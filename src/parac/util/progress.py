@@ -0,0 +1,353 @@
+# coding=utf-8
+"""
+Progress events of a compilation, which are computed from the actual work
+done (files, bytes and tokens) and can be consumed as a typed event stream or
+serialised as JSON lines
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..compiler import FinishedProcess
+
+__all__ = [
+    'PHASE_PREPROCESSOR',
+    'PHASE_TEMP_FILES',
+    'PHASE_COMPILER',
+    'FILE_PHASES',
+    'ProgressEvent',
+    'PhaseStartedEvent',
+    'FileCompletedEvent',
+    'PhaseFinishedEvent',
+    'CompilationFinishedEvent',
+    'PhaseStatistics',
+    'ProgressTracker'
+]
+
+logger = logging.getLogger(__name__)
+
+PHASE_PREPROCESSOR: str = "preprocessor"
+PHASE_TEMP_FILES: str = "temp-files"
+PHASE_COMPILER: str = "compiler"
+# Phases, which process the files of the program one by one. The overall
+# progress is the average of the progress of these phases
+FILE_PHASES: List[str] = [PHASE_PREPROCESSOR, PHASE_COMPILER]
+
+
+class ProgressEvent:
+    """ Base class of the events emitted during a compilation """
+    event_type: str = ""
+
+    def __init__(self, progress: float, elapsed: float):
+        """
+        :param progress: The overall progress of the compilation from 0 to 1
+        :param elapsed: The seconds since the compilation started
+        """
+        self.progress: float = progress
+        self.elapsed: float = elapsed
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self.to_dict()}>"
+
+    def _get_data(self) -> Dict[str, Any]:
+        """ Returns the event specific data for to_dict() """
+        return {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Returns the event as a JSON serializable dict """
+        return {
+            'event': self.event_type,
+            'progress': round(self.progress, 4),
+            'elapsed': round(self.elapsed, 6),
+            **self._get_data()
+        }
+
+    def to_json(self) -> str:
+        """ Returns the event as a single line of JSON """
+        return json.dumps(self.to_dict())
+
+
+class PhaseStartedEvent(ProgressEvent):
+    """ Emitted when a phase of the compilation starts """
+    event_type: str = "phase-started"
+
+    def __init__(
+            self,
+            phase: str,
+            description: str,
+            progress: float,
+            elapsed: float
+    ):
+        super().__init__(progress, elapsed)
+        self.phase: str = phase
+        self.description: str = description
+
+    def _get_data(self) -> Dict[str, Any]:
+        return {'phase': self.phase, 'description': self.description}
+
+
+class FileCompletedEvent(ProgressEvent):
+    """ Emitted when a file was processed in a phase """
+    event_type: str = "file-completed"
+
+    def __init__(
+            self,
+            phase: str,
+            file: str,
+            file_bytes: int,
+            tokens: int,
+            duration: float,
+            cached: bool,
+            files_completed: int,
+            files_total: int,
+            progress: float,
+            elapsed: float
+    ):
+        """
+        :param phase: The phase the file was processed in
+        :param file: The name of the file relative to the working directory
+        :param file_bytes: The size of the file in bytes
+        :param tokens: The amount of tokens the file was lexed into
+        :param duration: The seconds lexing, parsing and walking the file took
+        :param cached: True if the result was taken from the build cache
+        :param files_completed: The amount of processed files in the phase
+        :param files_total: The (expected) amount of files of the phase
+        """
+        super().__init__(progress, elapsed)
+        self.phase: str = phase
+        self.file: str = file
+        self.file_bytes: int = file_bytes
+        self.tokens: int = tokens
+        self.duration: float = duration
+        self.cached: bool = cached
+        self.files_completed: int = files_completed
+        self.files_total: int = files_total
+
+    def _get_data(self) -> Dict[str, Any]:
+        return {
+            'phase': self.phase,
+            'file': self.file,
+            'bytes': self.file_bytes,
+            'tokens': self.tokens,
+            'duration': round(self.duration, 6),
+            'cached': self.cached,
+            'files_completed': self.files_completed,
+            'files_total': self.files_total
+        }
+
+
+class PhaseFinishedEvent(ProgressEvent):
+    """ Emitted when a phase of the compilation finished """
+    event_type: str = "phase-finished"
+
+    def __init__(
+            self,
+            phase: str,
+            statistics: PhaseStatistics,
+            progress: float,
+            elapsed: float
+    ):
+        super().__init__(progress, elapsed)
+        self.phase: str = phase
+        self.statistics: PhaseStatistics = statistics
+
+    def _get_data(self) -> Dict[str, Any]:
+        return {'phase': self.phase, **self.statistics.to_dict()}
+
+
+class CompilationFinishedEvent(ProgressEvent):
+    """
+    Emitted when the compilation finished. Contains the duration of every
+    phase and the finished process, which is not serialised
+    """
+    event_type: str = "finished"
+
+    def __init__(
+            self,
+            phases: Dict[str, PhaseStatistics],
+            finished_process: FinishedProcess,
+            elapsed: float
+    ):
+        super().__init__(1.0, elapsed)
+        self.phases: Dict[str, PhaseStatistics] = phases
+        self.finished_process: FinishedProcess = finished_process
+
+    def _get_data(self) -> Dict[str, Any]:
+        return {
+            'phases': {
+                phase: round(stats.duration, 6)
+                for phase, stats in self.phases.items()
+            }
+        }
+
+
+class PhaseStatistics:
+    """ Counters for the work done in a single phase """
+
+    def __init__(self, expected_files: int = 0):
+        """
+        :param expected_files: The amount of files the phase is expected to
+        process, e.g. the amount of files of the last compilation
+        """
+        self.expected_files: int = expected_files
+        self.files_queued: int = 0
+        self.files_completed: int = 0
+        self.cached_files: int = 0
+        self.file_bytes: int = 0
+        self.tokens: int = 0
+        self.start: float = time.perf_counter()
+        self.duration: float = 0.0
+        self.finished: bool = False
+
+    @property
+    def files_total(self) -> int:
+        """
+        Returns the amount of files of the phase, which is the expected amount
+        until more files were queued or completed
+        """
+        return max(
+            self.expected_files, self.files_queued, self.files_completed
+        )
+
+    @property
+    def progress(self) -> float:
+        """ Returns the progress of the phase from 0 to 1 """
+        if self.finished:
+            return 1.0
+        elif self.files_total == 0:
+            return 0.0
+        return self.files_completed / self.files_total
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Returns the statistics as a JSON serializable dict """
+        return {
+            'duration': round(self.duration, 6),
+            'files': self.files_completed,
+            'cached_files': self.cached_files,
+            'bytes': self.file_bytes,
+            'tokens': self.tokens
+        }
+
+
+class ProgressTracker:
+    """
+    Tracks the work done by a compilation and emits the ProgressEvents to
+    the subscribed callbacks
+    """
+
+    def __init__(self):
+        self._start: float = time.perf_counter()
+        self._phases: Dict[str, PhaseStatistics] = {}
+        self._subscribers: List[Callable[[ProgressEvent], Any]] = []
+
+    @property
+    def phases(self) -> Dict[str, PhaseStatistics]:
+        """ Returns the statistics of the started phases """
+        return self._phases
+
+    @property
+    def elapsed(self) -> float:
+        """ Returns the seconds since the tracker was (re)started """
+        return time.perf_counter() - self._start
+
+    @property
+    def progress(self) -> float:
+        """
+        Returns the overall progress from 0 to 1, which is the average
+        progress of the FILE_PHASES
+        """
+        return sum(
+            self._phases[phase].progress
+            for phase in FILE_PHASES if phase in self._phases
+        ) / len(FILE_PHASES)
+
+    def subscribe(self, callback: Callable[[ProgressEvent], Any]) -> None:
+        """ Adds a callback, which is called with every emitted event """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ProgressEvent], Any]) -> None:
+        """ Removes a callback added with subscribe() """
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def emit(self, event: ProgressEvent) -> None:
+        """ Passes the event to all subscribers """
+        for callback in list(self._subscribers):
+            callback(event)
+
+    def restart(self) -> None:
+        """ Resets the phases and the start time """
+        self._start = time.perf_counter()
+        self._phases = {}
+
+    def start_phase(
+            self, phase: str, description: str, expected_files: int = 0
+    ) -> None:
+        """
+        Starts the passed phase
+
+        :param phase: The name of the phase
+        :param description: The description, which is shown to the user
+        :param expected_files: The amount of files the phase is expected to
+        process, which is used until more files were queued
+        """
+        self._phases[phase] = PhaseStatistics(expected_files)
+        logger.debug(f"Started phase '{phase}'")
+        self.emit(
+            PhaseStartedEvent(phase, description, self.progress, self.elapsed)
+        )
+
+    def _get_phase(self, phase: str) -> PhaseStatistics:
+        """ Returns the statistics of the phase and starts it if needed """
+        if phase not in self._phases:
+            self._phases[phase] = PhaseStatistics()
+        return self._phases[phase]
+
+    def add_files(self, phase: str, count: int) -> None:
+        """ Adds files, which were queued for processing in the phase """
+        self._get_phase(phase).files_queued += count
+
+    def file_completed(
+            self,
+            phase: str,
+            file: str,
+            file_bytes: int,
+            tokens: int,
+            duration: float,
+            cached: bool
+    ) -> None:
+        """ Records a processed file (see FileCompletedEvent) """
+        stats = self._get_phase(phase)
+        stats.files_completed += 1
+        stats.cached_files += int(cached)
+        stats.file_bytes += file_bytes
+        stats.tokens += tokens
+        self.emit(
+            FileCompletedEvent(
+                phase, file, file_bytes, tokens, duration, cached,
+                stats.files_completed, stats.files_total,
+                self.progress, self.elapsed
+            )
+        )
+
+    def finish_phase(self, phase: str) -> None:
+        """ Finishes the passed phase """
+        stats = self._get_phase(phase)
+        stats.duration = time.perf_counter() - stats.start
+        stats.finished = True
+        logger.debug(f"Finished phase '{phase}' in {stats.duration:.3f}s")
+        self.emit(
+            PhaseFinishedEvent(phase, stats, self.progress, self.elapsed)
+        )
+
+    def finish(self, finished_process: Optional[FinishedProcess]) -> None:
+        """ Emits the CompilationFinishedEvent """
+        self.emit(
+            CompilationFinishedEvent(
+                self._phases, finished_process, self.elapsed
+            )
+        )
@@ -1,29 +1,184 @@
 # coding=utf-8
 """ Stream File for implementing functions for the antlr4 streams """
+import os
+import sys
+from array import array
 from os import PathLike
-from typing import Union
-import antlr4
+from typing import Callable, Optional, Union, Sequence
 
 __all__ = [
+    "SourceStream",
+    "read_source_file",
+    "get_source_stream",
     "get_file_stream",
     "get_input_stream"
 ]
 
+# Same value as antlr4.Token.EOF, which is not imported to keep the import of
+# the util module free of the antlr4 runtime
+_EOF: int = -1
+_UTF32: str = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
 
-def get_file_stream(
-        path: Union[str, PathLike], encoding: str
-) -> antlr4.FileStream:
-    """ Fetches the FileStream from a file """
+
+class SourceStream:
+    """
+    Character stream for the Antlr4 lexers, which can be used in place of
+    antlr4.InputStream and antlr4.FileStream.
+
+    The antlr4 streams expand the text into a list of ints, which costs a
+    pointer per character. This stream keeps the text itself and stores the
+    code points in a compact buffer instead: a bytes object (1 byte per
+    character) for pure ASCII text, else an array of 4 byte code points.
+    """
+    __slots__ = ('name', 'fileName', 'strdata', 'data', '_index', '_size')
+
+    def __init__(
+            self,
+            data: str,
+            name: str = "<empty>",
+            file_name: Optional[Union[str, PathLike]] = None
+    ):
+        """
+        :param data: The text of the stream
+        :param name: The name of the stream, which is the simple file name
+        for files
+        :param file_name: The path of the file the text was read from
+        """
+        self.name: str = name
+        self.fileName: Optional[Union[str, PathLike]] = file_name
+        self.strdata: str = data
+        self.data: Sequence[int] = self._encode(data)
+        self._index: int = 0
+        self._size: int = len(data)
+
+    @staticmethod
+    def _encode(data: str) -> Sequence[int]:
+        """ Returns a buffer of the code points, which is indexable by char """
+        if data.isascii():
+            return data.encode('ascii')
+        return array('I', data.encode(_UTF32))
+
+    def __str__(self) -> str:
+        return self.strdata
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: name={self.name!r}, " \
+               f"size={self._size}>"
+
+    @property
+    def index(self) -> int:
+        """ Returns the index of the current character """
+        return self._index
+
+    @property
+    def size(self) -> int:
+        """ Returns the amount of characters in the stream """
+        return self._size
+
+    def reset(self) -> None:
+        """ Resets the stream to the start of the text """
+        self._index = 0
+
+    def consume(self) -> None:
+        """ Moves the stream to the next character """
+        if self._index >= self._size:
+            raise Exception("cannot consume EOF")
+        self._index += 1
+
+    def LA(self, offset: int) -> int:
+        """
+        Returns the code point at the passed offset relative to the current
+        character (1 is the current character, -1 the previous one)
+        """
+        if offset > 0:
+            pos = self._index + offset - 1
+        elif offset < 0:
+            pos = self._index + offset
+        else:
+            return 0  # undefined
+        if 0 <= pos < self._size:
+            return self.data[pos]
+        return _EOF
+
+    def LT(self, offset: int) -> int:
+        """ Same as LA() """
+        return self.LA(offset)
+
+    def mark(self) -> int:
+        """ Does nothing, since the entire text is buffered """
+        return -1
+
+    def release(self, marker: int) -> None:
+        """ Does nothing, since the entire text is buffered """
+        pass
+
+    def seek(self, index: int) -> None:
+        """ Moves the stream to the passed index """
+        if index <= self._index:
+            self._index = index
+        else:
+            self._index = min(index, self._size)
+
+    def getText(self, start: int, stop: int) -> str:
+        """ Returns the text from start to stop (both inclusive) """
+        if start >= self._size:
+            return ""
+        return self.strdata[start:stop + 1]
+
+    def getSourceName(self) -> str:
+        """ Returns the name of the stream """
+        return self.name
+
+
+def read_source_file(path: Union[str, PathLike], encoding: str) -> str:
+    """
+    Reads and decodes the passed file. Line endings are kept as they are,
+    like antlr4.FileStream does it
+    """
+    with open(path, 'rb') as file:
+        return file.read().decode(encoding)
+
+
+def get_source_stream(
+        text: str,
+        path: Union[str, PathLike],
+        transform: Optional[Callable[[str], str]] = None
+) -> SourceStream:
+    """
+    Creates the stream of a file from text that is already in memory, e.g.
+    the output of the Pre-Processor
+
+    :param text: The text of the file
+    :param path: The path to the file, which is used for the name of the
+    stream and the relative file name
+    :param transform: Function, which is applied on the text before creating
+    the stream (e.g. for removing comments)
+    """
     from ..const import SEPARATOR
-    stream = antlr4.FileStream(path, encoding)
-    stream.name = path.split(SEPARATOR)[-1]
-    return stream
-
-
-def get_input_stream(
-        string: str, name: str
-) -> antlr4.InputStream:
-    """ Creates a new InputStream based on the passed string """
-    stream = antlr4.InputStream(string)
-    stream.name = name
-    return stream
+
+    if transform is not None:
+        text = transform(text)
+    return SourceStream(
+        text, name=os.fspath(path).split(SEPARATOR)[-1], file_name=path
+    )
+
+
+def get_file_stream(
+        path: Union[str, PathLike],
+        encoding: str,
+        transform: Optional[Callable[[str], str]] = None
+) -> SourceStream:
+    """
+    Fetches the stream of a file. The file is only read and decoded once
+
+    :param path: The path to the file
+    :param encoding: The encoding of the file
+    :param transform: Function, which is applied on the text before creating
+    the stream (e.g. for removing comments)
+    """
+    return get_source_stream(read_source_file(path, encoding), path, transform)
+
+
+def get_input_stream(string: str, name: str) -> SourceStream:
+    """ Creates a new stream based on the passed string """
+    return SourceStream(string, name=name)
@@ -0,0 +1,196 @@
+# coding=utf-8
+"""
+Table-driven walker for Antlr4 parse trees, which only calls the listener
+callbacks that are actually implemented
+"""
+import dis
+import logging
+from types import FunctionType
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, \
+    TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from antlr4.tree.Tree import ParseTree, ParseTreeListener
+
+__all__ = [
+    "is_noop_callback",
+    "DispatchTableWalker"
+]
+
+logger = logging.getLogger(__name__)
+
+# Instructions of a function, which does nothing besides returning None
+_NOOP_INSTRUCTIONS = frozenset({
+    "RESUME", "NOP", "LOAD_CONST", "RETURN_VALUE", "RETURN_CONST"
+})
+
+# Callback, which is called with the listener and the node
+Callback = Callable[[Any, Any], None]
+# Entry of a dispatch table: (enter callback, exit callback) for rule
+# contexts or (visit callback, None) for terminal and error nodes
+DispatchEntry = Tuple[Optional[Callback], Optional[Callback]]
+
+
+def is_noop_callback(func: Any) -> bool:
+    """
+    Returns True if the passed function does nothing besides returning None,
+    e.g. generated callbacks consisting of 'pass' or overwritten callbacks
+    only consisting of a docstring and '...'
+    """
+    func = getattr(func, '__func__', func)
+    if not isinstance(func, FunctionType):
+        return False
+    for instruction in dis.get_instructions(func):
+        if instruction.opname not in _NOOP_INSTRUCTIONS:
+            return False
+        elif instruction.opname in ("LOAD_CONST", "RETURN_CONST") and \
+                instruction.argval is not None:
+            return False
+    return True
+
+
+class _CallbackNameRecorder:
+    """
+    Fake listener, which records the name of the callback a rule context
+    calls in its enterRule() or exitRule()
+    """
+
+    def __init__(self):
+        self.name: Optional[str] = None
+
+    def __getattr__(self, name: str) -> Callable[[Any], None]:
+        self.name = name
+        return lambda ctx: None
+
+
+def _get_callback_name(ctx_type: type, method: str) -> Optional[str]:
+    """
+    Returns the name of the listener callback, which the passed rule context
+    type calls in the passed method ('enterRule' or 'exitRule')
+    """
+    recorder = _CallbackNameRecorder()
+    # The generated contexts only pass themselves to the listener, so the
+    # methods can be called without an instance
+    getattr(ctx_type, method)(None, recorder)
+    return recorder.name
+
+
+class DispatchTableWalker:
+    """
+    Walker for Antlr4 parse trees, which can be used instead of the
+    antlr4.ParseTreeWalker.
+
+    The ParseTreeWalker calls enterEveryRule(), enterRule(), exitRule() and
+    exitEveryRule() on every node, even if the listener only implements a
+    handful of its callbacks. This walker creates a dispatch table per
+    listener type, which maps every node type to the callbacks that are
+    actually implemented (see is_noop_callback()) and skips the others
+    entirely. The tree is walked using an explicit stack, so deep trees do not
+    exceed the recursion limit.
+
+    The order in which the implemented callbacks are called is identical to
+    the ParseTreeWalker.
+    """
+
+    # Dispatch tables per listener type
+    _tables: Dict[type, Dict[type, DispatchEntry]] = {}
+
+    @classmethod
+    def get_dispatch_table(
+            cls, listener_type: Type['ParseTreeListener']
+    ) -> Dict[type, DispatchEntry]:
+        """
+        Returns the dispatch table of the passed listener type. The entries
+        are added once a node type is encountered for the first time
+        """
+        table = cls._tables.get(listener_type)
+        if table is None:
+            table = cls._tables[listener_type] = {}
+        return table
+
+    @staticmethod
+    def _get_implemented(listener_type: type, name: Optional[str]) \
+            -> Optional[Callback]:
+        """
+        Returns the callback with the passed name if it's implemented by the
+        listener type, else None
+        """
+        if name is None:
+            return None
+        func = getattr(listener_type, name, None)
+        if func is None or is_noop_callback(func):
+            return None
+        return func
+
+    @classmethod
+    def _create_entry(
+            cls, listener_type: type, node_type: type
+    ) -> DispatchEntry:
+        """ Creates the dispatch table entry for the passed node type """
+        from antlr4.tree.Tree import ErrorNode, TerminalNode
+
+        if issubclass(node_type, ErrorNode):
+            return cls._get_implemented(listener_type, "visitErrorNode"), None
+        elif issubclass(node_type, TerminalNode):
+            return cls._get_implemented(listener_type, "visitTerminal"), None
+
+        enter_every = cls._get_implemented(listener_type, "enterEveryRule")
+        exit_every = cls._get_implemented(listener_type, "exitEveryRule")
+        enter = cls._get_implemented(
+            listener_type, _get_callback_name(node_type, "enterRule")
+        )
+        _exit = cls._get_implemented(
+            listener_type, _get_callback_name(node_type, "exitRule")
+        )
+
+        def _join(first: Optional[Callback], second: Optional[Callback]) \
+                -> Optional[Callback]:
+            if first is None or second is None:
+                return first or second
+
+            def _both(listener: Any, ctx: Any) -> None:
+                first(listener, ctx)
+                second(listener, ctx)
+            return _both
+
+        return _join(enter_every, enter), _join(_exit, exit_every)
+
+    def walk(self, listener: 'ParseTreeListener', tree: 'ParseTree') -> int:
+        """
+        Walks through the passed tree and calls the implemented callbacks of
+        the listener
+
+        :returns: The amount of visited nodes
+        """
+        listener_type = type(listener)
+        table = self.get_dispatch_table(listener_type)
+        visited = 0
+
+        # The stack contains nodes, which still need to be entered, and
+        # tuples of the exit callback and the node, which need to be exited
+        stack: List[Any] = [tree]
+        while stack:
+            node = stack.pop()
+            if type(node) is tuple:
+                _exit, ctx = node
+                _exit(listener, ctx)
+                continue
+
+            visited += 1
+            node_type = type(node)
+            entry = table.get(node_type)
+            if entry is None:
+                entry = table[node_type] = self._create_entry(
+                    listener_type, node_type
+                )
+
+            enter, _exit = entry
+            if enter is not None:
+                enter(listener, node)
+            if _exit is not None:
+                stack.append((_exit, node))
+
+            children = getattr(node, 'children', None)
+            if children:
+                stack.extend(reversed(children))
+        return visited
@@ -1,39 +1,57 @@
 # coding=utf-8
 """ Main file of the Para-Compiler"""
+import contextlib
 import time
-import asyncio
 from pathlib import Path
-from typing import Union
+from typing import List, Optional, Set, Tuple, Union, TYPE_CHECKING
 import click
 import colorama
 import logging
+import os
 from os import PathLike
-from rich.progress import Progress
 
-from parac import RUNTIME_COMPILER
+from parac import const, CACHE_FOLDER_NAME
 from parac.exceptions import InvalidArgumentsError
 from parac.util import (cli_keep_open_callback, escape_ansi_args,
                         requires_init, is_c_compiler_ready,
-                        cli_initialise_c_compiler, abortable)
+                        cli_initialise_c_compiler, abortable, ParseMode,
+                        DEFAULT_PARSE_MODE, LexerKind, DEFAULT_LEXER_KIND,
+                        GrammarKind)
 from parac.logging import (get_rich_console as console, print_result_banner,
                            cli_create_prompt, cli_format_default,
                            init_rich_console, print_init_banner)
-from parac.compiler import (ProgramCompilationProcess,
-                            BasicProcess, FinishedProcess)
-from .utils import cli_run_output_dir_validation, cli_resolve_path
+from parac_client import SOCKET_ENV_NAME
+from .utils import (cli_run_output_dir_validation, cli_resolve_path,
+                    cli_create_include_tree)
+
+if TYPE_CHECKING:
+    from parac.compiler import (ProgramCompilationProcess, BasicProcess,
+                                FinishedProcess)
+    from parac.compiler.grammar_profiler import GrammarProfiler
 
 __all__ = [
     'cli_create_process',
     'cli_run_output_dir_validation',
     'cli_run_process_with_logging',
+    'log_parse_statistics',
+    'log_build_cache_statistics',
+    'log_include_statistics',
+    'log_profile_report',
+    'PROGRESS_FORMATS',
     'cli_entry',
     'cli_parac_compile',
+    'parac_deps',
+    'parac_profile_grammar',
+    'parac_serve',
     'ParacCLI'
 ]
 
 logger = logging.getLogger(__name__)
 colorama.init(autoreset=True)
 
+# Formats of the compile progress (see cli_run_process_with_logging())
+PROGRESS_FORMATS = ["bar", "json", "none"]
+
 
 @abortable(step="Setup", reraise=True, preserve_exception=True)
 def cli_create_process(
@@ -41,13 +59,26 @@ def cli_create_process(
         encoding: str,
         log_path: Union[str, PathLike, Path],
         build_path: Union[str, PathLike, Path],
-        dist_path: Union[str, PathLike, Path]
-) -> ProgramCompilationProcess:
+        dist_path: Union[str, PathLike, Path],
+        parse_mode: Union[str, ParseMode, None] = None,
+        use_dfa_cache: bool = True,
+        jobs: Optional[int] = 1,
+        use_build_cache: bool = True,
+        profile: bool = False,
+        profile_phases: bool = False,
+        release_parse_trees: bool = True,
+        keep_temp: bool = False,
+        include_paths: Optional[List[str]] = None,
+        lexer: Union[str, LexerKind, None] = None
+) -> 'ProgramCompilationProcess':
     """
     Creates a compilation process, which can be used for compiling Para-C code
     and returns it.
     Activates logging on default
     """
+    from parac import RUNTIME_COMPILER
+    from parac.compiler import ProgramCompilationProcess
+
     if not RUNTIME_COMPILER.log_initialised:
         RUNTIME_COMPILER.init_logging_session(log_path)
 
@@ -55,30 +86,159 @@ def cli_create_process(
     file: str = cli_resolve_path(file).strip()
     build_path: str = cli_resolve_path(build_path).strip()
     dist_path: str = cli_resolve_path(dist_path).strip()
-    return ProgramCompilationProcess(file, encoding, build_path, dist_path)
+    return ProgramCompilationProcess(
+        file, encoding, build_path, dist_path, parse_mode, use_dfa_cache,
+        jobs, use_build_cache, profile=profile, profile_phases=profile_phases,
+        release_parse_trees=release_parse_trees, keep_temp=keep_temp,
+        include_paths=include_paths, lexer=lexer
+    )
 
 
 def create_basic_process(
         file: Union[str, PathLike],
         encoding: str,
-        log_path: Union[str, PathLike]
-) -> BasicProcess:
+        log_path: Union[str, PathLike],
+        parse_mode: Union[str, ParseMode, None] = None,
+        include_paths: Optional[List[str]] = None,
+        lexer: Union[str, LexerKind, None] = None
+) -> 'BasicProcess':
     """
     Creates a basic process, which can be used for syntax validation and
     returns it.
     Activates logging on default
     """
+    from parac import RUNTIME_COMPILER
+    from parac.compiler import BasicProcess
+
     if not RUNTIME_COMPILER.log_initialised:
         RUNTIME_COMPILER.init_logging_session(log_path)
 
-    return BasicProcess(file, encoding)
+    return BasicProcess(file, encoding, parse_mode, include_paths, lexer)
+
+
+def log_parse_statistics() -> None:
+    """
+    Logs how many files were parsed with the SLL prediction and how often
+    the LL fallback was required
+    """
+    from parac.compiler import ParacCompiler
+    from parac.preprocessor import PreProcessor
+
+    for name, stats in (
+            ("Pre-Processor", PreProcessor.parse_statistics),
+            ("Compiler", ParacCompiler.parse_statistics)
+    ):
+        if stats.total_parses == 0:
+            continue
+        logger.info(
+            f"{name} parser: {stats.total_parses} file(s) parsed, "
+            f"{stats.ll_fallbacks} LL fallback(s) "
+            f"({stats.fallback_rate:.0%} of SLL attempts)"
+        )
 
 
-async def run_process(p: ProgramCompilationProcess) -> FinishedProcess:
+def log_build_cache_statistics(p: 'ProgramCompilationProcess') -> None:
+    """
+    Logs how many files were reused from the build cache and how many had to
+    be parsed again
+    """
+    if p.build_cache is None:
+        return
+    stats = p.build_cache.statistics
+    if stats.lookups == 0:
+        return
+    logger.info(
+        f"Build cache: {stats.hits} hit(s), {stats.misses} miss(es) "
+        f"({stats.hit_rate:.0%} hit rate), {stats.evictions} eviction(s)"
+    )
+
+
+def log_include_statistics(p: 'ProgramCompilationProcess') -> None:
+    """
+    Logs how many includes were skipped by the multiple-include optimisation
+    and how many files were not read or parsed again, since they were
+    reached through another path
+    """
+    stats = p.preprocessor_ctx.include_optimizer.statistics
+    if stats.skipped_includes + stats.skipped_reads + stats.skipped_parses \
+            == 0:
+        return
+    logger.info(
+        f"Includes: {stats.skipped_includes} skipped include(s) of guarded "
+        f"files, {stats.skipped_reads + stats.skipped_parses} duplicate "
+        f"path(s) of already parsed files"
+    )
+
+
+def log_profile_report(
+        p: 'ProgramCompilationProcess',
+        profile_output: Optional[str] = None,
+        max_rows: int = 25
+) -> None:
+    """
+    Prints the timings collected by the profiler of the process as a table
+    sorted by the wall time and writes the cProfile statistics of the hottest
+    phase if profile_output is set
+
+    :param p: The compilation process
+    :param profile_output: The path the pstats dump should be written to
+    :param max_rows: The max amount of rows of the table
+    """
+    from rich.table import Table
+    from parac.util import STEPS
+
+    profiler = p.profiler
+    if profiler is None:
+        return
+
+    table = Table(title="Compilation profile (sorted by wall time)")
+    table.add_column("Phase")
+    table.add_column("File")
+    for step in STEPS:
+        table.add_column(f"{step.capitalize()} (ms)", justify="right")
+    table.add_column("Wall (ms)", justify="right")
+    table.add_column("CPU (ms)", justify="right")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Nodes", justify="right")
+
+    records = profiler.get_sorted_records()
+    for record in records[:max_rows]:
+        steps = [
+            f"{record.steps[step][0] * 1000:.2f}"
+            if step in record.steps else "-"
+            for step in STEPS
+        ]
+        table.add_row(
+            record.phase,
+            "*" if record.file is None else (
+                f"{record.file} (cached)" if record.cached else record.file
+            ),
+            *steps,
+            f"{record.wall * 1000:.2f}",
+            f"{record.cpu * 1000:.2f}",
+            str(record.tokens),
+            str(record.nodes)
+        )
+    console().print(table)
+    if len(records) > max_rows:
+        console().print(f"... {len(records) - max_rows} more row(s)")
+
+    if profile_output:
+        phase = profiler.dump_hottest_phase(profile_output)
+        if phase is not None:
+            console().print(
+                f"Wrote the cProfile statistics of the phase '{phase}' to "
+                f"{profile_output}"
+            )
+
+
+async def run_process(p: 'ProgramCompilationProcess') -> 'FinishedProcess':
     """
     Runs the process and returns the finished compilation process
     Calls p.compile(), adds additional formatting and returns the result
     """
+    from parac import RUNTIME_COMPILER
+
     finished_process = await p.compile()
     if RUNTIME_COMPILER.log_initialised:
         print_result_banner()
@@ -86,33 +246,52 @@ async def run_process(p: ProgramCompilationProcess) -> FinishedProcess:
 
 
 async def cli_run_process_with_logging(
-        p: ProgramCompilationProcess
-) -> FinishedProcess:
-    """ Runs the compilation process with console logs and formatting """
+        p: 'ProgramCompilationProcess',
+        progress_format: str = "bar"
+) -> 'FinishedProcess':
+    """
+    Runs the compilation process with console logs and formatting
+
+    :param p: The compilation process
+    :param progress_format: The format of the progress, which is either
+    "bar" for a progress bar, "json" for JSON lines of the progress events
+    written to stderr or "none"
+    """
+    from rich.progress import Progress
+    from parac import RUNTIME_COMPILER
+    from parac.util import (PhaseStartedEvent, FileCompletedEvent,
+                            CompilationFinishedEvent)
+
     finished_process = None
+    progress_bar = None
+    if progress_format == "bar":
+        progress_bar = Progress(console=console(), refresh_per_second=30)
+    with progress_bar or contextlib.nullcontext():
+        if progress_bar is not None:
+            main_task = progress_bar.add_task("[green]Processing...", total=1)
 
-    # Some testing for now
-    with Progress(console=console(), refresh_per_second=30) as progress:
-        max_progress = 100
-        current_progress = 0
-        main_task = progress.add_task(
-            "[green]Processing...",
-            total=max_progress
-        )
+        async for event in p.compile_with_progress_events():
+            if progress_format == "json":
+                click.echo(event.to_json(), err=True)
+
+            if isinstance(event, PhaseStartedEvent):
+                logger.info(event.description)
+            elif isinstance(event, CompilationFinishedEvent):
+                finished_process = event.finished_process
 
-        async for p, status, level, end in \
-                await p.compile_with_progress_iterator():
-            if end is not None:
-                finished_process = end
-                progress.update(main_task, advance=p-current_progress)
-            else:
-                logger.log(level=level, msg=status)
-                progress.update(main_task, advance=p-current_progress)
-                current_progress = p
+            if progress_bar is not None:
+                if isinstance(event, FileCompletedEvent):
+                    progress_bar.update(
+                        main_task, description=f"[green]{event.file}"
+                    )
+                progress_bar.update(main_task, completed=event.progress)
 
     console().print("\n", end="")
     if RUNTIME_COMPILER.log_initialised:
         print_result_banner()
+        log_parse_statistics()
+        log_build_cache_statistics(p)
+        log_include_statistics(p)
     return finished_process
 
 
@@ -219,6 +398,93 @@ def parac_c_init(*args, **kwargs):
     default=False,
     help="If set the compiler will add additional debug information"
 )
+@click.option(
+    "--parse-mode",
+    type=click.Choice([mode.value for mode in ParseMode]),
+    default=DEFAULT_PARSE_MODE.value,
+    help="The prediction mode of the parser. 'two-stage' tries the fast SLL "
+         "prediction first and only falls back to the full LL prediction if "
+         "SLL fails"
+)
+@click.option(
+    "--lexer",
+    type=click.Choice([kind.value for kind in LexerKind]),
+    default=DEFAULT_LEXER_KIND.value,
+    help="The lexer used for the Para-C files. 'fast' matches the tokens "
+         "using a compiled regex and 'antlr' uses the generated Antlr4 lexer"
+)
+@click.option(
+    "-I",
+    "--include-path",
+    "include_paths",
+    type=str,
+    multiple=True,
+    help="Additional directory, which is searched for included files before "
+         "the working directory and the lib folder. Can be passed multiple "
+         "times"
+)
+@click.option(
+    "--dfa-cache/--no-dfa-cache",
+    type=bool,
+    default=True,
+    help="If set the prediction tables of the parsers will be stored in the "
+         "build folder and reused in the next compilation"
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=0),
+    default=1,
+    help="The amount of worker processes used for parsing the files. If set "
+         "to 0 the amount of CPUs is used"
+)
+@click.option(
+    "--cache/--no-cache",
+    type=bool,
+    default=True,
+    help="If set the results of unchanged files will be reused from the "
+         "cache in the build folder instead of parsing them again"
+)
+@click.option(
+    "--release-parse-trees/--keep-parse-trees",
+    type=bool,
+    default=True,
+    help="If set the parse tree of a file is released once its logic stream "
+         "was generated, so the memory usage scales with the largest file "
+         "instead of the entire program"
+)
+@click.option(
+    "--keep-temp",
+    is_flag=True,
+    default=False,
+    help="If set the files processed by the Pre-Processor are additionally "
+         "written to the temp folder in the build folder. The compiler gets "
+         "them in memory either way"
+)
+@click.option(
+    "--progress",
+    type=click.Choice(PROGRESS_FORMATS),
+    default="bar",
+    help="How the progress is shown. 'json' writes the progress events "
+         "(phases, files, bytes, tokens and durations) as JSON lines to "
+         "stderr"
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="If set the wall and CPU time of the phases and of lexing, parsing "
+         "and walking every file are printed as a table after the "
+         "compilation"
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Path the cProfile statistics (pstats) of the slowest phase are "
+         "written to. Implies --profile. Files parsed by worker processes "
+         "(--jobs) are not included"
+)
 @abortable(reraise=False)
 def cli_parac_compile(*args, **kwargs):
     """ Compile a Para-C program to C or executable """
@@ -276,6 +542,93 @@ def cli_parac_compile(*args, **kwargs):
     default=False,
     help="If set the compiler will add additional debug information"
 )
+@click.option(
+    "--parse-mode",
+    type=click.Choice([mode.value for mode in ParseMode]),
+    default=DEFAULT_PARSE_MODE.value,
+    help="The prediction mode of the parser. 'two-stage' tries the fast SLL "
+         "prediction first and only falls back to the full LL prediction if "
+         "SLL fails"
+)
+@click.option(
+    "--lexer",
+    type=click.Choice([kind.value for kind in LexerKind]),
+    default=DEFAULT_LEXER_KIND.value,
+    help="The lexer used for the Para-C files. 'fast' matches the tokens "
+         "using a compiled regex and 'antlr' uses the generated Antlr4 lexer"
+)
+@click.option(
+    "-I",
+    "--include-path",
+    "include_paths",
+    type=str,
+    multiple=True,
+    help="Additional directory, which is searched for included files before "
+         "the working directory and the lib folder. Can be passed multiple "
+         "times"
+)
+@click.option(
+    "--dfa-cache/--no-dfa-cache",
+    type=bool,
+    default=True,
+    help="If set the prediction tables of the parsers will be stored in the "
+         "build folder and reused in the next compilation"
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=0),
+    default=1,
+    help="The amount of worker processes used for parsing the files. If set "
+         "to 0 the amount of CPUs is used"
+)
+@click.option(
+    "--cache/--no-cache",
+    type=bool,
+    default=True,
+    help="If set the results of unchanged files will be reused from the "
+         "cache in the build folder instead of parsing them again"
+)
+@click.option(
+    "--release-parse-trees/--keep-parse-trees",
+    type=bool,
+    default=True,
+    help="If set the parse tree of a file is released once its logic stream "
+         "was generated, so the memory usage scales with the largest file "
+         "instead of the entire program"
+)
+@click.option(
+    "--keep-temp",
+    is_flag=True,
+    default=False,
+    help="If set the files processed by the Pre-Processor are additionally "
+         "written to the temp folder in the build folder. The compiler gets "
+         "them in memory either way"
+)
+@click.option(
+    "--progress",
+    type=click.Choice(PROGRESS_FORMATS),
+    default="bar",
+    help="How the progress is shown. 'json' writes the progress events "
+         "(phases, files, bytes, tokens and durations) as JSON lines to "
+         "stderr"
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="If set the wall and CPU time of the phases and of lexing, parsing "
+         "and walking every file are printed as a table after the "
+         "compilation"
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="Path the cProfile statistics (pstats) of the slowest phase are "
+         "written to. Implies --profile. Files parsed by worker processes "
+         "(--jobs) are not included"
+)
 @abortable(reraise=False)
 def parac_run(*args, **kwargs):
     """
@@ -319,12 +672,189 @@ def parac_run(*args, **kwargs):
     default=False,
     help="If set the compiler will add additional debug information"
 )
+@click.option(
+    "--parse-mode",
+    type=click.Choice([mode.value for mode in ParseMode]),
+    default=DEFAULT_PARSE_MODE.value,
+    help="The prediction mode of the parser. 'two-stage' tries the fast SLL "
+         "prediction first and only falls back to the full LL prediction if "
+         "SLL fails"
+)
+@click.option(
+    "--lexer",
+    type=click.Choice([kind.value for kind in LexerKind]),
+    default=DEFAULT_LEXER_KIND.value,
+    help="The lexer used for the Para-C files. 'fast' matches the tokens "
+         "using a compiled regex and 'antlr' uses the generated Antlr4 lexer"
+)
 @abortable(reraise=False)
 def parac_syntax_check(*args, **kwargs):
     """ Validates the syntax of a Para-C program and logs errors if needed """
     ParacCLI.parac_syntax_check(*args, **kwargs)
 
 
+@cli_entry.command(name="deps")
+@click.option("--keep-open", is_flag=True)
+@click.option(
+    "-f",
+    "--file",
+    type=str,
+    default=cli_format_default("entry.para"),
+    prompt=cli_create_prompt("Specify the entry-point of your program"),
+    help="The entry-point of the program where the compiler "
+         "should start the compilation process."
+)
+@click.option(
+    "--encoding",
+    default="utf-8",
+    type=str,
+    help="The encoding the files should be opened with"
+)
+@click.option(
+    "-l",
+    "--log",
+    type=str,
+    default=cli_format_default("./parac.log"),
+    prompt=cli_create_prompt(
+        "Specify where the console .log file should be created"),
+    help="Path of the output .log file where program messages should be logged"
+         ". If set to None it will not use a log file and only use the console"
+         " as the output method"
+)
+@click.option(
+    "-b",
+    "--build",
+    type=str,
+    default="./build",
+    help="The build folder of the last compilation, whose include graph is "
+         "used to determine the files that need to be rebuilt"
+)
+@click.option(
+    "--debug/--no-debug",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="If set the compiler will add additional debug information"
+)
+@click.option(
+    "--parse-mode",
+    type=click.Choice([mode.value for mode in ParseMode]),
+    default=DEFAULT_PARSE_MODE.value,
+    help="The prediction mode of the parser. 'two-stage' tries the fast SLL "
+         "prediction first and only falls back to the full LL prediction if "
+         "SLL fails"
+)
+@click.option(
+    "-I",
+    "--include-path",
+    "include_paths",
+    type=str,
+    multiple=True,
+    help="Additional directory, which is searched for included files before "
+         "the working directory and the lib folder. Can be passed multiple "
+         "times"
+)
+@abortable(reraise=False)
+def parac_deps(*args, **kwargs):
+    """
+    Prints the include graph of a Para-C program and the files that need to
+    be rebuilt since the last compilation
+    """
+    ParacCLI.parac_deps(*args, **kwargs)
+
+
+@cli_entry.command(name="profile-grammar")
+@click.option("--keep-open", is_flag=True)
+@click.option(
+    "-f",
+    "--file",
+    "files",
+    type=str,
+    multiple=True,
+    default=["entry.para"],
+    help="A file or directory whose files (.para, .ph, .c, .h) should be "
+         "parsed. Can be passed multiple times"
+)
+@click.option(
+    "--encoding",
+    default="utf-8",
+    type=str,
+    help="The encoding the files should be opened with"
+)
+@click.option(
+    "-l",
+    "--log",
+    type=str,
+    default="./parac.log",
+    help="Path of the output .log file where program messages should be logged"
+         ". If set to None it will not use a log file and only use the console"
+         " as the output method"
+)
+@click.option(
+    "--debug/--no-debug",
+    is_flag=True,
+    type=bool,
+    default=False,
+    help="If set the compiler will add additional debug information"
+)
+@click.option(
+    "--grammar",
+    type=click.Choice([kind.value for kind in GrammarKind]),
+    default=GrammarKind.PARAC.value,
+    help="The grammar whose parser should be profiled"
+)
+@click.option(
+    "--parse-mode",
+    type=click.Choice([mode.value for mode in ParseMode]),
+    default=DEFAULT_PARSE_MODE.value,
+    help="The prediction mode of the parser. 'two-stage' tries the fast SLL "
+         "prediction first and only falls back to the full LL prediction if "
+         "SLL fails"
+)
+@click.option(
+    "--sort",
+    "sort_by",
+    type=click.Choice(
+        ["time", "invocations", "sll-lookahead", "ll-lookahead",
+         "full-context", "ambiguities"]
+    ),
+    default="time",
+    help="The column the decisions should be sorted by (descending)"
+)
+@click.option(
+    "--max-rows",
+    type=int,
+    default=25,
+    help="The max amount of decisions that should be printed"
+)
+@abortable(reraise=False)
+def parac_profile_grammar(*args, **kwargs):
+    """
+    Parses files using a profiling parser and prints the prediction cost,
+    lookahead depth, full-context events and ambiguities of every grammar
+    decision
+    """
+    ParacCLI.parac_profile_grammar(*args, **kwargs)
+
+
+@cli_entry.command(name="serve")
+@click.option(
+    "--socket",
+    "socket_path",
+    type=str,
+    default=None,
+    help="The path of the Unix socket the server should listen on. Defaults "
+         f"to a per-user socket in the temp folder or ${SOCKET_ENV_NAME}"
+)
+@abortable(reraise=False)
+def parac_serve(*args, **kwargs):
+    """
+    Runs a compile server, which keeps the compiler loaded and runs the
+    commands of the parac client
+    """
+    ParacCLI.parac_serve(*args, **kwargs)
+
+
 class ParacCLI:
     """ CLI for the main Para-C Compiler process """
 
@@ -362,6 +892,8 @@ class ParacCLI:
     @escape_ansi_args
     def parac_c_init():
         """ Initialises the C compiler """
+        from parac import RUNTIME_COMPILER
+
         if not RUNTIME_COMPILER.log_initialised:
             RUNTIME_COMPILER.init_logging_session(print_banner=False)
         logger.info(
@@ -382,12 +914,26 @@ class ParacCLI:
             overwrite_dist: bool,
             source: bool,
             executable: bool,
-            debug: bool
-    ) -> FinishedProcess:
+            debug: bool,
+            parse_mode: str = DEFAULT_PARSE_MODE.value,
+            dfa_cache: bool = True,
+            jobs: int = 1,
+            cache: bool = True,
+            progress: str = "bar",
+            profile: bool = False,
+            profile_output: Optional[str] = None,
+            release_parse_trees: bool = True,
+            keep_temp: bool = False,
+            include_paths: Tuple[str, ...] = (),
+            lexer: str = DEFAULT_LEXER_KIND.value
+    ) -> 'FinishedProcess':
         """
         CLI interface for the parac_compile command.
         Will create a compilation-process and run it
         """
+        import asyncio
+        from parac import RUNTIME_COMPILER
+
         if not RUNTIME_COMPILER.log_initialised:
             RUNTIME_COMPILER.init_logging_session(
                 log,
@@ -411,7 +957,7 @@ class ParacCLI:
 
         # Creates a CompilationProcess which represents a process that can
         # be finished but does not need to be finished
-        p: ProgramCompilationProcess = abortable(
+        p: 'ProgramCompilationProcess' = abortable(
             cli_create_process,
             step="Setup",
             reraise=True
@@ -420,10 +966,25 @@ class ParacCLI:
             encoding,
             log,
             build_path,
-            dist_path
+            dist_path,
+            parse_mode,
+            dfa_cache,
+            jobs,
+            cache,
+            profile=profile,
+            profile_phases=profile_output is not None,
+            release_parse_trees=release_parse_trees,
+            keep_temp=keep_temp,
+            include_paths=list(include_paths),
+            lexer=lexer
         )
-        # Running the process with additional formatting and logging
-        return asyncio.run(cli_run_process_with_logging(p))
+        # Running the process with additional formatting and logging. The
+        # profile is also printed if the compilation failed, since it shows
+        # how far the compilation got
+        try:
+            return asyncio.run(cli_run_process_with_logging(p, progress))
+        finally:
+            log_profile_report(p, profile_output)
 
     @staticmethod
     @abortable(reraise=True)
@@ -436,7 +997,18 @@ class ParacCLI:
             log: str,
             overwrite_build: bool,
             overwrite_dist: bool,
-            debug: bool
+            debug: bool,
+            parse_mode: str = DEFAULT_PARSE_MODE.value,
+            dfa_cache: bool = True,
+            jobs: int = 1,
+            cache: bool = True,
+            progress: str = "bar",
+            profile: bool = False,
+            profile_output: Optional[str] = None,
+            release_parse_trees: bool = True,
+            keep_temp: bool = False,
+            include_paths: Tuple[str, ...] = (),
+            lexer: str = DEFAULT_LEXER_KIND.value
     ) -> None:
         """ CLI interface for compiling and running a program. """
         p = ParacCLI.parac_compile(
@@ -445,7 +1017,18 @@ class ParacCLI:
             log,
             overwrite_build,
             overwrite_dist,
-            debug
+            debug,
+            parse_mode=parse_mode,
+            dfa_cache=dfa_cache,
+            jobs=jobs,
+            cache=cache,
+            progress=progress,
+            profile=profile,
+            profile_output=profile_output,
+            release_parse_trees=release_parse_trees,
+            keep_temp=keep_temp,
+            include_paths=include_paths,
+            lexer=lexer
         )
         # TODO! Run the process. Requires GCC Integration
 
@@ -457,9 +1040,14 @@ class ParacCLI:
             file: str,
             encoding: str,
             log: str,
-            debug: bool
+            debug: bool,
+            parse_mode: str = DEFAULT_PARSE_MODE.value,
+            lexer: str = DEFAULT_LEXER_KIND.value
     ):
         """ Runs a syntax check on the specified file (imports excluded) """
+        import asyncio
+        from parac import RUNTIME_COMPILER
+
         if not RUNTIME_COMPILER.log_initialised:
             RUNTIME_COMPILER.init_logging_session(
                 log,
@@ -467,7 +1055,9 @@ class ParacCLI:
                 banner_name="Syntax Check"
             )
 
-        p = create_basic_process(file, encoding, log)
+        p = create_basic_process(
+            file, encoding, log, parse_mode, lexer=lexer
+        )
 
         # Exception won't be reraised and directly logged to the console
         result = asyncio.run(p.validate_syntax(enable_out=True))
@@ -500,3 +1090,200 @@ class ParacCLI:
             f"Errors: {errors}"
             "[/bold red]"
         )
+        log_parse_statistics()
+
+    @staticmethod
+    @abortable(reraise=True)
+    @cli_keep_open_callback
+    @escape_ansi_args
+    def parac_deps(
+            file: str,
+            encoding: str,
+            log: str,
+            build: str,
+            debug: bool,
+            parse_mode: str = DEFAULT_PARSE_MODE.value,
+            include_paths: Tuple[str, ...] = ()
+    ) -> Set[str]:
+        """
+        Prints the include graph of the program and the rebuild set, which
+        contains the files that changed since the last compilation and all
+        files that directly or indirectly include them
+
+        :returns: The rebuild set
+        """
+        import asyncio
+        from parac import RUNTIME_COMPILER
+        from parac.preprocessor import IncludeGraph, INCLUDE_GRAPH_FILE_NAME
+        from parac.preprocessor.ctx import ProgramPreProcessorContext
+
+        if not RUNTIME_COMPILER.log_initialised:
+            RUNTIME_COMPILER.init_logging_session(
+                log,
+                level=logging.DEBUG if debug else logging.INFO,
+                banner_name="Dependencies"
+            )
+
+        p = create_basic_process(
+            file, encoding, log, parse_mode, list(include_paths)
+        )
+        ctx = ProgramPreProcessorContext(p)
+        asyncio.run(ctx.parse_program_files(enable_out=True))
+
+        graph = ctx.include_graph
+        entry = graph.get_file_name(p.entry_file_path, p.work_dir)
+        previous = IncludeGraph.load(
+            os.path.join(
+                cli_resolve_path(build),
+                CACHE_FOLDER_NAME,
+                INCLUDE_GRAPH_FILE_NAME
+            )
+        )
+        if previous is None:
+            rebuild_set = set(graph.files)
+        else:
+            # Files that were not part of the last compilation are new
+            rebuild_set = previous.get_rebuild_set(p.work_dir) | (
+                set(graph.files) - set(previous.files)
+            )
+        rebuild_set &= set(graph.files)
+
+        print_result_banner("Dependencies")
+        out = console()
+        out.print(cli_create_include_tree(graph, entry, rebuild_set))
+        out.print("")
+        if previous is None:
+            out.print(
+                "No include graph of a previous compilation was found. "
+                "All files need to be rebuilt"
+            )
+        out.print(
+            "[bold yellow]"
+            f"Rebuild set: {len(rebuild_set)} of {len(graph.files)} file(s)"
+            "[/bold yellow]"
+        )
+        for name in sorted(rebuild_set):
+            out.print(f"  {name}")
+        return rebuild_set
+
+    @staticmethod
+    @abortable(reraise=True)
+    @cli_keep_open_callback
+    @escape_ansi_args
+    def parac_profile_grammar(
+            files: Tuple[str, ...],
+            encoding: str,
+            log: str,
+            debug: bool,
+            grammar: str = GrammarKind.PARAC.value,
+            parse_mode: str = DEFAULT_PARSE_MODE.value,
+            sort_by: str = "time",
+            max_rows: int = 25
+    ) -> 'GrammarProfiler':
+        """
+        Profiles the prediction decisions of the parser of the grammar over
+        the passed files and prints them as a table
+
+        :returns: The profiler containing the decision profiles
+        """
+        from rich.table import Table
+        from parac import RUNTIME_COMPILER
+        from parac.compiler.grammar_profiler import GrammarProfiler
+
+        if not RUNTIME_COMPILER.log_initialised:
+            RUNTIME_COMPILER.init_logging_session(
+                log,
+                level=logging.DEBUG if debug else logging.INFO,
+                banner_name="Grammar Profile"
+            )
+
+        profiler = GrammarProfiler(grammar, parse_mode)
+        for path in files:
+            path = cli_resolve_path(path)
+            if not os.path.exists(path):
+                raise InvalidArgumentsError(
+                    f"Failed to find the file or directory {path}"
+                )
+            profiler.profile_path(path, encoding)
+
+        table = Table(
+            title=f"Decisions of the {profiler.parser_cls.__name__} "
+                  f"(sorted by {sort_by})",
+            caption="k: lookahead depth (avg/max), Conflicts: SLL conflicts "
+                    "requiring the LL prediction, Full ctx: LL predictions"
+        )
+        table.add_column("#", justify="right")
+        table.add_column("Rule")
+        table.add_column("Calls", justify="right")
+        table.add_column("Time (ms)", justify="right")
+        table.add_column("SLL k", justify="right")
+        table.add_column("LL k", justify="right")
+        table.add_column("Conflicts", justify="right")
+        table.add_column("Full ctx", justify="right")
+        table.add_column("Ambiguities", justify="right")
+
+        decisions = profiler.get_sorted_decisions(sort_by)
+        for d in decisions[:max_rows]:
+            table.add_row(
+                str(d.decision),
+                d.rule_name,
+                str(d.invocations),
+                f"{d.time * 1000:.2f}",
+                f"{d.sll_avg_lookahead:.2f}/{d.sll_max_lookahead}",
+                f"{d.ll_avg_lookahead:.2f}/{d.ll_max_lookahead}"
+                if d.ll_predictions else "-",
+                str(d.sll_conflicts),
+                str(d.full_context_events),
+                str(d.ambiguities)
+            )
+
+        print_result_banner("Grammar Profile")
+        out = console()
+        out.print(table)
+        if len(decisions) > max_rows:
+            out.print(f"... {len(decisions) - max_rows} more decision(s)")
+
+        stats = profiler.parse_statistics
+        out.print(
+            f"Parsed {profiler.files} file(s) with {profiler.tokens:,} tokens "
+            f"in {profiler.parse_time * 1000:.2f} ms "
+            f"({profiler.syntax_errors} syntax error(s), "
+            f"{stats.ll_fallbacks} LL fallback(s))"
+        )
+        return profiler
+
+    @staticmethod
+    @abortable(reraise=True)
+    @escape_ansi_args
+    def parac_serve(socket_path: Optional[str] = None) -> None:
+        """
+        Runs the compile server until it's interrupted. Every request runs in
+        a forked child process with its own compilation process and logging
+        session
+        """
+        # Importing the compiler eagerly, so the forked requests do not have
+        # to import it themselves
+        import parac.compiler
+        import parac.preprocessor
+        from parac.util import get_dfa_cache, DFA_CACHE_FILE_NAME
+        from .server import ParacServer
+
+        server = ParacServer(socket_path)
+        server.bind()
+
+        # Starting with the prediction tables of the last compilation in the
+        # working directory
+        get_dfa_cache().load(
+            os.path.join(const.DEFAULT_BUILD_PATH, CACHE_FOLDER_NAME,
+                         DFA_CACHE_FILE_NAME)
+        )
+        out = console()
+        out.print(
+            "[bold bright_cyan]"
+            f"Compile server listening on {server.socket_path}"
+            "[/bold bright_cyan]"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            out.print("Compile server stopped")
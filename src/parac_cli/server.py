@@ -0,0 +1,304 @@
+# coding=utf-8
+"""
+Compile server for the Para-C CLI, which keeps the interpreter with the
+imported compiler and the warmed-up parsers alive and runs the CLI commands
+sent by the thin client (parac_client) over a local Unix socket.
+
+Every request is run in a forked child process, which inherits the warm
+state of the server, but isolates the global state of a compilation (logging
+session, console, statistics) from other requests running concurrently.
+"""
+import io
+import json
+import logging
+import os
+import select
+import socket
+import sys
+import threading
+import traceback
+from typing import Dict, List, Optional, Union
+
+from parac import UserInputError
+from parac.util import get_dfa_cache
+from parac_client import (FRAME_REQUEST, FRAME_STDOUT, FRAME_STDERR,
+                          FRAME_INPUT_REQUEST, FRAME_INPUT, FRAME_EXIT,
+                          get_socket_path, send_frame, recv_frame)
+
+__all__ = [
+    'ParacServer'
+]
+
+logger = logging.getLogger(__name__)
+
+# Time in seconds a client has to send its request after connecting
+REQUEST_TIMEOUT: float = 5.0
+
+
+class _FrameWriter(io.RawIOBase):
+    """ Raw stream, which sends the written data as frames to the client """
+
+    def __init__(self, sock: socket.socket, frame_type: bytes):
+        self._sock = sock
+        self._frame_type = frame_type
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        if data:
+            send_frame(self._sock, self._frame_type, bytes(data))
+        return len(data)
+
+
+class _FrameReader(io.RawIOBase):
+    """ Raw stream, which requests lines of the stdin of the client """
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._pending:
+            send_frame(self._sock, FRAME_INPUT_REQUEST, b'')
+            frame_type, payload = recv_frame(self._sock)
+            if frame_type != FRAME_INPUT or not payload:
+                return 0  # EOF
+            self._pending = payload
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class ParacServer:
+    """
+    Compile server, which listens on a Unix socket and runs every request in
+    a forked child process
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        """
+        :param socket_path: The path of the socket. If None the default path
+        of the current user is used
+        """
+        if not hasattr(socket, 'AF_UNIX') or not hasattr(os, 'fork'):
+            raise UserInputError(
+                "The compile server is only supported on POSIX systems"
+            )
+        self._socket_path: str = socket_path or get_socket_path()
+        self._socket: Optional[socket.socket] = None
+        # Set once shutdown() was called. Never reset, so a shutdown()
+        # before serve_forever() started looping is not lost
+        self._stop_requested = threading.Event()
+        # Read ends of the pipes, which the running requests report the path
+        # of their DFA cache through
+        self._children: Dict[int, int] = {}
+
+    @property
+    def socket_path(self) -> str:
+        """ Returns the path of the socket """
+        return self._socket_path
+
+    @property
+    def active_requests(self) -> int:
+        """ Returns the amount of currently running requests """
+        return len(self._children)
+
+    def _is_running(self) -> bool:
+        """ Returns whether another server is listening on the socket """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self._socket_path)
+            return True
+        except OSError:
+            return False
+        finally:
+            sock.close()
+
+    def bind(self) -> None:
+        """
+        Binds the socket. Removes a stale socket file of a previous server
+
+        :raises UserInputError: If another server is already running
+        """
+        if os.path.exists(self._socket_path):
+            if self._is_running():
+                raise UserInputError(
+                    f"A compile server is already running ({self._socket_path})"
+                )
+            os.remove(self._socket_path)
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(self._socket_path)
+        os.chmod(self._socket_path, 0o600)
+        self._socket.listen()
+
+    def close(self) -> None:
+        """ Closes the socket and removes the socket file """
+        for fd in self._children.values():
+            os.close(fd)
+        self._children.clear()
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            if os.path.exists(self._socket_path):
+                os.remove(self._socket_path)
+
+    @staticmethod
+    def _load_dfa_cache(fd: int) -> None:
+        """
+        Loads the prediction tables, which were persisted by a finished
+        request, so the next request starts warm. The request reports the
+        path of its DFA cache through the passed pipe, which is empty if it
+        did not save one
+        """
+        data = b''
+        chunk = os.read(fd, 4096)
+        while chunk:
+            data += chunk
+            chunk = os.read(fd, 4096)
+        os.close(fd)
+
+        path = data.decode()
+        if path and get_dfa_cache().load(path):
+            logger.debug(f"Loaded the DFA cache of a finished request ({path})")
+
+    @staticmethod
+    def _index_lib_path() -> None:
+        """
+        Lists the lib folder in the shared directory index, so the forked
+        requests inherit the listing and only check whether it changed
+        """
+        from parac import const
+        from parac.preprocessor import get_directory_index
+
+        try:
+            lib_path = str(const.C_LIB_PATH)
+        except RuntimeError:
+            return
+        get_directory_index().list_directory(lib_path)
+
+    def _reap_children(self) -> None:
+        """ Collects the finished child processes """
+        while self._children:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            fd = self._children.pop(pid, None)
+            if fd is not None:
+                self._load_dfa_cache(fd)
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """ Accepts and runs requests until interrupted """
+        if self._socket is None:
+            self.bind()
+
+        self._index_lib_path()
+        try:
+            while not self._stop_requested.is_set():
+                ready, _, _ = select.select(
+                    [self._socket], [], [], poll_interval
+                )
+                self._reap_children()
+                if ready:
+                    self._accept()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """
+        Stops serve_forever() after the current poll interval. Running
+        requests are not interrupted
+        """
+        self._stop_requested.set()
+
+    def _accept(self) -> None:
+        """ Accepts a connection and forks a child process for it """
+        conn, _ = self._socket.accept()
+        try:
+            conn.settimeout(REQUEST_TIMEOUT)
+            frame_type, payload = recv_frame(conn)
+            conn.settimeout(None)
+            if frame_type != FRAME_REQUEST:
+                raise ValueError("Expected a request frame")
+            request = json.loads(payload.decode())
+        except (OSError, ValueError) as e:
+            logger.debug(f"Rejected an invalid request: {e}")
+            conn.close()
+            return
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Child process
+            exit_code = 1
+            try:
+                self._socket.close()
+                os.close(read_fd)
+                exit_code = self._run_request(conn, request)
+                path = get_dfa_cache().saved_path
+                if path:
+                    os.write(write_fd, os.path.abspath(path).encode())
+            finally:
+                os._exit(exit_code)
+
+        os.close(write_fd)
+        self._children[pid] = read_fd
+        conn.close()
+
+    @staticmethod
+    def _run_request(conn: socket.socket, request: dict) -> int:
+        """
+        Runs the request inside the forked child and sends the output and
+        the exit code to the client
+
+        :returns: The exit code of the command
+        """
+        from parac.logging import init_rich_console
+        from .__main__ import cli_entry
+
+        stdout = io.TextIOWrapper(
+            io.BufferedWriter(_FrameWriter(conn, FRAME_STDOUT)),
+            encoding='utf-8', line_buffering=True
+        )
+        stderr = io.TextIOWrapper(
+            io.BufferedWriter(_FrameWriter(conn, FRAME_STDERR)),
+            encoding='utf-8', line_buffering=True
+        )
+        stdin = io.TextIOWrapper(
+            io.BufferedReader(_FrameReader(conn)), encoding='utf-8'
+        )
+        sys.stdout, sys.stderr, sys.stdin = stdout, stderr, stdin
+
+        argv: List[str] = list(request.get('argv', []))
+        exit_code = 0
+        try:
+            os.chdir(request.get('cwd', os.getcwd()))
+            init_rich_console(
+                width=max(request.get('columns') or 0, 120),
+                force_terminal=request.get('tty') or None
+            )
+            cli_entry.main(args=argv, prog_name="parac")
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                exit_code = e.code
+            elif e.code is not None:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            try:
+                stdout.flush()
+                stderr.flush()
+                send_frame(conn, FRAME_EXIT, str(exit_code).encode())
+            except OSError:
+                pass
+            conn.close()
+        return exit_code
@@ -4,17 +4,22 @@ import os
 import shutil
 from os import PathLike
 from pathlib import Path
-from typing import Union, Tuple
+from typing import Union, Tuple, Set, TYPE_CHECKING
+from rich.tree import Tree
 
-from parac import DEFAULT_BUILD_PATH, DEFAULT_DIST_PATH, UserInputError
+from parac import const, UserInputError, CACHE_FOLDER_NAME
 from parac.util import abortable, decode_if_bytes
 from parac.logging import get_rich_console as console
 
+if TYPE_CHECKING:
+    from parac.preprocessor import IncludeGraph
+
 __all__ = [
     "cli_err_dir_already_exists",
     "cli_run_output_dir_validation",
     "cli_check_destination",
-    "cli_resolve_path"
+    "cli_resolve_path",
+    "cli_create_include_tree"
 ]
 
 
@@ -57,21 +62,28 @@ def cli_check_destination(
     """
     Validates the destination and checks whether the specified output
     folder is available. If the folder already exists it will show a prompt
-    to the user what should be done about the existing folder.
+    to the user what should be done about the existing folder. The cache
+    folder (CACHE_FOLDER_NAME) is ignored and kept when overwriting.
 
     :returns: The path to the folder
     """
     output = default_path
     if not os.path.exists(default_path):
         os.mkdir(default_path)
-    elif len(os.listdir(default_path)) > 0:
+    elif any(i != CACHE_FOLDER_NAME for i in os.listdir(default_path)):
         # If the overwrite is set to False then a prompt will appear
         if overwrite is False:
             overwrite = cli_err_dir_already_exists(output_type)
 
         if overwrite:
-            shutil.rmtree(default_path)
-            os.mkdir(default_path)
+            for entry in os.scandir(default_path):
+                entry: os.DirEntry
+                if entry.name == CACHE_FOLDER_NAME:
+                    continue
+                elif entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.remove(entry.path)
         else:
             counter = 2
             while os.path.exists(f"{os.getcwd()}/{output_type}_{counter}"):
@@ -94,12 +106,46 @@ def cli_run_output_dir_validation(
     """
     build_path = cli_check_destination(
         "build",
-        DEFAULT_BUILD_PATH,
+        const.DEFAULT_BUILD_PATH,
         overwrite_build
     )
     dist_path = cli_check_destination(
         "dist",
-        DEFAULT_DIST_PATH,
+        const.DEFAULT_DIST_PATH,
         overwrite_dist
     )
     return build_path, dist_path
+
+
+def cli_create_include_tree(
+        graph: 'IncludeGraph',
+        entry: str,
+        rebuild_set: Set[str] = frozenset()
+) -> Tree:
+    """
+    Creates a rich Tree of the includes starting from the entry file. Files
+    that were already shown are not expanded again and files in the
+    rebuild_set are highlighted
+
+    :param graph: The include graph of the program
+    :param entry: The name of the entry file inside the graph
+    :param rebuild_set: The files that need to be rebuilt
+    """
+    def _label(name: str) -> str:
+        if name in rebuild_set:
+            return f"[bold yellow]{name}[/bold yellow] (rebuild)"
+        return name
+
+    shown: Set[str] = set()
+
+    def _add(node: Tree, name: str) -> None:
+        shown.add(name)
+        for include in graph.get_includes(name):
+            if include in shown:
+                node.add(f"{_label(include)} [dim](see above)[/dim]")
+            else:
+                _add(node.add(_label(include)), include)
+
+    tree = Tree(_label(entry))
+    _add(tree, entry)
+    return tree
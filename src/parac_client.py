@@ -0,0 +1,142 @@
+# coding=utf-8
+"""
+Thin client for the Para-C compile server (parac serve), which forwards the
+command line arguments to the server over a local Unix socket and writes the
+returned output, so the CLI does not have to import the compiler itself.
+
+Only uses the standard library, since importing it should not take longer
+than starting the interpreter.
+"""
+import json
+import os
+import shutil
+import socket
+import struct
+import sys
+import tempfile
+from typing import List, Optional, Tuple
+
+__all__ = [
+    'SOCKET_ENV_NAME',
+    'FRAME_REQUEST',
+    'FRAME_STDOUT',
+    'FRAME_STDERR',
+    'FRAME_INPUT_REQUEST',
+    'FRAME_INPUT',
+    'FRAME_EXIT',
+    'get_socket_path',
+    'send_frame',
+    'recv_frame',
+    'run_on_server',
+    'main'
+]
+
+# Environment variable, which can be used to overwrite the socket path
+SOCKET_ENV_NAME: str = "PARAC_SOCKET"
+
+# Frame types of the protocol. Every frame consists of the type (1 byte), the
+# length of the payload (4 bytes, big-endian) and the payload
+FRAME_REQUEST: bytes = b'r'  # client -> server: JSON request
+FRAME_STDOUT: bytes = b'o'  # server -> client: stdout data
+FRAME_STDERR: bytes = b'e'  # server -> client: stderr data
+FRAME_INPUT_REQUEST: bytes = b'i'  # server -> client: requests a line
+FRAME_INPUT: bytes = b'd'  # client -> server: line of stdin (empty = EOF)
+FRAME_EXIT: bytes = b'x'  # server -> client: exit code as str
+_HEADER = struct.Struct(">cI")
+
+
+def get_socket_path() -> str:
+    """
+    Returns the path of the socket of the compile server, which is unique
+    per user
+    """
+    path = os.environ.get(SOCKET_ENV_NAME)
+    if path:
+        return path
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return os.path.join(tempfile.gettempdir(), f"parac-{uid}.sock")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """ Receives exactly size bytes or raises ConnectionError """
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed by the peer")
+        data += chunk
+    return bytes(data)
+
+
+def send_frame(sock: socket.socket, frame_type: bytes, payload: bytes) -> None:
+    """ Sends a frame with the passed type and payload """
+    sock.sendall(_HEADER.pack(frame_type, len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> Tuple[bytes, bytes]:
+    """ Receives a frame and returns the type and payload """
+    frame_type, size = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return frame_type, _recv_exact(sock, size)
+
+
+def run_on_server(
+        argv: List[str], socket_path: Optional[str] = None
+) -> Optional[int]:
+    """
+    Runs the passed CLI arguments on the compile server
+
+    :param argv: The arguments (without the program name)
+    :param socket_path: The path of the socket. If None get_socket_path() is
+    used
+    :returns: The exit code of the command or None if no server is running
+    """
+    socket_path = socket_path or get_socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+
+    with sock:
+        request = {
+            'argv': list(argv),
+            'cwd': os.getcwd(),
+            'columns': shutil.get_terminal_size().columns,
+            'tty': sys.stdout.isatty()
+        }
+        send_frame(sock, FRAME_REQUEST, json.dumps(request).encode())
+
+        while True:
+            try:
+                frame_type, payload = recv_frame(sock)
+            except ConnectionError:
+                sys.stderr.write("Lost the connection to the compile server\n")
+                return 1
+
+            if frame_type == FRAME_STDOUT:
+                sys.stdout.buffer.write(payload)
+                sys.stdout.flush()
+            elif frame_type == FRAME_STDERR:
+                sys.stderr.buffer.write(payload)
+                sys.stderr.flush()
+            elif frame_type == FRAME_INPUT_REQUEST:
+                send_frame(sock, FRAME_INPUT, sys.stdin.buffer.readline())
+            elif frame_type == FRAME_EXIT:
+                return int(payload.decode())
+
+
+def main(argv: Optional[List[str]] = None) -> Optional[int]:
+    """
+    Runs the arguments on the compile server if one is running. The serve
+    command itself is never forwarded.
+
+    :returns: The exit code or None if the command should be run locally
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        return None
+    return run_on_server(argv)
@@ -0,0 +1,227 @@
+# coding=utf-8
+""" Tests for the AST built while walking the parse tree """
+import asyncio
+import os
+import pickle
+import sys
+
+import antlr4
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ParacCompiler, ProgramCompilationContext
+from parac.compiler import ast_nodes as ast
+from parac.compiler.parser.ast_builder import AstBuilder
+from parac.compiler.parser.fast_lexer import FastParaCLexer
+from parac.compiler.parser.python.ParaCListener import ParaCListener
+from parac.compiler.parser.python.ParaCParser import ParaCParser
+from parac.util import DispatchTableWalker, ParseMode, get_input_stream
+
+from .. import reset_input
+
+test_files_dir = f"{os.getcwd()}{SEP}test_files"
+
+
+class _AstListener(ParaCListener):
+    """ Listener only building the AST """
+
+    def __init__(self):
+        self.builder = AstBuilder()
+
+    def exitEveryRule(self, ctx: antlr4.ParserRuleContext):
+        self.builder.exit_rule(ctx)
+
+
+def build(tree: antlr4.ParserRuleContext) -> ast.TranslationUnit:
+    """ Builds the AST of the passed parse tree """
+    listener = _AstListener()
+    DispatchTableWalker().walk(listener, tree)
+    return listener.builder.result
+
+
+def parse(source: str, mode: ParseMode = ParseMode.TWO_STAGE) \
+        -> ast.TranslationUnit:
+    """ Parses the source and returns the AST of the file context """
+    file_ctx = asyncio.run(ProgramCompilationContext.parse_single_file(
+        get_input_stream(source, "test"), "test", False, mode,
+        release_parse_tree=True
+    ))
+    return file_ctx.ast
+
+
+def statements(source: str) -> tuple:
+    """ Returns the statements of the first function in the source """
+    return parse(source).items[0].body.items
+
+
+class TestAst:
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+
+    def test_slots(self):
+        node_types = [
+            getattr(ast, name) for name in ast.__all__
+            if isinstance(getattr(ast, name), type)
+        ]
+        for node_type in node_types:
+            node = node_type(*(None for _ in node_type._fields))
+            assert not hasattr(node, '__dict__'), node_type.__name__
+
+    def test_expressions(self):
+        (statement,) = statements(
+            "int main() { x += a + b * f(c, d[1])->e++ - -g ? (int) h : "
+            "i as long; }"
+        )
+        assignment = statement.expression
+        assert type(assignment) is ast.Assignment
+        assert assignment.operator == '+=' and \
+            assignment.target.name == 'x'
+
+        conditional = assignment.value
+        assert type(conditional) is ast.Conditional
+        assert type(conditional.then) is ast.Cast
+        assert type(conditional.otherwise) is ast.Conversion
+        assert conditional.otherwise.type_name.specifiers == ('long',)
+
+        # Left associative: (a + (b * ...)) - (-g)
+        subtraction = conditional.condition
+        assert subtraction.operator == '-'
+        assert type(subtraction.right) is ast.UnaryOperation
+        multiplication = subtraction.left.right
+        assert multiplication.operator == '*'
+
+        postfix = multiplication.right
+        assert type(postfix) is ast.PostfixOperation
+        member = postfix.operand
+        assert type(member) is ast.MemberAccess and member.arrow
+        call = member.value
+        assert call.function.name == 'f'
+        assert type(call.arguments[1]) is ast.Subscript
+
+    def test_declarations(self):
+        unit = parse(
+            "struct point { int x, y : 3; };\n"
+            "enum color { RED, GREEN = 2 };\n"
+            "char *name, **names = 0;\n"
+            "int (*callback)(int, char *);\n"
+            "int sq(int a) => a * a;\n"
+        )
+        struct = unit.items[0].specifiers[0]
+        assert struct.kind == 'struct' and struct.name == 'point'
+        assert type(struct.members[0].declarators[1]) is ast.BitField
+
+        enum = unit.items[1].specifiers[0]
+        assert [e.name for e in enum.enumerators] == ['RED', 'GREEN']
+
+        # The grammar assigns the first pointer to the type specifier, but
+        # it belongs to the first declarator
+        declaration = unit.items[2]
+        assert declaration.specifiers == ('char',)
+        first, second = (d.declarator for d in declaration.declarators)
+        assert first.name == 'name' and len(first.pointers) == 1
+        assert second.name == 'names' and len(second.pointers) == 2
+
+        callback = unit.items[3].declarators[0].declarator
+        assert callback.name == 'callback'
+        assert len(callback.inner.pointers) == 1
+        parameters = callback.suffixes[0].parameters
+        assert parameters[1].specifiers == ('char',)
+        assert len(parameters[1].declarator.pointers) == 1
+
+        function = unit.items[4]
+        assert type(function) is ast.FunctionDefinition
+        assert function.declarator.name == 'sq'
+        assert type(function.body) is ast.BinaryOperation
+
+    def test_statements(self):
+        items = statements(
+            "int main() {\n"
+            "    for (int i = 0; i < 10; i++) continue;\n"
+            "    while (x) if (x > 3) break; else x--;\n"
+            "    do { } while (0);\n"
+            "    switch (x) { case 1: goto end; default: ; }\n"
+            "    end: return 0;\n"
+            "}\n"
+        )
+        assert [type(item) for item in items] == [
+            ast.ForStatement, ast.WhileStatement, ast.DoWhileStatement,
+            ast.SwitchStatement, ast.LabeledStatement
+        ]
+        assert type(items[0].init) is ast.Declaration
+        assert type(items[1].body.otherwise.expression) is \
+            ast.PostfixOperation
+        case, default = items[3].body.items
+        assert case.statement.target == 'end'
+        assert default.statement.expression is None
+        assert type(items[4].statement) is ast.ReturnStatement
+
+    def test_interned_names(self):
+        (statement,) = statements("int main() { abc_def = abc_def + 1; }")
+        target = statement.expression.target
+        assert target.name is sys.intern("abc_def")
+        assert target.name is statement.expression.value.left.name
+
+    def test_spans(self):
+        source = ParacCompiler.remove_comments_from_str(
+            open(f"{test_files_dir}{SEP}entry.para", encoding="utf-8").read()
+        )
+        unit = parse(source)
+        for node in ast.walk(unit):
+            text = node.get_text(source)
+            if type(node) is ast.Identifier:
+                assert text == node.name
+            elif type(node) is ast.BinaryOperation:
+                assert node.operator in text
+
+        (statement,) = statements("int main() {\n    x = a + b;\n}")
+        value = statement.expression.value
+        source = "int main() {\n    x = a + b;\n}"
+        assert value.get_text(source) == "a + b"
+        assert value.get_position(source) == (2, 8)
+
+    def test_parsers_equal(self):
+        # The FlatParaCParser (both stages) and the generated ParaCParser
+        # have to create the same AST, including the spans
+        for root, _, files in os.walk(test_files_dir):
+            for name in files:
+                if not name.endswith((".para", ".ph", ".c", ".h")):
+                    continue
+                with open(f"{root}{SEP}{name}", 'r', encoding='utf-8') as f:
+                    source = ParacCompiler.remove_comments_from_str(f.read())
+
+                parser = ParaCParser(antlr4.CommonTokenStream(
+                    FastParaCLexer(get_input_stream(source, "test"))
+                ))
+                parser.removeErrorListeners()
+                dumps = [
+                    ast.dump(parse(source, mode), include_spans=True)
+                    for mode in (ParseMode.TWO_STAGE, ParseMode.LL)
+                ]
+                dumps.append(ast.dump(
+                    build(parser.compilationUnit()), include_spans=True
+                ))
+                assert dumps[0] == dumps[1] == dumps[2], name
+
+    def test_fewer_nodes(self):
+        source = "int main() { x = a + b * c; if (x) return f(x, 1); }"
+        file_ctx = asyncio.run(ProgramCompilationContext.parse_single_file(
+            get_input_stream(source, "test"), "test", False
+        ))
+        assert ast.count_nodes(file_ctx.ast) * 3 < file_ctx.node_count
+
+    def test_pickle(self):
+        # Long operator chains are nested deeper than the recursion limit
+        terms = " + ".join("a" for _ in range(sys.getrecursionlimit()))
+        unit = parse(f"int main() {{ x = {terms}; char *p = &p; }}")
+        restored = pickle.loads(pickle.dumps(unit))
+
+        assert ast.dump(restored.items[0].body.items[1], True) == \
+            ast.dump(unit.items[0].body.items[1], True)
+        assert [(type(n), n.start, n.stop) for n in ast.walk(restored)] == \
+            [(type(n), n.start, n.stop) for n in ast.walk(unit)]
+        assert restored.items[0].body.items[1].declarators[0] \
+            .declarator.name is sys.intern('p')
@@ -0,0 +1,290 @@
+# coding=utf-8
+""" Tests for the flattened expression tree of the FlatParaCParser """
+import asyncio
+import gc
+import os
+import random
+import weakref
+from typing import Dict, List, Tuple
+
+import antlr4
+import pytest
+from antlr4 import ParserRuleContext
+from antlr4.atn.Transition import AtomTransition, RuleTransition
+from antlr4.error.ErrorListener import ErrorListener
+from antlr4.tree.Tree import TerminalNode
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ParacCompiler
+from parac.compiler.parser.fast_lexer import FastParaCLexer
+from parac.compiler.parser import flat_parser
+from parac.compiler.parser.flat_parser import BINARY_LEVELS, FlatParaCParser
+from parac.compiler.parser.python.ParaCListener import ParaCListener
+from parac.compiler.parser.python.ParaCParser import ParaCParser
+from parac.util import (ParseMode, ParseModeStatistics, DispatchTableWalker,
+                        free_parse_tree, get_input_stream, parse_with_mode)
+
+from .. import reset_input
+
+test_files_dir = f"{os.getcwd()}{SEP}test_files"
+
+OPERATORS: List[str] = [
+    '+', '-', '*', '/', '%', '<', '>', '<=', '>=', '==', '!=', '&&', '||',
+    '&', '|', '^', '<<', '>>'
+]
+# Conversions ('a as int') are not part of the operands, since a type name
+# followed by a parenthesis always requires the full-context prediction
+OPERANDS: List[str] = [
+    "a", "b[i]", "f(x, y)", "1", "089", "0x1F", "p->q", "s.t", "-a", "!b",
+    "x++", "--y", "*p", "&v", "sizeof(int)", "(int) a", '"s"'
+]
+COLLAPSIBLE_CONTEXTS = (
+    ParaCParser.AssignmentExpressionContext,
+    ParaCParser.ConditionalExpressionContext,
+    ParaCParser.LogicalOrExpressionContext,
+    ParaCParser.MultiplicativeExpressionContext,
+    ParaCParser.CastOrConvertExpressionContext,
+    ParaCParser.UnaryExpressionContext,
+    ParaCParser.PostfixExpressionContext,
+)
+
+
+def get_source(size: int, seed: int) -> str:
+    """ Returns a function with random expression statements """
+    rnd = random.Random(seed)
+
+    def expression(depth: int = 0) -> str:
+        result = rnd.choice(OPERANDS)
+        for _ in range(rnd.randint(0, 3)):
+            operand = rnd.choice(OPERANDS)
+            if depth < 3 and rnd.random() < 0.3:
+                operand = rnd.choice(["({} + {})", "g({}, {})", "({} ? {} : {})",
+                                      "(v = {})", "(v += {})"]).format(
+                    *(expression(depth + 1) for _ in range(3))
+                )
+            result += f" {rnd.choice(OPERATORS)} {operand}"
+        return result
+
+    statements = [
+        "    x = {};\n", "    {};\n", "    if ({}) return {};\n",
+        "    y *= {}, z = {};\n", "    int w = {};\n", "    z = {} ? {} : {};\n"
+    ]
+    return "int main() {\n" + "".join(
+        rnd.choice(statements).format(*(expression() for _ in range(3)))
+        for _ in range(size)
+    ) + "    return 0;\n}\n"
+
+
+def parse(source: str, mode: ParseMode) -> ParserRuleContext:
+    """ Parses the source using the FlatParaCParser """
+    return asyncio.run(ParacCompiler.parse(
+        get_input_stream(source, "test"), False, mode
+    ))
+
+
+class _ErrorCollector(ErrorListener):
+    """ Collects the syntax errors of a parser """
+
+    def __init__(self):
+        self.errors: List[Tuple[int, int, str]] = []
+
+    def syntaxError(self, recognizer, offending_symbol, line, column, msg, e):
+        self.errors.append((line, column, msg))
+
+
+def parse_invalid(
+        source: str, mode: ParseMode, statistics: ParseModeStatistics
+) -> Tuple[ParserRuleContext, list]:
+    """
+    Parses the invalid source and returns the tree and the collected errors,
+    which are not logged, since logged errors fail later syntax validations
+    """
+    parser = FlatParaCParser(antlr4.CommonTokenStream(
+        FastParaCLexer(get_input_stream(source, "test"))
+    ))
+    parser.removeErrorListeners()
+    errors = _ErrorCollector()
+    tree = parse_with_mode(
+        parser, parser.compilationUnit, errors, mode, statistics
+    )
+    return tree, errors.errors
+
+
+def tokens(tree) -> List[str]:
+    """ Returns the tokens of the tree in order """
+    if isinstance(tree, TerminalNode):
+        return [tree.getText()]
+    return [text for child in tree.getChildren() for text in tokens(child)]
+
+
+class _EnterCounter(ParaCListener):
+    """ Counts the entered contexts by their rule """
+
+    def __init__(self):
+        self.entered: Dict[str, int] = {}
+
+    def enterEveryRule(self, ctx: ParserRuleContext):
+        name = ParaCParser.ruleNames[ctx.getRuleIndex()]
+        self.entered[name] = self.entered.get(name, 0) + 1
+
+
+class TestFlatParser:
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_generated_expressions(self, seed: int):
+        source = get_source(25, seed)
+        stats = ParacCompiler.parse_statistics
+        stats.reset()
+
+        # Precedence climbing (SLL stage) and the flattened generated rules
+        # (LL) have to create the same tree
+        trees = [parse(source, mode) for mode in (ParseMode.TWO_STAGE,
+                                                  ParseMode.LL)]
+        assert stats.ll_fallbacks == 0
+        assert trees[0].toStringTree(recog=trees[0].parser) == \
+            trees[1].toStringTree(recog=trees[1].parser)
+
+        parser = ParaCParser(antlr4.CommonTokenStream(
+            FastParaCLexer(get_input_stream(source, "test"))
+        ))
+        parser.removeErrorListeners()
+        assert tokens(trees[0]) == tokens(parser.compilationUnit())
+
+    def test_test_files(self):
+        for root, _, files in os.walk(test_files_dir):
+            for name in files:
+                if not name.endswith((".para", ".ph", ".c", ".h")):
+                    continue
+                with open(f"{root}{SEP}{name}", 'r', encoding='utf-8') as f:
+                    source = ParacCompiler.remove_comments_from_str(f.read())
+                trees = [
+                    parse(source, mode).toStringTree(recog=ParaCParser)
+                    for mode in (ParseMode.TWO_STAGE, ParseMode.LL)
+                ]
+                assert trees[0] == trees[1], name
+
+    def test_atn_states(self):
+        def transition(state: int):
+            atn_state = ParaCParser.atn.states[state]
+            rule = ParaCParser.ruleNames[atn_state.ruleIndex]
+            target = atn_state.transitions[0]
+            if isinstance(target, RuleTransition):
+                return rule, ParaCParser.ruleNames[target.target.ruleIndex]
+            assert isinstance(target, AtomTransition)
+            return rule, target.label_
+
+        rules = [
+            "logicalOrExpression", "logicalAndExpression",
+            "inclusiveOrExpression", "exclusiveOrExpression", "andExpression",
+            "equalityExpression", "relationalExpression", "shiftExpression",
+            "additiveExpression", "multiplicativeExpression",
+            "castOrConvertExpression"
+        ]
+        assert [transition(state) for _, state, _ in BINARY_LEVELS] == \
+            list(zip(rules, rules[1:]))
+
+        assert [transition(state) for state in (
+            flat_parser._CONDITIONAL_STATE, flat_parser._QUESTION_STATE,
+            flat_parser._TRUE_BRANCH_STATE, flat_parser._COLON_STATE,
+            flat_parser._FALSE_BRANCH_STATE
+        )] == [
+            ("conditionalExpression", "logicalOrExpression"),
+            ("conditionalExpression", ParaCParser.Question),
+            ("conditionalExpression", "expression"),
+            ("conditionalExpression", ParaCParser.Colon),
+            ("conditionalExpression", "conditionalExpression")
+        ]
+        assert [transition(state) for state in (
+            flat_parser._ASSIGNMENT_STATE,
+            flat_parser._ASSIGNMENT_OPERATOR_STATE,
+            flat_parser._ASSIGNED_VALUE_STATE
+        )] == [
+            ("assignmentExpression", "conditionalExpression"),
+            ("assignmentExpression", "assignmentOperator"),
+            ("assignmentExpression", "assignmentExpression")
+        ]
+
+    def test_flattened_tree(self):
+        tree = parse("int main() { x = a + b * c; return y; }",
+                     ParseMode.TWO_STAGE)
+        assert tree.toStringTree(recog=tree.parser).endswith(
+            "(compoundStatement { (blockItemList (blockItem (statement "
+            "(expressionStatement (expression (assignmentExpression "
+            "(primaryExpression x) (assignmentOperator =) "
+            "(additiveExpression (primaryExpression a) + "
+            "(multiplicativeExpression (primaryExpression b) * "
+            "(primaryExpression c))))) ;))) (blockItem (statement "
+            "(jumpStatement return (expression (primaryExpression y)) ;))))"
+            " })))) <EOF>)"
+        )
+
+    def test_flattened_conversion(self):
+        tree = parse("int main() { x = a as int as long + b; }",
+                     ParseMode.TWO_STAGE)
+        assert "(additiveExpression (castOrConvertExpression " \
+               "(castOrConvertExpression (primaryExpression a) as " \
+               "(typeName (specifierQualifierList (typeSpecifier int)))) " \
+               "as (typeName (specifierQualifierList (typeSpecifier long))))" \
+               " + (primaryExpression b))" in \
+               tree.toStringTree(recog=tree.parser)
+
+    @pytest.mark.parametrize("mode", [ParseMode.TWO_STAGE, ParseMode.LL])
+    def test_no_single_child_expressions(self, mode: ParseMode):
+        stack = [parse(get_source(25, 0), mode)]
+        while stack:
+            ctx = stack.pop()
+            children = [c for c in ctx.getChildren()
+                        if isinstance(c, ParserRuleContext)]
+            if isinstance(ctx, COLLAPSIBLE_CONTEXTS):
+                assert ctx.getChildCount() > 1 or not children
+            for child in children:
+                assert child.parentCtx is ctx
+            stack.extend(children)
+
+    def test_listener_callbacks(self):
+        listener = _EnterCounter()
+        tree = parse("int main() { x = a + b - c * d; y = e; }",
+                     ParseMode.TWO_STAGE)
+        DispatchTableWalker().walk(listener, tree)
+        assert listener.entered["additiveExpression"] == 1
+        assert listener.entered["multiplicativeExpression"] == 1
+        assert listener.entered["assignmentExpression"] == 2
+        assert listener.entered["primaryExpression"] == 7
+        assert "conditionalExpression" not in listener.entered
+        assert "castOrConvertExpression" not in listener.entered
+
+    def test_invalid_expression(self):
+        source = "int main() { x = a + ; y = b; }"
+        results = [
+            parse_invalid(source, mode, ParseModeStatistics())
+            for mode in (ParseMode.TWO_STAGE, ParseMode.LL)
+        ]
+        assert results[0][1] and results[0][1] == results[1][1]
+        assert results[0][0].toStringTree(recog=ParaCParser) == \
+            results[1][0].toStringTree(recog=ParaCParser)
+
+    def test_cancelled_parse_freed_without_gc(self):
+        stats = ParseModeStatistics()
+
+        # The SLL stage is cancelled inside the precedence climbing
+        tree, _ = parse_invalid(
+            "int main() { x = a * (b + ) ; }", ParseMode.TWO_STAGE, stats
+        )
+        assert isinstance(tree.parser, FlatParaCParser)
+        assert stats.ll_fallbacks == 1
+        ref = weakref.ref(tree.parser)
+
+        gc.disable()
+        try:
+            free_parse_tree(tree)
+            del tree
+            assert ref() is None
+        finally:
+            gc.enable()
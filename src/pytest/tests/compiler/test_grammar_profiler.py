@@ -0,0 +1,91 @@
+# coding=utf-8
+""" Tests for the decision profiler of the parsers """
+import os
+
+import pytest
+
+from parac import SEPARATOR as SEP
+from parac.compiler.grammar_profiler import GrammarProfiler
+from parac.compiler.parser.flat_parser import FlatParaCParser
+from parac.preprocessor.python.ParaCPreProcessorParser import \
+    ParaCPreProcessorParser
+from parac.util import GrammarKind, ParseMode
+
+from .. import reset_input
+
+test_files_dir = f"{os.getcwd()}{SEP}test_files"
+
+
+class TestGrammarProfiler:
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+
+    def test_decision_rules(self):
+        profiler = GrammarProfiler(GrammarKind.PARAC)
+        assert profiler.parser_cls is FlatParaCParser
+        assert len(profiler.decisions) == \
+            len(FlatParaCParser.atn.decisionToState)
+        for decision in profiler.decisions:
+            state = FlatParaCParser.atn.decisionToState[decision.decision]
+            assert decision.rule_name == \
+                FlatParaCParser.ruleNames[state.ruleIndex]
+
+    @pytest.mark.parametrize("mode", ["two-stage", "ll"])
+    def test_profile_test_files(self, mode: str):
+        profiler = GrammarProfiler("parac", mode)
+        assert profiler.profile_path(test_files_dir) == 0
+        assert profiler.files > 0 and profiler.tokens > 0
+
+        decisions = profiler.get_sorted_decisions("time")
+        assert decisions
+        assert [d.time for d in decisions] == \
+            sorted((d.time for d in decisions), reverse=True)
+        for d in decisions:
+            assert 1 <= d.sll_max_lookahead
+            assert d.sll_avg_lookahead <= d.sll_max_lookahead
+            assert d.ll_avg_lookahead <= d.ll_max_lookahead
+            assert d.ll_predictions <= d.full_context_events
+            # Prediction errors only happen in a failing SLL stage
+            assert d.errors == 0 or mode == "two-stage"
+
+        # The LL prediction is only used after an SLL conflict
+        full_context_events = sum(d.full_context_events for d in decisions)
+        assert full_context_events > 0
+        assert sum(d.sll_conflicts for d in decisions) >= full_context_events
+
+    def test_sll_mode(self):
+        profiler = GrammarProfiler(GrammarKind.PARAC, ParseMode.SLL)
+        assert profiler.profile_file(
+            f"{test_files_dir}{SEP}c_files{SEP}HelloWorld.c"
+        ) == 0
+        decisions = profiler.get_sorted_decisions("full-context")
+        assert sum(d.full_context_events for d in decisions) == 0
+
+    def test_sll_stage_errors(self):
+        # Function parameters require the LL prediction, so the SLL stage
+        # fails and the parse is repeated using LL
+        profiler = GrammarProfiler(GrammarKind.PARAC, ParseMode.TWO_STAGE)
+        profiler.profile_file(f"{test_files_dir}{SEP}entry.para")
+        assert profiler.parse_statistics.ll_fallbacks == 1
+        assert any(
+            d.rule_name == "parameterDeclaration" and d.sll_conflicts > 0
+            for d in profiler.get_sorted_decisions("full-context")
+        )
+
+    def test_preprocessor_grammar(self):
+        profiler = GrammarProfiler(GrammarKind.PREPROCESSOR, ParseMode.LL)
+        assert profiler.parser_cls is ParaCPreProcessorParser
+        profiler.profile_path(test_files_dir)
+        decisions = profiler.get_sorted_decisions("invocations")
+        assert decisions[0].invocations >= decisions[-1].invocations
+        assert {d.rule_name for d in decisions} <= \
+            set(ParaCPreProcessorParser.ruleNames)
+
+    def test_invalid_sort_key(self):
+        with pytest.raises(ValueError):
+            GrammarProfiler().get_sorted_decisions("nodes")
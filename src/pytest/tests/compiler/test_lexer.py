@@ -0,0 +1,138 @@
+# coding=utf-8
+""" Differential tests for the FastParaCLexer against the ParaCLexer """
+import asyncio
+import os
+import random
+from typing import List, Tuple
+
+import antlr4
+import pytest
+from antlr4.error.ErrorListener import ErrorListener
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ParacCompiler, BasicProcess
+from parac.compiler.parser.fast_lexer import (FastParaCLexer, KEYWORDS,
+                                              OPERATORS)
+from parac.compiler.parser.python.ParaCLexer import ParaCLexer
+from parac.util import LexerKind, get_input_stream
+
+from .. import reset_input
+
+test_files_dir = f"{os.getcwd()}{SEP}test_files"
+
+# Fragments of the generated corpus, which contain the edge cases of the
+# longest-match rule (e.g. keyword prefixes, numbers that are no Constant,
+# asm blocks and prefixed literals) and invalid input
+FRAGMENTS: List[str] = [
+    *KEYWORDS, *OPERATORS,
+    "intx", "asm", "asmfoo", "__asm__x", "L", "u8", "u", "U", "x", "_a1",
+    "0", "00", "089", "0x", "0x1F", "0x1.8p3", "0x.8P-2f", "0b101", "0b",
+    "0B2", "123", "123ul", "1ull", "1LLu", "1lL", "1e5", "1e", "1.", "1.5",
+    "1.5e+3f", ".5", "..", "1e5.", "'a'", "L'b'", "u'\\n'", "'\\x41'",
+    "'\\0'", "'\\8'", "'", "''", '""', '"ab\\"c"', 'u8"x"', 'L"y"',
+    '"a\\\nb"', '"a\\\r\nb"', '"unterminated', "@ foo { x } @ end\n",
+    "@foo{a}@end\r\n", "@x{", "#define X 1\n", "# x", " ", "\t", "\n",
+    "\r\n", "\r", "$", "`", "\\", "\\u00e9", "a\\u00e9b", "\\U0001F600",
+    "é", "\f",
+]
+
+
+class _ErrorCollector(ErrorListener):
+    """ Collects the token recognition errors of a lexer """
+
+    def __init__(self):
+        self.errors: List[Tuple[int, int, str]] = []
+
+    def syntaxError(self, recognizer, offending_symbol, line, column, msg, e):
+        self.errors.append((line, column, msg))
+
+
+def lex(lexer_cls: type, source: str) -> Tuple[list, list]:
+    """ Returns the tokens and errors of the passed lexer for the source """
+    lexer = lexer_cls(get_input_stream(source, "test"))
+    lexer.removeErrorListeners()
+    errors = _ErrorCollector()
+    lexer.addErrorListener(errors)
+    stream = antlr4.CommonTokenStream(lexer)
+    stream.fill()
+    tokens = [
+        (t.type, t.channel, t.start, t.stop, t.line, t.column, t.text)
+        for t in stream.tokens
+    ]
+    return tokens, errors.errors
+
+
+def get_corpus(size: int, seed: int) -> List[str]:
+    """ Returns the generated corpus of random fragment sequences """
+    rnd = random.Random(seed)
+    return [
+        "".join(
+            rnd.choice(FRAGMENTS) + rnd.choice(["", "", " ", "\n"])
+            for _ in range(rnd.randint(1, 25))
+        )
+        for _ in range(size)
+    ]
+
+
+class TestFastLexer:
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_generated_corpus(self, seed: int):
+        for source in get_corpus(250, seed):
+            assert lex(FastParaCLexer, source) == lex(ParaCLexer, source), \
+                repr(source)
+
+    def test_test_files(self):
+        for root, _, files in os.walk(test_files_dir):
+            for name in files:
+                if not name.endswith((".para", ".ph", ".c", ".h")):
+                    continue
+                with open(f"{root}{SEP}{name}", 'r', encoding='utf-8') as f:
+                    source = ParacCompiler.remove_comments_from_str(f.read())
+                assert lex(FastParaCLexer, source) == \
+                    lex(ParaCLexer, source), name
+
+    def test_invalid_input(self):
+        # The Antlr4 lexer recovers from the unterminated char constant by
+        # dropping the rest of the line
+        source = "int $x = 'a;\nint y;"
+        tokens, errors = lex(FastParaCLexer, source)
+        assert [t[-1] for t in tokens] == \
+            ["int", "x", "=", "int", "y", ";", "<EOF>"]
+        assert [error[:2] for error in errors] == [(1, 4), (1, 9)]
+        assert (tokens, errors) == lex(ParaCLexer, source)
+
+    def test_literals(self):
+        # Keywords and operators are taken from the generated lexer
+        assert KEYWORDS["int"] == ParaCLexer.Int
+        assert KEYWORDS["__asm__"] == ParaCLexer.T__12
+        assert OPERATORS["<<="] == ParaCLexer.LeftShiftAssign
+        assert len(KEYWORDS) + len(OPERATORS) == \
+            sum(name.startswith("'") for name in ParaCLexer.literalNames)
+
+    @pytest.mark.parametrize("lexer", [kind.value for kind in LexerKind])
+    def test_process_lexer(self, lexer: str):
+        p = BasicProcess(
+            f"{test_files_dir}{SEP}entry.para", 'utf-8', lexer=lexer
+        )
+        assert p.lexer is LexerKind(lexer)
+        assert asyncio.run(p.validate_syntax(True))
+
+    def test_same_parse_tree(self):
+        with open(f"{test_files_dir}{SEP}entry.para", 'r',
+                  encoding='utf-8') as file:
+            source = ParacCompiler.remove_comments_from_str(file.read())
+        trees = []
+        for lexer in LexerKind:
+            ctx = asyncio.run(ParacCompiler.parse(
+                get_input_stream(source, "entry"), True, lexer=lexer
+            ))
+            trees.append(ctx.toStringTree(recog=ctx.parser))
+        assert trees[0] == trees[1]
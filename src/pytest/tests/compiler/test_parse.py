@@ -4,10 +4,12 @@ import logging
 import os
 from typing import List
 import asyncio
+import pytest
 
 from parac import SEPARATOR as SEP, RUNTIME_COMPILER
 from parac.logging import set_avoid_print_banner_overwrite
 from parac.compiler import ParacCompiler, BasicProcess
+from parac.util import ParseMode, get_input_stream
 
 from .. import reset_input
 
@@ -21,6 +23,8 @@ set_avoid_print_banner_overwrite(True)
 main_file_path = f"{os.getcwd()}{SEP}test_files{SEP}entry.para"
 test_c_files_dir = f"{os.getcwd()}{SEP}test_files{SEP}c_files{SEP}"
 test_para_files_dir = f"{os.getcwd()}{SEP}test_files{SEP}"
+# File that can be parsed using only SLL prediction
+sll_file_path = f"{os.getcwd()}{SEP}test_files{SEP}exceptions.para"
 
 
 class TestParser:
@@ -59,3 +63,40 @@ class TestParser:
         for file in files:
             p = BasicProcess(file.path, 'utf-8')
             asyncio.run(p.validate_syntax(True))
+
+    @pytest.mark.parametrize(
+        "parse_mode", [mode.value for mode in ParseMode]
+    )
+    def test_parse_modes(self, parse_mode: str):
+        stats = ParacCompiler.parse_statistics
+        stats.reset()
+
+        p = BasicProcess(sll_file_path, 'utf-8', parse_mode)
+        assert p.parse_mode is ParseMode(parse_mode)
+        asyncio.run(p.validate_syntax(True))
+
+        assert stats.total_parses == 1
+        assert stats.ll_fallbacks == 0
+        assert stats.ll_parses == (1 if parse_mode == "ll" else 0)
+
+    def test_two_stage_same_tree(self):
+        with open(sll_file_path, 'r', encoding='utf-8') as file:
+            content = ParacCompiler.remove_comments_from_str(file.read())
+
+        trees = []
+        for mode in (ParseMode.LL, ParseMode.TWO_STAGE):
+            stream = get_input_stream(content, "exceptions.para")
+            ctx = asyncio.run(ParacCompiler.parse(stream, True, mode))
+            trees.append(ctx.toStringTree(recog=ctx.parser))
+        assert trees[0] == trees[1]
+
+    def test_two_stage_fallback_statistics(self):
+        stats = ParacCompiler.parse_statistics
+        stats.reset()
+
+        # Invalid syntax can never be parsed by the SLL stage
+        stream = get_input_stream("int x = ;", "invalid.para")
+        asyncio.run(ParacCompiler.parse(stream, True, ParseMode.TWO_STAGE))
+        assert stats.sll_parses == 1
+        assert stats.ll_fallbacks == 1
+        assert stats.total_parses == 1
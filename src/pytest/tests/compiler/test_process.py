@@ -1,14 +1,24 @@
 # coding=utf-8
 """ Test for the compiler process setup """
+import asyncio
+import json
 import os
+import pstats
+
+import pytest
 
 from parac import SEPARATOR as SEP
 from parac.compiler import ProgramCompilationProcess
 from parac.logging import set_avoid_print_banner_overwrite
+from parac.preprocessor import NonPreProcessorItem, PreProcessorProcessResult
+from parac.preprocessor.logic_stream import ProcessedFileStream
+from parac.util import (ProgressTracker, FileCompletedEvent,
+                        PHASE_PREPROCESSOR, PHASE_COMPILER, STEPS)
 
-from .. import add_folder, reset_input
+from .. import add_folder, remove_folder, reset_input
 
 main_file_path = f"{os.getcwd()}{SEP}test_files{SEP}entry.para"
+exceptions_file_path = f"{os.getcwd()}{SEP}test_files{SEP}exceptions.para"
 set_avoid_print_banner_overwrite(True)
 
 
@@ -42,3 +52,218 @@ class TestProcess:
 
         assert p.build_path == b_path.decode()
         assert p.dist_path == d_path.decode()
+
+    def test_jobs_init(self):
+        b_path = add_folder("build")
+        d_path = add_folder("dist")
+        p = ProgramCompilationProcess(
+            main_file_path, 'utf-8', b_path, d_path
+        )
+        assert p.jobs == 1
+
+        p = ProgramCompilationProcess(
+            main_file_path, 'utf-8', b_path, d_path, jobs=0
+        )
+        assert p.jobs == (os.cpu_count() or 1)
+
+        with pytest.raises(ValueError):
+            ProgramCompilationProcess(
+                main_file_path, 'utf-8', b_path, d_path, jobs=-1
+            )
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_parse_files(self, jobs: int):
+        b_path = add_folder("build")
+        d_path = add_folder("dist")
+        p = ProgramCompilationProcess(
+            main_file_path, 'utf-8', b_path, d_path, jobs=jobs
+        )
+        ctx = p.compilation_ctx
+
+        file_ctx_list = asyncio.run(
+            ctx.parse_files([main_file_path, exceptions_file_path], True)
+        )
+        assert [c.relative_file_name for c in file_ctx_list] == [
+            "entry", "exceptions"
+        ]
+        for file_ctx in file_ctx_list:
+            ctx.add_file_ctx(file_ctx, file_ctx.relative_file_name)
+            assert file_ctx.program_ctx is ctx
+        assert len(ctx.context_dict) == 2
+
+    def test_build_cache(self):
+        b_path = add_folder("build")
+        d_path = add_folder("dist")
+
+        def _parse(use_build_cache: bool):
+            process = ProgramCompilationProcess(
+                main_file_path, 'utf-8', b_path, d_path,
+                use_build_cache=use_build_cache
+            )
+            result = asyncio.run(
+                process.compilation_ctx.parse_files(
+                    [main_file_path, exceptions_file_path], True
+                )
+            )
+            return process, result
+
+        p, first = _parse(True)
+        assert p.build_cache.statistics.misses == 2
+
+        p, second = _parse(True)
+        assert p.build_cache.statistics.hits == 2
+        assert [c.relative_file_name for c in second] == [
+            c.relative_file_name for c in first
+        ]
+
+        p, _ = _parse(False)
+        assert p.build_cache is None
+
+    def test_build_cache_syntax_error(self):
+        b_path = add_folder("build")
+        d_path = add_folder("dist")
+        file_path = f"{add_folder('invalid')}{SEP}invalid.para"
+        with open(file_path, 'w', encoding='utf-8') as file:
+            file.write("int main( {")
+
+        for _ in range(2):
+            p = ProgramCompilationProcess(
+                file_path, 'utf-8', b_path, d_path
+            )
+            ctx, = asyncio.run(
+                p.compilation_ctx.parse_files([file_path], False)
+            )
+            assert ctx.syntax_errors > 0
+            assert p.build_cache.statistics.misses == 1
+        remove_folder("invalid")
+
+    @pytest.mark.parametrize("keep_temp", [False, True])
+    def test_processed_sources(self, keep_temp: bool):
+        b_path = add_folder("build")
+        d_path = add_folder("dist")
+        p = ProgramCompilationProcess(
+            main_file_path, 'utf-8', b_path, d_path, use_build_cache=False,
+            keep_temp=keep_temp
+        )
+        processed = ProcessedFileStream([
+            NonPreProcessorItem("int x = 1;\n", 1, 0, "exceptions", None),
+            NonPreProcessorItem("int y = 2;\n", 2, 0, "exceptions", None)
+        ])
+        assert processed.file_string == "int x = 1;\nint y = 2;\n"
+
+        result = PreProcessorProcessResult({exceptions_file_path: processed})
+        asyncio.run(p._pass_preprocessor_output(result))
+        assert p.processed_sources == {
+            exceptions_file_path: processed.file_string
+        }
+
+        # The processed file is parsed from memory instead of the disk
+        ctx = p.compilation_ctx
+        asyncio.run(ctx.process_program(False))
+        assert sorted(ctx.context_dict) == ["entry", "exceptions"]
+        assert ctx.context_dict["exceptions"].token_count == 11
+
+        assert os.path.exists(p.temp_build_folder) == keep_temp
+        if keep_temp:
+            assert p.temp_entry_file_path is None
+            temp_file, = p.temp_files
+            assert temp_file == os.path.join(
+                p.temp_build_folder, "exceptions.para"
+            )
+            with open(temp_file, 'r', encoding='utf-8') as file:
+                assert file.read() == processed.file_string
+        else:
+            assert p.temp_files == []
+
+    def test_progress_tracker(self):
+        tracker = ProgressTracker()
+        events = []
+        tracker.subscribe(events.append)
+
+        tracker.start_phase(PHASE_PREPROCESSOR, "Pre-Processor", 2)
+        tracker.file_completed(PHASE_PREPROCESSOR, "a.para", 10, 3, 0.1, False)
+        assert tracker.progress == 0.25
+        tracker.finish_phase(PHASE_PREPROCESSOR)
+        assert tracker.progress == 0.5
+        tracker.start_phase(PHASE_COMPILER, "Compiler")
+        tracker.finish_phase(PHASE_COMPILER)
+        tracker.finish(None)
+        assert tracker.progress == 1
+
+        assert [e.event_type for e in events] == [
+            "phase-started", "file-completed", "phase-finished",
+            "phase-started", "phase-finished", "finished"
+        ]
+        file_event = events[1].to_dict()
+        assert file_event['file'] == "a.para"
+        assert file_event['bytes'] == 10
+        assert file_event['tokens'] == 3
+        assert file_event['files_total'] == 2
+        for event in events:
+            assert json.loads(event.to_json()) == event.to_dict()
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_parse_files_progress(self, jobs: int):
+        b_path = add_folder("build")
+        d_path = add_folder("dist")
+        p = ProgramCompilationProcess(
+            main_file_path, 'utf-8', b_path, d_path, jobs=jobs,
+            use_build_cache=False
+        )
+        events = []
+        p.progress.subscribe(events.append)
+
+        asyncio.run(
+            p.compilation_ctx.parse_files(
+                [main_file_path, exceptions_file_path], True
+            )
+        )
+        file_events = [e for e in events if isinstance(e, FileCompletedEvent)]
+        assert sorted(e.file.split("/")[-1] for e in file_events) == [
+            "entry.para", "exceptions.para"
+        ]
+        for event in file_events:
+            assert event.phase == PHASE_COMPILER
+            assert event.file_bytes > 0
+            assert event.tokens > 0
+            assert not event.cached
+        assert file_events[-1].files_completed == 2
+        assert file_events[-1].files_total == 2
+        assert p.progress.phases[PHASE_COMPILER].tokens == sum(
+            e.tokens for e in file_events
+        )
+
+    def test_profiler(self):
+        b_path = add_folder("build")
+        d_path = add_folder("dist")
+        p = ProgramCompilationProcess(
+            main_file_path, 'utf-8', b_path, d_path
+        )
+        assert p.profiler is None
+
+        p = ProgramCompilationProcess(
+            main_file_path, 'utf-8', b_path, d_path, use_build_cache=False,
+            profile_phases=True
+        )
+
+        async def _parse():
+            with p.profiler.measure_phase(PHASE_COMPILER):
+                await p.compilation_ctx.parse_files(
+                    [main_file_path, exceptions_file_path], True
+                )
+        asyncio.run(_parse())
+
+        assert len(p.profiler.files) == 2
+        for record in p.profiler.files:
+            assert list(record.steps) == STEPS
+            assert record.wall > 0
+            assert record.tokens > 0
+            assert record.nodes > 0
+        phase = p.profiler.phases[PHASE_COMPILER]
+        assert phase.wall >= max(r.wall for r in p.profiler.files)
+        assert phase.nodes == sum(r.nodes for r in p.profiler.files)
+        assert p.profiler.get_sorted_records()[0] is phase
+
+        dump_path = f"{b_path}{SEP}profile.pstats"
+        assert p.profiler.dump_hottest_phase(dump_path) == PHASE_COMPILER
+        assert pstats.Stats(dump_path).total_calls > 0
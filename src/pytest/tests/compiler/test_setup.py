@@ -5,7 +5,7 @@ import pytest
 import os
 
 from parac import (FileNotFoundError as ParaFileNotFoundError,
-                   SEPARATOR as SEP, UserInputError)
+                   SEPARATOR as SEP, UserInputError, CACHE_FOLDER_NAME)
 from parac.logging import set_avoid_print_banner_overwrite
 from parac.compiler import ParacCompiler
 from parac_cli import cli_run_output_dir_validation, cli_create_process
@@ -59,6 +59,20 @@ class TestCLISetup:
         assert not os.path.exists("./dist/example.txt")
         add_folder("dist")
 
+    def test_build_cache_folder_kept(self):
+        add_folder("build")
+        os.mkdir(f"./build/{CACHE_FOLDER_NAME}")
+        create_test_file(f"build/{CACHE_FOLDER_NAME}", "cache.txt")
+
+        # Only the cache folder exists -> No prompt and no new folder
+        cli_run_output_dir_validation(False, True)
+        assert not os.path.exists("./build_2")
+
+        create_test_file("build", "example.txt")
+        cli_run_output_dir_validation(True, True)
+        assert not os.path.exists("./build/example.txt")
+        assert os.path.exists(f"./build/{CACHE_FOLDER_NAME}/cache.txt")
+
     def test_simple_setup_compilation_process(self):
         b_path = add_folder("build")
         d_path = add_folder("dist")
@@ -116,12 +130,18 @@ class TestCLISetup:
             ("x y z", "x y z", "\r\n"),
             ("x \ny z", "x // some \ny z", "\n"),
             ("x \r\ny z", "x // some \ny z", "\r\n"),
-            ("\nx \ny \nz", "/* xx  */x // some \ny // x x x \r\nz", "\n"),
-            ("\rx \ry \rz", "/* xx  */x // some \ny // x x x \r\nz", "\r"),
+            (" x \ny \nz", "/* xx  */x // some \ny // x x x \r\nz", "\n"),
+            (" x \ry \rz", "/* xx  */x // some \ny // x x x \r\nz", "\r"),
             ("x \n\n\ny z", "x // x \r// x \n// x \r\ny z", "\n"),
             ("x \r\r\ry z", "x // x \r// x \n// x \r\ny z", "\r"),
             ("x \n\n\n\ny \nz", "x // x \r\n\n// x \n// x \r\ny \nz", "\n"),
             ("x \r\r\r\ry \rz", "x // x \r\n\n// x \n// x \r\ny \nz", "\r"),
+            ("x \n\n\ny", "x /* x \n x \r\n */\ny", "\n"),
+            ("x 'y'  \nz", "x 'y' /* x */\nz", "\n"),
+            ('x "//y" \nz', 'x "//y" // x\nz', "\n"),
+            ('x "/*\\"*/" ', 'x "/*\\"*/" // "x"', "\n"),
+            ("x = '/'; ", "x = '/'; // x", "\n"),
+            ("x \n", "x /* x \n", "\n"),
         ]
     )
     def test_remove_comments_from_str(
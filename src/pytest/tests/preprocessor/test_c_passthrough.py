@@ -0,0 +1,115 @@
+# coding=utf-8
+""" Tests for the verbatim C regions ('#pragma PARAC lang C') """
+import asyncio
+import os
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ParacCompiler, ProgramCompilationProcess
+from parac.compiler.ctx import ProgramCompilationContext
+from parac.logging import set_avoid_print_banner_overwrite
+from parac.preprocessor import PragmaDirective, LANG_C, LANG_PARAC
+
+from .. import add_folder, remove_folder, reset_input
+
+set_avoid_print_banner_overwrite(True)
+
+ENTRY = '#define N 3\n' \
+        'int x = N;\n' \
+        '#pragma PARAC lang C\n' \
+        '#define N 4\n' \
+        'static int c_only(int *restrict a) { return a[0] @@ N; }\n' \
+        '#include "missing.h"\n' \
+        '#pragma PARAC lang PARAC\n' \
+        'int y = N;\n' \
+        '#pragma PARAC lang C\n' \
+        'int z = N;\n'
+
+
+def run_preprocessor(source: str):
+    """ Runs the Pre-Processor on entry.para and returns the result """
+    path = add_folder("c_passthrough_test")
+    with open(f"{path}{SEP}entry.para", 'w', encoding='utf-8') as file:
+        file.write(source)
+
+    p = ProgramCompilationProcess(
+        f"{path}{SEP}entry.para", 'utf-8', f"{os.getcwd()}{SEP}build",
+        f"{os.getcwd()}{SEP}dist", use_build_cache=False
+    )
+    result = asyncio.run(p.preprocessor_ctx.process_program(False))
+    return os.path.normpath(f"{path}{SEP}entry.para"), result
+
+
+class TestCPassthrough:
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+        remove_folder("c_passthrough_test")
+
+    def test_language_pragma(self):
+        for pragma, language in [
+            ("PARAC lang C", LANG_C),
+            ("PARAC lang PARAC", LANG_PARAC),
+            ("PARACC lang C", None),
+            ("PARAC lang Rust", None),
+            ("once", None),
+        ]:
+            directive = PragmaDirective(
+                f"#pragma {pragma}", 1, 0, "entry", None, pragma
+            )
+            assert directive.language == language, pragma
+
+    def test_preprocessor_regions(self):
+        entry_path, result = run_preprocessor(ENTRY)
+        assert result.c_regions == {entry_path: [(4, 7), (10, 12)]}
+
+        # Macros are neither defined nor expanded in C regions
+        lines = result.sources[entry_path].split('\n')
+        assert lines[1] == "int x = 3;"
+        assert lines[4].endswith("return a[0] @@ N; }")
+        assert lines[7] == "int y = 3;"
+        assert lines[9] == "int z = N;"
+
+    def test_no_regions(self):
+        entry_path, result = run_preprocessor(
+            '#pragma PARAC lang PARAC\nint x;\n'
+        )
+        assert result.c_regions == {}
+
+    def test_extract_c_regions(self):
+        source = "a\nb\nc\nd\ne"
+        string, regions = ParacCompiler.extract_c_regions(
+            source, [(2, 4), (5, 7)]
+        )
+        assert string == "a\n\n\nd\n"
+        assert regions == [(2, "b\nc\n"), (5, "e")]
+
+    def test_compile_skips_c_regions(self):
+        entry_path, result = run_preprocessor(ENTRY)
+        ctx = asyncio.run(
+            ProgramCompilationContext.read_and_parse_file(
+                entry_path, 'utf-8', os.getcwd(), False,
+                source=result.sources[entry_path],
+                c_regions=result.c_regions[entry_path]
+            )
+        )
+        # The invalid Para-C in the regions is not lexed or parsed
+        assert ctx.syntax_errors == 0
+        assert ctx.c_regions == [
+            (4, '#define N 4\n'
+                'static int c_only(int *restrict a) { return a[0] @@ N; }\n'
+                '#include "missing.h"\n'),
+            (10, 'int z = N;\n')
+        ]
+
+        ctx = asyncio.run(
+            ProgramCompilationContext.read_and_parse_file(
+                entry_path, 'utf-8', os.getcwd(), False,
+                source=result.sources[entry_path]
+            )
+        )
+        assert ctx.syntax_errors > 0
+        assert ctx.c_regions == []
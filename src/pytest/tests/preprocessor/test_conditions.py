@@ -0,0 +1,168 @@
+# coding=utf-8
+""" Tests for the evaluation of the selection directives """
+import asyncio
+import os
+
+import pytest
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ProgramCompilationProcess
+from parac.exceptions import LogicalError
+from parac.logging import set_avoid_print_banner_overwrite
+from parac.preprocessor import (ConditionEvaluator, IfDefinedDirective,
+                                IfDirective, ElIfNotDefinedDirective,
+                                EndIfDirective, MacroTable, parse_define)
+from parac.preprocessor.line_scanner import scan_directive_lines
+
+from .. import add_folder, remove_folder, reset_input
+
+set_avoid_print_banner_overwrite(True)
+
+
+def create_evaluator(*defines: str) -> ConditionEvaluator:
+    """ Creates an evaluator with a table containing the passed defines """
+    table = MacroTable()
+    for define in defines:
+        table.define(parse_define(define))
+    return ConditionEvaluator(table)
+
+
+def run_preprocessor(files: dict) -> str:
+    """
+    Creates the passed files, runs the Pre-Processor on entry.para and
+    returns its processed source
+    """
+    path = add_folder("condition_test")
+    for name, content in files.items():
+        with open(f"{path}{SEP}{name}", 'w', encoding='utf-8') as file:
+            file.write(content)
+
+    p = ProgramCompilationProcess(
+        f"{path}{SEP}entry.para", 'utf-8', f"{os.getcwd()}{SEP}build",
+        f"{os.getcwd()}{SEP}dist", use_build_cache=False
+    )
+    result = asyncio.run(p.preprocessor_ctx.process_program(False))
+    return result.sources[os.path.normpath(f"{path}{SEP}entry.para")]
+
+
+class TestConditions:
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+        remove_folder("condition_test")
+
+    def test_evaluate(self):
+        evaluator = create_evaluator(
+            "#define A 2", "#define B (A * 3)", "#define F(x) ((x) + 1)",
+            "#define E"
+        )
+        for expression, value in [
+            ("A == 2 && B > 5", 1),
+            ("defined(A) + defined E + defined X", 2),
+            ("!defined(E) || UNKNOWN", 0),
+            ("F(A) << 2", 12),
+            ("A > 1 ? 10 : 20", 10),
+            ("-7 / 2", -3),
+            ("-7 % 2", -1),
+            ("(3 && 5) + (0 || 7)", 2),
+            ("3 > 2 > 1", 0),
+            ("'a' + '\\n'", 107),
+            ("0x10 + 010 + 0b1 + 5UL", 30),
+            ("1 || 1 / 0", 1),
+            ("__cplusplus", 0),
+        ]:
+            assert evaluator.evaluate(expression) == value, expression
+
+        for invalid in ["", "1 +", "(1", "1 2", "1 / 0", "1.5", '"x"', "E",
+                        "defined", "defined(A"]:
+            with pytest.raises(LogicalError):
+                evaluator.evaluate(invalid)
+
+    def test_cache(self):
+        evaluator = create_evaluator("#define VERSION 2")
+        table = evaluator.macro_table
+        assert evaluator.evaluate("__cplusplus") == 0
+        assert evaluator.evaluate("VERSION >= 2") == 1
+
+        # Unrelated defines change the generation, but not the conditions
+        table.define(parse_define("#define HEADER_H"))
+        assert evaluator.evaluate("__cplusplus") == 0
+        assert evaluator.evaluate("VERSION >= 2") == 1
+        stats = evaluator.statistics
+        assert (stats.compilations, stats.cache_hits) == (2, 2)
+
+        table.define(parse_define("#define VERSION 1"))
+        assert evaluator.evaluate("VERSION >= 2") == 0
+        table.define(parse_define("#define __cplusplus 1"))
+        assert evaluator.evaluate("__cplusplus") == 1
+        assert stats.compilations == 4
+
+        uncached = ConditionEvaluator(table, cache_conditions=False)
+        uncached.evaluate("1")
+        uncached.evaluate("1")
+        assert uncached.statistics.compilations == 2
+
+    def test_is_satisfied(self):
+        evaluator = create_evaluator("#define A 1")
+        scanned = scan_directive_lines(
+            "#if A\n#ifdef A\n#elifndef A\n#endif\n#ifdef  B  extra\n",
+            "entry"
+        )
+        tokens = scanned.directive_items
+        assert [type(t) for t in tokens] == [
+            IfDirective, IfDefinedDirective, ElIfNotDefinedDirective,
+            EndIfDirective, IfDefinedDirective
+        ]
+        assert [t.condition for t in tokens] == ["A", "A", "A", None, "B"]
+        assert [evaluator.is_satisfied(t) for t in tokens] == [
+            True, True, False, True, False
+        ]
+        assert not scanned.has_directives
+
+    def test_process_program(self):
+        entry = run_preprocessor({
+            "entry.para": '#include "header.ph"\n'
+                          '#if VERSION > 1\n'
+                          'int new_api;\n'
+                          '#  ifdef __cplusplus\n'
+                          'int cpp;\n'
+                          '#  endif\n'
+                          '#elif VERSION == 1\n'
+                          'int old_api;\n'
+                          '#else\n'
+                          '#include "missing.ph"\n'
+                          '#error unreachable\n'
+                          '#endif\n'
+                          '#ifndef HEADER_H\n'
+                          'int no_header;\n'
+                          '#endif\n',
+            "header.ph": '#ifndef HEADER_H\n'
+                         '#define HEADER_H\n'
+                         '#define VERSION 2\n'
+                         '#endif\n'
+        })
+        assert entry == '#include "header.ph"\n' \
+                        '#if VERSION > 1\n' \
+                        'int new_api;\n' \
+                        '#  ifdef __cplusplus\n' \
+                        '\n' \
+                        '#  endif\n' \
+                        '#elif VERSION == 1\n' \
+                        '\n' \
+                        '#else\n' \
+                        '\n' \
+                        '\n' \
+                        '#endif\n' \
+                        '#ifndef HEADER_H\n' \
+                        '\n' \
+                        '#endif\n'
+
+    def test_unbalanced(self):
+        for text in ["#if 1\nint a;\n", "#endif\n", "#if 1\n#else\n#elif 1\n"
+                     "#endif\n", "#else\n"]:
+            with pytest.raises(LogicalError):
+                run_preprocessor({"entry.para": text})
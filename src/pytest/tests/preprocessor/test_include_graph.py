@@ -0,0 +1,126 @@
+# coding=utf-8
+""" Tests for the include graph of the Pre-Processor """
+import asyncio
+import os
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ProgramCompilationProcess
+from parac.logging import set_avoid_print_banner_overwrite
+from parac.preprocessor import IncludeGraph
+
+from .. import add_folder, remove_folder, reset_input
+
+set_avoid_print_banner_overwrite(True)
+
+# entry.para -> a.ph -> c.ph
+#            -> b.ph
+#            -> <stdio.h> (not resolved)
+TEST_PROGRAM = {
+    "entry.para": '#include "a.ph"\n#include "lib/b.ph"\n'
+                  '#include <stdio.h>\nint x;\n',
+    "a.ph": '#include "lib/c.ph"\nint a;\n',
+    f"lib{SEP}b.ph": 'int b;\n',
+    f"lib{SEP}c.ph": 'int c;\n'
+}
+
+
+def create_program() -> str:
+    """ Creates the test program and returns the path of the entry file """
+    path = add_folder("include_test")
+    os.mkdir(f"{path}{SEP}lib")
+    for name, content in TEST_PROGRAM.items():
+        with open(f"{path}{SEP}{name}", 'w', encoding='utf-8') as file:
+            file.write(content)
+    return f"{path}{SEP}entry.para"
+
+
+def run_preprocessor(entry_path: str) -> ProgramCompilationProcess:
+    """ Runs the Pre-Processor and saves the include graph """
+    p = ProgramCompilationProcess(
+        entry_path, 'utf-8', f"{os.getcwd()}{SEP}build",
+        f"{os.getcwd()}{SEP}dist"
+    )
+    p._load_include_graph()
+    asyncio.run(p._run_preprocessor(True))
+    p._save_include_graph()
+    return p
+
+
+class TestIncludeGraph:
+    @staticmethod
+    def setup_method(_):
+        """ Creates empty build and dist folders before each test """
+        add_folder("build")
+        add_folder("dist")
+
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+        remove_folder("include_test")
+
+    def test_transitive_dependents(self):
+        graph = IncludeGraph()
+        graph.includes.update({
+            "entry": ["a", "b"],
+            "a": ["c"],
+            "b": [],
+            "c": [],
+            "d": ["c", "entry"]
+        })
+
+        assert graph.get_dependents("c") == {"a", "d"}
+        assert graph.get_transitive_dependents(["c"]) == {"a", "entry", "d"}
+        assert graph.get_transitive_dependents(["b"]) == {"entry", "d"}
+        assert graph.get_transitive_dependents(["d"]) == set()
+
+    def test_program_graph(self):
+        p = run_preprocessor(create_program())
+
+        graph = p.preprocessor_ctx.include_graph
+        assert graph.includes == {
+            "entry.para": ["a.ph", "lib/b.ph"],
+            "a.ph": ["lib/c.ph"],
+            "lib/b.ph": [],
+            "lib/c.ph": []
+        }
+        assert len(p.preprocessor_ctx.context_dict) == 4
+
+        loaded = IncludeGraph.load(p.include_graph_path)
+        assert loaded.includes == graph.includes
+        assert loaded.get_rebuild_set(p.work_dir) == set()
+
+    def test_rebuild_set(self):
+        entry_path = create_program()
+        run_preprocessor(entry_path)
+
+        work_dir = os.path.dirname(entry_path)
+        with open(f"{work_dir}{SEP}lib{SEP}c.ph", 'a') as file:
+            file.write("int d;\n")
+
+        p = run_preprocessor(entry_path)
+        assert p.rebuild_set == {"lib/c.ph", "a.ph", "entry.para"}
+        assert p.requires_rebuild(f"{work_dir}{SEP}a.ph")
+        assert not p.requires_rebuild(f"{work_dir}{SEP}lib{SEP}b.ph")
+
+        # The changed header and its dependents are parsed again, while the
+        # unchanged file is taken from the build cache
+        stats = p.build_cache.statistics
+        assert (stats.hits, stats.misses) == (1, 3)
+
+    def test_deps_command(self):
+        from parac_cli import ParacCLI
+
+        entry_path = create_program()
+        run_preprocessor(entry_path)
+        with open(f"{os.path.dirname(entry_path)}{SEP}a.ph", 'a') as file:
+            file.write("int d;\n")
+
+        rebuild_set = ParacCLI.parac_deps(
+            file=entry_path, encoding='utf-8', log="None",
+            build=f"{os.getcwd()}{SEP}build", debug=False, keep_open=False
+        )
+        assert rebuild_set == {"a.ph", "entry.para"}
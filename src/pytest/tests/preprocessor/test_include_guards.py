@@ -0,0 +1,171 @@
+# coding=utf-8
+""" Tests for the multiple-include optimisation """
+import asyncio
+import os
+
+import pytest
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ProgramCompilationProcess
+from parac.logging import set_avoid_print_banner_overwrite
+from parac.preprocessor import (detect_include_guard, has_pragma_once,
+                                PragmaDirective)
+from parac.preprocessor.line_scanner import scan_directive_lines
+
+from .. import add_folder, remove_folder, reset_input
+
+set_avoid_print_banner_overwrite(True)
+
+GUARDED_HEADER = '#ifndef GUARDED_H\n' \
+                 '#define GUARDED_H\n' \
+                 '#define COUNT_GUARDED 1\n' \
+                 '#endif\n'
+ONCE_HEADER = '#pragma once\n' \
+              'int once;\n'
+
+
+def get_tokens(source: str) -> list:
+    """ Returns the scanned tokens of the passed source in line order """
+    scanned = scan_directive_lines(source, "entry")
+    return sorted(
+        scanned.code_items + scanned.directive_items,
+        key=lambda token: token.get_line
+    )
+
+
+def run_preprocessor(files: dict, links: dict = None):
+    """
+    Creates the passed files and symlinks, runs the Pre-Processor on
+    entry.para and returns the program context and processed source
+    """
+    path = add_folder("include_guard_test")
+    for name, content in files.items():
+        os.makedirs(os.path.dirname(f"{path}{SEP}{name}"), exist_ok=True)
+        with open(f"{path}{SEP}{name}", 'w', encoding='utf-8') as file:
+            file.write(content)
+    for name, target in (links or {}).items():
+        os.symlink(f"{path}{SEP}{target}", f"{path}{SEP}{name}")
+
+    p = ProgramCompilationProcess(
+        f"{path}{SEP}entry.para", 'utf-8', f"{os.getcwd()}{SEP}build",
+        f"{os.getcwd()}{SEP}dist", use_build_cache=False
+    )
+    result = asyncio.run(p.preprocessor_ctx.process_program(False))
+    entry_path = os.path.normpath(f"{path}{SEP}entry.para")
+    return p.preprocessor_ctx, result, result.sources[entry_path]
+
+
+class TestIncludeGuards:
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+        remove_folder("include_guard_test")
+
+    def test_detect_include_guard(self):
+        for source, guard in [
+            (GUARDED_HEADER, "GUARDED_H"),
+            ('\n\n#ifndef A\n#if 1\n#else\n#endif\nint a;\n#endif\n\n', "A"),
+            ('#if !defined(B)\nint b;\n#endif', "B"),
+            ('#if ! defined C\n#endif\n', "C"),
+            ('int a;\n#ifndef A\n#endif\n', None),
+            ('#ifndef A\n#endif\nint a;\n', None),
+            ('#ifndef A\n#else\n#endif\n', None),
+            ('#ifndef A\n#elif 1\n#endif\n', None),
+            ('#ifndef A\n#endif\n#ifndef B\n#endif\n', None),
+            ('#ifdef A\n#endif\n', None),
+            ('#if !defined(A) && X\n#endif\n', None),
+            ('#ifndef A\nint a;\n', None),
+            ('', None),
+        ]:
+            assert detect_include_guard(get_tokens(source)) == guard, source
+
+    def test_pragma_once(self):
+        tokens = get_tokens('#pragma  once \n#pragma PARAC lang C\n')
+        assert all(isinstance(token, PragmaDirective) for token in tokens)
+        assert [token.pragma for token in tokens] == ["once", "PARAC lang C"]
+        assert has_pragma_once(tokens)
+        assert not has_pragma_once(get_tokens('#if 0\n#pragma once\n#endif'))
+
+    def test_skipped_includes(self):
+        ctx, result, entry = run_preprocessor({
+            "entry.para": '#include "guarded.ph"\n'
+                          '#include "sub/../guarded.ph"\n'
+                          '#include "once.ph"\n'
+                          '#include "once.ph"\n'
+                          '#define VALUE 1\n'
+                          '#include "counter.ph"\n'
+                          '#undef VALUE\n'
+                          '#define VALUE 2\n'
+                          '#include "counter.ph"\n'
+                          '#ifdef SECOND\n'
+                          'int second;\n'
+                          '#endif\n',
+            "guarded.ph": GUARDED_HEADER,
+            "once.ph": ONCE_HEADER,
+            "sub/empty.ph": '',
+            "counter.ph": '#if VALUE == 2\n'
+                          '#define SECOND\n'
+                          '#endif\n',
+        })
+        # Unguarded files are processed again, same as in C
+        assert entry.endswith('#ifdef SECOND\nint second;\n#endif\n')
+        assert len(result.processed_files) == 4
+
+        optimizer = ctx.include_optimizer
+        assert list(optimizer.guards.values()) == ["GUARDED_H"]
+        assert [os.path.basename(f) for f in optimizer.once_files] == \
+            ["once.ph"]
+        assert optimizer.statistics.skipped_includes == 2
+
+    def test_undefined_guard(self):
+        ctx, _, entry = run_preprocessor({
+            "entry.para": '#include "guarded.ph"\n'
+                          '#undef GUARDED_H\n'
+                          '#undef COUNT_GUARDED\n'
+                          '#include "guarded.ph"\n'
+                          '#ifdef COUNT_GUARDED\n'
+                          'int counted;\n'
+                          '#endif\n',
+            "guarded.ph": GUARDED_HEADER
+        })
+        assert 'int counted;' in entry
+        assert ctx.include_optimizer.statistics.skipped_includes == 0
+
+    @pytest.mark.skipif(
+        not hasattr(os, 'symlink'), reason="Symlinks are not supported"
+    )
+    def test_duplicate_paths(self):
+        ctx, result, _ = run_preprocessor(
+            {
+                "entry.para": '#include "once.ph"\n'
+                              '#include "link.ph"\n'
+                              '#include "copy.ph"\n'
+                              '#include "plain.ph"\n'
+                              '#include "plain_copy.ph"\n',
+                "once.ph": ONCE_HEADER,
+                "copy.ph": ONCE_HEADER,
+                "plain.ph": 'int plain;\n',
+                "plain_copy.ph": 'int plain;\n'
+            },
+            {"link.ph": "once.ph"}
+        )
+        stats = ctx.include_optimizer.statistics
+        assert (stats.skipped_reads, stats.skipped_parses) == (1, 1)
+        assert stats.skipped_includes == 2
+        # Copies of unguarded files are separate files
+        assert sorted(
+            os.path.basename(path) for path in result.processed_files
+        ) == ["entry.para", "once.ph", "plain.ph", "plain_copy.ph"]
+        assert len(ctx.file_contexts) == 4
+
+        # Other paths to a file are recorded as includes of the file
+        graph = ctx.include_graph
+        entry_name = graph.get_file_name(
+            os.path.normpath(ctx.entry_file_path), ctx.work_dir
+        )
+        assert [os.path.basename(f) for f in graph.get_includes(entry_name)] \
+            == ["once.ph", "once.ph", "once.ph", "plain.ph", "plain_copy.ph"]
@@ -0,0 +1,106 @@
+# coding=utf-8
+""" Tests for the include resolver of the Pre-Processor """
+import asyncio
+import os
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ProgramCompilationProcess
+from parac.logging import set_avoid_print_banner_overwrite
+from parac.preprocessor import DirectoryIndex, IncludeResolver
+
+from .. import add_folder, remove_folder, reset_input
+
+set_avoid_print_banner_overwrite(True)
+
+
+def create_files(path: str, names: list) -> None:
+    """ Creates the passed files (relative to path) """
+    for name in names:
+        os.makedirs(os.path.dirname(f"{path}{SEP}{name}"), exist_ok=True)
+        with open(f"{path}{SEP}{name}", 'w', encoding='utf-8') as file:
+            file.write(f"// {name}\n")
+
+
+class TestIncludeResolver:
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+        remove_folder("include_resolver_test")
+
+    def test_search_order(self):
+        path = add_folder("include_resolver_test")
+        create_files(path, [
+            "src/a.ph", "src/sub/b.ph", "include/a.ph", "include/c.ph",
+            "work/c.ph", "work/d.ph", "lib/d.ph", "lib/e.ph"
+        ])
+        resolver = IncludeResolver(
+            [f"{path}{SEP}include"], f"{path}{SEP}work", f"{path}{SEP}lib",
+            DirectoryIndex()
+        )
+        src = f"{path}{SEP}src"
+        for name, is_lib_include, expected in [
+            ("a.ph", False, "src/a.ph"),
+            ("a.ph", True, "include/a.ph"),
+            ("sub/b.ph", False, "src/sub/b.ph"),
+            ("sub/../a.ph", False, "src/a.ph"),
+            ("c.ph", False, "include/c.ph"),
+            ("d.ph", False, "work/d.ph"),
+            ("d.ph", True, "lib/d.ph"),
+            ("e.ph", False, "lib/e.ph"),
+            ("sub", False, None),
+            ("missing.ph", False, None),
+            ("b.ph", True, None),
+        ]:
+            expected = os.path.normpath(f"{path}{SEP}{expected}") \
+                if expected is not None else None
+            assert resolver.resolve(name, src, is_lib_include) == expected, \
+                name
+
+        assert resolver.resolve(f"{src}{SEP}a.ph", path) == \
+            os.path.normpath(f"{src}{SEP}a.ph")
+
+    def test_cached_lookups(self):
+        path = add_folder("include_resolver_test")
+        create_files(path, ["a.ph", "lib/b.ph"])
+        index = DirectoryIndex()
+        resolver = IncludeResolver([], path, f"{path}{SEP}lib", index)
+        for _ in range(100):
+            assert resolver.resolve("a.ph", path) is not None
+            assert resolver.resolve("b.ph", path, True) is not None
+            assert resolver.resolve("missing.ph", path) is None
+
+        stats = resolver.statistics
+        assert (stats.lookups, stats.cache_hits) == (300, 297)
+        assert stats.directories == 2
+        assert index.listing_count == 2
+
+        # Another compilation only reads changed directories again
+        create_files(path, ["missing.ph"])
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+        resolver = IncludeResolver([], path, f"{path}{SEP}lib", index)
+        assert resolver.resolve("missing.ph", path) is not None
+        assert resolver.resolve("b.ph", path, True) is not None
+        assert index.listing_count == 3
+
+    def test_include_paths(self):
+        path = add_folder("include_resolver_test")
+        create_files(path, ["include/lib.ph"])
+        with open(f"{path}{SEP}entry.para", 'w', encoding='utf-8') as file:
+            file.write('#include <lib.ph>\n#include <missing.ph>\n')
+
+        p = ProgramCompilationProcess(
+            f"{path}{SEP}entry.para", 'utf-8', f"{os.getcwd()}{SEP}build",
+            f"{os.getcwd()}{SEP}dist", use_build_cache=False,
+            include_paths=[f"{path}{SEP}include"]
+        )
+        ctx = p.preprocessor_ctx
+        result = asyncio.run(ctx.process_program(False))
+        assert sorted(os.path.basename(f) for f in result.processed_files) \
+            == ["entry.para", "lib.ph"]
+        assert ctx.include_resolver.include_paths == [
+            os.path.normpath(f"{path}{SEP}include")
+        ]
@@ -0,0 +1,125 @@
+# coding=utf-8
+""" Tests for the line scanner of the Pre-Processor """
+import asyncio
+import os
+from typing import List
+
+import antlr4
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ParacCompiler
+from parac.preprocessor import (DefineDirective, NonPreProcessorItem,
+                                PragmaDirective, PreProcessor,
+                                SelectionDirective, UndefDirective)
+from parac.preprocessor.ctx import ProgramPreProcessorContext
+from parac.preprocessor.line_scanner import scan_directive_lines
+from parac.preprocessor.listener import Listener
+
+test_files_dirs = [
+    f"{os.getcwd()}{SEP}test_files{SEP}",
+    f"{os.getcwd()}{SEP}test_files{SEP}preprocessor{SEP}",
+    f"{os.getcwd()}{SEP}test_files{SEP}c_files{SEP}"
+]
+
+
+def _directives(tokens) -> List[tuple]:
+    """
+    Returns the attributes of the directive tokens. Defines, undefs, pragmas
+    and selection directives are skipped, since they are only created by the
+    scanner
+    """
+    return [
+        (t.get_name, t.get_line, t.get_column, t.get_as_str(),
+         getattr(t, 'include_name', None))
+        for t in tokens if t.is_directive and
+        not isinstance(
+            t, (DefineDirective, UndefDirective, PragmaDirective,
+                SelectionDirective)
+        )
+    ]
+
+
+def _parse_full_file(text: str) -> List[tuple]:
+    """ Parses the entire file using the grammar and returns the directives """
+    stream = antlr4.InputStream(text)
+    tree = asyncio.run(PreProcessor.parse(stream, False))
+    listener = Listener(tree, stream, "entry")
+    asyncio.run(listener.walk_and_process_directives(False))
+    return _directives(listener.logic_stream)
+
+
+def _parse_scanned_file(text: str):
+    """ Parses the file using the line scanner """
+    return asyncio.run(
+        ProgramPreProcessorContext.parse_single_file(
+            antlr4.InputStream(text), "entry", False
+        )
+    )
+
+
+class TestLineScanner:
+    def test_scan(self):
+        text = 'int a;\n  #include "a.para"\nint b;\n\n#define X\nint c;'
+        scanned = scan_directive_lines(text, "entry")
+
+        assert scanned.has_directives
+        assert scanned.directive_text == '  #include "a.para"\n'
+        assert scanned.line_map == [2]
+        assert [i.get_as_str() for i in scanned.code_items] == [
+            'int a;\n', 'int b;\n\n', 'int c;'
+        ]
+        assert [i.get_line for i in scanned.code_items] == [1, 3, 6]
+        for item in scanned.code_items:
+            assert item.antlr4_ctx is None
+            assert item.get_column == 0
+
+        define, = scanned.directive_items
+        assert isinstance(define, DefineDirective)
+        assert define.macro_name == "X"
+        assert (define.get_line, define.get_as_str()) == (5, "#define X")
+
+    def test_macro_directives(self):
+        text = 'int a;\n #define F(a) a\n#undef F\nF(1);\n'
+        scanned = scan_directive_lines(text, "entry")
+        assert not scanned.has_directives
+
+        ctx = _parse_scanned_file(text)
+        define, undef, item = ctx.logic_stream[1:]
+        assert isinstance(define, DefineDirective)
+        assert (define.get_line, define.get_column) == (2, 1)
+        assert define.macro.params == ("a",)
+        assert isinstance(undef, UndefDirective)
+        assert (undef.macro_name, undef.get_line) == ("F", 3)
+        assert item.get_as_str() == "F(1);\n"
+
+    def test_no_directives(self):
+        text = "int main() {\n    return 0;\n}\n"
+        assert not scan_directive_lines(text, "entry").has_directives
+
+        ctx = _parse_scanned_file(text)
+        assert ctx.token_count == 0
+        assert ctx.node_count == 0
+        item, = ctx.logic_stream
+        assert isinstance(item, NonPreProcessorItem)
+        assert item.get_as_str() == text
+
+    def test_source_is_kept(self):
+        text = 'int a;\n#include "a.para"\n#include <b.para>\nint b;\n'
+        ctx = _parse_scanned_file(text)
+        assert [t.get_line for t in ctx.logic_stream] == [1, 2, 3, 4]
+        code = "".join(
+            t.get_as_str() for t in ctx.logic_stream if not t.is_directive
+        )
+        assert code == "int a;\nint b;\n"
+
+    def test_same_directives_as_grammar(self):
+        for folder in test_files_dirs:
+            for name in os.listdir(folder):
+                if not name.endswith((".para", ".parah", ".c", ".h")):
+                    continue
+                with open(f"{folder}{name}", 'r', encoding='utf-8') as file:
+                    text = ParacCompiler.remove_comments_from_str(file.read())
+
+                ctx = _parse_scanned_file(text)
+                assert _directives(ctx.logic_stream) == \
+                    _parse_full_file(text), name
@@ -0,0 +1,72 @@
+# coding=utf-8
+""" Test for the logic tokens of the Pre-Processor """
+import asyncio
+import pickle
+
+import antlr4
+
+from parac.preprocessor import (NonPreProcessorItem, FileIncludeDirective,
+                                ComputedIncludeDirective)
+from parac.preprocessor.ctx import ProgramPreProcessorContext
+
+
+class TestLogicTokens:
+    def test_slots(self):
+        tokens = [
+            NonPreProcessorItem("int x;", 1, 0, "entry.para", None),
+            FileIncludeDirective(
+                '#include "a.para"', 2, 0, "entry.para", None, "a.para", False
+            ),
+            ComputedIncludeDirective(
+                "#include HEADER", 3, 0, "entry.para", None, "HEADER"
+            )
+        ]
+        for token in tokens:
+            assert not hasattr(token, '__dict__')
+
+        item = tokens[0]
+        assert item.get_name == "NonPreProcessorItem"
+        assert item.get_line == 1
+        assert item.get_column == 0
+        assert not item.is_directive
+        assert repr(item) == "<NonPreProcessorItem: 'int x;'>"
+
+    def test_pickle(self):
+        # The antlr4 context is not picklable and must be dropped
+        token = FileIncludeDirective(
+            '#include <a.para>', 4, 2, "entry.para", lambda: None, "a.para",
+            True
+        )
+        restored = pickle.loads(pickle.dumps(token))
+
+        assert restored.antlr4_ctx is None
+        assert restored.get_as_str() == '#include <a.para>'
+        assert restored.get_name == "FileIncludeDirective"
+        assert restored.get_line == 4
+        assert restored.get_column == 2
+        assert restored.include_name == "a.para"
+        assert restored.is_lib_include
+        assert restored.relative_parent_file_name == "entry.para"
+
+    def test_release_antlr4_ctx(self):
+        text = '#include "a.para"\n#include <b.para>\nint x;\n'
+
+        async def _parse(release: bool):
+            return await ProgramPreProcessorContext.parse_single_file(
+                antlr4.InputStream(text), "entry", False,
+                release_parse_tree=release
+            )
+
+        kept = [t for t in asyncio.run(_parse(False)).logic_stream
+                if t.is_directive]
+        released = [t for t in asyncio.run(_parse(True)).logic_stream
+                    if t.is_directive]
+        assert len(released) == len(kept) == 2
+        for token, original in zip(released, kept):
+            assert token.antlr4_ctx is None
+            assert original.antlr4_ctx is not None
+            assert token.has_source_text
+            assert token.get_as_str() == original.get_as_str()
+
+        restored = pickle.loads(pickle.dumps(released[0]))
+        assert restored.get_as_str() == kept[0].get_as_str()
@@ -0,0 +1,195 @@
+# coding=utf-8
+""" Tests for the macro table and the macro expansion of the Pre-Processor """
+import asyncio
+import os
+import pickle
+
+import pytest
+
+from parac import SEPARATOR as SEP
+from parac.compiler import ProgramCompilationProcess
+from parac.exceptions import LogicalError
+from parac.logging import set_avoid_print_banner_overwrite
+from parac.preprocessor import MacroTable, parse_define, parse_undef
+
+from .. import add_folder, remove_folder, reset_input
+
+set_avoid_print_banner_overwrite(True)
+
+# entry.para -> macros.ph
+TEST_PROGRAM = {
+    "entry.para": '#include "macros.ph"\n'
+                  'int x = SQUARE(SIZE);\n'
+                  '#undef SIZE\n'
+                  '#define SIZE 4\n'
+                  'int y = SQUARE(\n    SIZE);\n'
+                  'char *s = NAME(y);\n',
+    "macros.ph": '#define SIZE 2\n'
+                 '#define SQUARE(x) ((x) * (x))\n'
+                 '#define NAME(x) #x\n'
+}
+
+
+def create_table(*defines: str) -> MacroTable:
+    """ Creates a macro table with the passed defines """
+    table = MacroTable()
+    for define in defines:
+        table.define(parse_define(define))
+    return table
+
+
+class TestMacros:
+    @staticmethod
+    def teardown_method(_):
+        """
+        This method is being called after each test case, and it will revert
+        input back to the original function
+        """
+        reset_input()
+        remove_folder("macro_test")
+
+    def test_parse_define(self):
+        macro = parse_define("#define X 1 + 2\n")
+        assert (macro.name, macro.params, macro.body) == ("X", None, "1 + 2")
+        assert not macro.is_function_like
+
+        # A whitespace before the parenthesis makes it object-like
+        assert parse_define("# define F (a) a").params is None
+
+        macro = parse_define("#define F(a, b, ...) a")
+        assert macro.params == ("a", "b", "__VA_ARGS__")
+        assert macro.is_variadic
+        assert parse_define("#define F() 1").params == ()
+        assert parse_undef("  #undef X \n") == "X"
+
+        for invalid in ["#define", "#define F(a, a) a", "#define F(1) a"]:
+            with pytest.raises(LogicalError):
+                parse_define(invalid)
+
+    def test_object_like(self):
+        table = create_table("#define A 1", "#define B A + A", "#define E")
+        assert table.expand("int x = B; E") == "int x = 1 + 1; "
+        # Strings, chars and parts of identifiers are not expanded
+        assert table.expand('"A" \'A\' A_B _A') == '"A" \'A\' A_B _A'
+
+    def test_function_like(self):
+        table = create_table(
+            "#define A 2",
+            "#define MAX(a, b) ((a) > (b) ? (a) : (b))",
+            "#define STR(x) #x",
+            "#define XSTR(x) STR(x)",
+            "#define CAT(a, b) a ## b",
+            "#define LOG(fmt, ...) printf(fmt, __VA_ARGS__)",
+            "#define ZERO() 0"
+        )
+        assert table.expand("MAX(A, f(1, 2))") == \
+            "((2) > (f(1, 2)) ? (2) : (f(1, 2)))"
+        assert table.expand('STR(a + "b")') == '"a + \\"b\\""'
+        assert table.expand("STR(A) XSTR(A)") == '"A" "2"'
+        assert table.expand("CAT(A, 1) CAT(x, A)") == "A1 xA"
+        assert table.expand('LOG("%d", 1, 2)') == 'printf("%d", 1, 2)'
+        assert table.expand("ZERO() + MAX") == "0 + MAX"
+
+        # Newlines of the arguments are added after the expansion, so the
+        # lines of the following code do not change
+        assert table.expand("MAX(1,\n 2)\nx") == \
+            "((1) > (2) ? (1) : (2))\n\nx"
+
+        with pytest.raises(LogicalError):
+            table.expand("MAX(1)")
+        with pytest.raises(LogicalError):
+            table.expand("MAX(1, 2")
+
+    def test_recursion(self):
+        table = create_table(
+            "#define R R + 1", "#define A B", "#define B A",
+            "#define F(x) F(x + 1)"
+        )
+        assert table.expand("R; A; B") == "R + 1; A; B"
+        assert table.expand("F(1)") == "F(1 + 1)"
+
+    def test_rescan_with_following_tokens(self):
+        table = create_table(
+            "#define F f", "#define f(x) [x]", "#define g(x) f",
+            "#define h(x) h"
+        )
+        # The name at the end of an expansion is called by the following
+        # tokens
+        assert table.expand("F(1)") == "[1]"
+        assert table.expand("g(1)(2)") == "[2]"
+        assert table.expand("F (1) F") == "[1] f"
+        # The expanded macro itself is not called again
+        assert table.expand("h(1)(2)") == "h(2)"
+
+    def test_blocked_names(self):
+        # The expected results are the output of 'cpp -P'
+        table = create_table(
+            "#define A A+1", "#define ID(x) x", "#define f(x) x+f(x)",
+            "#define OBJ f", "#define g(x) g"
+        )
+        # A name blocked inside of an argument stays blocked when the
+        # argument is rescanned with the replacement list
+        assert table.expand("ID(A)") == "A+1"
+        assert table.expand("ID(ID(A))") == "A+1"
+        # A macro is only blocked inside of its own replacement list, not in
+        # the arguments following it in the source
+        assert table.expand("OBJ(OBJ)") == "f+f(f)"
+        assert table.expand("g(g)(1)") == "g(1)"
+        assert table.expand("ID(ID)(A)") == "ID(A+1)"
+
+    def test_cache_invalidation(self):
+        table = create_table("#define A B + C", "#define B 1", "#define D 2")
+        assert table.expand("A A") == "1 + C 1 + C"
+        assert table.statistics.cache_hits == 1
+
+        # C was undefined when A was expanded, so A depends on it as well
+        generation = table.generation
+        table.define(parse_define("#define C 3"))
+        assert table.generation == generation + 1
+        assert table.expand("A") == "1 + 3"
+        assert table.statistics.invalidations == 1
+
+        # Unrelated macros do not invalidate the expansion
+        table.undefine("D")
+        assert table.expand("A") == "1 + 3"
+        assert table.statistics.invalidations == 1
+
+        # The expansions of A and B are removed
+        table.undefine("B")
+        assert table.expand("A") == "B + 3"
+        assert table.statistics.invalidations == 3
+
+    def test_cache_disabled(self):
+        table = MacroTable(cache_expansions=False)
+        table.define(parse_define("#define A 1"))
+        assert table.expand("A A") == "1 1"
+        assert table.statistics.cache_hits == 0
+        assert table.statistics.cache_misses == 2
+
+    def test_pickle(self):
+        macro = parse_define("#define F(a, ...) a __VA_ARGS__")
+        loaded = pickle.loads(pickle.dumps(macro))
+        assert (loaded.name, loaded.params, loaded.body_tokens) == \
+            (macro.name, macro.params, macro.body_tokens)
+
+    def test_process_program(self):
+        path = add_folder("macro_test")
+        for name, content in TEST_PROGRAM.items():
+            with open(f"{path}{SEP}{name}", 'w', encoding='utf-8') as file:
+                file.write(content)
+
+        p = ProgramCompilationProcess(
+            f"{path}{SEP}entry.para", 'utf-8', f"{os.getcwd()}{SEP}build",
+            f"{os.getcwd()}{SEP}dist", use_build_cache=False
+        )
+        result = asyncio.run(p.preprocessor_ctx.process_program(False))
+        entry = result.sources[os.path.normpath(f"{path}{SEP}entry.para")]
+        assert entry == '#include "macros.ph"\n' \
+                        'int x = ((2) * (2));\n' \
+                        '#undef SIZE\n' \
+                        '#define SIZE 4\n' \
+                        'int y = ((4) * (4))\n;\n' \
+                        'char *s = "y";\n'
+        assert entry.count("\n") == TEST_PROGRAM["entry.para"].count("\n")
+        assert sorted(p.preprocessor_ctx.macro_table.macros) == \
+            ["NAME", "SIZE", "SQUARE"]
@@ -0,0 +1,103 @@
+# coding=utf-8
+""" Tests for the compile server (parac serve) and its thin client """
+import asyncio
+import os
+import tempfile
+import threading
+
+import pytest
+
+import parac_client
+
+SUPPORTED = hasattr(os, 'fork') and hasattr(parac_client.socket, 'AF_UNIX')
+
+
+@pytest.mark.skipif(not SUPPORTED, reason="Requires a POSIX system")
+class TestServer:
+    @staticmethod
+    def setup_method(_):
+        """ Starts a compile server on a temporary socket """
+        from parac_cli.server import ParacServer
+
+        path = os.path.join(tempfile.mkdtemp(), "parac-test.sock")
+        TestServer.server = ParacServer(path)
+        TestServer.server.bind()
+        TestServer.thread = threading.Thread(
+            target=TestServer.server.serve_forever, args=(0.05,), daemon=True
+        )
+        TestServer.thread.start()
+
+    @staticmethod
+    def teardown_method(_):
+        """ Stops the server and removes the socket """
+        TestServer.server.shutdown()
+        TestServer.thread.join()
+        assert not os.path.exists(TestServer.server.socket_path)
+
+    def test_version(self, capfd):
+        path = self.server.socket_path
+        assert parac_client.run_on_server(["--version"], path) == 0
+        assert "Parac v" in capfd.readouterr().out
+
+    def test_exit_code(self, capfd):
+        path = self.server.socket_path
+        assert parac_client.run_on_server(["unknown-command"], path) == 2
+        assert "unknown-command" in capfd.readouterr().err
+
+    def test_already_running(self):
+        from parac import UserInputError
+        from parac_cli.server import ParacServer
+
+        with pytest.raises(UserInputError):
+            ParacServer(self.server.socket_path).bind()
+
+
+@pytest.mark.skipif(not SUPPORTED, reason="Requires a POSIX system")
+def test_immediate_shutdown():
+    from parac_cli.server import ParacServer
+
+    server = ParacServer(os.path.join(tempfile.mkdtemp(), "parac-test.sock"))
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    server.shutdown()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert not os.path.exists(server.socket_path)
+
+
+@pytest.mark.skipif(not SUPPORTED, reason="Requires a POSIX system")
+def test_load_reported_dfa_cache():
+    from parac.compiler import ParacCompiler
+    from parac.util import get_dfa_cache, get_input_stream
+    from parac_cli.server import ParacServer
+
+    asyncio.run(ParacCompiler.parse(
+        get_input_stream("int main() { return a + b; }", "test"), False
+    ))
+    cache = get_dfa_cache()
+    state_count = cache.state_count
+    path = os.path.join(tempfile.mkdtemp(), "dfa.pickle")
+    assert cache.save(path)
+    cache.clear()
+
+    # The request reports the path of the cache it saved
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, path.encode())
+    os.close(write_fd)
+    ParacServer._load_dfa_cache(read_fd)
+    assert cache.state_count == state_count
+
+    # Nothing is loaded if the request did not save a cache
+    cache.clear()
+    read_fd, write_fd = os.pipe()
+    os.close(write_fd)
+    ParacServer._load_dfa_cache(read_fd)
+    assert cache.state_count == 0
+
+
+def test_no_server():
+    path = os.path.join(tempfile.mkdtemp(), "missing.sock")
+    assert parac_client.run_on_server(["--version"], path) is None
+    assert parac_client.main(["serve"]) is None
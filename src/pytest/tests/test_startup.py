@@ -0,0 +1,92 @@
+# coding=utf-8
+"""
+Startup regression tests, which use 'python -X importtime' to check that the
+CLI does not import the compiler, the generated parsers or the Antlr4 runtime
+if they are not needed
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+SRC_PATH = str(Path("..").absolute())
+
+# Modules (and their submodules), which may only be imported once a command
+# actually compiles or parses a file
+LAZY_MODULES = [
+    "antlr4",
+    "asyncio",
+    "parac.abc",
+    "parac.compiler",
+    "parac.preprocessor",
+    "parac_cli.server",
+    "rich.progress"
+]
+
+# Budget for the cumulative import time of the CLI in microseconds. The
+# eager import of the compiler took more than twice as long. Wall-clock
+# timings are unreliable on shared CI runners, so the budget is only checked
+# if the environment variable is set
+STARTUP_BUDGET_ENV_NAME = "PARAC_CHECK_STARTUP_BUDGET"
+STARTUP_BUDGET_US = 400_000
+
+
+def get_import_times(code: str) -> Dict[str, int]:
+    """
+    Runs the code in a new interpreter using -X importtime and returns the
+    cumulative import time of every imported module in microseconds
+    """
+    env = dict(os.environ, PYTHONPATH=SRC_PATH)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, check=True
+    )
+
+    times: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # Format: "import time: <self> | <cumulative> | <name>"
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def _is_lazy_module(name: str) -> bool:
+    return any(
+        name == module or name.startswith(f"{module}.")
+        for module in LAZY_MODULES
+    )
+
+
+@pytest.mark.parametrize("code", [
+    "import parac",
+    "import parac.util",
+    "import parac_cli",
+    "from parac_cli import cli_entry; "
+    "cli_entry.main(['--version'], standalone_mode=False)"
+])
+def test_lazy_imports(code):
+    times = get_import_times(code)
+    assert "parac" in times
+    assert [name for name in times if _is_lazy_module(name)] == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get(STARTUP_BUDGET_ENV_NAME),
+    reason=f"Timing check, set {STARTUP_BUDGET_ENV_NAME} to enable it"
+)
+def test_startup_budget():
+    times = get_import_times("import parac_cli")
+    assert times["parac_cli"] < STARTUP_BUDGET_US
+
+
+def test_lazy_attributes():
+    times = get_import_times(
+        "import parac; parac.RUNTIME_COMPILER; parac.preprocessor.PreProcessor"
+    )
+    assert "parac.compiler" in times
+    assert "parac.preprocessor" in times
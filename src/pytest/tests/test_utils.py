@@ -3,7 +3,31 @@
 Test for the utility functions in Para-C (test_util.py and decorators.py)
 """
 
-from parac import util, WIN
+import asyncio
+import gc
+import os
+import sys
+import weakref
+
+import antlr4
+
+from parac import util, WIN, SEPARATOR as SEP
+from parac.compiler import ParacCompiler
+from parac.compiler.parser.python.ParaCListener import ParaCListener
+from parac.compiler.parser.python.ParaCParser import ParaCParser
+
+from . import add_folder
+
+test_file_path = f"{os.getcwd()}{SEP}test_files{SEP}entry.para"
+
+
+def _parse_test_file() -> str:
+    """ Parses the test file and returns the parse tree as a string """
+    with open(test_file_path, 'r', encoding='utf-8') as file:
+        content = ParacCompiler.remove_comments_from_str(file.read())
+    stream = util.get_input_stream(content, "entry.para")
+    ctx = asyncio.run(ParacCompiler.parse(stream, False))
+    return ctx.toStringTree(recog=ctx.parser)
 
 
 class TestCheckValidPathName:
@@ -179,3 +203,261 @@ class TestGetRelativeFileName:
             ...
         else:
             assert False
+
+
+class TestDFACache:
+    def test_save_and_load(self):
+        cache = util.get_dfa_cache()
+        path = f"{add_folder('build')}{SEP}{util.DFA_CACHE_FILE_NAME}"
+
+        expected = _parse_test_file()
+        state_count = cache.state_count
+        assert state_count > 0
+        assert cache.save(path)
+        assert cache.saved_path == path
+        # Nothing new to save
+        assert not cache.save(path)
+        assert cache.saved_path == path
+
+        cache.clear()
+        assert cache.state_count == 0
+        assert cache.load(path)
+        assert cache.state_count == state_count
+        # Already warm -> nothing to load
+        assert not cache.load(path)
+
+        assert _parse_test_file() == expected
+        assert cache.state_count == state_count
+
+    def test_invalid_file(self):
+        cache = util.get_dfa_cache()
+        path = f"{add_folder('build')}{SEP}{util.DFA_CACHE_FILE_NAME}"
+        with open(path, 'wb') as file:
+            file.write(b"invalid")
+
+        cache.clear()
+        assert not cache.load(path)
+        assert cache.state_count == 0
+
+
+class TestBuildCache:
+    @staticmethod
+    def setup_method(_):
+        """ Creates an empty build folder before each test """
+        add_folder('build')
+
+    @staticmethod
+    def _create_cache():
+        path = f"{os.getcwd()}{SEP}build{SEP}{util.BUILD_CACHE_FOLDER_NAME}"
+        return util.BuildCache(path, 'utf-8')
+
+    @staticmethod
+    def _create_file(name: str, content: str) -> str:
+        path = f"{os.getcwd()}{SEP}build{SEP}{name}"
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def test_hit_and_miss(self):
+        cache = self._create_cache()
+        path = self._create_file("file.para", "int main() {}")
+
+        assert cache.get("compiler", path) is None
+        assert cache.put("compiler", path, ["value"])
+        assert cache.get("compiler", path) == ["value"]
+        # Different namespace
+        assert cache.get("preprocessor", path) is None
+
+        # Changed content
+        self._create_file("file.para", "int main() { return 0; }")
+        assert cache.get("compiler", path) is None
+
+        stats = cache.statistics
+        assert (stats.hits, stats.misses) == (1, 3)
+        assert stats.hit_rate == 0.25
+
+    def test_defines_in_key(self):
+        path = self._create_file("file.para", "int main() {}")
+        cache_path = f"{os.getcwd()}{SEP}build{SEP}cache"
+        cache = util.BuildCache(cache_path, 'utf-8', {'DEBUG': '1'})
+        cache.put("compiler", path, 1)
+
+        assert util.BuildCache(cache_path, 'utf-8').get(
+            "compiler", path
+        ) is None
+        assert util.BuildCache(cache_path, 'utf-8', {'DEBUG': '1'}).get(
+            "compiler", path
+        ) == 1
+
+    def test_lru_eviction(self):
+        cache = self._create_cache()
+        paths = [
+            self._create_file(f"file_{i}.para", str(i)) for i in range(3)
+        ]
+        for i, path in enumerate(paths):
+            cache.put("compiler", path, "x" * 1000)
+            # Entries of the same second would have the same mtime
+            entry_path = cache._get_entry_path(cache.get_key("compiler", path))
+            os.utime(entry_path, (i, i))
+        entry_size = cache.size // 3
+
+        # Using the first entry, which makes the second the least recently used
+        assert cache.get("compiler", paths[0]) is not None
+
+        cache._max_size = entry_size * 2
+        assert cache.evict() == 1
+        assert cache.get("compiler", paths[1]) is None
+        assert cache.get("compiler", paths[0]) is not None
+        assert cache.get("compiler", paths[2]) is not None
+        assert cache.statistics.evictions == 1
+
+
+class _RecordingListener(ParaCListener):
+    """ Listener, which records the calls of the implemented callbacks """
+
+    def __init__(self):
+        self.calls = []
+
+    def enterEveryRule(self, ctx):
+        self.calls.append(("enterEveryRule", type(ctx).__name__))
+
+    def exitEveryRule(self, ctx):
+        self.calls.append(("exitEveryRule", type(ctx).__name__))
+
+    def visitTerminal(self, node):
+        self.calls.append(("visitTerminal", node.getText()))
+
+    def enterPrimaryExpression(self, ctx):
+        self.calls.append(("enterPrimaryExpression", ctx.getText()))
+
+    def exitStandardFunctionDefinition(self, ctx):
+        self.calls.append(("exitStandardFunctionDefinition", ctx.getText()))
+
+    def exitDeclaration(self, ctx):
+        """ Not implemented """
+        ...
+
+
+class TestDispatchTableWalker:
+    def test_noop_callback(self):
+        def _docstring_only(_, ctx):
+            """ Only a docstring """
+            ...
+
+        def _returns_value(_, ctx):
+            return 1
+
+        assert util.is_noop_callback(_docstring_only)
+        assert util.is_noop_callback(ParaCListener.enterDeclaration)
+        assert not util.is_noop_callback(_returns_value)
+        assert not util.is_noop_callback(
+            _RecordingListener.enterPrimaryExpression
+        )
+
+    def test_same_order_as_antlr4(self):
+        with open(test_file_path, 'r', encoding='utf-8') as file:
+            content = ParacCompiler.remove_comments_from_str(file.read())
+        stream = util.get_input_stream(content, "entry.para")
+        tree = asyncio.run(ParacCompiler.parse(stream, False))
+
+        expected = _RecordingListener()
+        antlr4.ParseTreeWalker().walk(expected, tree)
+        listener = _RecordingListener()
+        util.DispatchTableWalker().walk(listener, tree)
+
+        assert listener.calls == expected.calls
+        assert ("exitStandardFunctionDefinition", "statusAdditionalFunction"
+                "(intx){printf(\"%i\",x);statusr={.status_code=0};returnr;}"
+                ) in listener.calls
+
+        table = util.DispatchTableWalker.get_dispatch_table(_RecordingListener)
+        entry = table[ParaCParser.DeclarationContext]
+        assert entry[0] is not None  # enterEveryRule
+        assert entry[1] is _RecordingListener.exitEveryRule
+
+    def test_deep_tree(self):
+        root = parent = antlr4.ParserRuleContext()
+        for _ in range(sys.getrecursionlimit() * 2):
+            child = antlr4.ParserRuleContext(parent)
+            parent.addChild(child)
+            parent = child
+
+        visited = util.DispatchTableWalker().walk(_RecordingListener(), root)
+        assert visited == sys.getrecursionlimit() * 2 + 1
+
+
+class TestFreeParseTree:
+    def test_freed_without_gc(self):
+        with open(test_file_path, 'r', encoding='utf-8') as file:
+            content = ParacCompiler.remove_comments_from_str(file.read())
+        stream = util.get_input_stream(content, "entry.para")
+        tree = asyncio.run(ParacCompiler.parse(stream, False))
+        token_stream = tree.parser.getTokenStream()
+        refs = [
+            weakref.ref(obj) for obj in
+            (tree, tree.parser, token_stream, token_stream.tokenSource)
+        ]
+        del stream, token_stream
+
+        gc.disable()
+        try:
+            assert util.free_parse_tree(tree) > 1
+            del tree
+            assert all(ref() is None for ref in refs)
+        finally:
+            gc.enable()
+
+
+def _lex(stream) -> list:
+    """ Returns the type, text and position of all tokens of the stream """
+    from parac.compiler.parser.python.ParaCLexer import ParaCLexer
+
+    token_stream = antlr4.CommonTokenStream(ParaCLexer(stream))
+    token_stream.fill()
+    return [
+        (t.type, t.text, t.start, t.stop, t.line, t.column)
+        for t in token_stream.tokens
+    ]
+
+
+class TestSourceStream:
+    def test_same_tokens_as_antlr4(self):
+        folder = os.path.dirname(test_file_path)
+        for name in os.listdir(folder):
+            if not name.endswith(".para"):
+                continue
+            with open(os.path.join(folder, name), 'r', encoding='utf-8') as f:
+                content = ParacCompiler.remove_comments_from_str(f.read())
+            assert _lex(util.get_input_stream(content, name)) == \
+                _lex(antlr4.InputStream(content))
+
+    def test_non_ascii(self):
+        content = 'char* s = "ü€\U0001f600";\nint x = 1;\n'
+        stream = util.get_input_stream(content, "entry.para")
+        assert not isinstance(stream.data, bytes)
+        assert stream.size == len(content)
+        assert stream.getText(11, 13) == "ü€\U0001f600"
+        assert _lex(stream) == _lex(antlr4.InputStream(content))
+
+    def test_stream_interface(self):
+        stream = util.get_input_stream("ab", "entry.para")
+        assert isinstance(stream.data, bytes)
+        assert (stream.LA(1), stream.LA(2), stream.LA(3)) == (97, 98, -1)
+        assert stream.LA(-1) == -1
+        stream.consume()
+        assert stream.index == 1 and stream.LA(-1) == 97
+        stream.seek(5)
+        assert stream.index == stream.size == 2
+        assert stream.getText(0, 10) == "ab"
+        assert stream.getText(2, 3) == ""
+
+    def test_file_stream(self):
+        stream = util.get_file_stream(
+            test_file_path, "utf-8",
+            transform=ParacCompiler.remove_comments_from_str
+        )
+        assert stream.name == "entry.para"
+        assert stream.fileName == test_file_path
+        with open(test_file_path, 'r', encoding='utf-8') as file:
+            assert stream.strdata == \
+                ParacCompiler.remove_comments_from_str(file.read())
@@ -30,6 +30,7 @@ setuptools.setup(
         "Changelog": "https://github.com/Luna-Klatzer/Para-C/releases"
     },
     packages=setuptools.find_packages(),
+    py_modules=["parac_client"],
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "Programming Language :: Python :: 3",